@@ -1,6 +1,7 @@
 # Import my own libraries
 import lib_platefunctions as pf
 import lib_datafunctions as df
+import lib_drtcresults as dr
 import lib_fittingfunctions as ff
 import lib_customplots as cp
 import lib_colourscheme as cs
@@ -94,12 +95,14 @@ class ProgressCurves(wx.Panel):
         self.figure.clear() # clear and re-draw function
         self.ax = self.figure.add_subplot()
         self.figure.subplots_adjust(left=self.Left, right=self.Right, top=self.Top , bottom=self.Bottom)
-        for conc in range(len(self.Input["Concentrations"])):
+        results = self.tabname.dfr_AssayData.loc[self.PlateIndex,"DRTCResults"]
+        arr_Time, arr_Concentrations, arr_RawMean = dr.progress_curves(results, self.SampleIndex)
+        for conc in range(len(arr_Concentrations)):
             if self.Exclude[conc] == False:
-                self.ax.plot(self.Input["Time"], self.Input["RawMean"].iloc[conc].apply(self.thousands), label=self.Input["Concentrations"][conc]*1000000,
+                self.ax.plot(arr_Time, self.thousands(arr_RawMean[conc]), label=arr_Concentrations[conc]*1000000,
                     color=self.Colours[conc], linestyle=self.Linestyles[conc])
             else:
-                self.ax.plot(self.Input["Time"], self.Input["RawMean"].iloc[conc].apply(self.thousands), label=self.Input["Concentrations"][conc]*1000000,
+                self.ax.plot(arr_Time, self.thousands(arr_RawMean[conc]), label=arr_Concentrations[conc]*1000000,
                     color=cs.BgMediumHex, linestyle=self.Linestyles[conc])
         self.ax.xaxis.set_pickradius(50)
         self.ax.yaxis.set_pickradius(50)
@@ -174,6 +177,7 @@ class ProgressCurves(wx.Panel):
     def OnPick(self, event):
         self.tabname.parent.Freeze()
         #print(event.artist.get_label())
+        results = self.tabname.dfr_AssayData.loc[self.PlateIndex,"DRTCResults"]
         flt_Conc = float(event.artist.get_label())/1000000
         for idx_Conc in range(len(self.Input["Concentrations"])):
             if self.Input["Concentrations"][idx_Conc] == flt_Conc:
@@ -181,63 +185,16 @@ class ProgressCurves(wx.Panel):
                 self.dlg_ReFittingProgress = GenericProgress(self, "Re-fitting")
                 self.dlg_ReFittingProgress.Show()
                 count = 0
-                for flt_Cycle in self.Input["Time"]:
-                    if np.isnan(self.Input["NormMean"].loc[flt_Conc,flt_Cycle]) == False:
-                        # First check if there are enough datapoints left to perform a fit
-                        # Selected datapoint IS NOT excluded -> copy it into excluded series and set value in data series to nan
-                        self.Input["RawExcluded"].at[flt_Conc,flt_Cycle] = self.Input["RawMean"].loc[flt_Conc,flt_Cycle]
-                        self.Input["RawMean"].at[flt_Conc,flt_Cycle] = np.nan
-                        self.Input["NormExcluded"].at[flt_Conc,flt_Cycle] = self.Input["NormMean"].loc[flt_Conc,flt_Cycle]
-                        self.Input["NormMean"].at[flt_Conc,flt_Cycle] = np.nan
-                    else:
-                        # Selected datapoint IS excluded -> copy it back into data series and set value in excluded series to nan
-                        self.Input["RawMean"].at[flt_Conc,flt_Cycle] = self.Input["RawExcluded"].loc[flt_Conc,flt_Cycle]
-                        self.Input["RawExcluded"].at[flt_Conc,flt_Cycle] = np.nan
-                        self.Input["NormMean"].at[flt_Conc,flt_Cycle] = self.Input["NormExcluded"].loc[flt_Conc,flt_Cycle]
-                        self.Input["NormExcluded"].at[flt_Conc,flt_Cycle] = np.nan
-                    
-                    self.Input["DoFit"].at["Value",flt_Cycle] = df.get_DoFit(self.Input["NormMean"].loc[:,flt_Cycle].tolist(),self.Input["NormSEM"].loc[:,flt_Cycle].tolist())
-            
-                    if self.Input["DoFit"].at["Value",flt_Cycle] == True:
-                    # 3. Re-fit
-                        lst_FitResults = ff.sigmoidal_free(self.Input["Concentrations"], self.Input["NormMean"].loc[:,flt_Cycle].tolist())  # only function for constrained needs SEM
-                        self.Input.at["NormFitFree"].loc[:,flt_Cycle] = lst_FitResults[0]
-                        self.Input.at["NormFitFreePars"].loc[:,flt_Cycle] = lst_FitResults[1]
-                        self.Input.at["NormFitFreeCI"].loc[:,flt_Cycle] = lst_FitResults[2]
-                        self.Input.at["NormFitFreeErrors"].loc[:,flt_Cycle] = lst_FitResults[3]
-                        self.Input.loc["NormFitFreeR2"].at["Value",flt_Cycle] = lst_FitResults[4]
-                        self.Input.loc["DoNormFitFree"].at["Value",flt_Cycle] = lst_FitResults[5]
-                        lst_FitResults = ff.sigmoidal_constrained(self.Input["Concentrations"], self.Input["NormMean"].loc[:,flt_Cycle].tolist(), self.Input["NormSEM"].loc[:,flt_Cycle].tolist())  # only function for constrained needs SEM
-                        self.Input.at["NormFitConst"].loc[:,flt_Cycle] = lst_FitResults[0]
-                        self.Input.at["NormFitConstPars"].loc[:,flt_Cycle] = lst_FitResults[1]
-                        self.Input.at["NormFitConstCI"].loc[:,flt_Cycle] = lst_FitResults[2]
-                        self.Input.at["NormFitConstErrors"].loc[:,flt_Cycle] = lst_FitResults[3]
-                        self.Input.loc["NormFitConstR2"].at["Value",flt_Cycle] = lst_FitResults[4]
-                        self.Input.loc["DoNormFitConst"].at["Value",flt_Cycle] = lst_FitResults[5]
-
-                    else:
-                        self.Input.at["RawFit"].loc[:,flt_Cycle] = df.set_to_nan(len(self.Input["RawFit"].loc[:,flt_Cycle]))
-                        self.Input.at["RawFitPars"].loc[:,flt_Cycle] = df.set_to_nan(4)
-                        self.Input.at["RawFitR2"].loc[:,flt_Cycle] = np.nan
-
-                        self.Input.at["NormFitFree"].loc[:,flt_Cycle] = df.set_to_nan(len(self.Input["NormFitFree"].loc[:,flt_Cycle]))
-                        self.Input.at["NormFitFreePars"].loc[:,flt_Cycle] = df.set_to_nan(4)
-                        self.Input.at["NormFitFreeR2"].loc[:,flt_Cycle] = np.nan
-
-                        self.Input.at["NormFitConst"].loc[:,flt_Cycle] = df.set_to_nan(len(self.Input["NormFitConst"].loc[:,flt_Cycle]))
-                        self.Input.at["NormFitConstPars"].loc[:,flt_Cycle] = df.set_to_nan(4)
-                        self.Input.at["NormFitConstR2"].loc[:,flt_Cycle] = np.nan
-
-                        self.Input.at["NormFitFreeCI"].loc[:,flt_Cycle], self.Input.at["NormFitConstCI"].loc[:,flt_Cycle], self.Input["RawFitCI"].loc[:,flt_Cycle] = df.set_to_nan(4), df.set_to_nan(4), df.set_to_nan(4)
-                        self.Input.at["NormFitFreeErrors"].loc[:,flt_Cycle], self.Input.at["NormFitConstErrors"].loc[:,flt_Cycle], self.Input["RawFitErrors"].loc[:,flt_Cycle] = df.set_to_nan(4), df.set_to_nan(4), df.set_to_nan(4)
+                for cycle in range(len(self.Input["Time"])):
+                    # Selected datapoint IS NOT excluded -> move it into the excluded values, otherwise move it back
+                    bol_Exclude = np.isnan(results.get_values(self.SampleIndex,"NormMean",cycle)[idx_Conc]) == False
+                    results.set_excluded(self.SampleIndex, idx_Conc, cycle, bol_Exclude)
+                    self.tabname.RefitCycle(self.PlateIndex, self.SampleIndex, cycle)
                     count += 1
                     self.dlg_ReFittingProgress.gauge.SetValue((count/len(self.Input["Time"]))*200)
 
-        self.tabname.dfr_AssayData.loc[self.PlateIndex,"ProcessedDataFrame"].at[self.SampleIndex] = self.Input
-        self.tabname.plt_IndividualCycle.Input = self.tabname.dfr_AssayData.loc[self.PlateIndex,"ProcessedDataFrame"].loc[self.SampleIndex]
-        self.tabname.plt_IndividualCycle.Draw()
-        self.tabname.plt_IndividualIC50AgainstTime.Input = self.tabname.dfr_AssayData.iloc[self.PlateIndex,5].loc[self.SampleIndex]
         self.tabname.plt_IndividualCycle.Draw()
+        self.tabname.plt_IndividualIC50AgainstTime.Draw()
         self.Draw()
         self.tabname.parent.Thaw()
         self.dlg_ReFittingProgress.Destroy()
@@ -267,10 +224,12 @@ class ProgressCurves(wx.Panel):
         cp.shared_PlotToPNG(self)
     
     def DataToClipboard(self, event):
+        results = self.tabname.dfr_AssayData.loc[self.PlateIndex,"DRTCResults"]
+        arr_Time, arr_Concentrations, arr_RawMean = dr.progress_curves(results, self.SampleIndex)
         data = {}
-        for conc in self.Input["RawMean"].index.values.tolist():
-            data[conc] = self.Input["RawMean"].loc[conc,:]
-        pd.DataFrame(data=data,index=self.Input["Time"]).to_clipboard(header=True, index=True)
+        for conc in range(len(arr_Concentrations)):
+            data[arr_Concentrations[conc]] = arr_RawMean[conc]
+        pd.DataFrame(data=data,index=arr_Time).to_clipboard(header=True, index=True)
 
     def thousands(self, x):
         return x / 1000
@@ -349,15 +308,17 @@ class CurvePlotPanel(wx.Panel):
 
     def Draw(self):
         # Convert dose to micromoles
+        results = self.tabname.dfr_AssayData.loc[self.PlateIndex,"DRTCResults"]
+        cycle = results.cycle_position(self.Cycle)
         self.Dose = self.Input["Concentrations"]
         self.DoseMicromolar = df.moles_to_micromoles(self.Dose)
-        self.Response = self.Input["NormMean"].loc[:,self.Cycle].tolist()
-        self.ErrorBars = self.Input["NormSEM"].loc[:,self.Cycle].tolist()
-        self.Excluded = self.Input["NormExcluded"].loc[:,self.Cycle].tolist()
-        if self.Input["Show"].loc["Value",self.Cycle] == 1:
-            self.NormFit = self.Input["NormFitFree"].loc[:,self.Cycle]
+        self.Response = results.get_values(self.SampleIndex,"NormMean",cycle).tolist()
+        self.ErrorBars = results.get_values(self.SampleIndex,"NormSEM",cycle).tolist()
+        self.Excluded = results.get_values(self.SampleIndex,"NormExcluded",cycle).tolist()
+        if results.get_values(self.SampleIndex,"Show",cycle) == 1:
+            self.NormFit = results.get_values(self.SampleIndex,"NormFitFree",cycle).tolist()
         else:
-            self.NormFit = self.Input["NormFitConst"].loc[:,self.Cycle]
+            self.NormFit = results.get_values(self.SampleIndex,"NormFitConst",cycle).tolist()
         self.figure.clear() # clear and re-draw function
         self.ax = self.figure.add_subplot()
         self.figure.subplots_adjust(left=0.18, right=0.99, top=self.Top , bottom=self.Bottom)
@@ -441,9 +402,9 @@ class CurvePlotPanel(wx.Panel):
                 str_Unit = ""
             # find nearest concentration to mouse position:
             conc = df.nearest(self.DoseMicromolar,hover_x)
-            conc_M = conc/1000000
             if pd.isna(conc) == True:
                 return None
+            idx_Conc = df.nearest(self.DoseMicromolar,hover_x,index=True)
             # find nearest response and excluded to mouse position:
             resp = df.nearest(self.Response,hover_y)
             if df.any_nonnan(self.Excluded) == True:
@@ -453,12 +414,11 @@ class CurvePlotPanel(wx.Panel):
             str_Tooltip = None
             # For the x axis (log scale), we have to adjust relative
             if hover_x >= (conc*0.9) and hover_x <= (conc*1.1):
-                # Convert back to molar
-                if pd.isna(self.Input["NormMean"].loc[conc_M,self.Cycle]) == False:
-                    if hover_y >= (self.Input["NormMean"].loc[conc_M,self.Cycle] - within) and hover_y <= (self.Input["NormMean"].loc[conc_M,self.Cycle] + within):
+                if pd.isna(self.Response[idx_Conc]) == False:
+                    if hover_y >= (self.Response[idx_Conc] - within) and hover_y <= (self.Response[idx_Conc] + within):
                         str_Tooltip = "x: " + str(conc) + " " + chr(181) +"M\ny: " + str(round(resp,2)) + str_Unit
-                elif pd.isna(self.Input["NormExcluded"].loc[conc_M,self.Cycle]) == False:
-                    if hover_y >= (self.Input["NormExcluded"].loc[conc_M,self.Cycle] - within) and hover_y <= (self.Input["NormExcluded"].loc[conc_M,self.Cycle] + within):
+                elif pd.isna(self.Excluded[idx_Conc]) == False:
+                    if hover_y >= (self.Excluded[idx_Conc] - within) and hover_y <= (self.Excluded[idx_Conc] + within):
                         str_Tooltip = "x: " + str(conc) + " " + chr(181) +"M\ny: " + str(round(excl,2)) + str_Unit
                 if not str_Tooltip == None:
                     self.tltp = tt.dlg_ToolTip(self, str_Tooltip)
@@ -481,77 +441,35 @@ class CurvePlotPanel(wx.Panel):
         if not N: return True
         # Get selected datapoint:
         # We need have a series for each datapoint to allow for the use of markers for each datapoint.
-        picked_conc = df.nearest(self.Dose,event.mouseevent.xdata/1000000) # from micromolar to molar
+        idx_Conc = df.nearest(self.Dose,event.mouseevent.xdata/1000000,index=True) # from micromolar to molar
+        results = self.tabname.dfr_AssayData.loc[self.PlateIndex,"DRTCResults"]
+        cycle = results.cycle_position(self.Cycle)
         # exclude datapoint:
-        # 1. First write value into lst_RawExcluded/lst_NormExcluded, write np.nan into lst_Raw/lst_Norm
-        if np.isnan(self.Input["NormMean"].loc[picked_conc,self.Cycle]) == False:
+        # 1. Move value into RawExcluded/NormExcluded, write np.nan into RawMean/NormMean (see DRTCResults.set_excluded)
+        if np.isnan(results.get_values(self.SampleIndex,"NormMean",cycle)[idx_Conc]) == False:
             # First check if there are enough datapoints left to perform a fit
             counter = 0
-            for datapoint in self.Input["NormMean"].loc[:,self.Cycle].tolist():
+            for datapoint in results.get_values(self.SampleIndex,"NormMean",cycle).tolist():
                 if np.isnan(datapoint) == False:
                     counter += 1
             if counter > 5:
-                # Selected datapoint IS NOT excluded -> copy it into excluded series and set value in data series to nan
-                self.Input["RawExcluded"].at[picked_conc,self.Cycle] = self.Input["RawMean"].loc[picked_conc,self.Cycle]
-                self.Input["RawMean"].at[picked_conc,self.Cycle] = np.nan
-                self.Input["NormExcluded"].at[picked_conc,self.Cycle] = self.Input["NormMean"].loc[picked_conc,self.Cycle]
-                self.Input["NormMean"].at[picked_conc,self.Cycle] = np.nan
+                # Selected datapoint IS NOT excluded -> move it into the excluded values
+                results.set_excluded(self.SampleIndex, idx_Conc, cycle, True)
             else:
                 wx.MessageBox("You are trying to remove too many points. Attempting to fit with less than five points will not produce a reliable fit.",
                     "Not enough points left",
                     wx.OK|wx.ICON_INFORMATION)
         else:
-            # Selected datapoint IS excluded -> copy it back into data series and set value in excluded series to nan
-            self.Input["RawMean"].at[picked_conc,self.Cycle] = self.Input["RawExcluded"].loc[picked_conc,self.Cycle]
-            self.Input["RawExcluded"].at[picked_conc,self.Cycle] = np.nan
-            self.Input["NormMean"].at[picked_conc,self.Cycle] = self.Input["NormExcluded"].loc[picked_conc,self.Cycle]
-            self.Input["NormExcluded"].at[picked_conc,self.Cycle] = np.nan
+            # Selected datapoint IS excluded -> move it back into the data
+            results.set_excluded(self.SampleIndex, idx_Conc, cycle, False)
         
-        # Check whether a re-fit is required:
-        self.Input["DoFit"].at["Value",self.Cycle] = df.get_DoFit(self.Input["NormMean"].loc[:,self.Cycle].tolist(),self.Input["NormSEM"].loc[:,self.Cycle].tolist())
-            
-        if self.Input["DoFit"].at["Value",self.Cycle] == True:
-            # 3. Re-fit
-            lst_FitResults = ff.sigmoidal_free(self.Input["Concentrations"], self.Input["NormMean"].loc[:,self.Cycle].tolist())  # only function for constrained needs SEM
-            self.Input.at["NormFitFree"].loc[:,self.Cycle] = lst_FitResults[0]
-            self.Input.at["NormFitFreePars"].loc[:,self.Cycle] = lst_FitResults[1]
-            self.Input.at["NormFitFreeCI"].loc[:,self.Cycle] = lst_FitResults[2]
-            self.Input.at["NormFitFreeErrors"].loc[:,self.Cycle] = lst_FitResults[3]
-            self.Input.loc["NormFitFreeR2"].at["Value",self.Cycle] = lst_FitResults[4]
-            self.Input.loc["DoNormFitFree"].at["Value",self.Cycle] = lst_FitResults[5]
-            lst_FitResults = ff.sigmoidal_constrained(self.Input["Concentrations"], self.Input["NormMean"].loc[:,self.Cycle].tolist(), self.Input["NormSEM"].loc[:,self.Cycle].tolist())  # only function for constrained needs SEM
-            self.Input.at["NormFitConst"].loc[:,self.Cycle] = lst_FitResults[0]
-            self.Input.at["NormFitConstPars"].loc[:,self.Cycle] = lst_FitResults[1]
-            self.Input.at["NormFitConstCI"].loc[:,self.Cycle] = lst_FitResults[2]
-            self.Input.at["NormFitConstErrors"].loc[:,self.Cycle] = lst_FitResults[3]
-            self.Input.loc["NormFitConstR2"].at["Value",self.Cycle] = lst_FitResults[4]
-            self.Input.loc["DoNormFitConst"].at["Value",self.Cycle] = lst_FitResults[5]
-
-        else:
-            self.Input.at["RawFit"].loc[:,self.Cycle] = df.set_to_nan(len(self.Input["RawFit"].loc[:,self.Cycle]))
-            self.Input.at["RawFitPars"].loc[:,self.Cycle] = df.set_to_nan(4)
-            self.Input.at["RawFitR2"].loc[:,self.Cycle] = np.nan
-            
-            self.Input.at["NormFitFree"].loc[:,self.Cycle] = df.set_to_nan(len(self.Input["NormFitFree"].loc[:,self.Cycle]))
-            self.Input.at["NormFitFreePars"].loc[:,self.Cycle] = df.set_to_nan(4)
-            self.Input.at["NormFitFreeR2"].loc[:,self.Cycle] = np.nan
-
-            self.Input.at["NormFitConst"].loc[:,self.Cycle] = df.set_to_nan(len(self.Input["NormFitConst"].loc[:,self.Cycle]))
-            self.Input.at["NormFitConstPars"].loc[:,self.Cycle] = df.set_to_nan(4)
-            self.Input.at["NormFitConstR2"].loc[:,self.Cycle] = np.nan
-
-            self.Input.at["NormFitFreeCI"].loc[:,self.Cycle], self.Input.at["NormFitConstCI"].loc[:,self.Cycle], self.Input["RawFitCI"].loc[:,self.Cycle] = df.set_to_nan(4), df.set_to_nan(4), df.set_to_nan(4)
-            self.Input.at["NormFitFreeErrors"].loc[:,self.Cycle], self.Input.at["NormFitConstErrors"].loc[:,self.Cycle], self.Input["RawFitErrors"].loc[:,self.Cycle] = df.set_to_nan(4), df.set_to_nan(4), df.set_to_nan(4)
+        # 2. Re-fit, if there are enough datapoints
+        self.tabname.RefitCycle(self.PlateIndex, self.SampleIndex, cycle)
         
-        # Redraw graph
+        # Redraw graph and update all the other plots
         self.Draw()
-        # 2. Push dfr_Sample back to CompleteContainer and also update all the other plots
-        self.tabname.dfr_AssayData.at[self.PlateIndex,"ProcessedDataFrame"].loc[self.SampleIndex] = self.Input
         self.tabname.UpdateIndividualCycleDetails(self.PlateIndex, self.SampleIndex, self.Cycle)
-
-        self.tabname.plt_ProgressCurves.Input = self.tabname.dfr_AssayData.iloc[self.PlateIndex,5].loc[self.SampleIndex]
         self.tabname.plt_ProgressCurves.Draw()
-        self.tabname.plt_IndividualIC50AgainstTime.Input = self.tabname.dfr_AssayData.iloc[self.PlateIndex,5].loc[self.SampleIndex]
         self.tabname.plt_IndividualIC50AgainstTime.Draw()
         #self.tabname.UpdateSampleReporting(None)
 
@@ -629,21 +547,13 @@ class IndividualIC50AgainstTimePlotPanel(wx.Panel):
             self.str_Show = "Norm"
         else:
             self.str_Show = "Raw"
-        self.lst_IC50s = []
-        self.lst_Errors = []
-        self.lst_CIUpper = []
-        self.lst_CILower = []
-        self.lst_CIs = []
-        for cycle in self.Input["Time"]:
-            if self.Input["Show"].loc["Value",cycle] == 1:
-                str_FitType = "Free"
-            else:
-                str_FitType = "Const"
-            self.lst_IC50s.append(self.Input[self.str_Show+"Fit"+str_FitType+"Pars"][cycle][3])
-            self.lst_Errors.append(self.Input[self.str_Show+"Fit"+str_FitType+"Errors"][cycle][3])
-            self.lst_CIUpper.append(self.Input[self.str_Show+"Fit"+str_FitType+"Pars"][cycle][3] + self.Input[self.str_Show+"Fit"+str_FitType+"CI"][cycle][3])
-            self.lst_CILower.append(self.Input[self.str_Show+"Fit"+str_FitType+"Pars"][cycle][3] - self.Input[self.str_Show+"Fit"+str_FitType+"CI"][cycle][3])
-            self.lst_CIs.append(self.Input[self.str_Show+"Fit"+str_FitType+"CI"][cycle][3])
+        results = self.tabname.dfr_AssayData.loc[self.PlateIndex,"DRTCResults"]
+        arr_Time, arr_IC50s, arr_Errors, arr_CIs = dr.ic50_against_time(results, self.SampleIndex, self.Normalised)
+        self.lst_IC50s = arr_IC50s.tolist()
+        self.lst_Errors = arr_Errors.tolist()
+        self.lst_CIUpper = (arr_IC50s + arr_CIs).tolist()
+        self.lst_CILower = (arr_IC50s - arr_CIs).tolist()
+        self.lst_CIs = arr_CIs.tolist()
         #self.ax.scatter(self.Input["Time"], lst_IC50s, marker="o",label="Data", color=self.Colours[0], picker=5,s=5)
         self.ax.plot(self.Input["Time"], self.lst_IC50s, label="Data", color=self.Colours[0])
         # Make YLimits independent from error bars!
@@ -2738,19 +2648,21 @@ class pnl_Project (wx.Panel):
         self.lbc_Cycles.Select(0)
         cycle = self.lbc_Cycles.GetItemText(self.lbc_Cycles.GetFirstSelected(),0)
         timestamp = float(self.lbc_Cycles.GetItemText(self.lbc_Cycles.GetFirstSelected(),1))
+        results = self.dfr_AssayData.loc[0,"DRTCResults"]
+        int_Cycle = results.cycle_position(timestamp)
         self.plt_DRCurveMultiplot.Timestamps[0] = timestamp
         self.plt_DRCurveMultiplot.Dose[0] = df.moles_to_micromoles(self.dfr_AssayData.iloc[0,5].loc[0,"Concentrations"])
-        self.plt_DRCurveMultiplot.RawPoints[0] = self.dfr_AssayData.iloc[0,5].loc[0,"RawMean"].loc[:,timestamp].tolist()
-        self.plt_DRCurveMultiplot.RawSEM[0] = self.dfr_AssayData.iloc[0,5].loc[0,"RawSEM"].loc[:,timestamp].tolist()
-        self.plt_DRCurveMultiplot.RawExcluded[0] = self.dfr_AssayData.iloc[0,5].loc[0,"RawExcluded"].loc[:,timestamp].tolist()
-        self.plt_DRCurveMultiplot.RawFit[0] = self.dfr_AssayData.iloc[0,5].loc[0,"RawFit"].loc[:,timestamp].tolist()
-        self.plt_DRCurveMultiplot.NormPoints[0] = self.dfr_AssayData.iloc[0,5].loc[0,"NormMean"].loc[:,timestamp].tolist()
-        self.plt_DRCurveMultiplot.NormSEM[0] = self.dfr_AssayData.iloc[0,5].loc[0,"NormSEM"].loc[:,timestamp].tolist()
-        self.plt_DRCurveMultiplot.NormExcluded[0] = self.dfr_AssayData.iloc[0,5].loc[0,"NormExcluded"].loc[:,timestamp].tolist()
-        if self.dfr_AssayData.iloc[0,5].loc[0,"Show"].loc["Value",timestamp] == 1:
-            self.plt_DRCurveMultiplot.NormFit[0] = self.dfr_AssayData.iloc[0,5].loc[0,"NormFitFree"].loc[:,timestamp]
+        self.plt_DRCurveMultiplot.RawPoints[0] = results.get_values(0,"RawMean",int_Cycle).tolist()
+        self.plt_DRCurveMultiplot.RawSEM[0] = results.get_values(0,"RawSEM",int_Cycle).tolist()
+        self.plt_DRCurveMultiplot.RawExcluded[0] = results.get_values(0,"RawExcluded",int_Cycle).tolist()
+        self.plt_DRCurveMultiplot.RawFit[0] = results.get_values(0,"RawFit",int_Cycle).tolist()
+        self.plt_DRCurveMultiplot.NormPoints[0] = results.get_values(0,"NormMean",int_Cycle).tolist()
+        self.plt_DRCurveMultiplot.NormSEM[0] = results.get_values(0,"NormSEM",int_Cycle).tolist()
+        self.plt_DRCurveMultiplot.NormExcluded[0] = results.get_values(0,"NormExcluded",int_Cycle).tolist()
+        if results.get_values(0,"Show",int_Cycle) == 1:
+            self.plt_DRCurveMultiplot.NormFit[0] = results.get_values(0,"NormFitFree",int_Cycle).tolist()
         else:
-            self.plt_DRCurveMultiplot.NormFit[0] = self.dfr_AssayData.iloc[0,5].loc[0,"NormFitConst"].loc[:,timestamp]
+            self.plt_DRCurveMultiplot.NormFit[0] = results.get_values(0,"NormFitConst",int_Cycle).tolist()
         self.dic_DRBitmapCombos[self.lst_DRBitmapCombos[0]].Enable(True)
         self.dic_DRMultiPlotLabels[self.lst_DRMultiPlotLabels[0]].SetLabel("Cycle " + cycle + ": " + str(timestamp))
         self.dic_DRMultiPlotLabels[self.lst_DRMultiPlotLabels[0]].Enable(True)
@@ -2758,13 +2670,8 @@ class pnl_Project (wx.Panel):
         self.plt_DRCurveMultiplot.Draw()
 
         # Add first IC50vsTime curve to summary plot
-        lst_IC50s = []
-        lst_Errors = []
-        lst_CIs = []
-        for cycle in self.dfr_AssayData.loc[0,"ProcessedDataFrame"].loc[0,"Time"]:
-            lst_IC50s.append(self.dfr_AssayData.loc[0,"ProcessedDataFrame"].loc[0,"NormFitFreePars"][cycle][3])
-            lst_Errors.append(self.dfr_AssayData.loc[0,"ProcessedDataFrame"].loc[0,"NormFitFreeErrors"][cycle][3])
-            lst_CIs.append(self.dfr_AssayData.loc[0,"ProcessedDataFrame"].loc[0,"NormFitFreeCI"][cycle][3])
+        arr_Time, arr_IC50s, arr_Errors, arr_CIs = dr.ic50_against_time(self.dfr_AssayData.loc[0,"DRTCResults"], 0)
+        lst_IC50s = arr_IC50s.tolist()
         self.plt_IC50Multiplot.IDs[0] = self.dfr_AssayData.loc[0,"ProcessedDataFrame"].loc[0,"SampleID"]
         self.plt_IC50Multiplot.Time[0] = self.dfr_AssayData.loc[0,"ProcessedDataFrame"].loc[0,"Time"]
         self.plt_IC50Multiplot.IC50s[0] = lst_IC50s
@@ -2820,9 +2727,7 @@ class pnl_Project (wx.Panel):
     def ToggleFit(self,event):
         # get indices
         idx,idx_Sample,idx_Plate = self.GetPlotIndices()
-        self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"DoFit"] = self.chk_Fit.GetValue()
-        self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"DoFitFree"] = self.chk_Fit.GetValue()
-        self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"DoFitConst"] = self.chk_Fit.GetValue()
+        self.dfr_AssayData.loc[idx_Plate,"DRTCResults"].set_values(idx_Sample, "DoFit", None, self.chk_Fit.GetValue())
         #if self.chk_Fit.GetValue() == False:
         #    self.dfr_AssayData.iloc[idx_Plate,5].at[idx_Sample,"RawFitPars"] = df.set_to_nan(4)
         #    self.dfr_AssayData.iloc[idx_Plate,5].at[idx_Sample,"NormFitFreePars"] = df.set_to_nan(4)
@@ -2835,7 +2740,7 @@ class pnl_Project (wx.Panel):
         self.plt_ProgressCurves.PlateIndex = idx_Plate
         self.plt_ProgressCurves.SampleIndex = idx_Sample
         self.plt_ProgressCurves.Draw()
-        self.UpdateDetails(self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample])
+        self.UpdateDetails(idx_Plate, idx_Sample)
         #self.UpdateSampleReporting("event")
 
     # 4.3 Show/Update the displayed curve based on selection on ListCtr
@@ -2888,9 +2793,10 @@ class pnl_Project (wx.Panel):
     
     def UpdateDetails(self, idx_Plate, idx_Sample):
         self.lbc_Cycles.DeleteAllItems()
-        for cycle in range(len(self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,"NormMean"])):
+        results = self.dfr_AssayData.loc[idx_Plate,"DRTCResults"]
+        for cycle in range(len(self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,"Time"])):
             row = cycle + 1
-            if self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,"Show"].loc["Value",cycle] == 1:
+            if results.get_values(idx_Sample,"Show",cycle) == 1:
                 str_Show = "Norm"
                 str_Fit = "Free"
             else:
@@ -2921,8 +2827,10 @@ class pnl_Project (wx.Panel):
                     self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"Concentrations"][i] = df.change_concentrations(float(str_OldConc),float(str_NewConc),
                         self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"Concentrations"][i],
                         self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"AssayVolume"])
-                if self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"DoFit"] == True:
-                    self.dfr_AssayData.iloc[idx_Plate,5].at[idx_Sample] = df.recalculate_fit_sigmoidal(self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample])
+                self.dfr_AssayData.loc[idx_Plate,"DRTCResults"].set_sample(idx_Sample,
+                    {"Concentrations":self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"Concentrations"]})
+                for cycle in range(len(self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"Time"])):
+                    self.RefitCycle(idx_Plate, idx_Sample, cycle)
                 self.plt_ProgressCurves.Input = self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample]
                 self.plt_ProgressCurves.PlateIndex = idx_Plate
                 self.plt_ProgressCurves.SampleIndex = idx_Sample
@@ -2978,6 +2886,8 @@ class pnl_Project (wx.Panel):
                     tempplot = IndividualIC50AgainstTimePlotPanel(self.pnl_Results, (500,400), self)
                     str_PlotType = "_IC50s"
                 tempplot.Input = self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample]
+                tempplot.PlateIndex = idx_Plate
+                tempplot.SampleIndex = idx_Sample
                 tempplot.Draw()
                 tempplot.figure.savefig(str_SaveDirPath + chr(92) + self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"SampleID"] + str_PlotType + ".png",
                     dpi=None, facecolor="w", edgecolor="w", orientation="portrait", format=None, transparent=False, bbox_inches=None, pad_inches=0.1)
@@ -2998,6 +2908,10 @@ class pnl_Project (wx.Panel):
         self.plt_IndividualCycle.Input = dfr_Input
         self.plt_IndividualCycle.Draw()
 
+    def RefitCycle(self, idx_Plate, idx_Sample, cycle):
+        # Re-fits one cycle of a sample after datapoints have been excluded or included (see df.refit_DRTC_cycle).
+        df.refit_DRTC_cycle(self.dfr_AssayData.loc[idx_Plate,"DRTCResults"], idx_Sample, cycle)
+
     def RadNormFree(self, event):
         self.rad_Res_NormFree.SetValue(True)
         self.rad_Res_NormConst.SetValue(False)
@@ -3005,12 +2919,10 @@ class pnl_Project (wx.Panel):
         idx_Plate = self.plt_ProgressCurves.PlateIndex
         idx_Sample = self.plt_ProgressCurves.SampleIndex
         timestamp = self.plt_IndividualCycle.Cycle
-        self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"Show"].loc["Value",timestamp] = self.IntShowIndiDR()
-        
-        self.plt_IndividualCycle.Input["Show"].at["Value",timestamp] = self.IntShowIndiDR()
+        results = self.dfr_AssayData.loc[idx_Plate,"DRTCResults"]
+        results.set_values(idx_Sample, "Show", results.cycle_position(timestamp), self.IntShowIndiDR())
+        # Progress curves do not neccessitate redrawing as there are no changes to this plot!
         self.plt_IndividualCycle.Draw()
-        self.plt_ProgressCurves.Input["Show"].at["Value",timestamp] = self.IntShowIndiDR() # Does not neccessitate redrawing as there are no changes to this plot!
-        self.plt_IndividualIC50AgainstTime.Input["Show"].at["Value",timestamp] = self.IntShowIndiDR()
         self.plt_IndividualIC50AgainstTime.Draw()
         self.UpdateIndividualCycleDetails(idx_Plate,idx_Sample,timestamp,False)
 
@@ -3021,10 +2933,10 @@ class pnl_Project (wx.Panel):
         idx_Plate = self.plt_ProgressCurves.PlateIndex
         idx_Sample = self.plt_ProgressCurves.SampleIndex
         timestamp = self.plt_IndividualCycle.Cycle
-        self.plt_IndividualCycle.Input["Show"].at["Value",timestamp] = self.IntShowIndiDR()
+        results = self.dfr_AssayData.loc[idx_Plate,"DRTCResults"]
+        results.set_values(idx_Sample, "Show", results.cycle_position(timestamp), self.IntShowIndiDR())
+        # Progress curves do not neccessitate redrawing as there are no changes to this plot!
         self.plt_IndividualCycle.Draw()
-        self.plt_ProgressCurves.Input["Show"].at["Value",timestamp] = self.IntShowIndiDR() # Does not neccessitate redrawing as there are no changes to this plot!
-        self.plt_IndividualIC50AgainstTime.Input["Show"].at["Value",timestamp] = self.IntShowIndiDR()
         self.plt_IndividualIC50AgainstTime.Draw()
         self.UpdateIndividualCycleDetails(idx_Plate,idx_Sample,timestamp,False)
 
@@ -3037,7 +2949,9 @@ class pnl_Project (wx.Panel):
             return 0
 
     def UpdateIndividualCycleDetails(self, idx_Plate, idx_Sample, timestamp, recursion=True):
-        if self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,"Show"].loc["Value",timestamp] == 0:
+        results = self.dfr_AssayData.loc[idx_Plate,"DRTCResults"]
+        cycle = results.cycle_position(timestamp)
+        if results.get_values(idx_Sample,"Show",cycle) == 0:
             str_Pars = "RawFitPars"
             str_DoFit = "DoFitRaw"
             str_Confidence = "RawFitCI"
@@ -3045,7 +2959,7 @@ class pnl_Project (wx.Panel):
             if recursion == True:
                 self.rad_Res_NormFree.SetValue(False)
                 self.rad_Res_NormConst.SetValue(False)
-        elif self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,"Show"].loc["Value",timestamp] == 1:
+        elif results.get_values(idx_Sample,"Show",cycle) == 1:
             str_Pars = "NormFitFreePars"
             str_DoFit = "DoNormFitFree"
             str_Confidence = "NormFitFreeCI"
@@ -3053,7 +2967,7 @@ class pnl_Project (wx.Panel):
             if recursion == True:
                 self.rad_Res_NormFree.SetValue(True)
                 self.rad_Res_NormConst.SetValue(False)
-        elif self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,"Show"] .loc["Value",timestamp]== 2:
+        elif results.get_values(idx_Sample,"Show",cycle) == 2:
             str_Pars = "NormFitConstPars"
             str_DoFit = "DoNormFitConst"
             str_Confidence = "NormFitConstCI"
@@ -3061,23 +2975,25 @@ class pnl_Project (wx.Panel):
             if recursion == True:
                 self.rad_Res_NormFree.SetValue(False)
                 self.rad_Res_NormConst.SetValue(True)
-        if self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,str_DoFit].loc["Value",timestamp] == True:
-            str_IC50 = df.write_IC50(self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,str_Pars].loc["Inflection",timestamp],
-                self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,str_DoFit].loc["Value",timestamp],
-                self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,str_Confidence].loc["Inflection",timestamp])
-            if self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,str_Pars].loc["Bottom",timestamp] < -20:
+        if results.get_values(idx_Sample,str_DoFit,cycle) == True:
+            sr_Pars = pd.Series(results.get_values(idx_Sample,str_Pars,cycle), index=dr.lst_Parameters)
+            sr_Confidence = pd.Series(results.get_values(idx_Sample,str_Confidence,cycle), index=dr.lst_Parameters)
+            str_IC50 = df.write_IC50(sr_Pars["Inflection"],
+                results.get_values(idx_Sample,str_DoFit,cycle),
+                sr_Confidence["Inflection"])
+            if sr_Pars["Bottom"] < -20:
                 str_BottomWarning = chr(9888) + " outside range"
             else:
                 str_BottomWarning = ""
-            str_YBot = str(round(self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,str_Pars].loc["Bottom",timestamp],2)) + " " + str_BottomWarning
-            if self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,str_Pars].loc["Top",timestamp] > 120:
+            str_YBot = str(round(sr_Pars["Bottom"],2)) + " " + str_BottomWarning
+            if sr_Pars["Top"] > 120:
                 str_TopWarning = chr(9888) + " outside range"
             else:
                 str_TopWarning = ""
-            str_YTop = str(round(self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,str_Pars].loc["Top",timestamp],2)) + " " + str_TopWarning
-            str_Span = str(round(self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,str_Pars].loc["Top",timestamp]-self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,str_Pars].loc["Bottom",timestamp],2))
-            str_Hill = str(round(self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,str_Pars].loc["Slope",timestamp],2))
-            str_RSquare = str(round(self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,str_RSquareKeyword].loc["Value",timestamp],3))
+            str_YTop = str(round(sr_Pars["Top"],2)) + " " + str_TopWarning
+            str_Span = str(round(sr_Pars["Top"]-sr_Pars["Bottom"],2))
+            str_Hill = str(round(sr_Pars["Slope"],2))
+            str_RSquare = str(round(results.get_values(idx_Sample,str_RSquareKeyword,cycle),3))
             bol_Enable = True
         else:
             str_IC50 = "N.D."
@@ -3121,17 +3037,19 @@ class pnl_Project (wx.Panel):
         timestamp = float(self.lbc_Cycles.GetItemText(self.lbc_Cycles.GetFirstSelected(),1))
         self.plt_DRCurveMultiplot.PreviewTimestamp = timestamp
         self.plt_DRCurveMultiplot.PreviewDose = df.moles_to_micromoles(self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"Concentrations"])
-        self.plt_DRCurveMultiplot.PreviewRawPoints = self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"RawMean"].loc[:,timestamp].tolist()
-        self.plt_DRCurveMultiplot.PreviewRawSEM = self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"RawSEM"].loc[:,timestamp].tolist()
-        self.plt_DRCurveMultiplot.PreviewRawExcluded = self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"RawExcluded"].loc[:,timestamp].tolist()
-        self.plt_DRCurveMultiplot.PreviewRawFit = self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"RawFit"].loc[:,timestamp].tolist()
-        self.plt_DRCurveMultiplot.PreviewNormPoints = self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"NormMean"].loc[:,timestamp].tolist()
-        self.plt_DRCurveMultiplot.PreviewNormSEM = self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"NormSEM"].loc[:,timestamp].tolist()
-        self.plt_DRCurveMultiplot.PreviewNormExcluded = self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"NormExcluded"].loc[:,timestamp].tolist()
-        if self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"Show"].loc["Value",timestamp] == 1:
-            self.plt_DRCurveMultiplot.PreviewNormFit = self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"NormFitFree"].loc[:,timestamp]
+        results = self.dfr_AssayData.loc[idx_Plate,"DRTCResults"]
+        int_Cycle = results.cycle_position(timestamp)
+        self.plt_DRCurveMultiplot.PreviewRawPoints = results.get_values(idx_Sample,"RawMean",int_Cycle).tolist()
+        self.plt_DRCurveMultiplot.PreviewRawSEM = results.get_values(idx_Sample,"RawSEM",int_Cycle).tolist()
+        self.plt_DRCurveMultiplot.PreviewRawExcluded = results.get_values(idx_Sample,"RawExcluded",int_Cycle).tolist()
+        self.plt_DRCurveMultiplot.PreviewRawFit = results.get_values(idx_Sample,"RawFit",int_Cycle).tolist()
+        self.plt_DRCurveMultiplot.PreviewNormPoints = results.get_values(idx_Sample,"NormMean",int_Cycle).tolist()
+        self.plt_DRCurveMultiplot.PreviewNormSEM = results.get_values(idx_Sample,"NormSEM",int_Cycle).tolist()
+        self.plt_DRCurveMultiplot.PreviewNormExcluded = results.get_values(idx_Sample,"NormExcluded",int_Cycle).tolist()
+        if results.get_values(idx_Sample,"Show",int_Cycle) == 1:
+            self.plt_DRCurveMultiplot.PreviewNormFit = results.get_values(idx_Sample,"NormFitFree",int_Cycle).tolist()
         else:
-            self.plt_DRCurveMultiplot.PreviewNormFit = self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"NormFitConst"].loc[:,timestamp]
+            self.plt_DRCurveMultiplot.PreviewNormFit = results.get_values(idx_Sample,"NormFitConst",int_Cycle).tolist()
         self.plt_DRCurveMultiplot.Draw()
         
     def DRColourSelect(self, event):
@@ -3146,17 +3064,19 @@ class pnl_Project (wx.Panel):
         idx_Graph = event.GetEventObject().Index
         self.plt_DRCurveMultiplot.Timestamps[idx_Graph] = timestamp
         self.plt_DRCurveMultiplot.Dose[idx_Graph] = df.moles_to_micromoles(self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"Concentrations"])
-        self.plt_DRCurveMultiplot.RawPoints[idx_Graph] = self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"RawMean"].loc[:,timestamp].tolist()
-        self.plt_DRCurveMultiplot.RawSEM[idx_Graph] = self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"RawSEM"].loc[:,timestamp].tolist()
-        self.plt_DRCurveMultiplot.RawExcluded[idx_Graph] = self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"RawExcluded"].loc[:,timestamp].tolist()
-        self.plt_DRCurveMultiplot.RawFit[idx_Graph] = self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"RawFit"].loc[:,timestamp].tolist()
-        self.plt_DRCurveMultiplot.NormPoints[idx_Graph] = self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"NormMean"].loc[:,timestamp].tolist()
-        self.plt_DRCurveMultiplot.NormSEM[idx_Graph] = self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"NormSEM"].loc[:,timestamp].tolist()
-        self.plt_DRCurveMultiplot.NormExcluded[idx_Graph] = self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"NormExcluded"].loc[:,timestamp].tolist()
-        if self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"Show"].loc["Value",timestamp] == 1:
-            self.plt_DRCurveMultiplot.NormFit[idx_Graph] = self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"NormFitFree"].loc[:,timestamp]
+        results = self.dfr_AssayData.loc[idx_Plate,"DRTCResults"]
+        int_Cycle = results.cycle_position(timestamp)
+        self.plt_DRCurveMultiplot.RawPoints[idx_Graph] = results.get_values(idx_Sample,"RawMean",int_Cycle).tolist()
+        self.plt_DRCurveMultiplot.RawSEM[idx_Graph] = results.get_values(idx_Sample,"RawSEM",int_Cycle).tolist()
+        self.plt_DRCurveMultiplot.RawExcluded[idx_Graph] = results.get_values(idx_Sample,"RawExcluded",int_Cycle).tolist()
+        self.plt_DRCurveMultiplot.RawFit[idx_Graph] = results.get_values(idx_Sample,"RawFit",int_Cycle).tolist()
+        self.plt_DRCurveMultiplot.NormPoints[idx_Graph] = results.get_values(idx_Sample,"NormMean",int_Cycle).tolist()
+        self.plt_DRCurveMultiplot.NormSEM[idx_Graph] = results.get_values(idx_Sample,"NormSEM",int_Cycle).tolist()
+        self.plt_DRCurveMultiplot.NormExcluded[idx_Graph] = results.get_values(idx_Sample,"NormExcluded",int_Cycle).tolist()
+        if results.get_values(idx_Sample,"Show",int_Cycle) == 1:
+            self.plt_DRCurveMultiplot.NormFit[idx_Graph] = results.get_values(idx_Sample,"NormFitFree",int_Cycle).tolist()
         else:
-            self.plt_DRCurveMultiplot.NormFit[idx_Graph] = self.dfr_AssayData.iloc[idx_Plate,5].loc[idx_Sample,"NormFitConst"].loc[:,timestamp]
+            self.plt_DRCurveMultiplot.NormFit[idx_Graph] = results.get_values(idx_Sample,"NormFitConst",int_Cycle).tolist()
 
         self.dic_DRBitmapCombos[self.lst_DRBitmapCombos[idx_Graph]].Enable(True)
         self.dic_DRMultiPlotLabels[self.lst_DRMultiPlotLabels[idx_Graph]].SetLabel("Cycle " + cycle + ": " + str(timestamp))
@@ -3214,17 +3134,9 @@ class pnl_Project (wx.Panel):
     def IC50AddGraph(self, event):
         idx_List,idx_Sample,idx_Plate = self.GetPlotIndices()
         idx_Graph = event.GetEventObject().Index
-        lst_IC50s = []
-        lst_Errors = []
-        lst_CIs = []
-        for cycle in self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,"Time"]:
-            if self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,"Show"].loc["Value",cycle] == 1:
-                str_FitType = "Free"
-            else:
-                str_FitType = "Const"
-            lst_IC50s.append(self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,"NormFit"+str_FitType+"Pars"][cycle][3])
-            lst_Errors.append(self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,"NormFit"+str_FitType+"Errors"][cycle][3])
-            lst_CIs.append(self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,"NormFit"+str_FitType+"CI"][cycle][3])
+        arr_Time, arr_IC50s, arr_Errors, arr_CIs = dr.ic50_against_time(self.dfr_AssayData.loc[idx_Plate,"DRTCResults"], idx_Sample)
+        lst_IC50s = arr_IC50s.tolist()
+        lst_Errors = arr_Errors.tolist()
         self.plt_IC50Multiplot.IDs[idx_Graph] = self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,"SampleID"]
         self.plt_IC50Multiplot.Time[idx_Graph] = self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,"Time"]
         self.plt_IC50Multiplot.IC50s[idx_Graph] = lst_IC50s
@@ -3271,17 +3183,9 @@ class pnl_Project (wx.Panel):
     def IC50ShowPreviewPlot(self, event):
         # Adds preview plot. Will only be displayed it self.plt_IC50MultiPlot.Preview is set to True.
         idx_List,idx_Sample,idx_Plate = self.GetPlotIndices()
-        lst_IC50s = []
-        lst_Errors = []
-        lst_CIs = []
-        for cycle in self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,"Time"]:
-            if self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,"Show"].loc["Value",cycle] == 1:
-                str_FitType = "Free"
-            else:
-                str_FitType = "Const"
-            lst_IC50s.append(self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,"NormFit"+str_FitType+"Pars"][cycle][3])
-            lst_Errors.append(self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,"NormFit"+str_FitType+"Errors"][cycle][3])
-            lst_CIs.append(self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,"NormFit"+str_FitType+"CI"][cycle][3])
+        arr_Time, arr_IC50s, arr_Errors, arr_CIs = dr.ic50_against_time(self.dfr_AssayData.loc[idx_Plate,"DRTCResults"], idx_Sample)
+        lst_IC50s = arr_IC50s.tolist()
+        lst_Errors = arr_Errors.tolist()
         self.plt_IC50Multiplot.PreviewID = self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,"SampleID"]
         self.plt_IC50Multiplot.PreviewTime = self.dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"].loc[idx_Sample,"Time"]
         self.plt_IC50Multiplot.PreviewIC50s = lst_IC50s
@@ -260,10 +260,14 @@ class CurvePlotPanel(wx.Panel):
         self.Input.at["DoFit"] = df.get_DoFit(self.Input["Norm"],self.Input["NormSEM"])
             
         if self.Input["DoFit"] == True:
-            # 3. Re-fit
-            self.Input.at["RawFit"], self.Input.at["RawFitPars"], self.Input.at["RawFitCI"], self.Input.at["RawFitErrors"], self.Input.at["RawFitR2"], self.Input.at["DoRawFit"] = ff.fit_sigmoidal_free(self.Input["Concentrations"], self.Input["Raw"])  # only function for constrained needs SEM
-            self.Input.at["NormFitFree"], self.Input.at["NormFitFreePars"], self.Input.at["NormFitFreeCI"], self.Input.at["NormFitFreeErrors"], self.Input.at["NormFitFreeR2"], self.Input.at["DoRawFree"] = ff.fit_sigmoidal_free(self.Input["Concentrations"], self.Input["Norm"])
-            self.Input.at["NormFitConst"], self.Input.at["NormFitConstPars"], self.Input.at["NormFitConstCI"], self.Input.at["NormFitConstErrors"], self.Input.at["NormFitConstR2"], self.Input.at["DoRawConst"] = ff.fit_sigmoidal_const(self.Input["Concentrations"], self.Input["Norm"], self.Input["NormSEM"])
+            # 3. Re-fit. Toggling a point back gets the previous result from the fit cache,
+            # new fits start from the current parameters.
+            self.Input.at["RawFit"], self.Input.at["RawFitPars"], self.Input.at["RawFitCI"], self.Input.at["RawFitErrors"], self.Input.at["RawFitR2"], self.Input.at["DoRawFit"] = ff.fit_sigmoidal_free_cached(self.Input["Concentrations"], self.Input["Raw"],
+                guess = ff.get_warm_start(self.Input["RawFitPars"]))  # only function for constrained needs SEM
+            self.Input.at["NormFitFree"], self.Input.at["NormFitFreePars"], self.Input.at["NormFitFreeCI"], self.Input.at["NormFitFreeErrors"], self.Input.at["NormFitFreeR2"], self.Input.at["DoRawFree"] = ff.fit_sigmoidal_free_cached(self.Input["Concentrations"], self.Input["Norm"],
+                guess = ff.get_warm_start(self.Input["NormFitFreePars"]))
+            self.Input.at["NormFitConst"], self.Input.at["NormFitConstPars"], self.Input.at["NormFitConstCI"], self.Input.at["NormFitConstErrors"], self.Input.at["NormFitConstR2"], self.Input.at["DoRawConst"] = ff.fit_sigmoidal_const_cached(self.Input["Concentrations"], self.Input["Norm"], self.Input["NormSEM"],
+                guess = ff.get_warm_start(self.Input["NormFitConstPars"]))
             if self.Input["DoFitFree"] == False and self.Input["DoFitConst"] == False:
                 self.Input.at["DoFit"] = False
         else:
@@ -0,0 +1,630 @@
+"""
+Command line batch analysis for BBQ.
+
+Runs the same data processing as the "Analyse data" button of a project
+(lib_datafunctions.get_CompleteContainer and its nanoDSF/CBCS variants)
+without wxPython, e.g. for overnight analyses on a compute server with
+no display. Progress gets reported through a callback function (see
+lib_progresslog) instead of the progress dialog.
+
+Usage examples:
+    python batch.py EPDR --transfer TransferFile.csv --data RawData
+                    --output project.bbq --results results.csv
+    python batch.py NDSF --data PrometheusExport.xlsx
+                    --layout capillaries.csv --output project.bbq
+
+Plates get assigned to data files in alphabetical order unless assigned
+explicitly with --assign "Destination Plate[1]=RawData_Plate.xls".
+Assay details default to the values of a new project and can be changed
+with --detail Key=Value (e.g. --detail AssayType=AlphaScreen).
+
+Functions:
+    main
+    get_arguments
+    get_details
+    get_transfer
+    assign_plates
+    read_layout
+    read_capillaries
+    get_results_table
+    expand_results
+    results_partials
+    write_results_table
+    run_analysis
+    run_analysis_CBCS
+
+"""
+
+import argparse
+import datetime
+from itertools import product
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+import lib_cyclefiller as cf
+import lib_datafunctions as df
+import lib_export as exp
+import lib_projectfile as prj
+import lib_progresslog as log
+import lib_resultreadouts as ro
+
+# Values a new project of each assay starts with. Order of the
+# entries is the order of dfr_Details in the GUI.
+dic_DefaultDetails = {
+    "EPDR": {"AssayType":"HTRF", "AssayCategory":"dose_response",
+             "DataFileExtension":".xls", "SampleSource":"echo",
+             "Device":"pherastar"},
+    "EPSD": {"AssayType":"HTRF", "AssayCategory":"single_dose",
+             "DataFileExtension":".xls", "SampleSource":"echo",
+             "Device":"pherastar"},
+    "DSF": {"AssayType":"DSF_LC_384", "AssayCategory":"thermal_shift",
+            "DataFileExtension":".txt", "SampleSource":"echo",
+            "Device":"lightcycler"},
+    "NDSF": {"AssayType":"nanoDSF", "AssayCategory":"thermal_shift",
+             "DataFileExtension":".xlsx", "SampleSource":"NA",
+             "Device":"prometheus"},
+    "RATE": {"AssayType":"enzymatic", "AssayCategory":"rate",
+             "DataFileExtension":".xls", "SampleSource":"echo",
+             "Device":"pherastar"},
+    "DRTC": {"AssayType":"Pherastar (384 wells)",
+             "AssayCategory":"dose_response_time_course",
+             "DataFileExtension":".xls", "SampleSource":"echo",
+             "Device":"pherastar"},
+    "CBCS": {"AssayType":"CBCS", "AssayCategory":"cellular",
+             "DataFileExtension":".txt", "SampleSource":"NA",
+             "Device":"operetta"}
+    }
+
+lst_DetailsIndex = ["AssayType","AssayCategory","Shorthand","PurificationID",
+                    "ProteinConcentration","PeptideID","PeptideConcentration",
+                    "Solvent","SolventConcentration","Buffer","ELN",
+                    "AssayVolume","DataFileExtension","SampleSource","Device",
+                    "Date"]
+
+# Names of fit parameters in the results table, by number of parameters:
+# sigmoidal dose response (ff.eq_sigmoidal, inflection point in uM),
+# logarithmic Michaelis-Menten (ff.eq_logMM) and linear (ff.eq_linear)
+dic_ParameterNames = {4:["Top","Bottom","Slope","IC50 (uM)"],
+                      3:["Y0","B","T0"],
+                      2:["Slope","Intercept"]}
+dic_ParameterSuffixes = {"Pars":"", "CI":" CI", "Errors":" Error"}
+
+def get_arguments(lst_Arguments = None):
+    """
+    Parses the command line arguments.
+
+    Arguments:
+        lst_Arguments -> list of strings. If None, sys.argv is used.
+    """
+    parser = argparse.ArgumentParser(prog="batch.py",
+        description="Analyse a BBQ project without the graphical user interface.")
+    parser.add_argument("assay", choices=list(dic_DefaultDetails.keys()),
+        help="Assay shorthand.")
+    parser.add_argument("--transfer", default=None,
+        help="Transfer file from liquid handler (Echo).")
+    parser.add_argument("--data", required=True,
+        help="Directory of raw data files. For EPSD and NDSF: the data file itself. "
+             + "NDSF: several data files separated by " + repr(os.pathsep) + ".")
+    parser.add_argument("--layout", default=None,
+        help="Plate layout file (.plf). For NDSF: capillary list (.csv), one per data file.")
+    parser.add_argument("--output", default=None,
+        help="Path of the .bbq project file to write (not available for CBCS).")
+    parser.add_argument("--results", default=None,
+        help="Path of the results table to write (.csv, or .xlsx for an Excel workbook).")
+    parser.add_argument("--assign", action="append", default=[],
+        metavar="ENTRY=FILE", help="Assign a data file to a transfer file entry.")
+    parser.add_argument("--detail", action="append", default=[],
+        metavar="KEY=VALUE", help="Set an assay detail, e.g. AssayType=AlphaScreen.")
+    parser.add_argument("--concentrations", nargs="+", default=[],
+        help="CBCS only: compound concentrations, e.g. 1uM 10uM.")
+    parser.add_argument("--parameters", nargs="+", default=[],
+        help="CBCS only: condition parameters, e.g. IFN TNF.")
+    parser.add_argument("--replicates", type=int, default=2,
+        help="CBCS only: number of replicates.")
+    parser.add_argument("--processor", default="Columbus", choices=["Columbus","Harmony"],
+        help="CBCS only: software that processed the Operetta images.")
+    parser.add_argument("--workers", type=int, default=1,
+        help="Number of worker processes to analyse plates in parallel.")
+    parser.add_argument("--read-threads", type=int, default=df.int_MaxReadThreads,
+        help="Number of raw data files to read at the same time.")
+    parser.add_argument("--cycle-stride", type=int, default=1,
+        help="DRTC only: fit every n-th cycle while analysing, the others get fitted afterwards.")
+    parser.add_argument("--cycles", nargs="+", type=int, default=None,
+        help="DRTC only: cycles to fit while analysing (first cycle is 1), the others get fitted afterwards.")
+    parser.add_argument("--quiet", action="store_true",
+        help="Do not print progress.")
+    return parser.parse_args(lst_Arguments)
+
+def get_details(str_Shorthand, lst_Details):
+    """
+    Creates the assay details dataframe.
+
+    Arguments:
+        str_Shorthand -> string. Assay shorthand
+        lst_Details -> list of strings of format "Key=Value"
+
+    Returns pandas dataframe with column "Value".
+    """
+    dic_Details = {"PurificationID":"NA", "ProteinConcentration":"0",
+                   "PeptideID":"NA", "PeptideConcentration":"0",
+                   "Solvent":"DMSO", "SolventConcentration":"0",
+                   "Buffer":"NA", "ELN":"NA", "AssayVolume":str(20 * 1000), # in nL
+                   "Date":datetime.date.today().strftime("%Y-%m-%d")}
+    dic_Details.update(dic_DefaultDetails[str_Shorthand])
+    dic_Details["Shorthand"] = str_Shorthand
+    for str_Detail in lst_Details:
+        if str_Detail.find("=") == -1:
+            raise ValueError("Assay details need to be given as Key=Value: " + str_Detail)
+        str_Key, str_Value = str_Detail.split("=",1)
+        dic_Details[str_Key] = str_Value
+    # Device and file extension for DRTC and DSF follow from the assay type, as in the GUI
+    if str_Shorthand == "DRTC" and dic_Details["AssayType"].find("FLIPR") != -1:
+        dic_Details["Device"] = "flipr"
+        dic_Details["DataFileExtension"] = ".seq"
+    elif str_Shorthand == "DSF" and dic_Details["AssayType"] == "DSF_MX_96":
+        dic_Details["Device"] = "agilent"
+        dic_Details["DataFileExtension"] = ".xls"
+    return pd.DataFrame(data={"Value":[dic_Details[key] for key in lst_DetailsIndex]},
+                        index=lst_DetailsIndex)
+
+def get_transfer(str_TransferFile):
+    """
+    Reads the transfer file.
+
+    Returns transfer file dataframe, exceptions dataframe and
+    dataframe of destination plates.
+    """
+    if str_TransferFile == None:
+        dfr_TransferFile = pd.DataFrame(columns=["SourceConcentration","DestinationPlateName",
+                                                 "DestinationPlateBarcode","DestinationPlateType",
+                                                 "DestinationWell","SampleID","SampleName",
+                                                 "DestinationConcentration","TransferVolume",
+                                                 "ActualVolume"])
+        return dfr_TransferFile, pd.DataFrame(columns=["DestinationPlateName","DestinationWell"]), None
+    tpl_Transfer = df.create_transfer_frame(str_TransferFile)
+    if tpl_Transfer is None:
+        raise ValueError("Not a transfer file: " + str_TransferFile)
+    dfr_TransferFile, dfr_Exceptions = tpl_Transfer
+    dfr_DestinationPlates = df.get_destination_plates(dfr_TransferFile)
+    # Intermediate plates never get read, same as on the file selection tab.
+    dfr_DestinationPlates = dfr_DestinationPlates[dfr_DestinationPlates["DestinationPlateName"].str.find("Intermediate") == -1]
+    return dfr_TransferFile, dfr_Exceptions, dfr_DestinationPlates.reset_index(drop=True)
+
+def assign_plates(dfr_Details, str_DataPath, dfr_DestinationPlates, lst_Assign):
+    """
+    Assigns data files (or, for single dose, plates in the data file) to
+    transfer file entries. Explicit assignments are used first, all
+    remaining entries get the remaining data files in alphabetical order.
+
+    Arguments:
+        dfr_Details -> pandas dataframe. Assay details
+        str_DataPath -> string. Data directory or data file.
+        dfr_DestinationPlates -> pandas dataframe. Destination plates from
+                                 transfer file. None if there is no transfer file.
+        lst_Assign -> list of strings of format "Entry=File".
+
+    Returns plate assignment dataframe with columns "TransferEntry",
+    "DataFile" and "Wells", same as FileSelection.UpdatePlateAssignment.
+    """
+    str_AssayCategory = dfr_Details.loc["AssayCategory","Value"]
+    # Get available data files/plates
+    if str_AssayCategory.find("single_dose") != -1:
+        lst_DataFiles = ro.get_bmg_list_namesonly(str_DataPath)
+        if lst_DataFiles == None or len(lst_DataFiles) == 0:
+            raise ValueError("No plates found in data file: " + str_DataPath)
+    else:
+        str_Reader = ro.get_reader_name(str_AssayCategory, dfr_Details.loc["AssayType","Value"],
+                                        dfr_Details.loc["Device","Value"])
+        lst_DataFiles = sorted(ro.list_datafiles(str_DataPath,
+                               dfr_Details.loc["DataFileExtension","Value"], str_Reader))
+    # Get transfer file entries. Without transfer file, each data file is its own entry.
+    if dfr_DestinationPlates is None:
+        str_AssayType = dfr_Details.loc["AssayType","Value"]
+        if str_AssayType.find("96") != -1:
+            int_Wells = 96
+        else:
+            int_Wells = 384
+        dfr_DestinationPlates = pd.DataFrame({"DestinationPlateName":[os.path.splitext(fil)[0] for fil in lst_DataFiles],
+                                              "DestinationPlateType":[int_Wells for fil in lst_DataFiles]})
+    dic_Assigned = {}
+    for str_Assign in lst_Assign:
+        str_Entry, str_File = str_Assign.split("=",1)
+        dic_Assigned[str_Entry] = str_File
+    lst_Remaining = [fil for fil in lst_DataFiles if not fil in dic_Assigned.values()]
+    # Single dose list files usually name the plates the same as the transfer file does.
+    if str_AssayCategory.find("single_dose") != -1:
+        for str_Entry in dfr_DestinationPlates["DestinationPlateName"]:
+            if not str_Entry in dic_Assigned and str_Entry in lst_Remaining:
+                dic_Assigned[str_Entry] = str_Entry
+                lst_Remaining.remove(str_Entry)
+    lst_Rows = []
+    for idx in dfr_DestinationPlates.index:
+        str_Entry = dfr_DestinationPlates.loc[idx,"DestinationPlateName"]
+        if str_Entry in dic_Assigned:
+            str_File = dic_Assigned[str_Entry]
+        elif len(lst_Remaining) > 0:
+            str_File = lst_Remaining.pop(0)
+        else:
+            continue
+        lst_Rows.append([str_Entry, str_File, str(dfr_DestinationPlates.loc[idx,"DestinationPlateType"])])
+    if len(lst_Rows) == 0:
+        raise ValueError("No data files could be assigned to plates.")
+    return pd.DataFrame(lst_Rows, columns=["TransferEntry","DataFile","Wells"])
+
+def read_layout(str_LayoutFile, dfr_PlateAssignment, dfr_Details):
+    """
+    Reads a plate layout file (.plf) as exported from the plate layout
+    dialog. A layout with one plate gets applied to all plates. Without
+    layout file, the default layout of the file selection tab is used.
+
+    Arguments:
+        str_LayoutFile -> string. Path of layout file or None.
+        dfr_PlateAssignment -> pandas dataframe.
+        dfr_Details -> pandas dataframe. Assay details
+
+    Returns layout dataframe with one row per assigned plate.
+    """
+    int_Plates = dfr_PlateAssignment.shape[0]
+    if str_LayoutFile == None:
+        dfr_Layout = pd.DataFrame(index=range(int_Plates),
+                                  columns=["PlateID","ProteinNumerical","PurificationID",
+                                           "Concentration","WellType"])
+        for idx_Plate in dfr_Layout.index:
+            int_PlateFormat = int(dfr_PlateAssignment.loc[idx_Plate,"Wells"])
+            dfr_Layout.at[idx_Plate,"PlateID"] = "X999A"
+            dfr_Layout.at[idx_Plate,"ProteinNumerical"] = df.make_list(int_PlateFormat,0)
+            dfr_Layout.at[idx_Plate,"PurificationID"] = df.make_list(int_PlateFormat,dfr_Details.loc["PurificationID","Value"])
+            dfr_Layout.at[idx_Plate,"Concentration"] = df.make_list(int_PlateFormat,dfr_Details.loc["ProteinConcentration","Value"])
+            dfr_Layout.at[idx_Plate,"WellType"] = df.make_list(int_PlateFormat,"Sample")
+        return dfr_Layout
+    dfr_Layout = pd.read_csv(str_LayoutFile, sep=",", header=0, index_col=0, engine="python")
+    # Lists are written as strings of the format "['1','1','1']". These strings need to be converted into lists again:
+    for idx_Plate in dfr_Layout.index:
+        for idx_Column in range(len(dfr_Layout.columns)):
+            if type(dfr_Layout.iloc[idx_Plate,idx_Column]) == str:
+                dfr_Layout.iloc[idx_Plate,idx_Column] = df.import_string_to_list(dfr_Layout.iloc[idx_Plate,idx_Column])
+    if len(dfr_Layout) < int_Plates:
+        dfr_Layout = pd.concat([dfr_Layout.iloc[[0]]]*int_Plates, ignore_index=True)
+    return dfr_Layout
+
+def read_capillaries(str_DataFile, str_CapillaryFile, str_PlateID):
+    """
+    Gets the capillaries of a Prometheus export and their meta data.
+
+    Arguments:
+        str_DataFile -> string. Path of Prometheus export.
+        str_CapillaryFile -> string. csv file with one row per capillary and
+                             the columns "PurificationID","ProteinConc",
+                             "SampleID","SampleConc","Buffer","CapillaryType"
+                             ("Reference" or "Sample"), same as the capillary
+                             grid in the GUI. Can be None.
+        str_PlateID -> string.
+
+    Returns capillaries dataframe and layout dataframe.
+    """
+    dfr_Capillaries = ro.get_prometheus_capillaries(str_DataFile)
+    if dfr_Capillaries is None:
+        raise ValueError("Not a Prometheus export: " + str_DataFile)
+    if not str_CapillaryFile == None:
+        dfr_Input = pd.read_csv(str_CapillaryFile, sep=",", header=0, index_col=False)
+        for col in ["PurificationID","ProteinConc","SampleID","SampleConc","Buffer","CapillaryType"]:
+            if col in dfr_Input.columns:
+                for idx in range(min(len(dfr_Input),len(dfr_Capillaries))):
+                    dfr_Capillaries.at[idx,col] = dfr_Input.loc[idx,col]
+    dfr_Layout = pd.DataFrame(index=range(1), columns=["PlateID","ProteinNumerical",
+                                                       "PurificationID","Concentration",
+                                                       "WellType"])
+    dfr_Layout.at[0,"PlateID"] = str_PlateID
+    dfr_Layout.at[0,"ProteinNumerical"] = df.make_list(len(dfr_Capillaries),"")
+    dfr_Layout.at[0,"PurificationID"] = dfr_Capillaries["PurificationID"].apply(df.string_or_na).tolist()
+    dfr_Layout.at[0,"Concentration"] = dfr_Capillaries["ProteinConc"].apply(df.string_or_na).tolist()
+    dfr_Layout.at[0,"WellType"] = [{"Reference":"r","Sample":"s"}.get(typ,"") for typ in dfr_Capillaries["CapillaryType"]]
+    return dfr_Capillaries, dfr_Layout
+
+def get_results_table(dfr_AssayData):
+    """
+    Collects the per sample results of all plates into one table.
+    Fit parameters, their confidence intervals and errors get one column
+    each (see expand_results). Other lists (e.g. raw data, fitted curves)
+    and nested dataframes are dropped.
+
+    Arguments:
+        dfr_AssayData -> pandas dataframe. Complete container.
+
+    Returns pandas dataframe.
+    """
+    return pd.concat(list(results_partials(dfr_AssayData)), ignore_index=True)
+
+def expand_results(dfr_Processed):
+    """
+    Returns the columns of a ProcessedDataFrame that hold single values,
+    with lists of results turned into single value columns:
+        - Fit parameters ("...Pars"), confidence intervals ("...CI") and
+          standard errors ("...Errors") get one column per parameter,
+          e.g. "NormFitFree IC50 (uM)", "NormFitFree IC50 (uM) CI".
+          Parameter names go by the number of parameters, see
+          dic_ParameterNames.
+        - Lists with one value per sample (e.g. single dose responses)
+          become a column of that value.
+        - Melting temperatures and slopes of thermal shift assays
+          ("...Inflections", "...Slopes") get one column per inflection.
+    All other lists and nested dataframes are dropped.
+
+    Arguments:
+        dfr_Processed -> pandas dataframe. ProcessedDataFrame of a plate.
+    """
+    dic_Columns = {}
+    for col in dfr_Processed.columns:
+        sr_Column = dfr_Processed[col]
+        arr_Sequence = sr_Column.apply(lambda x: isinstance(x, (list, tuple, np.ndarray))).to_numpy(dtype=bool)
+        if sr_Column.apply(lambda x: isinstance(x, (pd.DataFrame, pd.Series))).any():
+            continue
+        if not arr_Sequence.any():
+            dic_Columns[col] = sr_Column
+            continue
+        lst_Lengths = [len(x) if arr_Sequence[idx] else 0 for idx, x in enumerate(sr_Column)]
+        int_Length = max(lst_Lengths)
+        str_Suffix = None
+        for suffix in ["Pars","CI","Errors"]:
+            if col.endswith(suffix) == True:
+                str_Suffix = suffix
+        if not str_Suffix == None and int_Length in dic_ParameterNames.keys():
+            str_Prefix = col[:-len(str_Suffix)]
+            lst_Names = [str_Prefix + " " + name + dic_ParameterSuffixes[str_Suffix] for name in dic_ParameterNames[int_Length]]
+        elif col.endswith("Inflections") == True or col.endswith("Slopes") == True:
+            lst_Names = [col + " " + str(idx+1) for idx in range(int_Length)]
+        elif int_Length == 1 and all([length == 1 and pd.api.types.is_scalar(x[0]) for length, x in zip(lst_Lengths, sr_Column)]):
+            lst_Names = [col]
+        else:
+            continue
+        for idx, name in enumerate(lst_Names):
+            dic_Columns[name] = [x[idx] if arr_Sequence[row] and len(x) > idx else np.nan
+                                 for row, x in enumerate(sr_Column)]
+    return pd.DataFrame(dic_Columns, index=dfr_Processed.index)
+
+def results_partials(dfr_AssayData):
+    """
+    Generator. Yields the results of one plate at a time,
+    see get_results_table.
+
+    Arguments:
+        dfr_AssayData -> pandas dataframe. Complete container.
+    """
+    for idx_Plate in dfr_AssayData.index:
+        dfr_Partial = expand_results(dfr_AssayData.loc[idx_Plate,"ProcessedDataFrame"])
+        if not "DestinationPlateName" in dfr_Partial.columns:
+            dfr_Partial.insert(0,"DestinationPlateName",dfr_AssayData.loc[idx_Plate,"DestinationPlateName"])
+        yield dfr_Partial
+
+def write_results_table(str_Path, dfr_AssayData):
+    """
+    Writes the table of get_results_table to a CSV or Excel file
+    (see lib_export.TableWriter). The columns are the columns of all
+    plates, in the order they first occur. The results of each plate
+    only hold single values, so they are all created before writing
+    the header.
+
+    Arguments:
+        str_Path -> string. Path of file.
+        dfr_AssayData -> pandas dataframe. Complete container.
+    """
+    lst_Partials = list(results_partials(dfr_AssayData))
+    lst_Columns = []
+    for dfr_Partial in lst_Partials:
+        lst_Columns.extend([col for col in dfr_Partial.columns if not col in lst_Columns])
+    int_Row = 0
+    with exp.TableWriter(str_Path, lst_Columns) as writer:
+        for dfr_Partial in lst_Partials:
+            dfr_Partial.index = range(int_Row, int_Row + len(dfr_Partial))
+            int_Row += len(dfr_Partial)
+            writer.write(dfr_Partial)
+
+def run_analysis(str_Shorthand, str_DataPath, str_TransferFile = None, str_LayoutFile = None,
+                 lst_Details = None, lst_Assign = None, callback = log.print_progress,
+                 int_Workers = 1, int_ReadThreads = None, int_CycleStride = 1,
+                 lst_FitCycles = None):
+    """
+    Analyses a complete experiment the same way the GUI does.
+
+    Arguments:
+        str_Shorthand -> string. Assay shorthand
+        str_DataPath -> string. Data directory (EPSD, NDSF: data file).
+                        NDSF: several data files separated by os.pathsep.
+        str_TransferFile -> string. Transfer file. Optional for DSF and NDSF.
+        str_LayoutFile -> string. Plate layout file (NDSF: capillary list,
+                          one per data file separated by os.pathsep)
+        lst_Details -> list of strings of format "Key=Value"
+        lst_Assign -> list of strings of format "Entry=File"
+        callback -> function to report progress to. See lib_progresslog.
+        int_Workers -> integer. Number of worker processes for plates.
+        int_ReadThreads -> integer. Number of raw data files to read at the
+                           same time. Default: df.int_MaxReadThreads
+        int_CycleStride -> integer. DRTC: fit every n-th cycle only.
+        lst_FitCycles -> list of integers. DRTC: positions of the cycles
+                         to fit. See df.select_DRTC_cycles.
+
+    Returns complete container (None if processing failed), assay details
+    and the paths dataframe to write into the project file.
+    """
+    if lst_Details is None:
+        lst_Details = []
+    if lst_Assign is None:
+        lst_Assign = []
+    dlg_Progress = log.CallbackProgress(callback)
+    dfr_Details = get_details(str_Shorthand, lst_Details)
+    dfr_Paths = pd.DataFrame([str_TransferFile,str_DataPath], columns=["Path"])
+    if str_Shorthand == "NDSF":
+        # Each data file is one capillary set
+        lst_DataFiles = str_DataPath.split(os.pathsep)
+        if str_LayoutFile == None:
+            lst_CapillaryFiles = [None] * len(lst_DataFiles)
+        else:
+            lst_CapillaryFiles = str_LayoutFile.split(os.pathsep)
+            if not len(lst_CapillaryFiles) == len(lst_DataFiles):
+                raise ValueError("Number of capillary lists does not match number of data files.")
+        lst_Capillaries = []
+        lst_Layouts = []
+        for idx_Set in range(len(lst_DataFiles)):
+            dfr_Capillaries, dfr_Layout = read_capillaries(lst_DataFiles[idx_Set], lst_CapillaryFiles[idx_Set],
+                                                           dfr_Details.loc["PurificationID","Value"])
+            lst_Capillaries.append(dfr_Capillaries)
+            lst_Layouts.append(dfr_Layout)
+        dfr_AssayData = df.get_CompleteContainer_nanoDSF(lst_DataFiles,
+                                                         dfr_Details.loc["AssayCategory","Value"],
+                                                         False, lst_Capillaries,
+                                                         pd.concat(lst_Layouts, ignore_index=True),
+                                                         dlg_Progress, int_ReadThreads)
+        return dfr_AssayData, dfr_Details, dfr_Paths
+    dfr_TransferFile, dfr_Exceptions, dfr_DestinationPlates = get_transfer(str_TransferFile)
+    if dfr_DestinationPlates is None and dfr_Details.loc["SampleSource","Value"] == "echo":
+        if str_Shorthand == "DSF":
+            dfr_Details.loc["SampleSource","Value"] = "well"
+        else:
+            raise ValueError("A transfer file is required for " + str_Shorthand)
+    dfr_PlateAssignment = assign_plates(dfr_Details, str_DataPath, dfr_DestinationPlates, lst_Assign)
+    for idx in dfr_PlateAssignment.index:
+        dlg_Progress.lbx_Log.InsertItems([dfr_PlateAssignment.loc[idx,"TransferEntry"] + " <- " + dfr_PlateAssignment.loc[idx,"DataFile"]],
+                                         dlg_Progress.lbx_Log.Count)
+    dfr_Layout = read_layout(str_LayoutFile, dfr_PlateAssignment, dfr_Details)
+    dfr_AssayData = df.get_CompleteContainer(dfr_PlateAssignment, str_DataPath, dfr_TransferFile,
+                                             dfr_Exceptions, dfr_Layout, dfr_Details, dlg_Progress,
+                                             int_Workers, int_ReadThreads,
+                                             int_CycleStride = int_CycleStride,
+                                             lst_FitCycles = lst_FitCycles)
+    return dfr_AssayData, dfr_Details, dfr_Paths
+
+def run_analysis_CBCS(str_DataPath, str_LayoutFile, lst_Concentrations, lst_Parameters,
+                      int_Replicates, str_DataProcessor, callback = log.print_progress,
+                      int_ReadThreads = None):
+    """
+    Analyses a cell based compound screen. The data directory is searched
+    for the result files of each concentration/condition/replicate the same
+    way as on the file selection tab of the CBCS project.
+
+    Arguments:
+        str_DataPath -> string. Data directory.
+        str_LayoutFile -> string. Plate layout file.
+        lst_Concentrations -> list of strings, e.g. ["1uM","10uM"]
+        lst_Parameters -> list of strings. Each parameter is either present
+                          (+) or absent (-) in a condition.
+        int_Replicates -> integer.
+        str_DataProcessor -> string. "Columbus" or "Harmony"
+        callback -> function to report progress to. See lib_progresslog.
+        int_ReadThreads -> integer. Number of result files to read at the
+                           same time. Default: df.int_MaxReadThreads
+
+    Returns dataframe of processed conditions or None.
+    """
+    dlg_Progress = log.CallbackProgress(callback)
+    # Conditions: all combinations of parameters being present or absent.
+    # Reference condition is the one with all parameters absent.
+    lst_Conditions = []
+    str_ReferenceCondition = None
+    for prefix in product(["+", "-"], repeat=len(lst_Parameters)):
+        state = ""
+        for par in range(len(lst_Parameters)):
+            state += "_" + prefix[par] + lst_Parameters[par]
+        if all(element == "-" for element in prefix):
+            str_ReferenceCondition = state
+        lst_Conditions.append(state)
+    lst_Replicates = ["R" + str(rep+1) for rep in range(int_Replicates)]
+    lst_Index = list(product(lst_Concentrations, lst_Conditions, lst_Replicates))
+    dfr_DataStructure = pd.DataFrame(index=pd.MultiIndex.from_tuples(lst_Index),
+                                     columns=["FilePath","RawData","Mean","Normalised",
+                                              "Controls","ReferenceCondition"]).sort_index()
+    # Find result files
+    for toplvl in [os.path.join(str_DataPath, sub) for sub in os.listdir(str_DataPath)]:
+        for conc, cond, rep in lst_Index:
+            # concentration needs _ in front, otherwise "0.3uM" and "3uM" will be recongised as the same!
+            if ("_" + conc) in toplvl and cond in toplvl and rep in toplvl:
+                if str_DataProcessor == "Columbus":
+                    for fil in os.listdir(toplvl):
+                        if ".txt" in fil and "result" in fil:
+                            dfr_DataStructure.loc[(conc,cond,rep),"FilePath"] = os.path.join(toplvl,fil)
+                else:
+                    dfr_DataStructure.loc[(conc,cond,rep),"FilePath"] = os.path.join(toplvl,"Evaluation1","PlateResults.txt")
+    if dfr_DataStructure["FilePath"].isna().any():
+        raise ValueError("No result files found for: " + ", ".join([" ".join(idx) for idx in
+                         dfr_DataStructure.index[dfr_DataStructure["FilePath"].isna()]]))
+    dfr_Layout = pd.read_csv(str_LayoutFile, sep=",", header=0, index_col=0, engine="python")
+    for idx_Column in range(len(dfr_Layout.columns)):
+        if type(dfr_Layout.iloc[0,idx_Column]) == str:
+            dfr_Layout.iloc[0,idx_Column] = df.import_string_to_list(dfr_Layout.iloc[0,idx_Column])
+    dfr_DataStructure, dfr_Processed, dfr_SampleInfo = df.get_CompleteContainer_CBCS(dfr_DataStructure,
+        dfr_Layout, dlg_Progress, lst_Concentrations, lst_Conditions, str_ReferenceCondition,
+        lst_Replicates, str_DataProcessor, int_ReadThreads)
+    return dfr_Processed
+
+def main(lst_Arguments = None):
+    """
+    Entry point for the command line.
+    Returns exit code (0 on success).
+    """
+    args = get_arguments(lst_Arguments)
+    if args.quiet == True:
+        callback = None
+    else:
+        callback = log.print_progress
+    try:
+        if args.assay == "CBCS":
+            if args.layout == None:
+                raise ValueError("A plate layout file is required for CBCS.")
+            dfr_Processed = run_analysis_CBCS(args.data, args.layout, args.concentrations,
+                                              args.parameters, args.replicates, args.processor,
+                                              callback, args.read_threads)
+            dfr_AssayData = None
+        else:
+            if args.cycles == None:
+                lst_FitCycles = None
+            else:
+                lst_FitCycles = [cycle - 1 for cycle in args.cycles]
+            dfr_AssayData, dfr_Details, dfr_Paths = run_analysis(args.assay, args.data,
+                                                                 args.transfer, args.layout,
+                                                                 args.detail, args.assign,
+                                                                 callback, args.workers,
+                                                                 args.read_threads,
+                                                                 args.cycle_stride, lst_FitCycles)
+            if dfr_AssayData is None:
+                raise ValueError("DATA PROCESSING CANCELLED")
+            # No need to look at the results in between, fit the interpolated cycles straight away
+            thd_CycleFiller = cf.CycleFiller(dfr_AssayData, None, args.workers)
+            if len(thd_CycleFiller.lst_Outstanding) > 0:
+                if not callback == None:
+                    callback("Fitting remaining cycles of " + str(len(thd_CycleFiller.lst_Outstanding)) + " samples", False)
+                thd_CycleFiller.start()
+                thd_CycleFiller.join()
+    except (ValueError, OSError) as error:
+        print("\n" + str(error), file=sys.stderr)
+        return 1
+    if not callback == None:
+        print("")
+    # Write project file. Boolean variables as in frm_Main.SaveFile:
+    # AssayDetailsChanged, AssayDetailsCompleted, DataFilesAssigned,
+    # DataFilesUpdated, DataAnalysed, ELNPlotsDrawn, ExportPopulated,
+    # ResultsDrawn, ReviewsDrawn, TransferLoaded, GlobalLayout, PlateID,
+    # PlateMapPopulated
+    if not dfr_AssayData is None and not args.output == None:
+        str_Output = args.output
+        if str_Output.find(".bbq") == -1:
+            str_Output = str_Output + ".bbq"
+        lst_Boolean = [False, True, True, False, True, False, False, False, False,
+                       not args.transfer == None, False, False, False]
+        if prj.write_archive(str_Output, dfr_AssayData, dfr_Details, lst_Boolean, dfr_Paths) == False:
+            print("Could not write project file " + str_Output, file=sys.stderr)
+            return 1
+    if not args.results == None:
+        if dfr_AssayData is None:
+            with exp.TableWriter(args.results, dfr_Processed.columns) as writer:
+                writer.write(dfr_Processed)
+        else:
+            write_results_table(args.results, dfr_AssayData)
+    return 0
+
+if __name__ == "__main__":
+    # DRTC processing uses a multiprocessing pool
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Benchmarks for BBQ project files.
+
+Compares how long it takes to save and open projects in both versions
+of the project file format (see lib_projectfile) and how large the
+files get.
+
+Usage examples:
+    python benchmark.py
+    python benchmark.py project.bbq --repeats 5
+
+Without project files, the example projects (examples/*/*.bbq) are used.
+
+Functions:
+    main
+    get_arguments
+    benchmark_projectfile
+
+"""
+
+import argparse
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import lib_projectfile as prj
+
+def get_arguments(lst_Arguments = None):
+    """
+    Parses the command line arguments.
+
+    Arguments:
+        lst_Arguments -> list of strings. If None, sys.argv is used.
+    """
+    parser = argparse.ArgumentParser(prog="benchmark.py",
+        description="Compare save and open times of the BBQ project file format versions.")
+    parser.add_argument("projects", nargs="*",
+        help="Project files (.bbq). Default: the example projects.")
+    parser.add_argument("--repeats", type=int, default=3,
+        help="Number of runs per measurement, the best one counts.")
+    return parser.parse_args(lst_Arguments)
+
+def benchmark_projectfile(lst_FilePaths, int_Repeats = 3):
+    """
+    Compares open and save times of both file format versions.
+    Each project gets opened, saved as version 1 and version 2,
+    and each saved copy opened again. Times are the best of
+    int_Repeats runs.
+
+    Arguments:
+        lst_FilePaths -> list of paths of .bbq files
+        int_Repeats -> integer. Number of runs per measurement.
+
+    Returns pandas dataframe with times in seconds and file sizes
+    in bytes per project.
+    """
+    def best_time(function, *args):
+        flt_Best = np.inf
+        for rep in range(int_Repeats):
+            flt_Start = time.perf_counter()
+            function(*args)
+            flt_Best = min(flt_Best, time.perf_counter() - flt_Start)
+        return flt_Best
+    str_BenchDir = tempfile.mkdtemp(prefix="bbqbenchmark")
+    dfr_Benchmark = pd.DataFrame(columns=["SaveV1","OpenV1","SizeV1",
+                                          "SaveV2","OpenV2","SizeV2"])
+    try:
+        for str_FilePath in lst_FilePaths:
+            dfr_Details, lst_Boolean, dfr_Loaded, lst_Paths = prj.read_archive(str_FilePath)
+            dfr_Paths = pd.DataFrame(lst_Paths, columns=["Path"])
+            str_Project = os.path.basename(str_FilePath)
+            for int_Version in [1,2]:
+                str_Copy = os.path.join(str_BenchDir,"v" + str(int_Version) + "_" + str_Project)
+                dfr_Benchmark.at[str_Project,"SaveV"+str(int_Version)] = best_time(prj.write_archive,
+                    str_Copy, dfr_Loaded, dfr_Details, lst_Boolean, dfr_Paths, int_Version)
+                dfr_Benchmark.at[str_Project,"OpenV"+str(int_Version)] = best_time(prj.read_archive, str_Copy)
+                dfr_Benchmark.at[str_Project,"SizeV"+str(int_Version)] = os.path.getsize(str_Copy)
+    finally:
+        shutil.rmtree(str_BenchDir)
+    return dfr_Benchmark
+
+def main(lst_Arguments = None):
+    """
+    Runs the benchmark and prints the results.
+
+    Arguments:
+        lst_Arguments -> list of strings. If None, sys.argv is used.
+
+    Returns exit code (integer).
+    """
+    args = get_arguments(lst_Arguments)
+    lst_FilePaths = args.projects
+    if len(lst_FilePaths) == 0:
+        lst_FilePaths = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                      "examples","*","*.bbq")))
+    if len(lst_FilePaths) == 0:
+        print("No project files found", file=sys.stderr)
+        return 1
+    print(benchmark_projectfile(lst_FilePaths, max(1,args.repeats)).to_string())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,6 +13,7 @@ from matplotlib import patches
 from PIL import Image
 
 import lib_datafunctions as df
+import lib_drtcresults as dr
 import lib_platefunctions as pf
 import lib_fittingfunctions as ff
 import lib_messageboxes as msg
@@ -1367,8 +1368,8 @@ class PlotGridDRTC(wx.Panel):
         self.figure.set_facecolor(cs.BgUltraLightHex)
 
     def Draw(self,int_Samples,dfr_Input,strTitle,int_GridHeight,int_GridWidth,hspace_ratio,bottom_ratio,top_ratio,
-            total_height_px,int_SuperTitleSize,supertitle_ratio,int_TitleSize,int_LabelSize,dlg_PlottingProgress):
-        # dfr_Input is the processed dataframe for one plate.
+            total_height_px,int_SuperTitleSize,supertitle_ratio,int_TitleSize,int_LabelSize,dlg_PlottingProgress,results=None):
+        # dfr_Input is the processed dataframe for one plate, results its lib_drtcresults.DRTCResults.
         # Set "supertitle" for figure:
         self.figure.suptitle(strTitle,fontsize=int_SuperTitleSize,x=0.5,y=supertitle_ratio)
         smpl = 0
@@ -1376,18 +1377,11 @@ class PlotGridDRTC(wx.Panel):
             for j in range(int_GridWidth):
                 if int_Samples > smpl: # Check whether we"re still in the dataframe
                     self.ax = self.figure.add_subplot(int_GridHeight,int_GridWidth,smpl+1)
-                    lst_Time = []
-                    lst_IC50s = []
-                    lst_Errors = []
-                    if dfr_Input.loc[smpl,"DoFit"] == True:
-                        for cycle in range(len(dfr_Input.loc[smpl,"NormMean"])):
-                            if dfr_Input.loc[smpl,"Show"][cycle] == 1:
-                                str_Fit = "Free"
-                            else:
-                                str_Fit = "Const"
-                            lst_IC50s.append(dfr_Input.loc[smpl,"NormFit"+str_Fit+"Pars"][cycle][3])
-                            lst_Errors.append(dfr_Input.loc[smpl,"NormFit"+str_Fit+"Errors"][cycle][3])
-                            lst_Time.append(dfr_Input.loc[smpl,"Time"][cycle])
+                    if (results.get_values(smpl,"DoFit") == True).any():
+                        arr_Time, arr_IC50s, arr_Errors, arr_CIs = dr.ic50_against_time(results, smpl)
+                        lst_Time = arr_Time.tolist()
+                        lst_IC50s = arr_IC50s.tolist()
+                        lst_Errors = arr_Errors.tolist()
                         self.ax.plot(lst_Time, lst_IC50s, label="IC50 in uM", color="#872154")
                         self.ax.errorbar(lst_Time, lst_IC50s, yerr=lst_Errors,fmt="none", color="#872154", elinewidth=0.3, capsize=2)
                         # self.ax.plot(dfr_Input.loc[smpl,"LinFitTime"], dfr_Input.loc[smpl,"LinFit"], label="Linear", color="#ddcc77")
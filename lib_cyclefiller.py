@@ -0,0 +1,121 @@
+"""
+Fits the remaining cycles of dose response time course plates in a
+background thread.
+
+When only every n-th cycle (or a chosen set of cycles) of a dose response
+time course gets fitted during the analysis, the other cycles are
+interpolated so the results can be looked at straight away (see
+lib_datafunctions.select_DRTC_cycles). CycleFiller then fits those
+cycles on a pool of worker processes and writes the results into each
+plate's DRTCResults (see lib_drtcresults) sample by sample.
+
+Classes:
+    CycleFiller
+
+Functions:
+    get_outstanding_samples
+
+"""
+
+import threading
+
+import lib_datafunctions as df
+
+def get_outstanding_samples(dfr_AssayData):
+    """
+    Returns a list of (plate index, sample index) of all samples in the
+    complete container that still have interpolated cycles.
+
+    Arguments:
+        dfr_AssayData -> pandas dataframe. Complete container
+    """
+    lst_Samples = []
+    if not "DRTCResults" in dfr_AssayData.columns:
+        return lst_Samples
+    for idx_Plate in dfr_AssayData.index:
+        results = dfr_AssayData.loc[idx_Plate,"DRTCResults"]
+        for idx_Sample in range(results.shape[0]):
+            if len(df.get_interpolated_DRTC_cycles(results, idx_Sample)) > 0:
+                lst_Samples.append((idx_Plate, idx_Sample))
+    return lst_Samples
+
+class CycleFiller(threading.Thread):
+    """
+    Background thread that fits the interpolated cycles of all samples of
+    a complete container. The callback is called from the filler thread,
+    GUI code has to pass it on to the main thread (e.g. with wx.CallAfter).
+    """
+
+    def __init__(self, dfr_AssayData, callback = None, int_Workers = None):
+        """
+        Initialises class attributes.
+
+        Arguments:
+            dfr_AssayData -> pandas dataframe. Complete container
+            callback -> function taking the filler, the plate index and
+                        sample index (integers) of a sample that has been
+                        fitted and whether all samples are done (boolean).
+                        Called with None for both indices when finished.
+            int_Workers -> integer. Number of worker processes. Default is
+                           df.int_DefaultWorkers.
+        """
+        threading.Thread.__init__(self, daemon=True)
+        self.dfr_AssayData = dfr_AssayData
+        self.callback = callback
+        if int_Workers is None:
+            int_Workers = df.int_DefaultWorkers
+        self.int_Workers = int_Workers
+        self.evt_Cancel = threading.Event()
+        # Held while results get written into the container
+        self.lock = threading.Lock()
+        self.lst_Outstanding = get_outstanding_samples(dfr_AssayData)
+
+    def cancel(self):
+        """
+        Stops fitting. Samples that have not been fitted stay interpolated
+        and the callback does not get called again.
+        """
+        self.evt_Cancel.set()
+
+    def run(self):
+        """
+        Fits all outstanding samples.
+        """
+        lst_Input = []
+        for idx_Plate, idx_Sample in self.lst_Outstanding:
+            results = self.dfr_AssayData.loc[idx_Plate,"DRTCResults"]
+            lst_Input.append([idx_Plate, idx_Sample, results.lst_Time, results.sample_arrays(idx_Sample)])
+        int_Workers = min(self.int_Workers, len(lst_Input))
+        if int_Workers > 1:
+            with df.mp_Context.Pool(int_Workers) as p:
+                for lst_Result in p.imap_unordered(df.FillDRTC_MP, lst_Input):
+                    if self.evt_Cancel.is_set() == True:
+                        p.terminate()
+                        return
+                    self.store(*lst_Result)
+        else:
+            for lst_Item in lst_Input:
+                if self.evt_Cancel.is_set() == True:
+                    return
+                self.store(*df.FillDRTC_MP(lst_Item))
+        if self.evt_Cancel.is_set() == False and not self.callback == None:
+            self.callback(self, None, None, True)
+
+    def store(self, idx_Plate, idx_Sample, lst_Cycles, dic_Changed):
+        """
+        Writes the fits of a sample into the plate's DRTCResults.
+
+        Arguments:
+            idx_Plate -> integer. Index of plate in container
+            idx_Sample -> integer. Position of sample in DRTCResults
+            lst_Cycles -> list of integers. Positions of fitted cycles
+            dic_Changed -> dictionary. Column and new arrays of the sample.
+        """
+        with self.lock:
+            results = self.dfr_AssayData.loc[idx_Plate,"DRTCResults"]
+            # Cycles the user has re-fitted in the meantime are no longer interpolated and keep their fits
+            lst_Cycles = [cycle for cycle in lst_Cycles if df.is_fitted_DRTC_cycle(results, idx_Sample, cycle) == False]
+            results.set_sample(idx_Sample, dic_Changed, lst_Cycles)
+            self.lst_Outstanding.remove((idx_Plate, idx_Sample))
+        if not self.callback == None:
+            self.callback(self, idx_Plate, idx_Sample, False)
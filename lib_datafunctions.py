@@ -2,16 +2,46 @@
 # Functions to readout data from raw data files from devices are in separate library.
 
 # Import libraries
+import os
+import io
 import numpy as np
 from numpy.core.fromnumeric import mean
 import pandas as pd
-from multiprocessing import Pool
+import queue
+from multiprocessing import get_context, current_process, TimeoutError as MPTimeoutError
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 
 # Import my own libraries
 import lib_platefunctions as pf
 import lib_resultreadouts as ro
 import lib_fittingfunctions as ff
-import lib_messageboxes as msg
+import lib_progresslog as log
+import lib_processedstore as ps
+import lib_kineticstore as ks
+import lib_drtcresults as dr
+# Message boxes need wxPython. Without it (e.g. headless batch analysis via batch.py)
+# errors only get written to the progress log.
+try:
+	import lib_messageboxes as msg
+except ImportError:
+	msg = None
+
+# Number of raw data files read at the same time when plates are processed one after
+# another. Reading is mostly waiting for (network) drives, but do not hammer them.
+int_MaxReadThreads = 4
+# Number of worker processes for the log-MM fits of a rate plate (see fit_logMM_plate).
+int_MaxFitWorkers = min(8, os.cpu_count() or 1)
+# Number of worker processes for plates if nothing else has been set (see get_CompleteContainer).
+# Plates are processed one after another: each worker process has to import pandas and scipy
+# first, which takes longer than processing the usual handful of plates. Projects with many
+# plates can use more workers via the "Workers" row of the settings file (see main.py).
+int_DefaultWorkers = 1
+# Worker processes get spawned, not forked. The GUI and the raw data readers run threads, and a
+# forked process only gets a copy of the thread that forked it, with the other threads' locks
+# stuck in whatever state they were in.
+mp_Context = get_context("spawn")
+# Queue for the log of a plate processed in a worker process, see PlateProcessing_MP.
+que_PlateProgress = None
 
 ########################################################################################################
 ##                                                                                                    ##
@@ -23,6 +53,68 @@ import lib_messageboxes as msg
 ##                                                                                                    ##
 ########################################################################################################
 
+# Parsed transfer files. Key is (path, size, time of last modification)
+# so that a file gets parsed again once it changes.
+dic_TransferFileCache = {}
+
+# Plate names repeat for every transfer. As categories they take up a fraction of
+# the memory and comparisons against a plate name are much faster. Names as in the
+# file, before spaces get removed. Everything else is left to pandas as before.
+dic_TransferTypes = {"Source Plate Name":"category","Destination Plate Name":"category"}
+
+def parse_transfer_file(str_TransferFile):
+	"""
+	Reads an Echo transfer file in one pass and caches the result. Lines are scanned for
+	the section markers "[EXCEPTIONS]" and "[DETAILS]", the lines of the exceptions section
+	are collected on the way and the details section is read by the C engine straight from
+	the position after its marker. Spaces are removed from the column names.
+	Used by create_transfer_frame and by the Transfer File Processor in lib_tools.
+
+	Arguments:
+		str_TransferFile -> string. Path of transfer file
+
+	Returns dictionary with the pandas dataframes "Details" and "Exceptions" (all columns)
+	or None if the file has no "[DETAILS]" section. The dataframes are shared, do not
+	change them in place.
+	"""
+	try:
+		tpl_Key = (os.path.abspath(str_TransferFile), os.path.getsize(str_TransferFile),
+			os.path.getmtime(str_TransferFile))
+	except OSError:
+		return None
+	if tpl_Key in dic_TransferFileCache.keys():
+		return dic_TransferFileCache[tpl_Key]
+	lst_Exceptions = None
+	with open(str_TransferFile, "rb") as fil:
+		while True:
+			line = fil.readline()
+			# End of file without "[DETAILS]"
+			if line == b"":
+				return None
+			str_First = line.split(b",",1)[0].strip().strip(b"\"")
+			if str_First == b"[DETAILS]":
+				break
+			elif str_First == b"[EXCEPTIONS]":
+				lst_Exceptions = []
+			elif not lst_Exceptions is None:
+				lst_Exceptions.append(line)
+		dfr_Details = pd.read_csv(fil, sep=",", header=0, index_col=False, engine="c",
+			dtype=dic_TransferTypes)
+	dfr_Details.columns = dfr_Details.columns.str.replace(" ", "")
+	# Exceptions section: header, one line per exception, then an empty line
+	if not lst_Exceptions is None and len(lst_Exceptions) > 1:
+		dfr_Exceptions = pd.read_csv(io.BytesIO(b"".join(lst_Exceptions)), sep=",", header=0,
+			index_col=False, engine="c").dropna(how="all").reset_index(drop=True)
+		dfr_Exceptions.columns = dfr_Exceptions.columns.str.replace(" ", "")
+	else:
+		dfr_Exceptions = pd.DataFrame(columns=["DestinationPlateName","DestinationWell"])
+	# Forget earlier versions of the same file
+	for tpl_Cached in [tpl_Cached for tpl_Cached in dic_TransferFileCache.keys()
+		if tpl_Cached[0] == tpl_Key[0]]:
+		dic_TransferFileCache.pop(tpl_Cached)
+	dic_TransferFileCache[tpl_Key] = {"Details":dfr_Details, "Exceptions":dfr_Exceptions}
+	return dic_TransferFileCache[tpl_Key]
+
 def create_transfer_frame(str_TransferFile):
 	"""
 	Reads transfer file into data frame and trims it down to neccessary lines
@@ -31,35 +123,17 @@ def create_transfer_frame(str_TransferFile):
 	is not delimited. Example:
 	First line is: Run ID,3360
 	To capture all columns, the first line should be: Run ID,3360,,,,,,,,,,,,,,,,,,,
-	This will trip up pd.read_csv, so we have to find the header row first byt loading only the first column and searching for the keyword.
+	This will trip up pd.read_csv, so the sections get found by scanning the lines first (see parse_transfer_file).
 	"""
-	# Open transfer file and find header row and exceptions (if any)
-	dfr_Temp = pd.read_csv(str_TransferFile, sep=",", usecols=[0], header=None, index_col=False, engine="python")
-	int_Exceptions = dfr_Temp.index[dfr_Temp[0] == "[EXCEPTIONS]"].tolist()
-	int_HeaderRow = dfr_Temp.index[dfr_Temp[0] == "[DETAILS]"].tolist()
+	dic_Transfer = parse_transfer_file(str_TransferFile)
 	# Check whether the Details keyword has been found:
-	if not int_HeaderRow:
+	if dic_Transfer is None:
 		return None
-	# create exceptions dataframe
-	if int_Exceptions:
-		int_Exceptions = int_Exceptions[0] + 1
-		int_Length = int_HeaderRow[0] - int_Exceptions - 2
-		dfr_Exceptions = pd.read_csv(str_TransferFile, sep=",", header=int_Exceptions, index_col=False, engine="python")
-		dfr_Exceptions = dfr_Exceptions.iloc[0:int_Length]
-		dfr_Exceptions.columns = dfr_Exceptions.columns.str.replace(" ", "")
-		dfr_Exceptions = dfr_Exceptions[["DestinationPlateName","DestinationWell"]]
-	else:
-		dfr_Exceptions = pd.DataFrame(columns=["DestinationPlateName","DestinationWell"])
-	# Adjust header row for offset:
-	int_HeaderRow = int_HeaderRow[0] + 1
-	# Now open transfer file properly:
-	dfr_TransferFile = pd.read_csv(str_TransferFile, sep=",", header=int_HeaderRow, index_col=False, engine="python")
-	# Clean up headers
-	dfr_TransferFile.columns = dfr_TransferFile.columns.str.replace(" ", "")
+	dfr_Exceptions = dic_Transfer["Exceptions"][["DestinationPlateName","DestinationWell"]]
 	# Keep only relevant columns -> This will drop the first two columns that hold the appendix data (Instrument name, serial number, etc)
 	# Sort by DestinationConcentration -> Ensures that all points will be in the correct order and there are no weird gaps when drawing the fit
 	# Drop rows that are empty -> This will be where TransferVolume is "NaN"
-	dfr_TransferFile = dfr_TransferFile[["SourceConcentration","DestinationPlateName","DestinationPlateBarcode","DestinationPlateType","DestinationWell",
+	dfr_TransferFile = dic_Transfer["Details"][["SourceConcentration","DestinationPlateName","DestinationPlateBarcode","DestinationPlateType","DestinationWell",
 		"SampleID","SampleName","DestinationConcentration","TransferVolume","ActualVolume","SourcePlateName"]].sort_values(["DestinationPlateName","SampleID","DestinationConcentration"],
 		ascending=[True,True,False]).dropna(subset=["TransferVolume"])
 	# Make wells sortable -> Relegated to a later point
@@ -98,12 +172,14 @@ def get_samples(dfr_ProcessedTransfer,str_CurrentPlate,int_PlateFormat):
 	elif int_PlateFormat == 1536:
 		lst_WellsIndex = dfr_ProcessedTransfer.DestinationWell.apply(pf.sortable_well_1536).apply(pf.well_to_index_1536).tolist()
 	dfr_ProcessedTransfer.insert(3,"WellsIndex",lst_WellsIndex) # Column position three is chosen randomly.
-	# Create columns for Locations and Concentration, write placeholders, change data type to enable holding lists
+	# Create columns for Locations and Concentration, write placeholders, change data type to enable holding lists.
+	# Rows of each sample are looked up once instead of filtering the transfer file for every sample.
+	dic_Rows = dfr_ProcessedTransfer.groupby("SampleID", sort=False).indices
 	for smpl in range(dfr_Samples.shape[0]):
-		dfCurrent = dfr_ProcessedTransfer[dfr_ProcessedTransfer.SampleID == dfr_Samples.loc[smpl, "SampleID"]]
-		dfr_Samples.at[smpl,"Locations"] = dfCurrent.WellsIndex.reset_index(drop=True)
-		dfr_Samples.at[smpl,"Concentrations"] = dfCurrent.DestinationConcentration.reset_index(drop=True)
-		dfr_Samples.at[smpl,"TransferVolumes"] = dfCurrent.TransferVolume.reset_index(drop=True)
+		arr_Rows = dic_Rows[dfr_Samples.loc[smpl, "SampleID"]]
+		for str_Column, str_Source in [("Locations","WellsIndex"),("Concentrations","DestinationConcentration"),("TransferVolumes","TransferVolume")]:
+			sr_Source = dfr_ProcessedTransfer[str_Source]
+			dfr_Samples.at[smpl,str_Column] = pd.Series(sr_Source.to_numpy()[arr_Rows], name=str_Source, dtype=sr_Source.dtype)
 	return dfr_Samples
 
 def get_samples_lightcycler(str_CurrentPlate,dfr_RawData,int_PlateFormat):
@@ -163,25 +239,21 @@ def get_references(dfr_ProcessedTransfer,dfr_Exceptions,str_TransferEntry,str_Ra
 	# Merge controls into reference dataframe
 	dfr_References = pd.merge(dfr_References, dfr_Controls, on=["Well"], how="left")
 	# get all "buffer" wells, e.g. w/o any addition into them from transfer file
-	dfr_Transfers = pd.DataFrame(list(zip(lst_TransferWells,lst_TransferWells)),columns={"Well","Transfer"})
+	dfr_Transfers = pd.DataFrame(list(zip(lst_TransferWells,lst_TransferWells)),columns=["Well","Transfer"])
 	# Merge all transfers into reference dataframe
 	dfr_References = pd.merge(dfr_References, dfr_Transfers, on=["Well"], how="left")
 	# no transfer at all means buffer
-	for i in range(dfr_References.shape[0]):
-		if pd.isna(dfr_References.loc[i,"Transfer"]) == True and pd.isna(dfr_References.loc[i,"Reading"]) == False:
-			dfr_References.loc[i,"Buffer"] = "YES"
-		else:
-			dfr_References.loc[i,"Buffer"] = np.nan
+	arr_Buffer = np.where(dfr_References["Transfer"].isna() & dfr_References["Reading"].notna(), "YES", None)
+	arr_Buffer[arr_Buffer == None] = np.nan
+	dfr_References["Buffer"] = arr_Buffer if (arr_Buffer == "YES").any() else arr_Buffer.astype(float)
 	# Solvent wells have a transfer but no sample
 	#dfr_Solvent = dfr_ProcessedTransfer[["SampleID","Well"]]
 	dfr_Samples = dfr_ProcessedTransfer[(dfr_ProcessedTransfer["SampleID"].isnull() == False)]
 	# Get entries in transfer file with no sample -> Solvent transfer. Could be backfills!
 	dfr_Solvent = dfr_ProcessedTransfer[(dfr_ProcessedTransfer["SampleID"].isnull() == True)].reset_index(drop=True)
 	# Figure out which Solvent transfers are not backfills and drop these from the dataframe
-	lst_Backfills = []
-	for well in range(len(dfr_Solvent)):
-		if dfr_Solvent.loc[well,"Well"] in dfr_Samples.values:
-			lst_Backfills.append(well)
+	set_Samples = set(dfr_Samples["Well"])
+	lst_Backfills = [well for well in range(len(dfr_Solvent)) if dfr_Solvent.loc[well,"Well"] in set_Samples]
 	dfr_Solvent = dfr_Solvent[["Well"]].drop(lst_Backfills).reset_index(drop=True)
 	if len(dfr_Solvent) > 0:
 		dfr_Solvent.loc[dfr_Solvent["Well"].isnull() == False,"Solvent"] = "YES"
@@ -189,28 +261,18 @@ def get_references(dfr_ProcessedTransfer,dfr_Exceptions,str_TransferEntry,str_Ra
 		dfr_References = pd.merge(dfr_References, dfr_Solvent, on=["Well"], how="left")
 	else:
 		dfr_References["Solvent"] = make_list(len(dfr_References),np.nan)
-	# Write readings into appropriate columns
-	lst_Buffer = []
-	for i in range(len(dfr_References)):
-		if not dfr_References.loc[i,"Well"] in lst_Exceptions:
-			# Write control value, delete Solvent value if there is a control
-			if dfr_References.loc[i,"Control"] == "Control":
-				dfr_References.loc[i,"Control"] = dfr_References.loc[i,"Reading"]
-				dfr_References.loc[i,"Solvent"] = np.nan
-				dfr_References.loc[i,"Buffer"] = np.nan
-			# Write Solvent value. Must not be a control, must have transfer. SampleID = Nan has already been tested
-			elif dfr_References.loc[i,"Control"] != "Control" and dfr_References.loc[i,"Solvent"] == "YES":
-				dfr_References.loc[i,"Solvent"] = dfr_References.loc[i,"Reading"]
-				dfr_References.loc[i,"Control"] = np.nan
-				dfr_References.loc[i,"Buffer"] = np.nan
-						# Write buffer value
-			elif dfr_References.loc[i,"Buffer"] == "YES":
-					lst_Buffer.append(dfr_References.loc[i,"Well"])
-					dfr_References.loc[i,"Buffer"] = dfr_References.loc[i,"Reading"]
-		else:
-			dfr_References.loc[i,"Control"] = np.nan
-			dfr_References.loc[i,"Solvent"] = np.nan
-			dfr_References.loc[i,"Buffer"] = np.nan
+	# Write readings into appropriate columns. Exceptions are neither controls, solvent nor buffer.
+	arr_Valid = ~dfr_References["Well"].isin(lst_Exceptions).to_numpy()
+	arr_Reading = dfr_References["Reading"].to_numpy()
+	# Control value first, a control is not a solvent or buffer well.
+	arr_Control = arr_Valid & (dfr_References["Control"] == "Control").to_numpy()
+	# Solvent value. Must not be a control, must have transfer. SampleID = Nan has already been tested
+	arr_Solvent = arr_Valid & ~arr_Control & (dfr_References["Solvent"] == "YES").to_numpy()
+	arr_Buffer = arr_Valid & ~arr_Control & ~arr_Solvent & (dfr_References["Buffer"] == "YES").to_numpy()
+	for str_Column, arr_Type in [("Control",arr_Control),("Solvent",arr_Solvent),("Buffer",arr_Buffer)]:
+		arr_Column = np.full(len(dfr_References), np.nan, dtype=dfr_References[str_Column].dtype)
+		arr_Column[arr_Type] = arr_Reading[arr_Type]
+		dfr_References[str_Column] = arr_Column
 	# Calculate parameters:
 	flt_Solvent_Mean, flt_Solvent_SEM, flt_Solvent_STDEV = dfr_References["Solvent"].mean(), dfr_References["Solvent"].sem(), dfr_References["Solvent"].std()
 	flt_Solvent_Median, flt_Solvent_MAD = dfr_References["Solvent"].median(), MedianAbsoluteDeviation(dfr_References["Solvent"])
@@ -232,13 +294,11 @@ def get_references(dfr_ProcessedTransfer,dfr_Exceptions,str_TransferEntry,str_Ra
 	
 	lst_References = [flt_Solvent_Mean, flt_Solvent_SEM, flt_Control_Mean, flt_Control_SEM, flt_Buffer_Mean, flt_Buffer_SEM, flt_ZPrime_Mean, flt_ZPrime_Median]
 	# Write it all into dfr_Layout:
-	for i in range(int_PlateFormat):
-		if pd.isna(dfr_References.loc[i,"Control"]) == False:
-			dfr_Layout.loc[0,"WellType"][pf.well_to_index(dfr_References.loc[i,"Well"],int_PlateFormat)] = "r"
-		elif pd.isna(dfr_References.loc[i,"Solvent"]) == False:
-			dfr_Layout.loc[0,"WellType"][pf.well_to_index(dfr_References.loc[i,"Well"],int_PlateFormat)] = "d"
-		elif pd.isna(dfr_References.loc[i,"Buffer"]) == False:
-			dfr_Layout.loc[0,"WellType"][pf.well_to_index(dfr_References.loc[i,"Well"],int_PlateFormat)] = "b"
+	lst_WellType = dfr_Layout.loc[0,"WellType"]
+	lst_Wells = dfr_References["Well"].tolist()
+	for str_Column, str_Type in [("Buffer","b"),("Solvent","d"),("Control","r")]:
+		for i in np.flatnonzero(dfr_References[str_Column].notna().to_numpy()[:int_PlateFormat]):
+			lst_WellType[pf.well_to_index(lst_Wells[i],int_PlateFormat)] = str_Type
 
 	dfr_References_Return = pd.DataFrame(columns=[0],index=["SolventMean","SolventMedian","SolventSEM","SolventSTDEV","SolventMAD",
 		"BufferMean","BufferMedian","BufferSEM","BufferSTDEV","BufferMAD",
@@ -289,7 +349,7 @@ def get_layout(dfr_ProcessedTransfer,str_TransferEntry,str_RawDataFile,dfr_RawDa
 	dfr_References = pd.merge(dfr_References, dfr_Controls, on=["Well"], how="left")
 	# get all "buffer" wells, e.g. w/o any addition into them from transfer file
 	lst_TransferWells = dfr_ProcessedTransfer["Well"].unique()
-	dfr_Transfers = pd.DataFrame(list(zip(lst_TransferWells,lst_TransferWells)),columns={"Well","Transfer"})
+	dfr_Transfers = pd.DataFrame(list(zip(lst_TransferWells,lst_TransferWells)),columns=["Well","Transfer"])
 	# Merge all transfers into reference dataframe
 	dfr_References = pd.merge(dfr_References, dfr_Transfers, on=["Well"], how="left")
 	# no transfer means buffer
@@ -364,7 +424,7 @@ def get_references_DRTC(dfr_ProcessedTransfer,str_TransferEntry,str_RawDataFile,
 	dfr_References = pd.merge(dfr_Wells, dfr_Controls, on=["Well"], how="left")
 	# get all "buffer" wells, e.g. w/o any addition into them from transfer file
 	lst_TransferWells = dfr_ProcessedTransfer["Well"].unique()
-	dfr_Transfers = pd.DataFrame(list(zip(lst_TransferWells,lst_TransferWells)),columns={"Well","Transfer"})
+	dfr_Transfers = pd.DataFrame(list(zip(lst_TransferWells,lst_TransferWells)),columns=["Well","Transfer"])
 	# Merge all transfers into reference dataframe
 	dfr_References = pd.merge(dfr_References, dfr_Transfers, on=["Well"], how="left")
 	# no transfer means buffer
@@ -402,15 +462,15 @@ def get_references_DRTC(dfr_ProcessedTransfer,str_TransferEntry,str_RawDataFile,
 			dfr_References.loc[well,"Control"] = True
 			dfr_References.loc[well,"Solvent"] = False
 			dfr_References.loc[well,"Buffer"] = False
-			dfr_Control_Values.at[well] = dfr_RawData.loc[well]
+			dfr_Control_Values.loc[well] = dfr_RawData.loc[well]
 		elif dfr_References.loc[well,"Buffer"] == True:
 			dfr_References.loc[well,"Control"] = False
 			dfr_References.loc[well,"Solvent"] = False
-			dfr_Buffer_Values.at[well] = dfr_RawData.loc[well]
+			dfr_Buffer_Values.loc[well] = dfr_RawData.loc[well]
 		elif dfr_References.loc[well,"Solvent"] == True:
 			dfr_References.loc[well,"Control"] = False
 			dfr_References.loc[well,"Buffer"] = False
-			dfr_Solvent_Values.at[well] = dfr_RawData.loc[well]
+			dfr_Solvent_Values.loc[well] = dfr_RawData.loc[well]
 
 	for cycle in dfr_RawData.columns.values:
 		if any_nonnan(dfr_Solvent_Values.loc[:,cycle]) == True:
@@ -467,120 +527,293 @@ def get_references_DRTC(dfr_ProcessedTransfer,str_TransferEntry,str_RawDataFile,
 ##                                                      ##
 ##########################################################
 
-def get_CompleteContainer(dfr_PlateAssignment,str_DataPath,dfr_TransferFile, dfr_Exceptions,dfr_Layout,dfr_Details,dlg_Progress):
-	str_AssayName = dfr_Details.loc["AssayType","Value"]
+def get_CompleteContainer(dfr_PlateAssignment,str_DataPath,dfr_TransferFile, dfr_Exceptions,dfr_Layout,dfr_Details,dlg_Progress,int_Workers = 1,int_ReadThreads = None,
+	str_ProjectPath = None,int_CycleStride = 1,lst_FitCycles = None):
+	"""
+	Processes each assigned plate (see process_plate) and collects everything in one dataframe.
+
+	Without worker processes, the raw data files of several plates are handed to a pool of int_ReadThreads
+	threads (default: int_MaxReadThreads) as soon as processing starts. Plates get processed
+	in the order their files have been read. A single plate, or plates from one list file, are read
+	one after another without threads.
+
+	With int_Workers > 1 (see int_DefaultWorkers), plates are sent to a pool of worker processes.
+	The latest log entry of the plates being processed is shown in the last line of dlg_Progress,
+	each plate's full log gets written once the plate is finished. The container is always in plate order.
+	Dose response time course plates are processed one after another since create_dataframe_DRTC_MP
+	runs its own pool. Rate plates processed in worker processes fit their samples one after another,
+	otherwise fit_logMM_plate sends them to a pool.
+
+	Raw data of kinetic assays (rate, dose response time course) gets moved into a memory-mapped
+	file next to the project file str_ProjectPath (temporary file if the project has not been
+	saved yet), see lib_kineticstore.
+
+	Dose response time course plates only get every int_CycleStride-th cycle (or the cycles in
+	lst_FitCycles) fitted, see select_DRTC_cycles. The other cycles are interpolated until
+	lib_cyclefiller.CycleFiller has fitted them. Their results go into the container's
+	"DRTCResults" column (see lib_drtcresults).
+	"""
 	str_AssayCategory = dfr_Details.loc["AssayCategory","Value"]
-	str_AssayVolume = dfr_Details.loc["AssayVolume","Value"]
-	str_SampleSource = dfr_Details.loc["SampleSource","Value"]
-	str_Device = dfr_Details.loc["Device","Value"]
 	# Assay category is broad: single_dose, IC50 (or dose response), DSF_384...
 	# Count how many rows we need:
-	intRows = 0
+	lst_Plates = []
 	for i in range(dfr_PlateAssignment.shape[0]):
 		if dfr_PlateAssignment.loc[i,"DataFile"] != "":
-			intRows += 1
+			lst_Plates.append(i)
 	dlg_Progress.lbx_Log.InsertItems(["Assay category: " + str_AssayCategory], dlg_Progress.lbx_Log.Count)
 	dlg_Progress.lbx_Log.InsertItems([""], dlg_Progress.lbx_Log.Count)
-	dfr_Container = pd.DataFrame(columns=["DestinationPlateName","Samples","Wells","DataFileName",
-		"RawDataFrame","ProcessedDataFrame","Layout","References"], index=range(intRows))
-	# Iterate through the dfr_PlateAssignment frame
-	for i in range(dfr_PlateAssignment.shape[0]):
-		if dfr_PlateAssignment.loc[i,"DataFile"] != "":
-			dfr_Container.loc[i,"DestinationPlateName"] = dfr_PlateAssignment.loc[i,"TransferEntry"]
-			dlg_Progress.lbx_Log.InsertItems(["Processing plate " + str(i+1) + ": " + str(dfr_Container.loc[i,"DestinationPlateName"])], dlg_Progress.lbx_Log.Count)
-			dlg_Progress.lbx_Log.InsertItems(["==============================================================="], dlg_Progress.lbx_Log.Count)
-			dfr_Container.loc[i,"Wells"] = int(dfr_PlateAssignment.loc[i,"Wells"])
-			dfr_Container.loc[i,"DataFileName"] = dfr_PlateAssignment.loc[i,"DataFile"]
-			# Get raw data
-			dlg_Progress.lbx_Log.InsertItems(["Read raw data file: " + dfr_Container.loc[i,"DataFileName"]], dlg_Progress.lbx_Log.Count)
-			if str_AssayCategory == "dose_response_time_course":
-				if str_Device == "pherastar":
-					dfr_Container.at[i,"RawDataFrame"] = ro.get_bmg_DRTC_readout(str_DataPath + chr(92) + dfr_Container.loc[i,"DataFileName"])
-				elif str_Device == "flipr":
-					dfr_Container.at[i,"RawDataFrame"] = ro.get_FLIPR_DRTC_readout(str_DataPath + chr(92) + dfr_Container.loc[i,"DataFileName"])
-				else:
-					return None
-			elif str_AssayCategory.find("dose_response") != -1:
-				dfr_Container.at[i,"RawDataFrame"] = ro.get_bmg_plate_readout(str_DataPath,dfr_Container.loc[i,"DataFileName"],
-					dfr_Container.loc[i,"Wells"],str_AssayName)
-			elif str_AssayCategory.find("single_dose") != -1:
-				# All plates will be the same plate type!
-				dfrRawData = ro.get_bmg_list_readout(str_DataPath, int(dfr_PlateAssignment.loc[0,"Wells"]))
-				dfr_Container.at[i,"RawDataFrame"] = dfrRawData[["Well",dfr_Container.loc[i,"DataFileName"]]]
-			elif str_AssayCategory == "thermal_shift":
-				if str_AssayName == "DSF_MX_96":
-					dfr_Container.at[i,"RawDataFrame"] = ro.get_mxp_readout(str_DataPath + chr(92) + dfr_Container.loc[i,"DataFileName"], 24) # last argument is NOT number of wells but starting temperature!
-				elif str_AssayName == "DSF_LC_96":
-					dfr_Container.at[i,"RawDataFrame"] = ro.get_lightcycler_readout(str_DataPath + chr(92) + dfr_Container.loc[i,"DataFileName"], 96)
-				elif str_AssayName == "DSF_LC_384":
-					dfr_Container.at[i,"RawDataFrame"] = ro.get_lightcycler_readout(str_DataPath + chr(92) + dfr_Container.loc[i,"DataFileName"], 384)
-			elif str_AssayCategory == "rate":
-				dfr_Container.at[i,"RawDataFrame"] = ro.get_bmg_timecourse_readout(str_DataPath + dfr_Container.loc[i,"DataFileName"])
-			# Test whether a correct file was loaded:
-			if dfr_Container.loc[i,"RawDataFrame"] is None: # == False:
-				msg.FileNotData("self")
-				return None
-			# Get samples
-			if str_SampleSource == "echo":
-				dlg_Progress.lbx_Log.InsertItems(["Extract sample IDs from transfer file"], dlg_Progress.lbx_Log.Count)
-				dfr_Container.at[i,"Samples"] = get_samples(dfr_TransferFile,dfr_Container.loc[i,"DestinationPlateName"],dfr_Container.loc[i,"Wells"])
-			elif str_SampleSource == "lightcycler":
-				dlg_Progress.lbx_Log.InsertItems(["Extract sample IDs from raw data file"], dlg_Progress.lbx_Log.Count)
-				dfr_Container.at[i,"Samples"] = get_samples_lightcycler(dfr_Container.loc[i,"DestinationPlateName"],dfr_Container.at[i,"RawDataFrame"],len(dfr_Layout.loc[i,"ProteinNumerical"]))
-			elif str_SampleSource == "well":
-				dfr_Container.at[i,"Samples"] = get_samples_wellonly(dfr_Container.loc[i,"DestinationPlateName"],dfr_Container.at[i,"RawDataFrame"],len(dfr_Layout.loc[i,"ProteinNumerical"]))
-			if str_AssayCategory == "thermal_shift":
-				# References get handled differently here
-				if len(dfr_Layout) > 1:
-					idx_Layout = i
-				else:
-					idx_Layout = 0
-				# This is totally more complicated than it needs to be, but seems to be the only way this works. Shrug.
-				dfr_Container.at[i,"Layout"] = pd.DataFrame(index=[0],columns=["PlateID","ProteinNumerical","PurificationID","Concentration","WellType"])
-				dfr_Container.loc[i,"Layout"].at[0,"PlateID"] = dfr_Layout.loc[idx_Layout,"PlateID"]
-				dfr_Container.loc[i,"Layout"].at[0,"ProteinNumerical"] = dfr_Layout.loc[idx_Layout,"ProteinNumerical"]
-				dfr_Container.loc[i,"Layout"].at[0,"PurificationID"] = dfr_Layout.loc[idx_Layout,"PurificationID"]
-				dfr_Container.loc[i,"Layout"].at[0,"Concentration"] = dfr_Layout.loc[idx_Layout,"Concentration"]
-				dfr_Container.loc[i,"Layout"].at[0,"WellType"] = dfr_Layout.loc[idx_Layout,"WellType"]
-				# Create dataframe for data processing
-				dfr_Container.at[i,"ProcessedDataFrame"], dfr_Container.at[i,"References"] = create_dataframe_DSF(dfr_Container.at[i,"RawDataFrame"],
-					dfr_Container.loc[i,"Samples"], dfr_Layout.loc[idx_Layout], dlg_Progress)
-			elif str_AssayCategory.find("rate") != -1:
-				# References get handled differently here
-				dfr_Container.at[i,"Layout"] = get_layout(dfr_TransferFile,dfr_Container.loc[i,"DestinationPlateName"],
-					dfr_Container.loc[i,"DataFileName"],dfr_Container.loc[i,"RawDataFrame"])
-				# Create dataframe for data processing
-				dfr_Container.at[i,"ProcessedDataFrame"], dfr_Container.at[i,"References"] = create_dataframe_rate(dfr_Container.at[i,"RawDataFrame"],
-					dfr_Container.loc[i,"Samples"],dfr_Container.loc[i,"References"],dlg_Progress)
-			elif str_AssayCategory == "dose_response_time_course":
-				# Get References
-				dfr_Container.at[i,"References"], dfr_Container.at[i,"Layout"] = get_references_DRTC(dfr_TransferFile,dfr_Container.loc[i,"DestinationPlateName"],
-					dfr_Container.loc[i,"DataFileName"],dfr_Container.loc[i,"RawDataFrame"])
-				dfr_Container.at[i,"ProcessedDataFrame"] = create_dataframe_DRTC_MP(dfr_Container.at[i,"RawDataFrame"],
-					dfr_Container.loc[i,"Samples"],dfr_Container.loc[i,"References"],str_AssayVolume,dlg_Progress)
+	lst_Columns = ["DestinationPlateName","Samples","Wells","DataFileName",
+		"RawDataFrame","ProcessedDataFrame","Layout","References"]
+	# Results of dose response time courses are held in arrays, see lib_drtcresults
+	if str_AssayCategory == "dose_response_time_course":
+		lst_Columns.append("DRTCResults")
+	dfr_Container = pd.DataFrame(columns=lst_Columns, index=range(len(lst_Plates)))
+	int_Workers = min(int_Workers, len(lst_Plates))
+	if str_AssayCategory.find("rate") != -1 or str_AssayCategory == "dose_response_time_course":
+		kineticstore = ks.KineticStore(ks.get_store_path(str_ProjectPath))
+	else:
+		kineticstore = None
+	if int_Workers > 1 and str_AssayCategory != "dose_response_time_course":
+		# Plates in a list file (e.g. single dose plates) all come from the same file. Parse it once
+		# here and hand each worker only its plate's readings instead of having every worker parse it.
+		str_Reader = ro.get_reader_name(str_AssayCategory,dfr_Details.loc["AssayType","Value"],
+			dfr_Details.loc["Device","Value"])
+		bol_ListFile = str_Reader in ro.dic_Readers.keys() and ro.dic_Readers[str_Reader]["ListFile"] == True
+		# Only hand each worker the part of the transfer file it needs, everything gets pickled.
+		lst_Input = []
+		for i in lst_Plates:
+			str_Plate = dfr_PlateAssignment.loc[i,"TransferEntry"]
+			if bol_ListFile == True:
+				dfr_RawData = read_plate_datafile(dfr_PlateAssignment.loc[i],str_DataPath,dfr_Details)
 			else:
-				# Endpoint assays
-				# Get controls and references
-				dfr_Container.at[i,"References"], dfr_Container.at[i,"Layout"] = get_references(dfr_TransferFile, dfr_Exceptions,dfr_Container.loc[i,"DestinationPlateName"],
-					dfr_Container.loc[i,"DataFileName"],dfr_Container.loc[i,"RawDataFrame"])
-				if pd.isna(dfr_Container.loc[i,"References"].loc["SolventMean",0]) == True:
-					dlg_Progress.lbx_Log.InsertItems(["Note: No Solvent wells"], dlg_Progress.lbx_Log.Count)
-				if pd.isna(dfr_Container.loc[i,"References"].loc["ControlMean",0]) == True:
-					dlg_Progress.lbx_Log.InsertItems(["Note: No control wells"], dlg_Progress.lbx_Log.Count)
-				if pd.isna(dfr_Container.loc[i,"References"].loc["BufferMean",0]) == True:
-					dlg_Progress.lbx_Log.InsertItems(["Note: No buffer wells"], dlg_Progress.lbx_Log.Count)
-				# Create dataframe for data processing
-				if str_AssayCategory.find("dose_response") != -1:
-					dfr_Container.at[i,"ProcessedDataFrame"] = create_dataframe_EPDR(dfr_Container.at[i,"RawDataFrame"],
-						dfr_Container.loc[i,"Samples"],dfr_Container.loc[i,"References"],str_AssayName,str_AssayVolume,dlg_Progress)
-				elif str_AssayCategory.find("single_dose") != -1:
-					dfr_Container.at[i,"ProcessedDataFrame"] = create_dataframe_EPSD(dfr_Container.at[i,"RawDataFrame"],
-						dfr_Container.loc[i,"Samples"],dfr_Container.loc[i,"References"],str_AssayName,str_AssayVolume,dlg_Progress)
-			dlg_Progress.lbx_Log.InsertItems(["Plate "+ str(i+1) + " completed"], dlg_Progress.lbx_Log.Count)
+				dfr_RawData = None
+			lst_Input.append([i,dfr_PlateAssignment.loc[i],str_DataPath,
+				dfr_TransferFile[dfr_TransferFile["DestinationPlateName"]==str_Plate],
+				dfr_Exceptions[dfr_Exceptions["DestinationPlateName"]==str_Plate],
+				dfr_Layout,dfr_Details,bol_ListFile,dfr_RawData])
+		dlg_Progress.lbx_Log.InsertItems(["Processing " + str(len(lst_Plates)) + " plates on " + str(int_Workers) + " worker processes"], dlg_Progress.lbx_Log.Count)
+		dlg_Progress.lbx_Log.InsertItems([""], dlg_Progress.lbx_Log.Count)
+		que_Progress = mp_Context.Queue()
+		with mp_Context.Pool(int_Workers, initializer=init_PlateProcessing_MP, initargs=(que_Progress,)) as p:
+			itr_Plates = p.imap_unordered(PlateProcessing_MP, lst_Input)
+			# Last line shows what the workers are doing
 			dlg_Progress.lbx_Log.InsertItems([""], dlg_Progress.lbx_Log.Count)
+			lst_Done = []
+			for int_Done in range(len(lst_Input)):
+				while True:
+					try:
+						i, dic_Plate, lst_Log = itr_Plates.next(timeout=0.2)
+						break
+					except MPTimeoutError:
+						show_plate_progress(que_Progress, dlg_Progress, lst_Done)
+				lst_Done.append(i)
+				dlg_Progress.lbx_Log.SetString(dlg_Progress.lbx_Log.Count - 1, "")
+				dlg_Progress.lbx_Log.InsertItems(lst_Log, dlg_Progress.lbx_Log.Count)
+				if int_Done < len(lst_Input) - 1:
+					dlg_Progress.lbx_Log.InsertItems([""], dlg_Progress.lbx_Log.Count)
+				if dic_Plate is None:
+					if msg != None:
+						msg.FileNotData("self")
+					return None
+				if not kineticstore == None:
+					ks.store_plate(kineticstore,dic_Plate,str_AssayCategory)
+				for key in dic_Plate.keys():
+					dfr_Container.at[i,key] = dic_Plate[key]
+	else:
+		if int_ReadThreads is None:
+			int_ReadThreads = int_MaxReadThreads
+		# Single dose plates all come from the same list file. Parse it once, each plate is then only looked up.
+		if str_AssayCategory.find("single_dose") != -1:
+			ro.parse_bmg_list_file(str_DataPath)
+			int_ReadThreads = 1
+		# Reading threads only pay off if there is another file to read while a plate gets processed.
+		# Otherwise process_plate reads each file itself.
+		if len(lst_Plates) > 1 and int_ReadThreads > 1:
+			exe_Read = ThreadPoolExecutor(int_ReadThreads)
+			dic_Reading = {exe_Read.submit(read_plate_datafile,dfr_PlateAssignment.loc[i],str_DataPath,dfr_Details):i
+				for i in lst_Plates}
+			itr_Plates = ((dic_Reading[fut_RawData], fut_RawData) for fut_RawData in as_completed(dic_Reading.keys()))
+		else:
+			exe_Read = None
+			itr_Plates = ((i, None) for i in lst_Plates)
+		try:
+			for i, fut_RawData in itr_Plates:
+				dic_Plate = process_plate(i,dfr_PlateAssignment.loc[i],str_DataPath,dfr_TransferFile,dfr_Exceptions,dfr_Layout,dfr_Details,dlg_Progress,fut_RawData,
+					int_CycleStride,lst_FitCycles)
+				if dic_Plate is None:
+					if msg != None:
+						msg.FileNotData("self")
+					return None
+				if not kineticstore == None:
+					ks.store_plate(kineticstore,dic_Plate,str_AssayCategory)
+				for key in dic_Plate.keys():
+					dfr_Container.at[i,key] = dic_Plate[key]
+		finally:
+			if not exe_Read is None:
+				# Files that have not been read yet are not needed if processing failed
+				exe_Read.shutdown(cancel_futures=True)
 
 	return dfr_Container
 
+def init_PlateProcessing_MP(que_Progress):
+	"""
+	Initialiser of the worker processes of get_CompleteContainer. Keeps the queue the
+	log entries get sent through (queues cannot be handed over with the tasks).
+	"""
+	global que_PlateProgress
+	que_PlateProgress = que_Progress
+
+def PlateProcessing_MP(lst_Input):
+	"""
+	Wrapper of process_plate for worker processes. Each log entry gets sent to
+	get_CompleteContainer through que_PlateProgress as it is written (e.g. the progress
+	of the samples of a plate), the whole log is handed back together with the plate
+	index and results. Plates from list files come with their raw data (None if it
+	could not be parsed), other raw data files get read in the worker.
+	"""
+	i = lst_Input[0]
+	bol_Read = lst_Input[7]
+	dfr_RawData = lst_Input[8]
+	lst_Input = lst_Input[:7]
+	if que_PlateProgress is None:
+		dlg_Progress = log.CallbackProgress(None)
+	else:
+		dlg_Progress = log.CallbackProgress(lambda str_Line, bol_Replace: que_PlateProgress.put((i, str_Line)))
+	lst_Input.append(dlg_Progress)
+	if bol_Read == True:
+		fut_RawData = Future()
+		fut_RawData.set_result(dfr_RawData)
+		lst_Input.append(fut_RawData)
+	dic_Plate = process_plate(*lst_Input)
+	return lst_Input[0], dic_Plate, dlg_Progress.lbx_Log.lst_Lines
+
+def show_plate_progress(que_Progress, dlg_Progress, lst_Done):
+	"""
+	Writes the latest log entry sent by the worker processes of get_CompleteContainer
+	into the last line of dlg_Progress.
+
+	Arguments:
+		que_Progress -> multiprocessing queue of (plate index, line of text)
+		dlg_Progress -> progress dialog
+		lst_Done -> list of integers. Indices of finished plates, their full
+					log has already been written.
+	"""
+	str_Line = None
+	while True:
+		try:
+			i, str_Entry = que_Progress.get_nowait()
+		except queue.Empty:
+			break
+		if not str_Entry == "" and not i in lst_Done:
+			str_Line = "Plate " + str(i+1) + ": " + str_Entry
+	if not str_Line == None:
+		dlg_Progress.lbx_Log.SetString(dlg_Progress.lbx_Log.Count - 1, str_Line)
+
+def read_plate_datafile(sr_Plate,str_DataPath,dfr_Details):
+	"""
+	Reads the raw data file of one plate with the reader for the assay (see lib_resultreadouts.dic_Readers).
+	Files that are not the right type do not get parsed. Safe to call from threads.
+
+	Returns pandas dataframe or None if the file could not be parsed.
+	"""
+	str_Reader = ro.get_reader_name(dfr_Details.loc["AssayCategory","Value"],dfr_Details.loc["AssayType","Value"],
+		dfr_Details.loc["Device","Value"])
+	return ro.read_datafile(str_Reader,str_DataPath,sr_Plate["DataFile"],int(sr_Plate["Wells"]),
+		dfr_Details.loc["AssayType","Value"])
+
+def process_plate(i,sr_Plate,str_DataPath,dfr_TransferFile,dfr_Exceptions,dfr_Layout,dfr_Details,dlg_Progress,fut_RawData = None,
+	int_CycleStride = 1,lst_FitCycles = None):
+	"""
+	Processes one plate: reads the raw data file, gets samples and references, normalises and fits.
+	If the file has already been handed to a thread (see get_CompleteContainer), fut_RawData is
+	the future of read_plate_datafile. int_CycleStride and lst_FitCycles are only used for dose
+	response time course plates, see create_dataframe_DRTC_MP.
+
+	Returns dictionary with the fields of the plate's row in the complete container or None if the
+	raw data file could not be parsed.
+	"""
+	str_AssayName = dfr_Details.loc["AssayType","Value"]
+	str_AssayCategory = dfr_Details.loc["AssayCategory","Value"]
+	str_AssayVolume = dfr_Details.loc["AssayVolume","Value"]
+	str_SampleSource = dfr_Details.loc["SampleSource","Value"]
+	dic_Plate = {}
+	dic_Plate["DestinationPlateName"] = sr_Plate["TransferEntry"]
+	dlg_Progress.lbx_Log.InsertItems(["Processing plate " + str(i+1) + ": " + str(dic_Plate["DestinationPlateName"])], dlg_Progress.lbx_Log.Count)
+	dlg_Progress.lbx_Log.InsertItems(["==============================================================="], dlg_Progress.lbx_Log.Count)
+	dic_Plate["Wells"] = int(sr_Plate["Wells"])
+	dic_Plate["DataFileName"] = sr_Plate["DataFile"]
+	# Get raw data
+	dlg_Progress.lbx_Log.InsertItems(["Read raw data file: " + dic_Plate["DataFileName"]], dlg_Progress.lbx_Log.Count)
+	if fut_RawData is None:
+		dfr_RawData = read_plate_datafile(sr_Plate,str_DataPath,dfr_Details)
+	else:
+		dfr_RawData = fut_RawData.result()
+	# Test whether a correct file was loaded:
+	if dfr_RawData is None: # == False:
+		dlg_Progress.lbx_Log.InsertItems(["Could not parse raw data file: " + dic_Plate["DataFileName"]], dlg_Progress.lbx_Log.Count)
+		return None
+	dic_Plate["RawDataFrame"] = dfr_RawData
+	# Get samples
+	if str_SampleSource == "echo":
+		dlg_Progress.lbx_Log.InsertItems(["Extract sample IDs from transfer file"], dlg_Progress.lbx_Log.Count)
+		dic_Plate["Samples"] = get_samples(dfr_TransferFile,dic_Plate["DestinationPlateName"],dic_Plate["Wells"])
+	elif str_SampleSource == "lightcycler":
+		dlg_Progress.lbx_Log.InsertItems(["Extract sample IDs from raw data file"], dlg_Progress.lbx_Log.Count)
+		dic_Plate["Samples"] = get_samples_lightcycler(dic_Plate["DestinationPlateName"],dfr_RawData,len(dfr_Layout.loc[i,"ProteinNumerical"]))
+	elif str_SampleSource == "well":
+		dic_Plate["Samples"] = get_samples_wellonly(dic_Plate["DestinationPlateName"],dfr_RawData,len(dfr_Layout.loc[i,"ProteinNumerical"]))
+	if str_AssayCategory == "thermal_shift":
+		# References get handled differently here
+		if len(dfr_Layout) > 1:
+			idx_Layout = i
+		else:
+			idx_Layout = 0
+		# This is totally more complicated than it needs to be, but seems to be the only way this works. Shrug.
+		dic_Plate["Layout"] = pd.DataFrame(index=[0],columns=["PlateID","ProteinNumerical","PurificationID","Concentration","WellType"])
+		dic_Plate["Layout"].at[0,"PlateID"] = dfr_Layout.loc[idx_Layout,"PlateID"]
+		dic_Plate["Layout"].at[0,"ProteinNumerical"] = dfr_Layout.loc[idx_Layout,"ProteinNumerical"]
+		dic_Plate["Layout"].at[0,"PurificationID"] = dfr_Layout.loc[idx_Layout,"PurificationID"]
+		dic_Plate["Layout"].at[0,"Concentration"] = dfr_Layout.loc[idx_Layout,"Concentration"]
+		dic_Plate["Layout"].at[0,"WellType"] = dfr_Layout.loc[idx_Layout,"WellType"]
+		# Create dataframe for data processing
+		dic_Plate["ProcessedDataFrame"], dic_Plate["References"] = create_dataframe_DSF(dfr_RawData,
+			dic_Plate["Samples"], dfr_Layout.loc[idx_Layout], dlg_Progress)
+	elif str_AssayCategory.find("rate") != -1:
+		# References get handled differently here
+		dic_Plate["Layout"] = get_layout(dfr_TransferFile,dic_Plate["DestinationPlateName"],
+			dic_Plate["DataFileName"],dfr_RawData)
+		# Create dataframe for data processing
+		dic_Plate["ProcessedDataFrame"], dic_Plate["References"] = create_dataframe_rate(dfr_RawData,
+			dic_Plate["Samples"],dic_Plate["Layout"],dlg_Progress)
+	elif str_AssayCategory == "dose_response_time_course":
+		# Get References
+		dic_Plate["References"], dic_Plate["Layout"] = get_references_DRTC(dfr_TransferFile,dic_Plate["DestinationPlateName"],
+			dic_Plate["DataFileName"],dfr_RawData)
+		dic_Plate["ProcessedDataFrame"], dic_Plate["DRTCResults"] = create_dataframe_DRTC_MP(dfr_RawData,
+			dic_Plate["Samples"],dic_Plate["References"],str_AssayVolume,dlg_Progress,int_CycleStride,lst_FitCycles)
+	else:
+		# Endpoint assays
+		# Get controls and references
+		dic_Plate["References"], dic_Plate["Layout"] = get_references(dfr_TransferFile, dfr_Exceptions,dic_Plate["DestinationPlateName"],
+			dic_Plate["DataFileName"],dfr_RawData)
+		if pd.isna(dic_Plate["References"].loc["SolventMean",0]) == True:
+			dlg_Progress.lbx_Log.InsertItems(["Note: No Solvent wells"], dlg_Progress.lbx_Log.Count)
+		if pd.isna(dic_Plate["References"].loc["ControlMean",0]) == True:
+			dlg_Progress.lbx_Log.InsertItems(["Note: No control wells"], dlg_Progress.lbx_Log.Count)
+		if pd.isna(dic_Plate["References"].loc["BufferMean",0]) == True:
+			dlg_Progress.lbx_Log.InsertItems(["Note: No buffer wells"], dlg_Progress.lbx_Log.Count)
+		# Create dataframe for data processing
+		if str_AssayCategory.find("dose_response") != -1:
+			dic_Plate["ProcessedDataFrame"] = create_dataframe_EPDR(dfr_RawData,
+				dic_Plate["Samples"],dic_Plate["References"],str_AssayName,str_AssayVolume,dlg_Progress)
+		elif str_AssayCategory.find("single_dose") != -1:
+			dic_Plate["ProcessedDataFrame"] = create_dataframe_EPSD(dfr_RawData,
+				dic_Plate["Samples"],dic_Plate["References"],str_AssayName,str_AssayVolume,dlg_Progress)
+	dlg_Progress.lbx_Log.InsertItems(["Plate "+ str(i+1) + " completed"], dlg_Progress.lbx_Log.Count)
+	dlg_Progress.lbx_Log.InsertItems([""], dlg_Progress.lbx_Log.Count)
+
+	return dic_Plate
+
 def ProgressGauge(current,total):
 	int_Length = 20
 	int_Full = int(round(current/total * int_Length,0))
@@ -859,6 +1092,35 @@ def Normalise(lst_Readings,str_AssayType,dfr_References):
 ##                                      ##
 ##########################################
 
+def group_replicates(lst_Conc, lst_Loc, dfr_RawData = None, int_Column = 1):
+	"""
+	Groups the wells of a sample by concentration. Concentrations are used as keys, so each well
+	only gets looked at once and the input lists stay untouched. Groups are in order of the first
+	occurrence of each concentration.
+
+	Arguments:
+		lst_Conc -> list of concentrations, one per well
+		lst_Loc -> list of integers. Locations (row index in dfr_RawData) of each well
+		dfr_RawData -> pandas dataframe with raw data or None if raw values are not needed
+		int_Column -> integer. Column of dfr_RawData to take the raw values from
+
+	Returns:
+		lst_UniqueConc -> list of unique concentrations
+		lstlst_Loc -> list of lists of locations for each concentration
+		lstlst_Raw -> list of lists of raw values for each concentration (None if no dfr_RawData given)
+	"""
+	dic_Groups = {}
+	for idx in range(len(lst_Conc)):
+		dic_Groups.setdefault(lst_Conc[idx], []).append(idx)
+	arr_Loc = np.array(lst_Loc)
+	lst_UniqueConc = list(dic_Groups.keys())
+	lstlst_Loc = [arr_Loc[idx_Group].tolist() for idx_Group in dic_Groups.values()]
+	if dfr_RawData is None:
+		return lst_UniqueConc, lstlst_Loc, None
+	arr_Raw = dfr_RawData.iloc[:,int_Column].to_numpy()
+	lstlst_Raw = [arr_Raw[lst_Group].tolist() for lst_Group in lstlst_Loc]
+	return lst_UniqueConc, lstlst_Loc, lstlst_Raw
+
 def create_dataframe_EPDR(dfr_RawData, dfr_Samples, dfr_References, str_AssayType, str_AssayVolume, dlg_Progress):
 	"""
 	This function is for endpoint protein-peptide interaction/displacement assays such as HTRF, AlphaScreen or endpoint assays of enzymatic
@@ -875,197 +1137,186 @@ def create_dataframe_EPDR(dfr_RawData, dfr_Samples, dfr_References, str_AssayTyp
 		"Norm","NormSEM","NormExcluded","NormFitFree","NormFitFreePars","NormFitFreeCI","NormFitFreeR2","NormFitFreeErrors","DoFitFree",
 		"NormFitConst","NormFitConstPars","NormFitConstCI","NormFitConstR2","NormFitConstErrors","DoFitConst",
 		"Show","DoFit"]
-	dfr_Processed = pd.DataFrame(columns=lst_Columns, index=range(int_Samples))
 	fltAssayVolume = float(str_AssayVolume)
+	# Columns get filled as lists and turned into the dataframe at the end, writing cell by cell is slow.
+	dic_Columns = get_sample_columns(dfr_Samples, fltAssayVolume)
 	# Check each concentration if it occurs more than once, then write it into a new list and add the corresponding locations
 	# to a list and add that list to a list. Once finished, overwrite columns Locations and Concentration with the new list.
 	# dfr_Samples must have been sorted for Concentration for this to work properly.
 	dlg_Progress.lbx_Log.InsertItems(["Number of samples to process: " + str(int_Samples)], dlg_Progress.lbx_Log.Count)
 	dlg_Progress.lbx_Log.InsertItems(["Processed 0 out of " + str(int_Samples) + " samples"], dlg_Progress.lbx_Log.Count)
+	lst_Fit = []
 	for smpl in range(int_Samples):
-		# Pull list of concentrations for current sample
-		lstConc = dfr_Samples.loc[smpl,"Concentrations"]
-		lstLoc = dfr_Samples.loc[smpl,"Locations"]
-		#lstRaw = dfr_Processed.loc[i, "RawData"]
-		# Create list of lists:
-		lstlstConc = [] # list of lists for concentrations
-		lstlstLoc = [] # list of lists for locations
-		lstlstRaw = [] # list of lists for raw data
-		lstRawExcluded = [] # list of excluded values
-		lstNormExcluded = []
-		# Go through list of concentrations
-		for conc in range(len(lstConc)):
-			lstConcTemp = []
-			lstRawTemp = []
-			lstLocTemp = []
-			# Check to only use unique concentrations
-			if lstConc[conc] != "found":
-				# assign current conc/loc to temporary lists
-				lstConcTemp = lstConc[conc] # simple list
-				lstLocTemp = [lstLoc[conc]] # list of lists, one concentration can be in many locations
-				lstRawTemp = [dfr_RawData.iloc[lstLoc[conc],1]]
-				for k in range(conc+1,len(lstConc)):
-					if lstConc[conc] == lstConc[k]:
-						lstConc[k] = "found" # flag concentrations that are not unique
-						lstLocTemp.append(lstLoc[k])
-						lstRawTemp.append(dfr_RawData.iloc[lstLoc[k],1])
-				# append temporary list to list of lists
-				lstlstConc.append(lstConcTemp)
-				lstlstLoc.append(lstLocTemp)
-				lstlstRaw.append(lstRawTemp)
-				# Create excluded list, initialised with np.nan in the first instance
-				lstRawExcluded.append(np.nan)
-				lstNormExcluded.append(np.nan)
-		# Assign list of lists to dataframe
-		dfr_Processed.loc[smpl,"DestinationPlateName"] = dfr_Samples.loc[smpl,"DestinationPlateName"]
-		dfr_Processed.loc[smpl,"SampleID"] = dfr_Samples.loc[smpl,"SampleID"]
-		dfr_Processed.loc[smpl,"SourceConcentration"] = dfr_Samples.loc[smpl,"SourceConcentration"]
-		dfr_Processed.loc[smpl,"Concentrations"] = lstlstConc
-		dfr_Processed.loc[smpl,"AssayVolume"] = fltAssayVolume
-		dfr_Processed.loc[smpl,"Locations"] = lstlstLoc
-		dfr_Processed.loc[smpl,"RawData"] = lstlstRaw
-		dfr_Processed.loc[smpl,"Raw"], dfr_Processed.loc[smpl,"RawSEM"], fnord = Mean_SEM_STDEV_ListList(lstlstRaw)
-		dfr_Processed.loc[smpl,"RawExcluded"] = lstRawExcluded
-
-		# Normalisation needs to happen before datafitting is attempted
-		lstlstNorm = []
-		for j in range(len(lstlstRaw)):
-			lstlstNorm.append(Normalise(lstlstRaw[j], str_AssayType, dfr_References))
-		dfr_Processed.loc[smpl,"Norm"], dfr_Processed.loc[smpl,"NormSEM"], fnord = Mean_SEM_STDEV_ListList(lstlstNorm)
-		dfr_Processed.loc[smpl,"NormExcluded"] = lstNormExcluded
-
+		lstRaw, lstRawSEM, lstNorm, lstNormSEM = process_replicates(smpl, dfr_Samples, dfr_RawData, str_AssayType, dfr_References, dic_Columns)
 		# Fitting criteria
 		# Exclude points where the NormSEM is > 20%
-		for j in range(len(dfr_Processed.loc[smpl,"Raw"])):
-			if dfr_Processed.loc[smpl,"NormSEM"][j] > 20:
-				dfr_Processed.loc[smpl,"RawExcluded"][j] = dfr_Processed.loc[smpl,"Raw"][j]
-				dfr_Processed.loc[smpl,"Raw"][j] = np.nan
-				dfr_Processed.loc[smpl,"NormExcluded"][j] = dfr_Processed.loc[smpl,"Norm"][j]
-				dfr_Processed.loc[smpl,"Norm"][j] = np.nan
-			else:
-				dfr_Processed.loc[smpl,"RawExcluded"][j] = np.nan
-				dfr_Processed.loc[smpl,"NormExcluded"][j] = np.nan
+		lstRawExcluded = set_to_nan(len(lstRaw))
+		lstNormExcluded = set_to_nan(len(lstRaw))
+		for j in range(len(lstRaw)):
+			if lstNormSEM[j] > 20:
+				lstRawExcluded[j] = lstRaw[j]
+				lstRaw[j] = np.nan
+				lstNormExcluded[j] = lstNorm[j]
+				lstNorm[j] = np.nan
+		dic_Columns["RawExcluded"][smpl] = lstRawExcluded
+		dic_Columns["NormExcluded"][smpl] = lstNormExcluded
 		# Criteria for fit:
-		dfr_Processed.loc[smpl,"DoFit"] = get_DoFit(dfr_Processed.loc[smpl,"Norm"],dfr_Processed.loc[smpl,"NormSEM"])
-		# Perform fit -> Check if fitting criteria are met in the first instance
-		if dfr_Processed.loc[smpl,"DoFit"] == True:
-			dfr_Processed.loc[smpl,"RawFit"], dfr_Processed.loc[smpl,"RawFitPars"], dfr_Processed.loc[smpl,"RawFitCI"], dfr_Processed.loc[smpl,"RawFitErrors"], dfr_Processed.loc[smpl,"RawFitR2"], dfr_Processed.loc[smpl,"DoFitRaw"] = ff.fit_sigmoidal_free(dfr_Processed.loc[smpl,"Concentrations"], dfr_Processed.loc[smpl,"Raw"])
-			dfr_Processed.loc[smpl,"NormFitFree"], dfr_Processed.loc[smpl,"NormFitFreePars"], dfr_Processed.loc[smpl,"NormFitFreeCI"], dfr_Processed.loc[smpl,"NormFitFreeErrors"], dfr_Processed.loc[smpl,"NormFitFreeR2"], dfr_Processed.loc[smpl,"DoFitFree"] = ff.fit_sigmoidal_free(dfr_Processed.loc[smpl,"Concentrations"], dfr_Processed.loc[smpl,"Norm"])
-			# Constrained fit needs SEM for fit
-			dfr_Processed.loc[smpl,"NormFitConst"], dfr_Processed.loc[smpl,"NormFitConstPars"], dfr_Processed.loc[smpl,"NormFitConstCI"], dfr_Processed.loc[smpl,"NormFitConstErrors"], dfr_Processed.loc[smpl,"NormFitConstR2"], dfr_Processed.loc[smpl,"DoFitConst"] = ff.fit_sigmoidal_const(dfr_Processed.loc[smpl,"Concentrations"], dfr_Processed.loc[smpl,"Norm"], dfr_Processed.loc[smpl,"NormSEM"])
-			# If both the free and constrained fit fail, set check variable to False
-			if dfr_Processed.loc[smpl,"DoFitFree"] == False and dfr_Processed.loc[smpl,"DoFitConst"] == False:
-				dfr_Processed.loc[smpl,"DoFit"] = False
+		dic_Columns["DoFit"][smpl] = get_DoFit(lstNorm,lstNormSEM)
+		# Perform fit -> Check if fitting criteria are met in the first instance.
+		# Samples that meet them get fitted together once all samples are processed.
+		if dic_Columns["DoFit"][smpl] == True:
+			lst_Fit.append(smpl)
 		else:
-			dfr_Processed.loc[smpl,"RawFit"], dfr_Processed.loc[smpl,"RawFitPars"] = set_to_nan(len(dfr_Processed.loc[smpl,"Raw"])), set_to_nan(4)
-			dfr_Processed.loc[smpl,"RawFitCI"], dfr_Processed.loc[smpl,"RawFitErrors"] = set_to_nan(4), set_to_nan(4)
-			dfr_Processed.loc[smpl,"RawFitR2"] = np.nan
-			dfr_Processed.loc[smpl,"DoFitRaw"] = False
-			dfr_Processed.loc[smpl,"NormFitFree"],dfr_Processed.loc[smpl,"NormFitFreePars"] = set_to_nan(len(dfr_Processed.loc[smpl,"Raw"])), set_to_nan(4)
-			dfr_Processed.loc[smpl,"NormFitFreeCI"], dfr_Processed.loc[smpl,"NormFitFreeErrors"] = set_to_nan(4), set_to_nan(4)
-			dfr_Processed.loc[smpl,"NormFitFreeR2"] = np.nan
-			dfr_Processed.loc[smpl,"DoFitFree"] = False
-			dfr_Processed.loc[smpl,"NormFitConst"],dfr_Processed.loc[smpl,"NormFitConstPars"] = set_to_nan(len(dfr_Processed.loc[smpl,"Raw"])), set_to_nan(4)
-			dfr_Processed.loc[smpl,"NormFitConstCI"], dfr_Processed.loc[smpl,"NormFitConstErrors"] = set_to_nan(4), set_to_nan(4)
-			dfr_Processed.loc[smpl,"NormFitConstR2"] = np.nan
-			dfr_Processed.loc[smpl,"DoFitConst"] = False
-
-		dfr_Processed.loc[smpl,"Show"] = 1
+			for str_Fit, str_DoFit in [("RawFit","DoFitRaw"),("NormFitFree","DoFitFree"),("NormFitConst","DoFitConst")]:
+				dic_Columns[str_Fit][smpl], dic_Columns[str_Fit+"Pars"][smpl] = set_to_nan(len(lstRaw)), set_to_nan(4)
+				dic_Columns[str_Fit+"CI"][smpl], dic_Columns[str_Fit+"Errors"][smpl] = set_to_nan(4), set_to_nan(4)
+				dic_Columns[str_Fit+"R2"][smpl] = np.nan
+				dic_Columns[str_DoFit][smpl] = False
+
+		dic_Columns["Show"][smpl] = 1
 		dlg_Progress.lbx_Log.SetString(dlg_Progress.lbx_Log.Count - 1, ProgressGauge(smpl+1,int_Samples) + " " + str(smpl+1) + " out of " + str(int_Samples) + " samples.")
 
+	# Fit all samples on the plate in one go
+	if len(lst_Fit) > 0:
+		dlg_Progress.lbx_Log.InsertItems(["Fitting " + str(len(lst_Fit)) + " samples"], dlg_Progress.lbx_Log.Count)
+		lst_Conc = [dic_Columns["Concentrations"][smpl] for smpl in lst_Fit]
+		lst_RawFits = ff.fit_sigmoidal_free_batch(lst_Conc, [dic_Columns["Raw"][smpl] for smpl in lst_Fit])
+		lst_FreeFits = ff.fit_sigmoidal_free_batch(lst_Conc, [dic_Columns["Norm"][smpl] for smpl in lst_Fit])
+		# Constrained fit needs SEM for fit
+		lst_ConstFits = ff.fit_sigmoidal_const_batch(lst_Conc, [dic_Columns["Norm"][smpl] for smpl in lst_Fit],
+			[dic_Columns["NormSEM"][smpl] for smpl in lst_Fit])
+		for j in range(len(lst_Fit)):
+			smpl = lst_Fit[j]
+			for str_Fit, str_DoFit, lst_Fits in [("RawFit","DoFitRaw",lst_RawFits),("NormFitFree","DoFitFree",lst_FreeFits),
+				("NormFitConst","DoFitConst",lst_ConstFits)]:
+				(dic_Columns[str_Fit][smpl], dic_Columns[str_Fit+"Pars"][smpl], dic_Columns[str_Fit+"CI"][smpl],
+					dic_Columns[str_Fit+"Errors"][smpl], dic_Columns[str_Fit+"R2"][smpl], dic_Columns[str_DoFit][smpl]) = lst_Fits[j]
+			# If both the free and constrained fit fail, set check variable to False
+			if dic_Columns["DoFitFree"][smpl] == False and dic_Columns["DoFitConst"][smpl] == False:
+				dic_Columns["DoFit"][smpl] = False
+
 	# Return
-	return dfr_Processed
+	return pd.DataFrame(dic_Columns, columns=lst_Columns, index=range(int_Samples), dtype=object)
+
+def get_sample_columns(dfr_Samples, flt_AssayVolume):
+	"""
+	Starts the columns of the ProcessedDataFrame of an endpoint assay (see create_dataframe_EPDR)
+	as a dictionary of lists, one entry per sample. Sample details are filled in, all other
+	entries are np.nan.
+
+	Arguments:
+		dfr_Samples -> pandas dataframe. Samples of the plate (see get_samples)
+		flt_AssayVolume -> float. Assay volume
+
+	Returns dictionary of column name and list.
+	"""
+	int_Samples = len(dfr_Samples)
+	dic_Columns = {str_Column:list(dfr_Samples[str_Column].to_numpy()) for str_Column in ["DestinationPlateName","SampleID","SourceConcentration"]}
+	dic_Columns["AssayVolume"] = [flt_AssayVolume] * int_Samples
+	for str_Column in ["Locations","Concentrations","RawData","Raw","RawSEM","RawExcluded","RawFit","RawFitPars","RawFitCI","RawFitR2","RawFitErrors","DoFitRaw",
+		"Norm","NormSEM","NormExcluded","NormFitFree","NormFitFreePars","NormFitFreeCI","NormFitFreeR2","NormFitFreeErrors","DoFitFree",
+		"NormFitConst","NormFitConstPars","NormFitConstCI","NormFitConstR2","NormFitConstErrors","DoFitConst","Show","DoFit"]:
+		dic_Columns[str_Column] = [np.nan] * int_Samples
+	return dic_Columns
+
+def process_replicates(smpl, dfr_Samples, dfr_RawData, str_AssayType, dfr_References, dic_Columns):
+	"""
+	Groups the replicates of a sample by concentration, normalises them and writes locations, raw data,
+	means and standard errors into dic_Columns (see get_sample_columns).
+
+	Returns the lists of raw means, raw SEMs, normalised means and normalised SEMs as written into dic_Columns.
+	"""
+	# Group replicates: one list of locations and raw values per concentration
+	lstlstConc, lstlstLoc, lstlstRaw = group_replicates(dfr_Samples.at[smpl,"Concentrations"], dfr_Samples.at[smpl,"Locations"], dfr_RawData)
+	dic_Columns["Concentrations"][smpl] = lstlstConc
+	dic_Columns["Locations"][smpl] = lstlstLoc
+	dic_Columns["RawData"][smpl] = lstlstRaw
+	lstRaw, lstRawSEM, fnord = Mean_SEM_STDEV_ListList(lstlstRaw)
+	# Normalisation needs to happen before datafitting is attempted
+	lstlstNorm = [Normalise(lstRaw_Conc, str_AssayType, dfr_References) for lstRaw_Conc in lstlstRaw]
+	lstNorm, lstNormSEM, fnord = Mean_SEM_STDEV_ListList(lstlstNorm)
+	dic_Columns["Raw"][smpl], dic_Columns["RawSEM"][smpl] = lstRaw, lstRawSEM
+	dic_Columns["Norm"][smpl], dic_Columns["NormSEM"][smpl] = lstNorm, lstNormSEM
+	# Excluded lists, initialised with np.nan in the first instance
+	dic_Columns["RawExcluded"][smpl] = set_to_nan(len(lstlstConc))
+	dic_Columns["NormExcluded"][smpl] = set_to_nan(len(lstlstConc))
+	return lstRaw, lstRawSEM, lstNorm, lstNormSEM
 
 def create_Database_frame_EPDR(dfr_Details,lstHeaders,dfr_PlateData,dfr_References):
+	"""
+	Creates the rows for the database export of one plate. The fit results of all samples
+	are taken from an array-backed copy of the plate's data (see lib_processedstore)
+	and written column by column.
+	"""
 	# Filter out controls:
-	dfr_PlateData = dfr_PlateData[dfr_PlateData["SampleID"] != "Control"]
+	dfr_PlateData = dfr_PlateData[dfr_PlateData["SampleID"] != "Control"].reset_index(drop=True)
+	store = ps.ProcessedStore.from_dataframe(dfr_PlateData)
+	int_Samples = len(dfr_PlateData)
 	# Create partial Database frame
-	dfr_Partial = pd.DataFrame(columns=lstHeaders,index=range(len(dfr_PlateData)))
-	# Go through dfr_PlateData and write into dfPatial
-	for i in range(len(dfr_PlateData)):
-		if dfr_PlateData.loc[i,"SampleID"] != "Control":
-			dfr_Partial.iloc[i,0] = dfr_Details.loc["AssayType","Value"] + " IC50" # Assay type
-			dfr_Partial.iloc[i,1] = dfr_Details.loc["PurificationID","Value"] # Purification ID
-			dfr_Partial.iloc[i,2] = float(dfr_Details.loc["ProteinConcentration","Value"])/1000 # protein concentration in uM. Form is in nM.
-			dfr_Partial.iloc[i,3] = dfr_Details.loc["PeptideID","Value"] # PeptideID
-			dfr_Partial.iloc[i,4] = dfr_PlateData.loc[i,"SampleID"] # Sample ID/Global Compound ID
-			dfr_Partial.iloc[i,5] = float(dfr_Details.loc["PeptideConcentration","Value"])/1000 # peptide concentration in uM. Form is in nM.
-			dfr_Partial.iloc[i,6] = dfr_Details.loc["Solvent","Value"] # solvent
-			dfr_Partial.iloc[i,7] = dfr_Details.loc["SolventConcentration","Value"] # solvent concentration in %
-			dfr_Partial.iloc[i,8] = dfr_Details.loc["Buffer","Value"] # Buffer
-			# dfr_Partial.iloc[i,9] = # compound incubation time
-			# dfr_Partial.iloc[i,10] = # peptide incubation time
-			# dfr_Partial.iloc[i,11] = # bead incubation time
-			dfr_Partial.iloc[i,12] = 22 # incubation temperature
-			if dfr_PlateData.loc[i,"DoFit"] == True:
-				if dfr_PlateData.loc[i,"Show"] == 0:
-					str_Pars = "RawFitPars"
-					str_CI = "RawFitCI"
-					str_Errors = "RawFitErrors"
-					str_RSquare = "RawFitR2"
-				elif dfr_PlateData.loc[i,"Show"] == 1:
-					str_Pars = "NormFitFreePars"
-					str_CI = "NormFitFreeCI"
-					str_Errors = "NormFitFreeErrors"
-					str_RSquare = "NormFitFreeR2"
-				elif dfr_PlateData.loc[i,"Show"] == 2:
-					str_Pars = "NormFitConstPars"
-					str_CI = "NormFitConstCI"
-					str_Errors = "NormFitConstErrors"
-					str_RSquare = "NormFitConstR2"
-				dfr_Partial.iloc[i,13] = np.log10(float(dfr_PlateData.loc[i,str_Pars][3])/1000000)# log10 IC50. IC50 is stored in uM!
-				dfr_Partial.iloc[i,14] = dfr_PlateData.loc[i,str_Errors][3]
-				dfr_Partial.iloc[i,15] = float(dfr_PlateData.loc[i,str_Pars][3]) # IC50 in uM
-				dfr_Partial.iloc[i,16] = dfr_PlateData.loc[i,str_Pars][3] + dfr_PlateData.loc[i,str_CI][3]
-				dfr_Partial.iloc[i,17] = dfr_PlateData.loc[i,str_Pars][3] - dfr_PlateData.loc[i,str_CI][3]
-				dfr_Partial.iloc[i,18] = float(dfr_PlateData.loc[i,str_Pars][2]) # Hill slope
-				# dfr_Partial.iloc[i,19] = # curve
-				dfr_Partial.iloc[i,20] = float(dfr_PlateData.loc[i,str_Pars][1]) # bottom of curve fit
-				dfr_Partial.iloc[i,21] = float(dfr_PlateData.loc[i,str_Pars][0]) # top of curve fit
-				dfr_Partial.iloc[i,22] = dfr_PlateData.loc[i,str_RSquare]# R square value
-				# dfr_Partial.iloc[i,23] = # data quality
-				dfr_Partial.iloc[i,24] = "Free fit"# comments on curve classification and definitions
-			else:
-				dfr_Partial.iloc[i,13] = np.nan
-				dfr_Partial.iloc[i,14] = np.nan
-				dfr_Partial.iloc[i,15] = np.nan
-				dfr_Partial.iloc[i,16] = np.nan
-				dfr_Partial.iloc[i,17] = np.nan
-				dfr_Partial.iloc[i,18] = np.nan
-				# dfr_Partial.iloc[i,19] = # curve
-				dfr_Partial.iloc[i,20] = np.nan
-				dfr_Partial.iloc[i,21] = np.nan
-				dfr_Partial.iloc[i,22] = np.nan
-				# dfr_Partial.iloc[i,23] = # data quality
-				dfr_Partial.iloc[i,24] = "not fitted" # comments on curve classification and definitions
-			dfr_Partial.iloc[i,25] = dfr_References.loc["SolventMean",0] # enzyme reference
-			dfr_Partial.iloc[i,26] = dfr_References.loc["SolventSEM",0] # enzyme reference error
-			lstConcentrations = moles_to_micromoles(dfr_PlateData.loc[i,"Concentrations"])
-			for j in range(len(lstConcentrations)):
-				intColumnOffset = (j)*3
-				dfr_Partial.iloc[i,27+intColumnOffset] = lstConcentrations[j]
-				dfr_Partial.iloc[i,28+intColumnOffset] = dfr_PlateData.loc[i,"Norm"][j]
-				dfr_Partial.iloc[i,29+intColumnOffset] = dfr_PlateData.loc[i,"NormSEM"][j]
-			try: 
-				dfr_Partial.iloc[i,79] = round(dfr_References.loc["ZPrimeMean",0],3) # ZPrime
-			except:
-				dfr_Partial.iloc[i,79] = ""
-			try:
-				dfr_Partial.iloc[i,80] = round(dfr_References.loc["ZPrimeMedian",0],3) # ZPrimeRobust
-			except:
-				dfr_Partial.iloc[i,80] = ""
-			try:
-				dfr_Partial.iloc[i,81] = round(dfr_References.loc["SolventMean",0]/dfr_References.loc["ControlMean",0],3) # Solvent/Control
-			except:
-				dfr_Partial.iloc[i,81] = ""
-			try:
-				dfr_Partial.iloc[i,82] = round(dfr_References.loc["BufferMean",0]/dfr_References.loc["ControlMean",0],3) # Buffer/Control
-			except:
-				dfr_Partial.iloc[i,82] = ""
-			dfr_Partial.iloc[i,83] = dfr_Details.loc["Date","Value"] # Date of Experiment
-			dfr_Partial.iloc[i,84] = dfr_Details.loc["ELN","Value"] # ELN Page
-			dfr_Partial.iloc[i,85] = ""
-	
+	dfr_Partial = pd.DataFrame(columns=lstHeaders,index=range(int_Samples))
+	if int_Samples == 0:
+		return dfr_Partial
+	dfr_Partial.iloc[:,0] = dfr_Details.loc["AssayType","Value"] + " IC50" # Assay type
+	dfr_Partial.iloc[:,1] = dfr_Details.loc["PurificationID","Value"] # Purification ID
+	dfr_Partial.iloc[:,2] = float(dfr_Details.loc["ProteinConcentration","Value"])/1000 # protein concentration in uM. Form is in nM.
+	dfr_Partial.iloc[:,3] = dfr_Details.loc["PeptideID","Value"] # PeptideID
+	dfr_Partial.iloc[:,4] = store.get("SampleID") # Sample ID/Global Compound ID
+	dfr_Partial.iloc[:,5] = float(dfr_Details.loc["PeptideConcentration","Value"])/1000 # peptide concentration in uM. Form is in nM.
+	dfr_Partial.iloc[:,6] = dfr_Details.loc["Solvent","Value"] # solvent
+	dfr_Partial.iloc[:,7] = dfr_Details.loc["SolventConcentration","Value"] # solvent concentration in %
+	dfr_Partial.iloc[:,8] = dfr_Details.loc["Buffer","Value"] # Buffer
+	# 9: compound incubation time, 10: peptide incubation time, 11: bead incubation time
+	dfr_Partial.iloc[:,12] = 22 # incubation temperature
+	# Parameters of the fit that is shown for each sample (raw, free or constrained). Order: ytop, ybot, h, i
+	arr_DoFit = np.array([bol_DoFit == True for bol_DoFit in store.get("DoFit")])
+	arr_Pars = store.select_fit("Pars")
+	arr_CI = store.select_fit("CI")
+	arr_Errors = store.select_fit("Errors")
+	arr_RSquare = store.select_fit("R2")
+	with np.errstate(all="ignore"):
+		dfr_Partial.iloc[:,13] = np.where(arr_DoFit, np.log10(arr_Pars[:,3]/1000000), np.nan) # log10 IC50. IC50 is stored in uM!
+	dfr_Partial.iloc[:,14] = np.where(arr_DoFit, arr_Errors[:,3], np.nan)
+	dfr_Partial.iloc[:,15] = np.where(arr_DoFit, arr_Pars[:,3], np.nan) # IC50 in uM
+	dfr_Partial.iloc[:,16] = np.where(arr_DoFit, arr_Pars[:,3] + arr_CI[:,3], np.nan)
+	dfr_Partial.iloc[:,17] = np.where(arr_DoFit, arr_Pars[:,3] - arr_CI[:,3], np.nan)
+	dfr_Partial.iloc[:,18] = np.where(arr_DoFit, arr_Pars[:,2], np.nan) # Hill slope
+	# 19: curve
+	dfr_Partial.iloc[:,20] = np.where(arr_DoFit, arr_Pars[:,1], np.nan) # bottom of curve fit
+	dfr_Partial.iloc[:,21] = np.where(arr_DoFit, arr_Pars[:,0], np.nan) # top of curve fit
+	dfr_Partial.iloc[:,22] = np.where(arr_DoFit, arr_RSquare, np.nan) # R square value
+	# 23: data quality
+	dfr_Partial.iloc[:,24] = np.where(arr_DoFit, "Free fit", "not fitted") # comments on curve classification and definitions
+	dfr_Partial.iloc[:,25] = dfr_References.loc["SolventMean",0] # enzyme reference
+	dfr_Partial.iloc[:,26] = dfr_References.loc["SolventSEM",0] # enzyme reference error
+	# Concentrations (same conversion as moles_to_micromoles), responses and errors
+	arr_Conc = np.trunc(store.get("Concentrations")*1000000*100000)/100000
+	arr_Norm = store.get("Norm")
+	arr_NormSEM = store.get("NormSEM")
+	for j in range(min(arr_Conc.shape[1], arr_Norm.shape[1])):
+		intColumnOffset = (j)*3
+		dfr_Partial.iloc[:,27+intColumnOffset] = arr_Conc[:,j]
+		dfr_Partial.iloc[:,28+intColumnOffset] = arr_Norm[:,j]
+		dfr_Partial.iloc[:,29+intColumnOffset] = arr_NormSEM[:,j]
+	try: 
+		dfr_Partial.iloc[:,79] = round(dfr_References.loc["ZPrimeMean",0],3) # ZPrime
+	except:
+		dfr_Partial.iloc[:,79] = ""
+	try:
+		dfr_Partial.iloc[:,80] = round(dfr_References.loc["ZPrimeMedian",0],3) # ZPrimeRobust
+	except:
+		dfr_Partial.iloc[:,80] = ""
+	try:
+		dfr_Partial.iloc[:,81] = round(dfr_References.loc["SolventMean",0]/dfr_References.loc["ControlMean",0],3) # Solvent/Control
+	except:
+		dfr_Partial.iloc[:,81] = ""
+	try:
+		dfr_Partial.iloc[:,82] = round(dfr_References.loc["BufferMean",0]/dfr_References.loc["ControlMean",0],3) # Buffer/Control
+	except:
+		dfr_Partial.iloc[:,82] = ""
+	dfr_Partial.iloc[:,83] = dfr_Details.loc["Date","Value"] # Date of Experiment
+	dfr_Partial.iloc[:,84] = dfr_Details.loc["ELN","Value"] # ELN Page
+	dfr_Partial.iloc[:,85] = ""
+
 	return dfr_Partial
 
 def create_Database_frame_EPDR_New(dfr_Details,lstHeaders,dfr_PlateData,dfr_References):
@@ -1197,10 +1448,14 @@ def recalculate_fit_sigmoidal(dfr_Input):
 			lst_RawTrim.append(lst_Raw[i])
 			lst_NormTrim.append(lst_Norm[i])
 			lst_NormSEMTrim.append(lst_NormSEM[i])
-	# 3. Re-fit
-	lst_RawFitPars, lst_RawFitCI, lst_RawFitErrors = ff.fit_sigmoidal_free(lst_DoseTrim, lst_RawTrim, parsonly = True, skiptrim = True)
-	lst_NormFitPars, lst_NormFitFreeCI, lst_NormFitFreeErrors = ff.fit_sigmoidal_free(lst_DoseTrim, lst_NormTrim, parsonly = True, skiptrim = True)
-	lst_NormFitConstPars, lst_NormFitConstCI, lst_NormFitConstErrors = ff.fit_sigmoidal_const(lst_DoseTrim, lst_NormTrim, lst_NormSEMTrim, parsonly = True, skiptrim = True)
+	# 3. Re-fit. Results come from the fit cache if this set of datapoints has been fitted before,
+	# otherwise the fits start from the current parameters.
+	lst_RawFitPars, lst_RawFitCI, lst_RawFitErrors = ff.fit_sigmoidal_free_cached(lst_DoseTrim, lst_RawTrim,
+		guess = ff.get_warm_start(dfr_Input["RawFitPars"]))[1:4]
+	lst_NormFitPars, lst_NormFitFreeCI, lst_NormFitFreeErrors = ff.fit_sigmoidal_free_cached(lst_DoseTrim, lst_NormTrim,
+		guess = ff.get_warm_start(dfr_Input["NormFitFreePars"]))[1:4]
+	lst_NormFitConstPars, lst_NormFitConstCI, lst_NormFitConstErrors = ff.fit_sigmoidal_const_cached(lst_DoseTrim, lst_NormTrim, lst_NormSEMTrim,
+		guess = ff.get_warm_start(dfr_Input["NormFitConstPars"]))[1:4]
 	for i in range(len(lst_RawFitPars)):
 		dfr_Input["RawFitPars"][i] = lst_RawFitPars[i]
 		dfr_Input["RawFitCI"][i] = lst_RawFitCI[i]
@@ -1274,69 +1529,20 @@ def create_dataframe_EPSD(dfr_RawData, dfr_Samples, dfr_References, str_AssayTyp
 		"Norm","NormSEM","NormExcluded","NormFitFree","NormFitFreePars","NormFitFreeCI","NormFitFreeR2","NormFitFreeErrors","DoFitFree",
 		"NormFitConst","NormFitConstPars","NormFitConstCI","NormFitConstR2","NormFitConstErrors","DoFitConst",
 		"Show","DoFit"]
-	dfr_Processed = pd.DataFrame(columns=lst_Columns, index=range(int_Samples))
 	fltAssayVolume = float(str_AssayVolume)
+	# Columns get filled as lists and turned into the dataframe at the end, see create_dataframe_EPDR
+	dic_Columns = get_sample_columns(dfr_Samples, fltAssayVolume)
 	# Check each concentration if it occurs more than once, then write it into a new list and add the corresponding locations
 	# to a list and add that list to a list. Once finished, overwrite columns Locations and Concentration with the new list.
 	# dfr_Samples must have been sorted for Concentration for this to work properly.
 	dlg_Progress.lbx_Log.InsertItems(["Number of samples to process: " + str(int_Samples)], dlg_Progress.lbx_Log.Count)
 	dlg_Progress.lbx_Log.InsertItems(["Processed 0 out of " + str(int_Samples) + " samples"], dlg_Progress.lbx_Log.Count)
 	for smpl in range(int_Samples):
-		# Pull list of concentrations for current sample
-		lstConc = dfr_Samples.loc[smpl,"Concentrations"]
-		lstLoc = dfr_Samples.loc[smpl,"Locations"]
-		#lstRaw = dfr_Processed.loc[i, "RawData"]
-		# Create list of lists:
-		lstlstConc = [] # list of lists for concentrations
-		lstlstLoc = [] # list of lists for locations
-		lstlstRaw = [] # list of lists for raw data
-		lstRawExcluded = [] # list of excluded values
-		lstNormExcluded = []
-		# Go through list of concentrations
-		for conc in range(len(lstConc)):
-			lstConcTemp = []
-			lstRawTemp = []
-			lstLocTemp = []
-			# Check to only use unique concentrations
-			if lstConc[conc] != "found":
-				# assign current conc/loc to temporary lists
-				lstConcTemp = lstConc[conc] # simple list
-				lstLocTemp = [lstLoc[conc]] # list of lists, one concentration can be in many locations
-				lstRawTemp = [dfr_RawData.iloc[lstLoc[conc],1]]
-				for k in range(conc+1,len(lstConc)):
-					if lstConc[conc] == lstConc[k]:
-						lstConc[k] = "found" # flag concentrations that are not unique
-						lstLocTemp.append(lstLoc[k])
-						lstRawTemp.append(dfr_RawData.iloc[lstLoc[k],1])
-				# append temporary list to list of lists
-				lstlstConc.append(lstConcTemp)
-				lstlstLoc.append(lstLocTemp)
-				lstlstRaw.append(lstRawTemp)
-				# Create excluded list, initialised with np.nan in the first instance
-				lstRawExcluded.append(np.nan)
-				lstNormExcluded.append(np.nan)
-		# Assign list of lists to dataframe
-		dfr_Processed.loc[smpl,"DestinationPlateName"] = dfr_Samples.loc[smpl,"DestinationPlateName"]
-		dfr_Processed.loc[smpl,"SampleID"] = dfr_Samples.loc[smpl,"SampleID"]
-		dfr_Processed.loc[smpl,"SourceConcentration"] = dfr_Samples.loc[smpl,"SourceConcentration"]
-		dfr_Processed.loc[smpl,"Concentrations"] = lstlstConc
-		dfr_Processed.loc[smpl,"AssayVolume"] = fltAssayVolume
-		dfr_Processed.loc[smpl,"Locations"] = lstlstLoc
-		dfr_Processed.loc[smpl,"RawData"] = lstlstRaw
-		dfr_Processed.loc[smpl,"Raw"], dfr_Processed.loc[smpl,"RawSEM"], fnord = Mean_SEM_STDEV_ListList(lstlstRaw)
-		dfr_Processed.loc[smpl,"RawExcluded"] = lstRawExcluded
-
-		# Normalisation needs to happen before datafitting is attempted
-		lstlstNorm = []
-		for j in range(len(lstlstRaw)):
-			lstlstNorm.append(Normalise(lstlstRaw[j], str_AssayType, dfr_References))
-		dfr_Processed.loc[smpl,"Norm"], dfr_Processed.loc[smpl,"NormSEM"], fnord = Mean_SEM_STDEV_ListList(lstlstNorm)
-		dfr_Processed.loc[smpl,"NormExcluded"] = lstNormExcluded
-
-		dfr_Processed.loc[smpl,"Show"] = 1
+		process_replicates(smpl, dfr_Samples, dfr_RawData, str_AssayType, dfr_References, dic_Columns)
+		dic_Columns["Show"][smpl] = 1
 		dlg_Progress.lbx_Log.SetString(dlg_Progress.lbx_Log.Count - 1, ProgressGauge(smpl+1,int_Samples) + " " + str(smpl+1) + " out of " + str(int_Samples) + " samples.")
 	# Return
-	return dfr_Processed
+	return pd.DataFrame(dic_Columns, columns=lst_Columns, index=range(int_Samples), dtype=object)
 
 def create_Database_frame_EPSD(dfr_Details,lstHeaders,dfr_PlateData,dfr_References):
 	# Filter out controls:
@@ -1472,24 +1678,32 @@ def create_Database_frame_ActAssay(dfr_Details,lstHeaders,dfr_PlateData,lst_Refe
 ##                                      ##
 ##########################################
 
-def create_dataframe_DRTC_MP(dfr_RawData, dfr_Samples, dfr_References, str_AssayVolume, dlg_Progress):
+def create_dataframe_DRTC_MP(dfr_RawData, dfr_Samples, dfr_References, str_AssayVolume, dlg_Progress, int_CycleStride = 1, lst_FitCycles = None,
+	int_Workers = None):
 	"""
 	This function is for endpoint protein-peptide interaction/displacement assays such as HTRF, AlphaScreen or endpoint assays of enzymatic
 	reactions such as the "Glo" family of assays.
 	Takes re-arranged raw data arrays(well as index and first column, plate readings in the subsequent columns)
 	and the array with sample IDs, locations and concentrations and creates the data dataframe that will be used
 	to calculate values based on the assay type.
+	Only the cycles picked by select_DRTC_cycles(int_CycleStride, lst_FitCycles) get fitted, the others are
+	interpolated (see interpolate_DRTC_cycles) until they get fitted with fill_DRTC_cycles.
+	The samples get sent to a pool of int_Workers processes (default: int_MaxFitWorkers). Each worker only gets
+	the replicate values of its sample and sends back arrays. Without a pool (one worker, or inside a worker process),
+	the samples get processed one after another straight into the plate's results (see process_DRTC_sample).
+
+	Returns the dataframe with the details of each sample and a lib_drtcresults.DRTCResults holding the
+	means, fits and per-cycle values of all samples (same order as the dataframe).
 	"""
 	# Get number of samples:
 	int_Samples = dfr_Samples.shape[0]
-	# Create new dataframe
-	lst_Columns = ["DestinationPlateName","SampleID","Locations","Concentrations","SourceConcentration","AssayVolume","RawData","Time",
-		"RawMean","RawSEM","RawExcluded","RawFit","RawFitPars","RawFitCI","RawFitR2","RawFitErrors","DoFitRaw",
-		"NormMean","NormSEM","NormExcluded","NormFitFree","NormFitFreePars","NormFitFreeCI","NormFitFreeR2","NormFitFreeErrors","DoNormFitFree",
-		"NormFitConst","NormFitConstPars","NormFitConstCI","NormFitConstR2","NormFitConstErrors","DoNormFitConst",
-		"Show","DoFit"]
-	dfr_Processed = pd.DataFrame(columns=lst_Columns)
-	fltAssayVolume = float(str_AssayVolume)
+	# Columns of new dataframe, filled sample by sample
+	lst_Columns = ["DestinationPlateName","SampleID","Locations","Concentrations","SourceConcentration","AssayVolume","RawData","Time"]
+	dic_Columns = {}
+	for str_Column in ["DestinationPlateName","SampleID","SourceConcentration"]:
+		dic_Columns[str_Column] = list(dfr_Samples[str_Column].to_numpy())
+	for str_Column in ["Locations","Concentrations","RawData","Time"]:
+		dic_Columns[str_Column] = [None]*int_Samples
 	# Check each concentration if it occurs more than once, then write it into a new list and add the corresponding locations
 	# to a list and add that list to a list. Once finished, overwrite columns Locations and Concentration with the new list.
 	# dfr_Samples must have been sorted for Concentration for this to work properly.
@@ -1498,130 +1712,296 @@ def create_dataframe_DRTC_MP(dfr_RawData, dfr_Samples, dfr_References, str_Assay
 
 	#baseline = 20 # 20s initial baseline for testing purposes
 
+	lst_Cycles = select_DRTC_cycles(dfr_RawData.shape[1], int_CycleStride, lst_FitCycles)
+	if not lst_Cycles is None:
+		dlg_Progress.lbx_Log.InsertItems(["Fitting " + str(len(lst_Cycles)) + " out of " + str(dfr_RawData.shape[1]) + " cycles, the others are interpolated"],
+			dlg_Progress.lbx_Log.Count)
+
+	arr_RawData = dfr_RawData.to_numpy()
+	lst_Time = dfr_RawData.columns.values.tolist()
+	# Solvent is the reference where there is one, buffer otherwise
+	arr_Solvent = dfr_References.loc["SolventMean",lst_Time].to_numpy(dtype=float)
+	arr_Reference = np.where(pd.isna(arr_Solvent), dfr_References.loc["BufferMean",lst_Time].to_numpy(dtype=float), arr_Solvent)
+	arr_Control = dfr_References.loc["ControlMean",lst_Time].to_numpy(dtype=float)
+
 	lst_Input = []
+	int_Concentrations = 0
 	for smpl in range(int_Samples):
+		# Group replicates: one list of locations per concentration
+		lstlstConc, lstlstLoc, fnord = group_replicates(dfr_Samples.loc[smpl,"Concentrations"], dfr_Samples.loc[smpl,"Locations"])
+		dic_Columns["Concentrations"][smpl] = lstlstConc
+		dic_Columns["Locations"][smpl] = lstlstLoc
+		dic_Columns["Time"][smpl] = lst_Time
+		# Replicate values are not copied for each sample but looked up in the raw data.
+		# All samples share the plate's matrix, see lib_kineticstore.
+		dic_Columns["RawData"][smpl] = ks.KineticReplicates(arr_RawData,lstlstLoc,lstlstConc,lst_Time)
+		int_Concentrations = max(int_Concentrations, len(lstlstConc))
 		lst_Item = []
-		lst_Item.append(smpl)
-		lst_Item.append(dfr_Samples)
-		lst_Item.append(dfr_RawData)
-		lst_Item.append(dfr_References)
+		lst_Item.append(lstlstConc)
+		# Replicate values of each concentration (replicates x cycles)
+		lst_Item.append([arr_RawData[lst_Loc,:] for lst_Loc in lstlstLoc])
+		lst_Item.append(arr_Reference)
+		lst_Item.append(arr_Control)
+		lst_Item.append(lst_Time)
+		lst_Item.append(lst_Cycles)
 		lst_Input.append(lst_Item)
 	#cur = 0
-	with Pool(5) as p:
-		dfr_Processed = dfr_Processed.append(p.map(SampleProcessing_DRTC_MP, lst_Input))
+	results = dr.DRTCResults(lst_Time, int_Samples, int_Concentrations)
+	if int_Workers is None:
+		int_Workers = int_MaxFitWorkers
+	int_Workers = min(int_Workers, int_Samples)
+	if int_Workers > 1 and current_process().daemon == False:
+		with mp_Context.Pool(int_Workers) as p:
+			for smpl, dic_Sample in enumerate(p.map(SampleProcessing_DRTC_MP, lst_Input)):
+				results.set_sample(smpl, dic_Sample)
+	else:
+		for smpl, lst_Item in enumerate(lst_Input):
+			process_DRTC_sample(results, smpl, *lst_Item)
 		#dlg_Progress.lbx_Log.SetString(dlg_Progress.lbx_Log.Count - 1, ProgressGauge(cur+1,int_Samples) + " " + str(cur+1) + " out of " + str(int_Samples) + " samples.")
-	for smpl in range(int_Samples):
-		dfr_Processed["AssayVolume"] = fltAssayVolume
-		
+	dfr_Processed = pd.DataFrame(dic_Columns, columns=lst_Columns, index=range(int_Samples), dtype=object)
+	dfr_Processed["AssayVolume"] = float(str_AssayVolume)
+
 	# Return
-	return dfr_Processed
+	return dfr_Processed, results
 
 def SampleProcessing_DRTC_MP(lst_Input):
+	"""
+	Normalises and fits one sample of a dose response time course plate in a worker process
+	(see process_DRTC_sample). Returns the sample's arrays (see lib_drtcresults.DRTCResults.sample_arrays).
+	"""
+	results = dr.DRTCResults(lst_Input[4], 1, len(lst_Input[0]))
+	process_DRTC_sample(results, 0, *lst_Input)
 
-	smpl = lst_Input[0]
-	dfr_Samples = lst_Input[1]
-	dfr_RawData = lst_Input[2]
-	dfr_References = lst_Input[3]
-
-	lst_Columns = ["DestinationPlateName","SampleID","Locations","Concentrations","SourceConcentration","AssayVolume","RawData","Time",
-		"RawMean","RawSEM","RawExcluded","RawFit","RawFitPars","RawFitCI","RawFitR2","RawFitErrors","DoFitRaw",
-		"NormMean","NormSEM","NormExcluded","NormFitFree","NormFitFreePars","NormFitFreeCI","NormFitFreeR2","NormFitFreeErrors","DoNormFitFree",
-		"NormFitConst","NormFitConstPars","NormFitConstCI","NormFitConstR2","NormFitConstErrors","DoNormFitConst",
-		"Show","DoFit"]
-	dfr_Processed = pd.DataFrame(columns=lst_Columns, index=range(dfr_Samples.shape[0]))
-
-	# Pull list of concentrations for current sample
-	lstConc = dfr_Samples.loc[smpl,"Concentrations"]
-	lstLoc = dfr_Samples.loc[smpl,"Locations"]
-	# Create list of lists:
-	lstlstConc = [] # list of lists for concentrations
-	lstlstLoc = [] # list of lists for locations
-	# Go through list of concentrations
-	for conc in range(len(lstConc)):
-		lstConcTemp = []
-		lstLocTemp = []
-		# Check to only use unique concentrations
-		if lstConc[conc] != "found":
-			# assign current conc/loc to temporary lists
-			lstConcTemp = lstConc[conc] # simple list
-			lstLocTemp = [lstLoc[conc]] # list of lists, one concentration can be in many locations
-			for k in range(conc+1,len(lstConc)):
-				if lstConc[conc] == lstConc[k]:
-					lstConc[k] = "found" # flag concentrations that are not unique
-					lstLocTemp.append(lstLoc[k])
-			# append temporary list to list of lists
-			lstlstConc.append(lstConcTemp)
-			lstlstLoc.append(lstLocTemp)
-	# Assign list of lists to dataframe
-	dfr_Processed.loc[smpl,"DestinationPlateName"] = dfr_Samples.loc[smpl,"DestinationPlateName"]
-	dfr_Processed.loc[smpl,"SampleID"] = dfr_Samples.loc[smpl,"SampleID"]
-	dfr_Processed.loc[smpl,"SourceConcentration"] = dfr_Samples.loc[smpl,"SourceConcentration"]
-	dfr_Processed.at[smpl,"Concentrations"] = lstlstConc
-	dfr_Processed.at[smpl,"Locations"] = lstlstLoc
-	dfr_Processed.at[smpl,"Time"] = dfr_RawData.columns.values.tolist()
-	lst_CycleColumns = ["RawData", "RawMean","RawSEM","RawExcluded","RawFit","NormMean","NormSEM","NormExcluded","NormFitFree","NormFitConst","NormFitConstPars"]
-	for column in lst_CycleColumns:
-		dfr_Processed.at[smpl,column] = pd.DataFrame(index=dfr_Processed.loc[smpl,"Concentrations"],columns=dfr_RawData.columns.values.tolist())
-	lst_ParameterColumns = ["RawFitPars","RawFitCI","RawFitErrors","NormFitFreePars","NormFitFreeCI","NormFitFreeErrors","NormFitConstPars","NormFitConstCI","NormFitConstErrors"]
-	for column in lst_ParameterColumns:
-		dfr_Processed.at[smpl,column] = pd.DataFrame(index=["Top","Bottom","Slope","Inflection"],columns=dfr_RawData.columns.values.tolist())
-	lst_OutstandingColumns = ["DoFitRaw","RawFitR2","DoNormFitFree","NormFitFreeR2","NormFitConstR2","DoNormFitConst","DoFit","Show"]
-	for column in lst_OutstandingColumns:
-		dfr_Processed.at[smpl,column] = pd.DataFrame(index=["Value"],columns=dfr_RawData.columns.values.tolist())
-	#dfr_Processed.at[smpl,"Baseline"] = pd.DataFrame(index=dfr_Processed.loc[smpl,"Concentrations"],columns=["Baseline"])
+	# Return
+	return results.sample_arrays(0)
 
+def process_DRTC_sample(results, smpl, lstlstConc, lst_Replicates, arr_Reference, arr_Control, lst_Time, lst_Cycles):
+	"""
+	Normalises and fits one sample of a dose response time course plate.
+
+	Arguments:
+		results -> lib_drtcresults.DRTCResults to write into
+		smpl -> integer. Position of sample in results
+		lstlstConc -> list. Concentrations of the sample
+		lst_Replicates -> list. Replicate values of each concentration (replicates x cycles)
+		arr_Reference -> array. Reference of each cycle
+		arr_Control -> array. Control of each cycle
+		lst_Time -> list. Time of each cycle
+		lst_Cycles -> list of integers. Cycles to fit, None for all.
+	"""
+	results.arr_Counts[smpl] = len(lstlstConc)
+	results.arr_Concentrations[smpl,:len(lstlstConc)] = lstlstConc
 	# Arrange and average raw data so that we can subtract baseline
-	for cycle in range(len(dfr_Processed.loc[smpl,"Time"])):
+	for conc in range(len(lstlstConc)):
+		arr_Raw = lst_Replicates[conc]
+		int_Replicates = arr_Raw.shape[0]
+		results["RawMean"][smpl,conc] = np.mean(arr_Raw, axis=0)
+		results["RawSEM"][smpl,conc] = np.std(arr_Raw, axis=0, ddof = 1) / np.sqrt(int_Replicates)
 		# Normalisation
-		timestamp = dfr_Processed.loc[smpl,"Time"][cycle]
-		for conc in range(len(lstlstConc)):
-			dfr_Processed.loc[smpl,"RawData"].iloc[conc,cycle] = []
-			for rep in range(len(dfr_Processed.loc[smpl,"Locations"][conc])):
-				dfr_Processed.loc[smpl,"RawData"].iloc[conc,cycle].append(dfr_RawData.iloc[dfr_Processed.loc[smpl,"Locations"][conc][rep],cycle])
-				dfr_Processed.loc[smpl,"RawMean"].iloc[conc,cycle] = np.mean(dfr_Processed.loc[smpl,"RawData"].iloc[conc,cycle])
-			dfr_Processed.loc[smpl,"RawSEM"].iloc[conc,cycle] = np.std(dfr_Processed.loc[smpl,"RawData"].iloc[conc,cycle], ddof = 1) / np.sqrt(np.size(dfr_Processed.loc[smpl,"RawData"].iloc[conc,cycle]))
-			if pd.isna(dfr_References.loc["SolventMean",timestamp]) == False:
-				str_Reference = "SolventMean"
+		arr_Norm = (1-((arr_Raw - arr_Control)/(arr_Reference - arr_Control)))*100
+		results["NormMean"][smpl,conc] = np.mean(arr_Norm, axis=0)
+		results["NormSEM"][smpl,conc] = np.std(arr_Norm, axis=0, ddof = 1) / np.sqrt(int_Replicates)
+	# Nothing has been fitted yet
+	results["Interpolated"][smpl] = True
+
+	if lst_Cycles is None:
+		lst_Cycles = list(range(len(lst_Time)))
+	fit_DRTC_cycles(results, smpl, lst_Cycles)
+	interpolate_DRTC_cycles(results, smpl)
+
+def select_DRTC_cycles(int_Cycles, int_CycleStride = 1, lst_FitCycles = None):
+	"""
+	Picks the cycles of a dose response time course to fit first: every int_CycleStride-th cycle or the
+	cycles in lst_FitCycles (positions, starting at 0). The first and last cycle are always included,
+	so all other cycles lie between two fitted ones and can be interpolated.
+
+	Returns list of positions or None if all cycles get fitted.
+	"""
+	if lst_FitCycles is None or len(lst_FitCycles) == 0:
+		if int_CycleStride <= 1:
+			return None
+		lst_Cycles = list(range(0,int_Cycles,int_CycleStride))
+	else:
+		lst_Cycles = [int(cycle) for cycle in lst_FitCycles if cycle >= 0 and cycle < int_Cycles]
+	lst_Cycles = sorted(set(lst_Cycles + [0,int_Cycles-1]))
+	if len(lst_Cycles) >= int_Cycles:
+		return None
+	return lst_Cycles
+
+def fit_DRTC_cycles(results, smpl, lst_Cycles, bol_WarmStart = True):
+	"""
+	Fits the normalised data of the given cycles of a dose response time course sample (free and constrained fit).
+	Adjacent cycles have nearly the same curve. With bol_WarmStart, each fit starts from the parameters of the
+	cycle before it if that one has been fitted, otherwise from those of the previous cycle in lst_Cycles.
+	Only successful fits get used as starting values (see get_DRTC_warm_start). If a fit from such a start fails,
+	the cycle gets fitted again from starting values estimated from its data.
+
+	Arguments:
+		results -> lib_drtcresults.DRTCResults of the plate
+		smpl -> integer. Position of sample
+		lst_Cycles -> list of integers. Positions of cycles to fit, in the order they should be fitted.
+		bol_WarmStart -> boolean. Use previous parameters as starting values.
+	"""
+	lst_FreeGuess = None
+	lst_ConstGuess = None
+	for cycle in lst_Cycles:
+		if bol_WarmStart == True and cycle > 0 and is_fitted_DRTC_cycle(results, smpl, cycle-1) == True:
+			lst_FreeGuess = get_DRTC_warm_start(results, smpl, "NormFitFree", cycle-1)
+			lst_ConstGuess = get_DRTC_warm_start(results, smpl, "NormFitConst", cycle-1)
+		fit_DRTC_cycle(results, smpl, cycle, lst_FreeGuess, lst_ConstGuess)
+		results.set_values(smpl, "Show", cycle, 1)
+		results.set_values(smpl, "Interpolated", cycle, False)
+		if bol_WarmStart == True:
+			lst_FreeGuess = get_DRTC_warm_start(results, smpl, "NormFitFree", cycle)
+			lst_ConstGuess = get_DRTC_warm_start(results, smpl, "NormFitConst", cycle)
+
+def fit_DRTC_cycle(results, smpl, cycle, lst_FreeGuess = None, lst_ConstGuess = None):
+	"""
+	Fits the normalised data of one cycle of a dose response time course sample (free and constrained fit).
+	Fits from starting values that fail get repeated with starting values estimated from the data.
+
+	Arguments:
+		results -> lib_drtcresults.DRTCResults of the plate
+		smpl -> integer. Position of sample
+		cycle -> integer. Position of cycle
+		lst_FreeGuess -> list of floats. Starting values of free fit or None.
+		lst_ConstGuess -> list of floats. Starting values of constrained fit or None.
+	"""
+	lst_Concentrations = results.concentrations(smpl).tolist()
+	lst_Mean = results.get_values(smpl, "NormMean", cycle).tolist()
+	lst_SEM = results.get_values(smpl, "NormSEM", cycle).tolist()
+	# Normalised fit, free
+	lst_FitResults = ff.fit_sigmoidal_free(lst_Concentrations,lst_Mean,guess=lst_FreeGuess)
+	if not lst_FreeGuess == None and (lst_FitResults[5] == False or np.isfinite(lst_FitResults[1]).all() == False):
+		lst_FitResults = ff.fit_sigmoidal_free(lst_Concentrations,lst_Mean)
+	set_DRTC_fit(results, smpl, cycle, "NormFitFree", lst_FitResults)
+	# Normalised fit, constrained
+	lst_FitResults = ff.fit_sigmoidal_const(lst_Concentrations,lst_Mean,lst_SEM,guess=lst_ConstGuess)
+	if not lst_ConstGuess == None and (lst_FitResults[5] == False or np.isfinite(lst_FitResults[1]).all() == False):
+		lst_FitResults = ff.fit_sigmoidal_const(lst_Concentrations,lst_Mean,lst_SEM)
+	set_DRTC_fit(results, smpl, cycle, "NormFitConst", lst_FitResults)
+
+def set_DRTC_fit(results, smpl, cycle, str_Fit, lst_FitResults):
+	"""
+	Writes the results of a fit (fit, parameters, confidence intervals, errors, R square and success as
+	returned by ff.fit_sigmoidal_free) into a cycle of a dose response time course sample.
+
+	Arguments:
+		results -> lib_drtcresults.DRTCResults of the plate
+		smpl -> integer. Position of sample
+		cycle -> integer. Position of cycle
+		str_Fit -> string. "NormFitFree" or "NormFitConst"
+		lst_FitResults -> list. Results of fit.
+	"""
+	results.set_values(smpl, str_Fit, cycle, lst_FitResults[0])
+	results.set_values(smpl, str_Fit+"Pars", cycle, lst_FitResults[1])
+	results.set_values(smpl, str_Fit+"CI", cycle, lst_FitResults[2])
+	results.set_values(smpl, str_Fit+"Errors", cycle, lst_FitResults[3])
+	results.set_values(smpl, str_Fit+"R2", cycle, lst_FitResults[4])
+	results.set_values(smpl, "Do"+str_Fit, cycle, lst_FitResults[5])
+
+def refit_DRTC_cycle(results, smpl, cycle):
+	"""
+	Fits one cycle of a dose response time course sample again, e.g. after concentrations have been
+	excluded (see lib_drtcresults.DRTCResults.set_excluded). If the data do not qualify for a fit
+	(see get_DoFit), all fits of the cycle are emptied. The fit shown for the cycle stays as it is.
+
+	Arguments:
+		results -> lib_drtcresults.DRTCResults of the plate
+		smpl -> integer. Position of sample
+		cycle -> integer. Position of cycle
+	"""
+	results.set_values(smpl, "DoFit", cycle, get_DoFit(results.get_values(smpl, "NormMean", cycle).tolist(),
+		results.get_values(smpl, "NormSEM", cycle).tolist()))
+	if results.get_values(smpl, "DoFit", cycle) == True:
+		fit_DRTC_cycle(results, smpl, cycle)
+	else:
+		for str_Fit, str_DoFit in [("RawFit","DoFitRaw"),("NormFitFree","DoNormFitFree"),("NormFitConst","DoNormFitConst")]:
+			for str_Suffix in ["","Pars","CI","Errors","R2"]:
+				results.set_values(smpl, str_Fit+str_Suffix, cycle, np.nan)
+			results.set_values(smpl, str_DoFit, cycle, False)
+	results.set_values(smpl, "Interpolated", cycle, False)
+
+def get_DRTC_warm_start(results, smpl, str_Fit, cycle):
+	"""
+	Returns the parameters of a fitted cycle of a dose response time course sample as starting values
+	for fitting another cycle, or None if the fit failed or is no good start (see ff.get_warm_start).
+
+	Arguments:
+		results -> lib_drtcresults.DRTCResults of the plate
+		smpl -> integer. Position of sample
+		str_Fit -> string. "NormFitFree" or "NormFitConst"
+		cycle -> integer. Position of the cycle
+	"""
+	return ff.get_warm_start(results.get_values(smpl, str_Fit+"Pars", cycle).tolist(),
+		results.get_values(smpl, "Do"+str_Fit, cycle) == True)
+
+def is_fitted_DRTC_cycle(results, smpl, cycle):
+	"""
+	Returns True if a cycle of a dose response time course sample has been fitted, False if it is interpolated.
+	Samples of projects saved before cycles could be interpolated have all cycles fitted.
+	"""
+	return not results.get_values(smpl, "Interpolated", cycle) == True
+
+def get_interpolated_DRTC_cycles(results, smpl):
+	"""
+	Returns positions of the cycles of a dose response time course sample that have not been fitted yet.
+	"""
+	return np.flatnonzero(results.get_values(smpl, "Interpolated") == True).tolist()
+
+def interpolate_DRTC_cycles(results, smpl):
+	"""
+	Fills in the cycles of a dose response time course sample that have not been fitted yet: parameters are
+	interpolated linearly over time between the fitted cycles and the curves drawn from them, so the sample can
+	be displayed before all cycles are fitted. Confidence intervals, errors and R squared are np.nan for these cycles.
+	"""
+	lst_Interpolated = get_interpolated_DRTC_cycles(results, smpl)
+	if len(lst_Interpolated) == 0:
+		return
+	arr_Time = np.array(results.lst_Time, dtype=float)
+	lst_Concentrations = results.concentrations(smpl).tolist()
+	arr_Fitted = ~(results.get_values(smpl, "Interpolated") == True)
+	for str_Fit in ["NormFitFree","NormFitConst"]:
+		arr_Pars = results.get_values(smpl, str_Fit+"Pars")
+		arr_Known = arr_Fitted & np.isfinite(arr_Pars).all(axis=0)
+		for cycle in lst_Interpolated:
+			if arr_Known.any() == True:
+				lst_Pars = [np.interp(arr_Time[cycle], arr_Time[arr_Known], arr_Pars[par,arr_Known]) for par in range(4)]
+				results.set_values(smpl, str_Fit, cycle, ff.draw_sigmoidal(lst_Concentrations, lst_Pars))
 			else:
-				str_Reference = "BufferMean"
-			dfr_Processed.loc[smpl,"NormMean"].iloc[conc,cycle], dfr_Processed.loc[smpl,"NormSEM"].iloc[conc,cycle] = Normalise_DRTC(dfr_Processed.loc[smpl,"RawData"].iloc[conc,cycle],
-				dfr_References.loc[str_Reference,timestamp], dfr_References.loc["ControlMean",timestamp])
-		# Curve fitting
-		#sigmoidal_fit, lst_Parameters, lst_Confidence, lst_STDERR, RSquare, success = ff.fit_sigmoidal_free(dfr_Processed.loc[smpl,"Concentrations",dfr_Processed.loc[smpl,"RawMean"][cycle])
-		# Free fit, free
-		lst_FitResults = []
-		#lst_FitResults = ff.fit_sigmoidal_free(dfr_Processed.loc[smpl,"RawMean"].index.values.tolist(),dfr_Processed.loc[smpl,"RawMean"].loc[:,timestamp].tolist())
-		#dfr_Processed.loc[smpl,"RawFit"].loc[:,timestamp] = lst_FitResults[0]
-		#dfr_Processed.loc[smpl,"RawFitPars"].loc[:,timestamp] = lst_FitResults[1]
-		#dfr_Processed.loc[smpl,"RawFitCI"].loc[:,timestamp] = lst_FitResults[2]
-		#dfr_Processed.loc[smpl,"RawFitErrors"].loc[:,timestamp] = lst_FitResults[3]
-		#dfr_Processed.loc[smpl,"RawFitR2"].at["Value",timestamp] = lst_FitResults[4]
-		#dfr_Processed.loc[smpl,"DoFitRaw"].at["Value",timestamp] = lst_FitResults[5]
-		# Normalised fit, free
-		lst_FitResults = []
-		lst_FitResults = ff.fit_sigmoidal_free(dfr_Processed.loc[smpl,"NormMean"].index.values.tolist(),dfr_Processed.loc[smpl,"NormMean"].loc[:,timestamp].tolist())
-		dfr_Processed.loc[smpl,"NormFitFree"].loc[:,timestamp] = lst_FitResults[0]
-		dfr_Processed.loc[smpl,"NormFitFreePars"].loc[:,timestamp] = lst_FitResults[1]
-		dfr_Processed.loc[smpl,"NormFitFreeCI"].loc[:,timestamp] = lst_FitResults[2]
-		dfr_Processed.loc[smpl,"NormFitFreeErrors"].loc[:,timestamp] = lst_FitResults[3]
-		dfr_Processed.loc[smpl,"NormFitFreeR2"].at["Value",timestamp] = lst_FitResults[4]
-		dfr_Processed.loc[smpl,"DoNormFitFree"].at["Value",timestamp] = lst_FitResults[5]
-		# Normalised fit, constrained
-		lst_FitResults = []
-		lst_FitResults = ff.fit_sigmoidal_const(dfr_Processed.loc[smpl,"NormMean"].index.values.tolist(),dfr_Processed.loc[smpl,"NormMean"].loc[:,timestamp].tolist(),
-			dfr_Processed.loc[smpl,"NormSEM"].loc[:,timestamp].tolist())
-		dfr_Processed.loc[smpl,"NormFitConst"].loc[:,timestamp] = lst_FitResults[0]
-		dfr_Processed.loc[smpl,"NormFitConstPars"].loc[:,timestamp] = lst_FitResults[1]
-		dfr_Processed.loc[smpl,"NormFitConstCI"].loc[:,timestamp] = lst_FitResults[2]
-		dfr_Processed.loc[smpl,"NormFitConstErrors"].loc[:,timestamp] = lst_FitResults[3]
-		dfr_Processed.loc[smpl,"NormFitConstR2"].at["Value",timestamp] = lst_FitResults[4]
-		dfr_Processed.loc[smpl,"DoNormFitConst"].at["Value",timestamp] = lst_FitResults[5]
-		lst_FitResults = []
-
-		dfr_Processed.loc[smpl,"Show"].at["Value",timestamp] = 1
+				lst_Pars = set_to_nan(4)
+				results.set_values(smpl, str_Fit, cycle, np.nan)
+			results.set_values(smpl, str_Fit+"Pars", cycle, lst_Pars)
+			results.set_values(smpl, str_Fit+"CI", cycle, np.nan)
+			results.set_values(smpl, str_Fit+"Errors", cycle, np.nan)
+			results.set_values(smpl, str_Fit+"R2", cycle, np.nan)
+			results.set_values(smpl, "Do"+str_Fit, cycle, arr_Known.any())
+	results.set_values(smpl, "Show", lst_Interpolated, 1)
+
+def fill_DRTC_cycles(results, smpl):
+	"""
+	Fits the cycles of a dose response time course sample that have only been interpolated so far,
+	in the order of time, each one starting from the parameters of the cycle before (see fit_DRTC_cycles).
+	"""
+	fit_DRTC_cycles(results, smpl, get_interpolated_DRTC_cycles(results, smpl))
 
-	# Return
-	return dfr_Processed.loc[smpl]
+def FillDRTC_MP(lst_Input):
+	"""
+	Wrapper of fill_DRTC_cycles for worker processes (see lib_cyclefiller).
+	Gets plate index, sample index, the time of each cycle and the arrays of the sample
+	(see lib_drtcresults.DRTCResults.sample_arrays). Returns plate and sample index, the cycles
+	that have been fitted and the arrays of the fits.
+	"""
+	dic_Sample = lst_Input[3]
+	results = dr.DRTCResults(lst_Input[2], 1, len(dic_Sample["Concentrations"]))
+	results.set_sample(0, dic_Sample)
+	lst_Cycles = get_interpolated_DRTC_cycles(results, 0)
+	fill_DRTC_cycles(results, 0)
+	dic_Changed = {"Concentrations":dic_Sample["Concentrations"]}
+	for column in ["NormFitFree","NormFitFreePars","NormFitFreeCI","NormFitFreeErrors","NormFitFreeR2","DoNormFitFree",
+		"NormFitConst","NormFitConstPars","NormFitConstCI","NormFitConstErrors","NormFitConstR2","DoNormFitConst","Show","Interpolated"]:
+		dic_Changed[column] = results.get_values(0, column)
+	return lst_Input[0], lst_Input[1], lst_Cycles, dic_Changed
 
 def Normalise_DRTC(lst_RawData, reference, control):
 
@@ -1633,43 +2013,6 @@ def Normalise_DRTC(lst_RawData, reference, control):
 
 	return Mean, SEM
 
-def recalculate_DRTC_MP(dfr_Input, flt_Cycle):
-	dfr_Input["DoFit"].at["Value",flt_Cycle] = get_DoFit(dfr_Input["NormMean"].loc[:,flt_Cycle].tolist(),dfr_Input["NormSEM"].loc[:,flt_Cycle].tolist())
-			
-	if dfr_Input["DoFit"].at["Value",flt_Cycle] == True:
-		# 3. Re-fit
-		lst_FitResults = ff.fit_sigmoidal_free(dfr_Input["Concentrations"], dfr_Input["NormMean"].loc[:,flt_Cycle].tolist())  # only function for constrained needs SEM
-		dfr_Input.at["NormFitFree"].loc[:,flt_Cycle] = lst_FitResults[0]
-		dfr_Input.at["NormFitFreePars"].loc[:,flt_Cycle] = lst_FitResults[1]
-		dfr_Input.at["NormFitFreeCI"].loc[:,flt_Cycle] = lst_FitResults[2]
-		dfr_Input.at["NormFitFreeErrors"].loc[:,flt_Cycle] = lst_FitResults[3]
-		dfr_Input.loc["NormFitFreeR2"].at["Value",flt_Cycle] = lst_FitResults[4]
-		dfr_Input.loc["DoNormFitFree"].at["Value",flt_Cycle] = lst_FitResults[5]
-		lst_FitResults = ff.fit_sigmoidal_const(dfr_Input["Concentrations"], dfr_Input["NormMean"].loc[:,flt_Cycle].tolist(), dfr_Input["NormSEM"].loc[:,flt_Cycle].tolist())  # only function for constrained needs SEM
-		dfr_Input.at["NormFitConst"].loc[:,flt_Cycle] = lst_FitResults[0]
-		dfr_Input.at["NormFitConstPars"].loc[:,flt_Cycle] = lst_FitResults[1]
-		dfr_Input.at["NormFitConstCI"].loc[:,flt_Cycle] = lst_FitResults[2]
-		dfr_Input.at["NormFitConstErrors"].loc[:,flt_Cycle] = lst_FitResults[3]
-		dfr_Input.loc["NormFitConstR2"].at["Value",flt_Cycle] = lst_FitResults[4]
-		dfr_Input.loc["DoNormFitConst"].at["Value",flt_Cycle] = lst_FitResults[5]
-
-	else:
-		dfr_Input.at["RawFit"].loc[:,flt_Cycle] = set_to_nan(len(dfr_Input["RawFit"].loc[:,flt_Cycle]))
-		dfr_Input.at["RawFitPars"].loc[:,flt_Cycle] = set_to_nan(4)
-		dfr_Input.at["RawFitR2"].loc[:,flt_Cycle] = np.nan
-			
-		dfr_Input.at["NormFitFree"].loc[:,flt_Cycle] = set_to_nan(len(dfr_Input["NormFitFree"].loc[:,flt_Cycle]))
-		dfr_Input.at["NormFitFreePars"].loc[:,flt_Cycle] = set_to_nan(4)
-		dfr_Input.at["NormFitFreeR2"].loc[:,flt_Cycle] = np.nan
-
-		dfr_Input.at["NormFitConst"].loc[:,flt_Cycle] = set_to_nan(len(dfr_Input["NormFitConst"].loc[:,flt_Cycle]))
-		dfr_Input.at["NormFitConstPars"].loc[:,flt_Cycle] = set_to_nan(4)
-		dfr_Input.at["NormFitConstR2"].loc[:,flt_Cycle] = np.nan
-
-		dfr_Input.at["NormFitFreeCI"].loc[:,flt_Cycle], dfr_Input.at["NormFitConstCI"].loc[:,flt_Cycle], dfr_Input["RawFitCI"].loc[:,flt_Cycle] = set_to_nan(4), set_to_nan(4), set_to_nan(4)
-		dfr_Input.at["NormFitFreeErrors"].loc[:,flt_Cycle], dfr_Input.at["NormFitConstErrors"].loc[:,flt_Cycle], dfr_Input["RawFitErrors"].loc[:,flt_Cycle] = set_to_nan(4), set_to_nan(4), set_to_nan(4)
-	return dfr_Input
-
 ##################################
 ##                              ##
 ##    #####    #####  ######    ##
@@ -1764,14 +2107,18 @@ def create_dataframe_DSF(dfr_RawData, dfr_Samples, dfr_Layout, dlg_Progress):
 			#		flt_TmLower = dfr_Processed.loc[k,"Temp"][i] + 273.15
 			#		break
 
-			# Perform fit -> Check if fitting criteria are met in the first instance
-			if dfr_Processed.loc[k,"DoFit"] == True:
-				# Do The Fits
-				dfr_Processed.at[k,"RawDeriv"], dfr_Processed.at[k,"RawInflections"], dfr_Processed.at[k,"RawSlopes"] = ff.derivative(dfr_Processed.loc[k,"Temp"],dfr_Processed.loc[k,"Fluo"],0,1,"max")
-				dfr_Processed.at[k,"NormDeriv"], dfr_Processed.at[k,"NormInflections"], dfr_Processed.at[k,"NormSlopes"] = ff.derivative(dfr_Processed.loc[k,"Temp"],dfr_Processed.loc[k,"Norm"],0,1,"max")
-
 			dfr_Processed.loc[k,"Show"] = 0
 			dlg_Progress.lbx_Log.SetString(dlg_Progress.lbx_Log.Count - 1, ProgressGauge(k+1,int_Samples) + " " + str(k+1) + " out of " + str(int_Samples) + " samples.")
+	# Perform fit -> Check if fitting criteria are met in the first instance.
+	# Derivatives of all samples get calculated at once (see ff.derivative_batch).
+	lst_Fit = [k for k in range(int_Samples) if dfr_Processed.loc[k,"DoFit"] == True]
+	lst_Temp = [dfr_Processed.loc[k,"Temp"] for k in lst_Fit]
+	for str_Data, str_Prefix in [("Fluo","Raw"),("Norm","Norm")]:
+		lst_Deriv, lst_Inflections, lst_Slopes = ff.derivative_batch(lst_Temp,[dfr_Processed.loc[k,str_Data] for k in lst_Fit],0,1,"max")
+		for j in range(len(lst_Fit)):
+			dfr_Processed.at[lst_Fit[j],str_Prefix+"Deriv"] = lst_Deriv[j]
+			dfr_Processed.at[lst_Fit[j],str_Prefix+"Inflections"] = lst_Inflections[j]
+			dfr_Processed.at[lst_Fit[j],str_Prefix+"Slopes"] = lst_Slopes[j]
 	# Calculate DTms:
 	# Make dataframe to calculate average Tm of references
 	lst_Proteins = list(set(dfr_Layout.loc["PurificationID"]))
@@ -1899,25 +2246,53 @@ def write_Enthalpy(flt_H, bol_DoFit, flt_PlusMinus):
 ##                                                                      ##
 ##########################################################################
 
-def get_CompleteContainer_nanoDSF(str_DataPath,str_AssayCategory,bol_PlateID,dfr_Capillaries,dfr_Layout,dlg_Progress):
+def get_CompleteContainer_nanoDSF(str_DataPath,str_AssayCategory,bol_PlateID,dfr_Capillaries,dfr_Layout,dlg_Progress,int_ReadThreads = None):
+	"""
+	Processes one or more Prometheus exports (capillary sets) and collects everything in one dataframe.
+
+	str_DataPath can be a list of paths, one per capillary set. dfr_Capillaries is then a list of
+	capillary dataframes in the same order (or one dataframe for all sets) and dfr_Layout has one row
+	per set. All exports are handed to a pool of int_ReadThreads threads (default: int_MaxReadThreads)
+	and each set gets processed as soon as its file has been read.
+	"""
 	dlg_Progress.lbx_Log.InsertItems(["Assay category: " + str_AssayCategory], dlg_Progress.lbx_Log.Count)
 	dlg_Progress.lbx_Log.InsertItems([""], dlg_Progress.lbx_Log.Count)
 
+	if type(str_DataPath) == str:
+		lst_DataPaths = [str_DataPath]
+	else:
+		lst_DataPaths = list(str_DataPath)
+	if type(dfr_Capillaries) == pd.DataFrame:
+		lst_Capillaries = [dfr_Capillaries] * len(lst_DataPaths)
+	else:
+		lst_Capillaries = list(dfr_Capillaries)
+
 	dfr_Container = pd.DataFrame(columns=["DestinationPlateName","Samples","Capillaries","DataFileName",
-		"RawDataFrame","ProcessedDataFrame","Layout","References"], index=range(1))
-
-	for idx_Set in range(len(dfr_Container)):
-		dlg_Progress.lbx_Log.InsertItems(["Processing capillary set " + str(idx_Set + 1)], dlg_Progress.lbx_Log.Count)
-		dfr_Container.loc[idx_Set,"DestinationPlateName"] = "CapillarySet_" + str(idx_Set+1)
-		dfr_Container.loc[idx_Set,"DataFileName"] = str_DataPath
-		dfr_Container.at[idx_Set,"RawDataFrame"] = ro.get_prometheus_readout(str_DataPath)
-		if dfr_Container.loc[idx_Set,"RawDataFrame"] is None: # == False:
-			msg.FileNotData(None)
-			return None
-		dfr_Container.at[idx_Set,"Samples"] = pd.DataFrame({"CapillaryIndex":dfr_Container.loc[idx_Set,"RawDataFrame"]["CapIndex"].to_list(),
-			"CapillaryName":dfr_Container.loc[idx_Set,"RawDataFrame"]["CapillaryName"].to_list()})
-		dfr_Container.at[idx_Set,"Layout"] = dfr_Layout
-		dfr_Container.at[idx_Set,"ProcessedDataFrame"], dfr_Container.at[idx_Set,"References"] = create_dataframe_nanoDSF(dfr_Container.loc[idx_Set,"RawDataFrame"],dfr_Capillaries,dfr_Layout.loc[idx_Set],dlg_Progress)
+		"RawDataFrame","ProcessedDataFrame","Layout","References"], index=range(len(lst_DataPaths)))
+
+	if int_ReadThreads is None:
+		int_ReadThreads = int_MaxReadThreads
+	with ThreadPoolExecutor(max(1,int_ReadThreads)) as exe_Read:
+		dic_Reading = {exe_Read.submit(ro.get_prometheus_readout,lst_DataPaths[idx_Set]):idx_Set
+			for idx_Set in range(len(lst_DataPaths))}
+		for fut_RawData in as_completed(dic_Reading.keys()):
+			idx_Set = dic_Reading[fut_RawData]
+			dlg_Progress.lbx_Log.InsertItems(["Processing capillary set " + str(idx_Set + 1)], dlg_Progress.lbx_Log.Count)
+			dfr_Container.loc[idx_Set,"DestinationPlateName"] = "CapillarySet_" + str(idx_Set+1)
+			dfr_Container.loc[idx_Set,"DataFileName"] = lst_DataPaths[idx_Set]
+			dfr_Container.at[idx_Set,"RawDataFrame"] = fut_RawData.result()
+			if dfr_Container.loc[idx_Set,"RawDataFrame"] is None: # == False:
+				for fut_Pending in dic_Reading.keys():
+					fut_Pending.cancel()
+				dlg_Progress.lbx_Log.InsertItems(["Could not parse raw data file: " + lst_DataPaths[idx_Set]], dlg_Progress.lbx_Log.Count)
+				if msg != None:
+					msg.FileNotData(None)
+				return None
+			dfr_Container.at[idx_Set,"Samples"] = pd.DataFrame({"CapillaryIndex":dfr_Container.loc[idx_Set,"RawDataFrame"]["CapIndex"].to_list(),
+				"CapillaryName":dfr_Container.loc[idx_Set,"RawDataFrame"]["CapillaryName"].to_list()})
+			dfr_Container.at[idx_Set,"Layout"] = dfr_Layout
+			dfr_Container.at[idx_Set,"ProcessedDataFrame"], dfr_Container.at[idx_Set,"References"] = create_dataframe_nanoDSF(dfr_Container.loc[idx_Set,"RawDataFrame"],
+				lst_Capillaries[idx_Set],dfr_Layout.loc[idx_Set],dlg_Progress)
 
 	return dfr_Container
 
@@ -1951,48 +2326,62 @@ def create_dataframe_nanoDSF(dfr_RawData, dfr_Capillaries, dfr_Layout, dlg_Progr
 	dlg_Progress.lbx_Log.InsertItems(["Number of samples to process: " + str(int_Samples)], dlg_Progress.lbx_Log.Count)
 	dlg_Progress.lbx_Log.InsertItems(["Processed 0 out of " + str(int_Samples) + " samples"], dlg_Progress.lbx_Log.Count)
 
-	k = -1
-	for cap in range(int_Samples):
-		if dfr_RawData.loc[cap,"CapillaryName"] != "no capillary":
-			k += 1
-			dfr_Processed.at[cap,"RatioDeriv"],dfr_Processed.at[cap,"RatioInflections"],dfr_Processed.at[cap,"RatioSlopes"] = ff.derivative(dfr_RawData.loc[cap,"Temp"], dfr_RawData.loc[cap,"Ratio"],2,2,"both")
-			dfr_Processed.at[cap,"330nmDeriv"],dfr_Processed.at[cap,"330nmInflections"],dfr_Processed.at[cap,"330nmSlopes"] = ff.derivative(dfr_RawData.loc[cap,"Temp"], dfr_RawData.loc[cap,"330nm"],2,2,"both")
-			dfr_Processed.at[cap,"350nmDeriv"],dfr_Processed.at[cap,"350nmInflections"],dfr_Processed.at[cap,"350nmSlopes"] = ff.derivative(dfr_RawData.loc[cap,"Temp"], dfr_RawData.loc[cap,"350nm"],2,2,"both")
-			dfr_Processed.at[cap,"ScatteringDeriv"],dfr_Processed.at[cap,"ScatteringInflections"],dfr_Processed.at[cap,"ScatteringSlopes"] = ff.derivative(dfr_RawData.loc[cap,"Temp"], dfr_RawData.loc[cap,"Scattering"],2,2,"both")
-			dlg_Progress.lbx_Log.SetString(dlg_Progress.lbx_Log.Count - 1, ProgressGauge(k+1,int_Samples) + " " + str(k+1) + " out of " + str(int_Samples) + " samples.")
+	# Derivatives of all capillaries and channels get calculated at once on an array of
+	# capillaries x channels x temperatures (see ff.derivative_batch)
+	lst_Channels = ["Ratio","330nm","350nm","Scattering"]
+	lst_Capillaries = [cap for cap in range(int_Samples) if dfr_RawData.loc[cap,"CapillaryName"] != "no capillary"]
+	lst_Deriv, lst_Inflections, lst_Slopes = ff.derivative_batch([dfr_RawData.loc[cap,"Temp"] for cap in lst_Capillaries],
+		[[dfr_RawData.loc[cap,str_Channel] for str_Channel in lst_Channels] for cap in lst_Capillaries],2,2,"both")
+	for j in range(len(lst_Capillaries)):
+		for c in range(len(lst_Channels)):
+			dfr_Processed.at[lst_Capillaries[j],lst_Channels[c]+"Deriv"] = lst_Deriv[j][c]
+			dfr_Processed.at[lst_Capillaries[j],lst_Channels[c]+"Inflections"] = lst_Inflections[j][c]
+			dfr_Processed.at[lst_Capillaries[j],lst_Channels[c]+"Slopes"] = lst_Slopes[j][c]
+	dlg_Progress.lbx_Log.SetString(dlg_Progress.lbx_Log.Count - 1, ProgressGauge(int_Samples,int_Samples) + " " + str(len(lst_Capillaries)) + " out of " + str(int_Samples) + " samples.")
 
 	# Calculate DTms:
 	# Make dataframe to calculate average Tm of references
 	lst_Proteins = list(set(dfr_Layout.loc["PurificationID"]))
 	dfr_References = pd.DataFrame(columns=["TmSum","n","AverageTm"], index=(range(len(lst_Proteins))))
 	# Since the protein assignment works differently here (at least at the moment), we will have to iterate through to assign the numerical:
+	dic_Proteins = {lst_Proteins[prot]:prot for prot in range(len(lst_Proteins))}
+	arr_Protein = np.zeros(len(dfr_Processed), dtype=int)
 	for idx_Capillary in range(len(dfr_Processed)):
-		for prot in range(len(lst_Proteins)):
-			if dfr_Layout.loc["PurificationID"][idx_Capillary] == lst_Proteins[prot]:
-				dfr_Layout.loc["ProteinNumerical"][idx_Capillary] = prot+1
-	# Need to initialise these with 0 to make the += work later.
+		arr_Protein[idx_Capillary] = dic_Proteins[dfr_Layout.loc["PurificationID"][idx_Capillary]]
+		dfr_Layout.loc["ProteinNumerical"][idx_Capillary] = int(arr_Protein[idx_Capillary])+1
+	# Sum up and average Tms of references per protein: group reductions with np.bincount
+	arr_Tm = np.array([first_or_nan(dfr_Processed.loc[idx_Capillary,"RatioInflections"]) for idx_Capillary in range(len(dfr_Processed))], dtype=float)
+	arr_Reference = np.array([dfr_Layout["WellType"][idx_Capillary] == "r" for idx_Capillary in range(len(dfr_Processed))], dtype=bool)
+	arr_TmSum = np.bincount(arr_Protein[arr_Reference], weights=arr_Tm[arr_Reference], minlength=len(lst_Proteins))
+	arr_n = np.bincount(arr_Protein[arr_Reference], minlength=len(lst_Proteins))
+	arr_AverageTm = np.zeros(len(lst_Proteins))
 	for i in range(len(lst_Proteins)):
-		dfr_References.at[i,"TmSum"] = 0
-		dfr_References.at[i,"n"] = 0
-		dfr_References.at[i,"AverageTm"] = 0
-	# Sum up Tms of references
-	for idx_Capillary in range(len(dfr_Processed)):
-		if dfr_Layout["WellType"][idx_Capillary] == "r":
-			dfr_References.at[int(dfr_Layout["ProteinNumerical"][idx_Capillary])-1,"TmSum"] += dfr_Processed.loc[idx_Capillary,"RatioInflections"][0]
-			dfr_References.at[int(dfr_Layout["ProteinNumerical"][idx_Capillary])-1,"n"] += 1
-	# Average Tms of references
-	for i in range(len(dfr_References)):
-		if dfr_References.loc[i,"n"] > 0:
-			dfr_References.at[i,"AverageTm"] = round(dfr_References.loc[i,"TmSum"]/dfr_References.loc[i,"n"],2)
-			# get DTms of samples
-			for idx_Capillary in range(len(dfr_Processed)):
-				dfr_Processed.at[idx_Capillary,"NormDTm"] = round(dfr_Processed.loc[idx_Capillary,"RatioInflections"][0] - dfr_References.loc[int(dfr_Layout["ProteinNumerical"][idx_Capillary])-1,"AverageTm"],2)
+		dfr_References.at[i,"TmSum"] = arr_TmSum[i] if arr_n[i] > 0 else 0
+		dfr_References.at[i,"n"] = int(arr_n[i])
+		if arr_n[i] > 0:
+			arr_AverageTm[i] = round(arr_TmSum[i]/arr_n[i],2)
+			dfr_References.at[i,"AverageTm"] = arr_AverageTm[i]
 		else:
+			dfr_References.at[i,"AverageTm"] = 0
 			dlg_Progress.lbx_Log.InsertItems(["No reference capillaries have been defined for protein " + lst_Proteins[i] + ". Only melting temperatures, not Tm shifts, were calculated."],
 				dlg_Progress.lbx_Log.Count)
+	# get DTms of samples. Proteins without references have an average Tm of 0, as before.
+	if arr_n.sum() > 0:
+		arr_DTm = np.round(arr_Tm - arr_AverageTm[arr_Protein],2)
+		for idx_Capillary in range(len(dfr_Processed)):
+			dfr_Processed.at[idx_Capillary,"NormDTm"] = arr_DTm[idx_Capillary]
 
 	return dfr_Processed, dfr_References
 
+def first_or_nan(lst_Values):
+	"""
+	Returns the first item of a list, np.nan if there is none (e.g. capillary was not processed).
+	"""
+	if type(lst_Values) == list and len(lst_Values) > 0:
+		return lst_Values[0]
+	else:
+		return np.nan
+
 def create_Database_frame_NanoDSF(dfr_Details,lstHeaders,dfr_PlateData,dfr_Layout):
 	# Filter out controls:
 	dfr_PlateData = dfr_PlateData[dfr_PlateData["SampleID"] != "Control"]
@@ -2074,67 +2463,107 @@ def create_dataframe_rate(dfr_RawData, dfr_Samples, dfr_Layout, dlg_Progress):
 			dfr_Processed.loc[k,"ManualRate"] = False
 
 			# Normalisation needs to happen before datafitting is attempted
-			flt_SignalMin = np.min(dfr_Processed.loc[k,"Signal"])
-			flt_SignalMax = np.max(dfr_Processed.loc[k,"Signal"]) - flt_SignalMin
-			lst_Norm = []
-			for j in range(len(dfr_Processed.loc[k,"Signal"])):
-				lst_Norm.append((dfr_Processed.loc[k,"Signal"][j]-flt_SignalMin)/flt_SignalMax)
-			dfr_Processed.at[k,"Norm"] = lst_Norm
+			arr_Signal = np.asarray(dfr_Processed.loc[k,"Signal"], dtype=float)
+			flt_SignalMin = np.min(arr_Signal)
+			flt_SignalMax = np.max(arr_Signal) - flt_SignalMin
+			dfr_Processed.at[k,"Norm"] = ((arr_Signal-flt_SignalMin)/flt_SignalMax).tolist()
 			
 			# Fitting criteria
 			# Criteria for fit:
 			dfr_Processed.loc[k,"DoFit"] = True
 			dfr_Processed.loc[k,"DoLogFit"] = True
 			dfr_Processed.loc[k,"DoLinFit"] = True
-			int_Len = len(dfr_Processed.loc[k,"Time"])
-			# Perform fit -> Check if fitting criteria are met in the first instance
-			if dfr_Processed.loc[k,"DoFit"] == True:
-				# Do The Fits
-				fit, dfr_Processed.at[k,"RawFitPars"], dfr_Processed.at[k,"RawFitCI"], dfr_Processed.at[k,"RawFitErrors"], rsquare, success_raw = ff.fit_logMM_free(dfr_Processed.loc[k,"Time"], dfr_Processed.loc[k,"Signal"])
-				fit, dfr_Processed.at[k,"NormFitPars"], dfr_Processed.at[k,"NormFitCI"], dfr_Processed.at[k,"NormFitFreeErrors"], rsquare, success_norm = ff.fit_logMM_free(dfr_Processed.loc[k,"Time"], dfr_Processed.loc[k,"Norm"])
-				# -> Now check if fits were successful
-				if success_raw == True:
-					dfr_Processed.at[k,"RawFit"] = ff.draw_logMM(dfr_Processed.loc[k,"Time"],dfr_Processed.loc[k,"RawFitPars"])
-					dfr_Processed.at[k,"RawFitR2"] = ff.calculate_rsquare(dfr_Processed.loc[k,"Signal"],dfr_Processed.loc[k,"RawFit"])
-					dfr_Processed.loc[k,"DoLogFit"] = True
-				else:
-					dfr_Processed.at[k,"RawFit"], dfr_Processed.at[k,"RawFitPars"] = set_to_nan(int_Len), set_to_nan(4)
-					dfr_Processed.loc[k,"RawFitR2"] = np.nan
-					dfr_Processed.loc[k,"DoLogFit"] = False
-				if success_norm == True:
-					dfr_Processed.at[k,"NormFit"] = ff.draw_logMM(dfr_Processed.loc[k,"Time"],dfr_Processed.loc[k,"NormFitPars"])
-					dfr_Processed.at[k,"NormFitR2"] = ff.calculate_rsquare(dfr_Processed.loc[k,"Signal"],dfr_Processed.loc[k,"NormFit"])
-					dfr_Processed.at[k,"LinFit"], dfr_Processed.at[k,"LinFitPars"], dfr_Processed.at[k,"NormDeriv"], dfr_Processed.at[k,"LinStart"], dfr_Processed.at[k,"LinStop"], dfr_Processed.at[k,"LinFitCI"], dfr_Processed.at[k,"LinFitErrors"], dfr_Processed.at[k,"LinFitTime"] = ff.linear_fit(dfr_Processed.loc[k,"Time"], dfr_Processed.loc[k,"Signal"], dfr_Processed.loc[k,"NormFitPars"], 0,int_Len,"auto")
-					dfr_Processed.loc[k,"LinFitR2"] = np.nan #ff.calculate_rsquare(dfr_Processed.loc[k,"Norm"],dfr_Processed.loc[k,"LinFit"])
-					dfr_Processed.loc[k,"DoLinFit"] = True
-				else:
-					dfr_Processed.at[k,"NormFit"], dfr_Processed.at[k,"LinFit"], dfr_Processed.at[k,"NormDeriv"] = set_to_nan(int_Len), set_to_nan(int_Len), set_to_nan(int_Len)
-					dfr_Processed.at[k,"NormFitPars"] = set_to_nan(4)
-					dfr_Processed.loc[k,"NormFitFitR2"] = np.nan
-					dfr_Processed.at[k,"LinStart"] = np.nan
-					dfr_Processed.at[k,"LinStop"] = np.nan
-					dfr_Processed.loc[k,"LinFitPars"] = set_to_nan(2)
-					dfr_Processed.loc[k,"LinFitCI"] = set_to_nan(2)
-					dfr_Processed.loc[k,"LinFitErrors"] = set_to_nan(2)
-					dfr_Processed.loc[k,"LinFitR2"] = np.nan
-					dfr_Processed.loc[k,"DoLinFit"] = False
-			else:
-				dfr_Processed.at[k,"RawFit"], dfr_Processed.at[k,"RawFitPars"] = set_to_nan(len(dfr_Processed.loc[k,"Signal"])), set_to_nan(4)
-				dfr_Processed.loc[k,"RawFitR2"] = np.nan
-				dfr_Processed.at[k,"NormFit"], dfr_Processed.at[k,"NormFitPars"] = set_to_nan(len(dfr_Processed.loc[k,"Signal"])), set_to_nan(4)
-				dfr_Processed.loc[k,"NormFitR2"] = np.nan
-				dfr_Processed.loc[k,"LinFit"] = set_to_nan(len(dfr_Processed.loc[k,"Signal"]))
-				dfr_Processed.loc[k,"LinFitPars"] = set_to_nan(2)
-				dfr_Processed.loc[k,"LinFitR2"] = np.nan
-			dfr_Processed.loc[k,"Show"] = 0
-			dlg_Progress.lbx_Log.SetString(dlg_Progress.lbx_Log.Count - 1, ProgressGauge(k+1,int_Samples) + " " + str(k+1) + " out of " + str(int_Samples) + " samples.")
 			k += 1
 
+	# Perform fit -> Check if fitting criteria are met in the first instance
+	lst_Fit = [k for k in range(int_Samples) if dfr_Processed.loc[k,"DoFit"] == True]
+	lst_LogMMFits = fit_logMM_plate([dfr_Processed.loc[k,"Time"] for k in lst_Fit], [dfr_Processed.loc[k,"Signal"] for k in lst_Fit],
+		[dfr_Processed.loc[k,"Norm"] for k in lst_Fit], dlg_Progress, int_Samples)
+	lst_LinFit = []
+	for j in range(len(lst_Fit)):
+		k = lst_Fit[j]
+		int_Len = len(dfr_Processed.loc[k,"Time"])
+		# Do The Fits
+		fit, dfr_Processed.at[k,"RawFitPars"], dfr_Processed.at[k,"RawFitCI"], dfr_Processed.at[k,"RawFitErrors"], rsquare, success_raw = lst_LogMMFits[j][0]
+		fit, dfr_Processed.at[k,"NormFitPars"], dfr_Processed.at[k,"NormFitCI"], dfr_Processed.at[k,"NormFitFreeErrors"], rsquare, success_norm = lst_LogMMFits[j][1]
+		# -> Now check if fits were successful
+		if success_raw == True:
+			dfr_Processed.at[k,"RawFit"] = ff.draw_logMM(dfr_Processed.loc[k,"Time"],dfr_Processed.loc[k,"RawFitPars"])
+			dfr_Processed.at[k,"RawFitR2"] = ff.calculate_rsquare(dfr_Processed.loc[k,"Signal"],dfr_Processed.loc[k,"RawFit"])
+			dfr_Processed.loc[k,"DoLogFit"] = True
+		else:
+			dfr_Processed.at[k,"RawFit"], dfr_Processed.at[k,"RawFitPars"] = set_to_nan(int_Len), set_to_nan(4)
+			dfr_Processed.loc[k,"RawFitR2"] = np.nan
+			dfr_Processed.loc[k,"DoLogFit"] = False
+		if success_norm == True:
+			dfr_Processed.at[k,"NormFit"] = ff.draw_logMM(dfr_Processed.loc[k,"Time"],dfr_Processed.loc[k,"NormFitPars"])
+			dfr_Processed.at[k,"NormFitR2"] = ff.calculate_rsquare(dfr_Processed.loc[k,"Signal"],dfr_Processed.loc[k,"NormFit"])
+			# Linear phases of all samples get fitted at once below
+			lst_LinFit.append(k)
+			dfr_Processed.loc[k,"LinFitR2"] = np.nan #ff.calculate_rsquare(dfr_Processed.loc[k,"Norm"],dfr_Processed.loc[k,"LinFit"])
+			dfr_Processed.loc[k,"DoLinFit"] = True
+		else:
+			dfr_Processed.at[k,"NormFit"], dfr_Processed.at[k,"LinFit"], dfr_Processed.at[k,"NormDeriv"] = set_to_nan(int_Len), set_to_nan(int_Len), set_to_nan(int_Len)
+			dfr_Processed.at[k,"NormFitPars"] = set_to_nan(4)
+			dfr_Processed.loc[k,"NormFitFitR2"] = np.nan
+			dfr_Processed.at[k,"LinStart"] = np.nan
+			dfr_Processed.at[k,"LinStop"] = np.nan
+			dfr_Processed.loc[k,"LinFitPars"] = set_to_nan(2)
+			dfr_Processed.loc[k,"LinFitCI"] = set_to_nan(2)
+			dfr_Processed.loc[k,"LinFitErrors"] = set_to_nan(2)
+			dfr_Processed.loc[k,"LinFitR2"] = np.nan
+			dfr_Processed.loc[k,"DoLinFit"] = False
+	lst_LinFitResults = ff.linear_fit_batch([dfr_Processed.loc[k,"Time"] for k in lst_LinFit], [dfr_Processed.loc[k,"Signal"] for k in lst_LinFit],
+		[dfr_Processed.loc[k,"NormFitPars"] for k in lst_LinFit])
+	for j in range(len(lst_LinFit)):
+		k = lst_LinFit[j]
+		dfr_Processed.at[k,"LinFit"], dfr_Processed.at[k,"LinFitPars"], dfr_Processed.at[k,"NormDeriv"], dfr_Processed.at[k,"LinStart"], dfr_Processed.at[k,"LinStop"], dfr_Processed.at[k,"LinFitCI"], dfr_Processed.at[k,"LinFitErrors"], dfr_Processed.at[k,"LinFitTime"] = lst_LinFitResults[j]
+	for k in range(int_Samples):
+		if not dfr_Processed.loc[k,"DoFit"] == True:
+			dfr_Processed.at[k,"RawFit"], dfr_Processed.at[k,"RawFitPars"] = set_to_nan(len(dfr_Processed.loc[k,"Signal"])), set_to_nan(4)
+			dfr_Processed.loc[k,"RawFitR2"] = np.nan
+			dfr_Processed.at[k,"NormFit"], dfr_Processed.at[k,"NormFitPars"] = set_to_nan(len(dfr_Processed.loc[k,"Signal"])), set_to_nan(4)
+			dfr_Processed.loc[k,"NormFitR2"] = np.nan
+			dfr_Processed.loc[k,"LinFit"] = set_to_nan(len(dfr_Processed.loc[k,"Signal"]))
+			dfr_Processed.loc[k,"LinFitPars"] = set_to_nan(2)
+			dfr_Processed.loc[k,"LinFitR2"] = np.nan
+
 	# Placeholder
 	dfr_References = pd.DataFrame(data={"Solvent":[1234],"Buffer":[1234],"Control":[1234]},index=["Plate1"])
 	# Return
 	return dfr_Processed, dfr_References
 
+def fit_logMM_plate(lst_Time, lst_Signal, lst_Norm, dlg_Progress, int_Samples, int_Workers = None):
+	"""
+	Fits the logarithmic approximation of the Michaelis-Menten equation to the signal and the normalised
+	signal of each sample (see ff.fit_logMM_free). The samples get sent to a pool of int_Workers processes
+	(default: int_MaxFitWorkers). Inside a worker process (plates processed in parallel, see get_CompleteContainer)
+	pools cannot be started and the samples get fitted one after another.
+
+	Returns list with a tuple (fit of signal, fit of normalised signal) for each sample.
+	"""
+	lst_Input = [[lst_Time[k],lst_Signal[k],lst_Norm[k]] for k in range(len(lst_Time))]
+	if int_Workers is None:
+		int_Workers = int_MaxFitWorkers
+	int_Workers = min(int_Workers, len(lst_Input))
+	lst_Fits = []
+	if int_Workers > 1 and current_process().daemon == False:
+		with mp_Context.Pool(int_Workers) as p:
+			for tpl_Fits in p.imap(LogMMFitting_MP, lst_Input, chunksize=max(1,len(lst_Input)//(4*int_Workers))):
+				lst_Fits.append(tpl_Fits)
+				dlg_Progress.lbx_Log.SetString(dlg_Progress.lbx_Log.Count - 1, ProgressGauge(len(lst_Fits),int_Samples) + " " + str(len(lst_Fits)) + " out of " + str(int_Samples) + " samples.")
+	else:
+		for lst_Item in lst_Input:
+			lst_Fits.append(LogMMFitting_MP(lst_Item))
+			dlg_Progress.lbx_Log.SetString(dlg_Progress.lbx_Log.Count - 1, ProgressGauge(len(lst_Fits),int_Samples) + " " + str(len(lst_Fits)) + " out of " + str(int_Samples) + " samples.")
+	return lst_Fits
+
+def LogMMFitting_MP(lst_Input):
+	"""
+	Fits signal and normalised signal of one sample, see fit_logMM_plate.
+	"""
+	return ff.fit_logMM_free(lst_Input[0], lst_Input[1]), ff.fit_logMM_free(lst_Input[0], lst_Input[2])
+
 def create_Database_frame_rate(dfr_Details,lstHeaders,dfr_PlateData):
 	# Filter out controls:
 	dfr_PlateData = dfr_PlateData[dfr_PlateData["SampleID"] != "Control"]
@@ -2191,7 +2620,11 @@ def write_Rate(flt_Rate, bol_DoFit, flt_PlusMinus):
 ##                                      ##
 ##########################################
 
-def get_CompleteContainer_CBCS(dfr_DataStructure, dfr_Layout, dlg_Progress, lst_Concentrations, lst_Conditions, str_ReferenceCondition, lst_Replicates, str_DataProcessor):
+def get_CompleteContainer_CBCS(dfr_DataStructure, dfr_Layout, dlg_Progress, lst_Concentrations, lst_Conditions, str_ReferenceCondition, lst_Replicates, str_DataProcessor, int_ReadThreads = None):
+	"""
+	Reads all raw data files (int_ReadThreads at a time, default: int_MaxReadThreads)
+	and processes them, see create_dataframe_CBCS.
+	"""
 
 	#dfr_AssayData = pd.DataFrame(index=[0],columns=["Column"])
 
@@ -2201,11 +2634,16 @@ def get_CompleteContainer_CBCS(dfr_DataStructure, dfr_Layout, dlg_Progress, lst_
 	dlg_Progress.lbx_Log.InsertItems([""], dlg_Progress.lbx_Log.Count)
 	dlg_Progress.lbx_Log.InsertItems(["Reading raw data files:"], dlg_Progress.lbx_Log.Count)
 	dlg_Progress.lbx_Log.InsertItems(["0 out of " + str(int_Plates) + " files read."], dlg_Progress.lbx_Log.Count)
+	if int_ReadThreads is None:
+		int_ReadThreads = int_MaxReadThreads
 	k = 0
-	for idx in dfr_DataStructure.index:
-		dfr_DataStructure.at[idx,"RawData"] = ro.get_operetta_readout(dfr_DataStructure.loc[idx,"FilePath"], str_DataProcessor)
-		dlg_Progress.lbx_Log.SetString(dlg_Progress.lbx_Log.Count - 1, ProgressGauge(k+1,int_Plates) + " " + str(k+1) + " out of " + str(int_Plates) + " files read.")
-		k += 1
+	with ThreadPoolExecutor(max(1,int_ReadThreads)) as exe_Read:
+		dic_Reading = {exe_Read.submit(ro.get_operetta_readout, dfr_DataStructure.loc[idx,"FilePath"], str_DataProcessor):idx
+			for idx in dfr_DataStructure.index}
+		for fut_RawData in as_completed(dic_Reading.keys()):
+			dfr_DataStructure.at[dic_Reading[fut_RawData],"RawData"] = fut_RawData.result()
+			dlg_Progress.lbx_Log.SetString(dlg_Progress.lbx_Log.Count - 1, ProgressGauge(k+1,int_Plates) + " " + str(k+1) + " out of " + str(int_Plates) + " files read.")
+			k += 1
 
 	return create_dataframe_CBCS(dfr_DataStructure, dfr_Layout, dlg_Progress, lst_Concentrations, lst_Conditions, str_ReferenceCondition, lst_Replicates)
 
@@ -0,0 +1,347 @@
+"""
+Results of dose response time course (DRTC) plates as dense arrays.
+
+Every sample of a DRTC plate has means and SEMs of each concentration in
+each cycle, fitted curves, fit parameters and flags per cycle. DRTCResults
+holds these for all samples of a plate in a few numpy arrays:
+
+    arr_Curves      (columns x samples x concentrations x cycles), float
+                    RawMean, RawSEM, RawFit, NormMean, NormFitFree...
+    arr_Parameters  (columns x samples x 4 x cycles), float
+                    RawFitPars, NormFitFreePars, NormFitFreeCI...
+    arr_Values      (columns x samples x cycles), object
+                    DoFit, Show, NormFitFreeR2...
+
+Samples with fewer concentrations than others are padded with np.nan.
+Samples are addressed by their position in the plate's ProcessedDataFrame,
+cycles by their position in "Time" (see cycle_position).
+
+Each plate's DRTCResults sits in the "DRTCResults" column of the complete
+container, next to its ProcessedDataFrame, which only holds the sample
+details (SampleID, concentrations, locations...). Everything reads and
+writes the results through get_values and set_values or the functions at
+the bottom. Worker processes only send the arrays of each sample back
+(see lib_datafunctions.create_dataframe_DRTC_MP). Project files store the
+arrays as they are (see to_arrays and lib_projectfile).
+
+Classes:
+    DRTCResults
+
+Functions:
+    progress_curves
+    ic50_against_time
+    summary_ic50_against_time
+
+"""
+
+import numpy as np
+import pandas as pd
+
+# Columns by shape of their arrays.
+# Concentrations x cycles:
+lst_CurveColumns = ["RawMean","RawSEM","RawExcluded","RawFit","NormMean","NormSEM","NormExcluded",
+    "NormFitFree","NormFitConst"]
+# Fit parameters x cycles:
+lst_ParameterColumns = ["RawFitPars","RawFitCI","RawFitErrors","NormFitFreePars","NormFitFreeCI",
+    "NormFitFreeErrors","NormFitConstPars","NormFitConstCI","NormFitConstErrors"]
+lst_Parameters = ["Top","Bottom","Slope","Inflection"]
+# One value per cycle. Flags can be True, False or np.nan:
+lst_ValueColumns = ["DoFitRaw","RawFitR2","DoNormFitFree","NormFitFreeR2","NormFitConstR2",
+    "DoNormFitConst","DoFit","Show","Interpolated"]
+lst_FlagColumns = ["DoFitRaw","DoNormFitFree","DoNormFitConst","DoFit","Interpolated"]
+
+class DRTCResults:
+    """
+    Curves, fit parameters and per-cycle values of all samples of a
+    dose response time course plate.
+    """
+
+    def __init__(self, lst_Time, int_Samples, int_Concentrations):
+        """
+        Initialises class attributes. All values are np.nan.
+
+        Arguments:
+            lst_Time -> list. Time of each cycle
+            int_Samples -> integer. Number of samples
+            int_Concentrations -> integer. Highest number of
+                                  concentrations of any sample.
+        """
+        self.lst_Time = list(lst_Time)
+        int_Cycles = len(self.lst_Time)
+        self.arr_Curves = np.full((len(lst_CurveColumns),int_Samples,int_Concentrations,int_Cycles), np.nan)
+        self.arr_Parameters = np.full((len(lst_ParameterColumns),int_Samples,len(lst_Parameters),int_Cycles), np.nan)
+        self.arr_Values = np.full((len(lst_ValueColumns),int_Samples,int_Cycles), np.nan, dtype=object)
+        self.arr_Concentrations = np.full((int_Samples,int_Concentrations), np.nan)
+        # Number of concentrations of each sample
+        self.arr_Counts = np.zeros(int_Samples, dtype=int)
+        self.dic_Arrays = {}
+        for idx, column in enumerate(lst_CurveColumns):
+            self.dic_Arrays[column] = self.arr_Curves[idx]
+        for idx, column in enumerate(lst_ParameterColumns):
+            self.dic_Arrays[column] = self.arr_Parameters[idx]
+        for idx, column in enumerate(lst_ValueColumns):
+            self.dic_Arrays[column] = self.arr_Values[idx]
+
+    @property
+    def shape(self):
+        """
+        Number of samples, concentrations and cycles.
+        """
+        return self.arr_Curves.shape[1:]
+
+    @property
+    def nbytes(self):
+        """
+        Memory used by the arrays in bytes.
+        """
+        return self.arr_Curves.nbytes + self.arr_Parameters.nbytes + self.arr_Values.nbytes
+
+    def __getitem__(self, str_Column):
+        """
+        Returns the array of a column, samples as first axis.
+        """
+        return self.dic_Arrays[str_Column]
+
+    def cycle_position(self, timestamp):
+        """
+        Returns the position of the cycle closest to a time.
+
+        Arguments:
+            timestamp -> float. Time of cycle as in lst_Time.
+        """
+        return int(np.argmin(np.abs(np.asarray(self.lst_Time, dtype=float) - float(timestamp))))
+
+    def concentrations(self, smpl):
+        """
+        Returns the concentrations of a sample as array.
+
+        Arguments:
+            smpl -> integer. Position of sample
+        """
+        return self.arr_Concentrations[smpl,:self.arr_Counts[smpl]]
+
+    def get_values(self, smpl, str_Column, cycle = None):
+        """
+        Returns the values of a column of one sample, trimmed to its
+        concentrations: one value per concentration, fit parameter or
+        nothing (for per-cycle values), for all cycles if cycle is None
+        (cycles as last axis). The array is a view, use set_values to
+        change values.
+
+        Arguments:
+            smpl -> integer. Position of sample
+            str_Column -> string. Column, e.g. "NormMean" or "Show"
+            cycle -> integer. Position of cycle, or None for all cycles.
+        """
+        arr_Values = self.dic_Arrays[str_Column][smpl]
+        if str_Column in lst_CurveColumns:
+            arr_Values = arr_Values[:self.arr_Counts[smpl]]
+        if cycle is None:
+            return arr_Values
+        return arr_Values[...,cycle]
+
+    def set_values(self, smpl, str_Column, cycle, values):
+        """
+        Writes values of a column of one sample (see get_values).
+
+        Arguments:
+            smpl -> integer. Position of sample
+            str_Column -> string. Column, e.g. "NormMean" or "Show"
+            cycle -> integer. Position of cycle, or None for all cycles.
+            values -> value or list/array of values.
+        """
+        if cycle is None:
+            cycle = slice(None)
+        # Select the sample first, a list of cycles would otherwise become the first axis
+        arr_Sample = self.dic_Arrays[str_Column][smpl]
+        if str_Column in lst_CurveColumns:
+            arr_Sample[:self.arr_Counts[smpl],cycle] = values
+        else:
+            arr_Sample[...,cycle] = values
+
+    def set_excluded(self, smpl, conc, cycle, bol_Exclude):
+        """
+        Excludes a concentration of a sample from the fits of a cycle by
+        moving its means into "RawExcluded" and "NormExcluded", or moves
+        them back. Does not re-fit, see lib_datafunctions.refit_DRTC_cycle.
+
+        Arguments:
+            smpl -> integer. Position of sample
+            conc -> integer. Position of concentration
+            cycle -> integer. Position of cycle, or None for all cycles.
+            bol_Exclude -> boolean.
+        """
+        if cycle is None:
+            cycle = slice(None)
+        for str_Data in ["Raw","Norm"]:
+            if bol_Exclude == True:
+                str_From, str_To = str_Data + "Mean", str_Data + "Excluded"
+            else:
+                str_From, str_To = str_Data + "Excluded", str_Data + "Mean"
+            arr_From = self.dic_Arrays[str_From][smpl,conc,cycle]
+            arr_Moved = ~np.isnan(arr_From)
+            # Only move what is there, cycles that have been moved before keep their values
+            self.dic_Arrays[str_To][smpl,conc,cycle] = np.where(arr_Moved, arr_From, self.dic_Arrays[str_To][smpl,conc,cycle])
+            self.dic_Arrays[str_From][smpl,conc,cycle] = np.nan
+
+    def sample_arrays(self, smpl):
+        """
+        Returns a dictionary with the arrays (concentrations, then one
+        per column) of one sample, trimmed to its concentrations.
+
+        Arguments:
+            smpl -> integer. Position of sample
+        """
+        dic_Sample = {"Concentrations":self.concentrations(smpl)}
+        for column in lst_CurveColumns + lst_ParameterColumns + lst_ValueColumns:
+            dic_Sample[column] = self.get_values(smpl, column)
+        return dic_Sample
+
+    def set_sample(self, smpl, dic_Sample, lst_Cycles = None):
+        """
+        Writes the arrays of one sample (see sample_arrays), e.g. as sent
+        back by a worker process.
+
+        Arguments:
+            smpl -> integer. Position of sample
+            dic_Sample -> dictionary. Concentrations and column arrays.
+                          Columns that are missing are left as they are.
+            lst_Cycles -> list of integers. Only write these cycles. None
+                          for all cycles.
+        """
+        int_Count = len(dic_Sample["Concentrations"])
+        self.arr_Counts[smpl] = int_Count
+        self.arr_Concentrations[smpl,:int_Count] = dic_Sample["Concentrations"]
+        if lst_Cycles is None:
+            lst_Cycles = slice(None)
+        for column in lst_CurveColumns + lst_ParameterColumns + lst_ValueColumns:
+            if column in dic_Sample.keys():
+                self.set_values(smpl, column, lst_Cycles, np.asarray(dic_Sample[column])[...,lst_Cycles])
+
+    def to_arrays(self):
+        """
+        Returns a dictionary of numpy arrays without python objects, e.g.
+        to write into an npz file. Flags are written as 1.0 (True) and
+        0.0 (False), empty values as np.nan. See from_arrays.
+        """
+        arr_Values = np.full(self.arr_Values.shape, np.nan)
+        for idx, value in np.ndenumerate(self.arr_Values):
+            if not pd.isna(value):
+                arr_Values[idx] = float(value)
+        return {"Time":np.array(self.lst_Time),
+                "Concentrations":self.arr_Concentrations,
+                "Counts":self.arr_Counts,
+                "Curves":self.arr_Curves,
+                "Parameters":self.arr_Parameters,
+                "Values":arr_Values}
+
+    @classmethod
+    def from_arrays(cls, dic_Arrays):
+        """
+        Creates a DRTCResults from the arrays of to_arrays.
+
+        Arguments:
+            dic_Arrays -> dictionary-like of numpy arrays (e.g. loaded npz file)
+        """
+        int_Samples, int_Concentrations = dic_Arrays["Concentrations"].shape
+        results = cls(dic_Arrays["Time"].tolist(), int_Samples, int_Concentrations)
+        results.arr_Concentrations[:] = dic_Arrays["Concentrations"]
+        results.arr_Counts[:] = dic_Arrays["Counts"]
+        results.arr_Curves[:] = dic_Arrays["Curves"]
+        results.arr_Parameters[:] = dic_Arrays["Parameters"]
+        for idx, column in enumerate(lst_ValueColumns):
+            lst_Values = dic_Arrays["Values"][idx].ravel().tolist()
+            if column in lst_FlagColumns:
+                lst_Values = [np.nan if np.isnan(value) else value == 1 for value in lst_Values]
+            elif column == "Show":
+                lst_Values = [np.nan if np.isnan(value) else int(value) for value in lst_Values]
+            results.arr_Values[idx] = np.array(lst_Values, dtype=object).reshape(int_Samples,-1)
+        return results
+
+    @classmethod
+    def from_processed(cls, dfr_Processed):
+        """
+        Creates a DRTCResults from a ProcessedDataFrame of a project
+        saved before the results had their own column, when each sample
+        held a dataframe per column (e.g. "NormMean", concentrations as
+        index, cycles as columns). Cells that do not hold a dataframe are
+        left as np.nan.
+
+        Arguments:
+            dfr_Processed -> pandas dataframe. ProcessedDataFrame of plate
+        """
+        lst_Time = dfr_Processed.iloc[0]["Time"] if len(dfr_Processed) > 0 else []
+        lst_Counts = [len(dfr_Processed.iloc[smpl]["NormMean"]) for smpl in range(len(dfr_Processed))]
+        results = cls(lst_Time, len(dfr_Processed), max(lst_Counts + [0]))
+        for smpl in range(len(dfr_Processed)):
+            sr_Sample = dfr_Processed.iloc[smpl]
+            int_Count = lst_Counts[smpl]
+            results.arr_Counts[smpl] = int_Count
+            results.arr_Concentrations[smpl,:int_Count] = sr_Sample["NormMean"].index.values
+            for column in lst_CurveColumns + lst_ParameterColumns + lst_ValueColumns:
+                if column in sr_Sample.index and isinstance(sr_Sample[column], pd.DataFrame):
+                    if column in lst_ValueColumns:
+                        results.set_values(smpl, column, None, sr_Sample[column].to_numpy()[0])
+                    else:
+                        results.set_values(smpl, column, None, sr_Sample[column].to_numpy(dtype=float))
+        return results
+
+def progress_curves(results, smpl):
+    """
+    Returns the data of the progress curves plot of a sample: time of
+    each cycle, concentrations and mean raw signal (concentrations x
+    cycles).
+
+    Arguments:
+        results -> DRTCResults of the plate
+        smpl -> integer. Position of sample
+    """
+    return (np.asarray(results.lst_Time, dtype=float),
+            results.concentrations(smpl),
+            results.get_values(smpl, "RawMean"))
+
+def ic50_against_time(results, smpl, bol_Normalised = True):
+    """
+    Returns the data of the IC50 against time plots of a sample: time,
+    IC50, standard error and confidence interval of each cycle.
+    Each cycle takes the fit that is shown for it ("Show" is 1 for the
+    free fit, otherwise the constrained fit). The raw data only have one fit.
+
+    Arguments:
+        results -> DRTCResults of the plate
+        smpl -> integer. Position of sample
+        bol_Normalised -> boolean. Normalised or raw data fit.
+    """
+    idx_Inflection = lst_Parameters.index("Inflection")
+    if bol_Normalised == True:
+        arr_Free = results.get_values(smpl, "Show") == 1
+        lst_Arrays = []
+        for str_Suffix in ["Pars","Errors","CI"]:
+            lst_Arrays.append(np.where(arr_Free,
+                results.get_values(smpl, "NormFitFree"+str_Suffix)[idx_Inflection],
+                results.get_values(smpl, "NormFitConst"+str_Suffix)[idx_Inflection]))
+    else:
+        lst_Arrays = [results.get_values(smpl, "RawFit"+str_Suffix)[idx_Inflection].copy()
+            for str_Suffix in ["Pars","Errors","CI"]]
+    return (np.asarray(results.lst_Time, dtype=float), *lst_Arrays)
+
+def summary_ic50_against_time(lst_Samples, bol_Normalised = True):
+    """
+    Returns the data of the IC50 against time summary plot for several
+    samples as arrays (samples x cycles): time, IC50, standard error and
+    confidence interval. Samples with fewer cycles are padded with np.nan.
+
+    Arguments:
+        lst_Samples -> list of tuples of DRTCResults of the plate and
+                       position of sample.
+        bol_Normalised -> boolean. Normalised or raw data fit.
+    """
+    lst_Data = [ic50_against_time(results, smpl, bol_Normalised) for results, smpl in lst_Samples]
+    int_Cycles = max([len(tpl_Data[0]) for tpl_Data in lst_Data] + [0])
+    lst_Arrays = []
+    for idx in range(4):
+        arr_Stacked = np.full((len(lst_Data),int_Cycles), np.nan)
+        for smpl, tpl_Data in enumerate(lst_Data):
+            arr_Stacked[smpl,:len(tpl_Data[idx])] = tpl_Data[idx]
+        lst_Arrays.append(arr_Stacked)
+    return tuple(lst_Arrays)
@@ -0,0 +1,170 @@
+"""
+Writes result tables to CSV or Excel files one plate at a time.
+
+The export tab and the command line batch analysis used to collect the
+rows of all plates in one dataframe before writing it. TableWriter
+writes each plate's rows as soon as they have been created instead, so
+only one plate's rows are held in memory at any time. Excel files are
+written with a write-only openpyxl workbook, which streams rows to disk
+as well.
+
+Classes:
+    TableWriter
+
+Functions:
+    excel_value
+    database_partials
+    write_database
+
+"""
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+import lib_datafunctions as df
+
+class TableWriter:
+    """
+    Writes a table chunk by chunk. The file format follows the extension
+    of the file: ".xlsx" for an Excel workbook, CSV for anything else.
+    Use as context manager or call close() once all chunks are written.
+    """
+
+    def __init__(self, str_Path, lst_Columns, bol_Index = True):
+        """
+        Initialises class attributes, opens the file and writes the header.
+
+        Arguments:
+            str_Path -> string. Path of file
+            lst_Columns -> list. Column headers. Every chunk gets written
+                           with these columns, in this order.
+            bol_Index -> boolean. Write the index of each chunk as first
+                         column (as pandas' to_csv does).
+        """
+        self.str_Path = str_Path
+        self.lst_Columns = list(lst_Columns)
+        self.bol_Index = bol_Index
+        self.int_Rows = 0
+        self.bol_Excel = str_Path.lower().endswith(".xlsx")
+        if self.bol_Excel == True:
+            lst_Header = self.lst_Columns
+            if bol_Index == True:
+                lst_Header = [""] + lst_Header
+            self.wbk_Export = Workbook(write_only=True)
+            self.wks_Export = self.wbk_Export.create_sheet()
+            self.wks_Export.append([str(header) for header in lst_Header])
+        else:
+            self.fil_Export = open(str_Path, "w", newline="", encoding="utf-8")
+            # Let pandas write the header, too, so quoting and line endings match the rows
+            pd.DataFrame(columns=self.lst_Columns).to_csv(self.fil_Export, index=bol_Index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, dfr_Chunk):
+        """
+        Appends the rows of a dataframe. Columns the chunk does not have
+        are left empty.
+
+        Arguments:
+            dfr_Chunk -> pandas dataframe.
+        """
+        if not dfr_Chunk.columns.tolist() == self.lst_Columns:
+            dfr_Chunk = dfr_Chunk.reindex(columns=self.lst_Columns)
+        if self.bol_Excel == True:
+            for row in dfr_Chunk.itertuples(index=self.bol_Index, name=None):
+                self.wks_Export.append([excel_value(value) for value in row])
+        else:
+            dfr_Chunk.to_csv(self.fil_Export, header=False, index=self.bol_Index)
+        self.int_Rows += len(dfr_Chunk)
+
+    def close(self):
+        """
+        Finishes the file. Excel workbooks only get saved here.
+        """
+        if self.bol_Excel == True:
+            if not self.wbk_Export is None:
+                self.wbk_Export.save(self.str_Path)
+                self.wbk_Export = None
+        else:
+            self.fil_Export.close()
+
+def excel_value(value):
+    """
+    Turns a value into something openpyxl can write into a cell:
+    numpy numbers become Python numbers, np.nan becomes an empty cell
+    and lists and the like become their string representation.
+    """
+    if isinstance(value, (np.bool_, bool)):
+        return bool(value)
+    elif isinstance(value, (np.integer, int)):
+        return int(value)
+    elif isinstance(value, (np.floating, float)):
+        if np.isnan(value) == True:
+            return None
+        return float(value)
+    elif isinstance(value, str) or value is None:
+        return value
+    elif pd.api.types.is_scalar(value) and pd.isna(value):
+        return None
+    return str(value)
+
+def database_partials(dfr_AssayData, dfr_Details, lst_Headers, dfr_Layout,
+                      str_AssayCategory, str_AssayType):
+    """
+    Generator. Yields the rows for the database export of one plate at
+    a time (see create_Database_frame_... functions in lib_datafunctions).
+
+    Arguments:
+        dfr_AssayData -> pandas dataframe. Complete container
+        dfr_Details -> pandas dataframe. Assay details
+        lst_Headers -> list. Column headers of database export
+        dfr_Layout -> pandas dataframe. Plate layouts (thermal shift assays)
+        str_AssayCategory -> string.
+        str_AssayType -> string.
+    """
+    for i in range(len(dfr_AssayData)):
+        if str_AssayCategory.find("dose_response") != -1:
+            bol_DoseResponse = True
+            if str_AssayCategory.find("activity") != -1:
+                dfr_Partial = df.create_Database_frame_EPDR_ActAssay(dfr_Details,lst_Headers,dfr_AssayData.iloc[i,5],
+                    dfr_AssayData.loc[i,"References"],bol_DoseResponse)
+            else:
+                dfr_Partial = df.create_Database_frame_EPDR(dfr_Details,lst_Headers,dfr_AssayData.iloc[i,5],
+                    dfr_AssayData.loc[i,"References"])
+        elif str_AssayCategory == "single_dose":
+            bol_DoseResponse = False
+            if str_AssayCategory.find("activity") != -1:
+                dfr_Partial = df.create_Database_frame_EPSD_ActAssay(dfr_Details,lst_Headers,dfr_AssayData.iloc[i,5],
+                    dfr_AssayData.loc[i,"References"],bol_DoseResponse)
+            else:
+                dfr_Partial = df.create_Database_frame_EPSD(dfr_Details,lst_Headers,dfr_AssayData.iloc[i,5],
+                    dfr_AssayData.loc[i,"References"])
+        elif str_AssayCategory == "rate":
+            dfr_Partial = df.create_Database_frame_rate(dfr_Details,lst_Headers,dfr_AssayData.iloc[i,5])
+        elif str_AssayCategory == "thermal_shift":
+            if str_AssayType == "nanoDSF":
+                dfr_Partial = df.create_Database_frame_NanoDSF(dfr_Details,lst_Headers,dfr_AssayData.iloc[i,5],
+                    dfr_Layout.loc[i])
+            else:
+                dfr_Partial = df.create_Database_frame_DSF(dfr_Details,lst_Headers,dfr_AssayData.iloc[i,5],
+                    dfr_Layout.loc[i])
+        yield dfr_Partial
+
+def write_database(str_Path, dfr_AssayData, dfr_Details, lst_Headers, dfr_Layout,
+                   str_AssayCategory, str_AssayType):
+    """
+    Writes the database export straight to a CSV or Excel file, plate by
+    plate. Arguments see database_partials, str_Path is the path of the file.
+
+    Returns number of rows written.
+    """
+    with TableWriter(str_Path, lst_Headers) as writer:
+        for dfr_Partial in database_partials(dfr_AssayData, dfr_Details, lst_Headers,
+                                             dfr_Layout, str_AssayCategory, str_AssayType):
+            writer.write(dfr_Partial)
+    return writer.int_Rows
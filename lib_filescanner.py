@@ -0,0 +1,282 @@
+"""
+Scans for raw data files in a background thread so the file selection
+tab stays responsive on slow network drives.
+
+What has been found out about a file (which readers in
+lib_resultreadouts.dic_Readers accept it, which plates are in a BMG list
+file) is kept in a small index on disk. Entries are keyed by size and
+time of last modification, so revisiting a directory only looks at files
+that are new or have changed.
+
+Classes:
+    FileIndex
+    DirectoryScanner
+
+Functions:
+    get_file_index
+
+"""
+
+import os
+import json
+import threading
+from time import perf_counter, time
+
+import lib_resultreadouts as ro
+
+# Default location of the index, one per user
+str_IndexPath = os.path.join(os.path.expanduser("~"), ".bbq", "datafileindex.json")
+int_IndexVersion = 1
+# Directories to remember. The ones scanned longest ago get dropped first.
+int_MaxFolders = 200
+
+# Index shared by all file selection tabs, see get_file_index
+fileindex = None
+
+def get_file_index():
+    """
+    Returns the FileIndex shared by all file selection tabs.
+    """
+    global fileindex
+    if fileindex is None:
+        fileindex = FileIndex(str_IndexPath)
+    return fileindex
+
+class FileIndex:
+    """
+    What is known about data files, by directory and file name.
+    Safe to use from several threads.
+    """
+
+    def __init__(self, str_Path):
+        """
+        Initialises class attributes and loads the index if it exists.
+        A damaged or outdated index gets ignored.
+
+        Arguments:
+            str_Path -> string. Path of index file.
+        """
+        self.str_Path = str_Path
+        self.lock = threading.Lock()
+        self.bol_Changed = False
+        self.dic_Folders = {}
+        try:
+            with open(str_Path, "r") as fil:
+                dic_Index = json.load(fil)
+            if dic_Index["Version"] == int_IndexVersion:
+                self.dic_Folders = dic_Index["Folders"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def lookup(self, str_Folder, str_File, tpl_Stat):
+        """
+        Returns the entry for a file or None if there is none or the file
+        has changed since.
+
+        Arguments:
+            str_Folder -> string. Absolute path of directory
+            str_File -> string. File name
+            tpl_Stat -> tuple. Size and time of last modification of the file.
+        """
+        with self.lock:
+            dic_Entry = self.dic_Folders.get(str_Folder, {}).get("Files", {}).get(str_File)
+        if dic_Entry is None or not [dic_Entry["Size"], dic_Entry["Modified"]] == list(tpl_Stat):
+            return None
+        return dic_Entry
+
+    def store(self, str_Folder, str_File, tpl_Stat, dic_Values):
+        """
+        Writes the entry for a file. Values already in the entry are kept
+        as long as the file has not changed.
+
+        Arguments:
+            str_Folder -> string. Absolute path of directory
+            str_File -> string. File name
+            tpl_Stat -> tuple. Size and time of last modification of the file.
+            dic_Values -> dictionary. Values to write, e.g. {"Readers":[...]}
+        """
+        with self.lock:
+            dic_Folder = self.dic_Folders.setdefault(str_Folder, {"Scanned":0, "Files":{}})
+            dic_Entry = {"Size":tpl_Stat[0], "Modified":tpl_Stat[1]}
+            dic_Old = dic_Folder["Files"].get(str_File)
+            if not dic_Old is None and [dic_Old["Size"], dic_Old["Modified"]] == list(tpl_Stat):
+                dic_Entry.update(dic_Old)
+            dic_Entry.update(dic_Values)
+            # New dictionary, entries handed out by lookup() never change
+            dic_Folder["Files"][str_File] = dic_Entry
+            self.bol_Changed = True
+
+    def forget_missing(self, str_Folder, lst_Files, flt_Scanned):
+        """
+        Removes entries of files that are no longer in a directory and
+        notes when the directory was scanned.
+
+        Arguments:
+            str_Folder -> string. Absolute path of directory
+            lst_Files -> list. Names of files that are in the directory
+            flt_Scanned -> float. Time of scan in seconds since the epoch
+        """
+        with self.lock:
+            dic_Folder = self.dic_Folders.setdefault(str_Folder, {"Scanned":0, "Files":{}})
+            set_Files = set(lst_Files)
+            for str_File in [fil for fil in dic_Folder["Files"].keys() if not fil in set_Files]:
+                dic_Folder["Files"].pop(str_File)
+            dic_Folder["Scanned"] = flt_Scanned
+            self.bol_Changed = True
+
+    def save(self):
+        """
+        Writes the index to disk if it has changed. Failing to write
+        (e.g. no permission) is not an error, the index is only a cache.
+        """
+        with self.lock:
+            if self.bol_Changed == False:
+                return
+            lst_Folders = sorted(self.dic_Folders.keys(),
+                                 key=lambda str_Folder: self.dic_Folders[str_Folder]["Scanned"])
+            for str_Folder in lst_Folders[:max(0, len(lst_Folders) - int_MaxFolders)]:
+                self.dic_Folders.pop(str_Folder)
+            str_Index = json.dumps({"Version":int_IndexVersion, "Folders":self.dic_Folders})
+            self.bol_Changed = False
+        str_Part = self.str_Path + "." + str(os.getpid()) + "." + str(threading.get_ident()) + ".part"
+        try:
+            os.makedirs(os.path.dirname(self.str_Path), exist_ok=True)
+            with open(str_Part, "w") as fil:
+                fil.write(str_Index)
+            os.replace(str_Part, self.str_Path)
+        except OSError:
+            if os.path.exists(str_Part):
+                os.remove(str_Part)
+
+class DirectoryScanner(threading.Thread):
+    """
+    Background thread that finds the data files in a directory, or the
+    plates in a BMG list file, and hands them to a callback in batches.
+    The callback is called from the scanner thread, GUI code has to pass
+    the items on to the main thread (e.g. with wx.CallAfter).
+    """
+
+    def __init__(self, str_DataPath, str_Extension, str_Reader, callback,
+                 fileindex = None, int_BatchSize = 50):
+        """
+        Initialises class attributes.
+
+        Arguments:
+            str_DataPath -> string. Directory to scan. For BMG list files
+                            (str_Reader "bmg_list"): the file itself.
+            str_Extension -> string. File extension, e.g. ".xls"
+            str_Reader -> string. Name of reader in ro.dic_Readers. Only files
+                          it accepts are listed. None to list all files with
+                          the extension.
+            callback -> function taking the scanner, a list of items (strings)
+                        and whether the scan is finished (boolean). Called
+                        with an empty list when the scan finishes.
+            fileindex -> FileIndex. Uses the shared index if None.
+            int_BatchSize -> integer. Number of items to collect before
+                             calling the callback.
+        """
+        threading.Thread.__init__(self, daemon=True)
+        self.str_DataPath = str_DataPath
+        self.str_Extension = str_Extension
+        self.str_Reader = str_Reader
+        self.callback = callback
+        if fileindex is None:
+            fileindex = get_file_index()
+        self.fileindex = fileindex
+        self.int_BatchSize = int_BatchSize
+        self.evt_Cancel = threading.Event()
+        self.lst_Items = []
+
+    def cancel(self):
+        """
+        Stops the scan. The callback does not get called again.
+        """
+        self.evt_Cancel.set()
+
+    def run(self):
+        """
+        Scans and saves the index once done.
+        """
+        try:
+            if self.str_Reader in ro.dic_Readers.keys() and ro.dic_Readers[self.str_Reader]["ListFile"] == True:
+                self.scan_listfile()
+            else:
+                self.scan_directory()
+        finally:
+            self.fileindex.save()
+        if self.evt_Cancel.is_set() == False:
+            self.callback(self, [], True)
+
+    def stat(self, str_File):
+        """
+        Returns size and time of last modification of a file,
+        None if it does not exist.
+        """
+        try:
+            stat_File = os.stat(str_File)
+        except OSError:
+            return None
+        return (stat_File.st_size, stat_File.st_mtime)
+
+    def scan_listfile(self):
+        """
+        Gets the plate names in a BMG list file, from the index if the file
+        has been looked at before.
+        """
+        str_Folder, str_File = os.path.split(os.path.abspath(self.str_DataPath))
+        tpl_Stat = self.stat(self.str_DataPath)
+        if tpl_Stat is None:
+            return
+        dic_Entry = self.fileindex.lookup(str_Folder, str_File, tpl_Stat)
+        if not dic_Entry is None and "Plates" in dic_Entry.keys():
+            lst_Plates = dic_Entry["Plates"]
+        else:
+            lst_Plates = ro.get_bmg_list_namesonly(self.str_DataPath)
+            if lst_Plates is None:
+                lst_Plates = []
+            lst_Plates = [str(plate) for plate in lst_Plates]
+            self.fileindex.store(str_Folder, str_File, tpl_Stat, {"Plates":lst_Plates})
+        if self.evt_Cancel.is_set() == False and len(lst_Plates) > 0:
+            self.callback(self, lst_Plates, False)
+
+    def scan_directory(self):
+        """
+        Goes through the directory in the order of os.listdir. Files that
+        are not in the index or have changed get sniffed.
+        """
+        str_Folder = os.path.abspath(self.str_DataPath)
+        try:
+            lst_Files = os.listdir(str_Folder)
+        except OSError:
+            return
+        flt_Scanned = time()
+        flt_LastCall = perf_counter()
+        for str_File in lst_Files:
+            if self.evt_Cancel.is_set() == True:
+                return
+            if str_File.find(self.str_Extension) == -1:
+                continue
+            if self.str_Reader in ro.dic_Readers.keys():
+                str_Path = os.path.join(str_Folder, str_File)
+                tpl_Stat = self.stat(str_Path)
+                if tpl_Stat is None or os.path.isdir(str_Path) == True:
+                    continue
+                dic_Entry = self.fileindex.lookup(str_Folder, str_File, tpl_Stat)
+                if dic_Entry is None or not "Readers" in dic_Entry.keys():
+                    # Sniff for all readers, so the entry is useful for other assays, too
+                    lst_Readers = ro.sniff_datafile(str_Path)
+                    self.fileindex.store(str_Folder, str_File, tpl_Stat, {"Readers":lst_Readers})
+                else:
+                    lst_Readers = dic_Entry["Readers"]
+                if not self.str_Reader in lst_Readers:
+                    continue
+            self.lst_Items.append(str_File)
+            if len(self.lst_Items) >= self.int_BatchSize or perf_counter() - flt_LastCall > 0.25:
+                self.callback(self, self.lst_Items, False)
+                self.lst_Items = []
+                flt_LastCall = perf_counter()
+        if len(self.lst_Items) > 0 and self.evt_Cancel.is_set() == False:
+            self.callback(self, self.lst_Items, False)
+            self.lst_Items = []
+        if self.str_Reader in ro.dic_Readers.keys():
+            self.fileindex.forget_missing(str_Folder, lst_Files, flt_Scanned)
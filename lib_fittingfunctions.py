@@ -22,12 +22,25 @@ Functions:
     eq_thompson
     eq_krippendorff
 
+    jac_linear
+    jac_sigmoidal
+    jac_logMM
+    jac_thompson
+
     draw_any
     draw_linear
     draw_sigmoidal
     draw_logMM
     draw_thompson
 
+    guess_linear
+    guess_sigmoidal
+    is_plausible_sigmoidal
+    guess_logMM
+    count_evaluations
+    count_fit
+    reset_evaluations
+
     calculate_rsquare
     calculate_repcorr
     calculate_confidence
@@ -35,23 +48,64 @@ Functions:
     fit_sigmoidal_free
     fit_sigmoidal_free_dataframe
     fit_sigmoidal_const
+    fit_sigmoidal_batch
+    fit_sigmoidal_free_batch
+    fit_sigmoidal_const_batch
+    get_fit_key
+    get_cached_fit
+    clear_fit_cache
+    fit_sigmoidal_free_cached
+    fit_sigmoidal_const_cached
+    get_warm_start
     draw_sigmoidal_fit_error
     fit_thompson
+    thermal_shift
     fit_logMM_free
+    draw_rate_deriv
+    linear_regression
+    linear_fit
+    linear_fit_batch
+    linear_fit_result
+    derivative
+    derivative_matrix
+    derivative_batch
+    parabola_slope
+    parabola_vertex
 
 
 """
 
+import copy
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
 import scipy
 from scipy.optimize import curve_fit
+from scipy.special import expit
 from scipy.stats.distributions import t
 # from scipy.interpolate import CubicSpline
 from scipy.signal import savgol_filter
 from math import isinf
 import lib_datafunctions as df
 
+# Number of fits, function and jacobian evaluations per fit function. Gets filled
+# by the fit functions (see count_evaluations, count_fit). Each process counts on its own.
+dic_Evaluations = {}
+
+# Results of recent fits, keyed on everything that goes into the fit (see get_fit_key).
+# Used when refitting single samples, e.g. after datapoints get excluded/included.
+int_FitCacheSize = 2000
+dic_FitCache = OrderedDict()
+dic_CacheStatistics = {"Hits":0,"Misses":0}
+
+# Sigmoidal fits with an inflection point more than this factor outside the concentration
+# range, or with a plateau more than this many response ranges outside the responses,
+# count as failed (see is_plausible_sigmoidal).
+flt_MaxInflectionFactor = 100
+flt_MaxPlateauSpans = 10
+# Sigmoidal fits steeper than this do not get used as starting values (see get_warm_start).
+flt_MaxWarmStartSlope = 10
+
 #####  ###  #   #  ###  ##### #  ###  #   #  ####
 #     #   # #   # #   #   #   # #   # ##  # #
 ###   #   # #   # #####   #   # #   # #####  ###
@@ -155,6 +209,81 @@ def eq_krippendorf(t, IC50, S, KM, KI, kinact):
     return (((1+(S/KM))*KI)/(((kinact*(IC50/((KI*(1+(S/KM)))+IC50)))*t)/((2-((kinact*(IC50/((KI*(1+(S/KM)))+IC50)))*t))-(2*np.exp((((-1)*kinact)*(IC50/((KI*(1+(S/KM)))+IC50)))*t)))))
 
 
+def jac_linear(x, m, c):
+    """
+    Partial derivatives of eq_linear with respect to its parameters.
+
+    Arguments:
+        x -> float or array. Independent variable
+        m, c -> floats. See eq_linear.
+
+    Returns array with one column per parameter (m, c), as
+    scipy.optimize.curve_fit expects it for its jac argument.
+    """
+    x = np.asarray(x, dtype=float)
+    return np.stack([x, np.ones_like(x)], axis=-1)
+
+def jac_sigmoidal(x,ytop,ybot,h,i):
+    """
+    Partial derivatives of eq_sigmoidal with respect to its parameters.
+    Works on single values and on (stacked) numpy arrays.
+
+    Arguments:
+        x -> float or array. concentration/dose
+        ytop, ybot, h, i -> floats or arrays. See eq_sigmoidal.
+
+    Returns array with one column per parameter (ytop, ybot, h, i).
+    """
+    x = np.asarray(x, dtype=float)
+    # 1/(1 + (i/x)**h) written as logistic function of h*log(i/x), (i/x)**h
+    # itself overflows for steep slopes or doses far from the IC50.
+    lg = np.log(i/x)
+    s = expit(-h*lg)
+    dytop = s
+    dybot = 1 - s
+    dh = -(ytop - ybot)*s*(1 - s)*lg
+    di = -(ytop - ybot)*s*(1 - s)*h/i
+    return np.stack(np.broadcast_arrays(dytop, dybot, dh, di), axis=-1)
+
+def jac_logMM(t, y0, b, t0):
+    """
+    Partial derivatives of eq_logMM with respect to its parameters.
+
+    Arguments:
+        t -> float or array. Timepoints
+        y0, b, t0 -> floats. See eq_logMM.
+
+    Returns array with one column per parameter (y0, b, t0).
+    """
+    t = np.asarray(t, dtype=float)
+    dy0 = np.ones_like(t)
+    db = np.log(1 + t/t0)
+    dt0 = -b*t/(t0*(t0 + t))
+    return np.stack([dy0, db, dt0], axis=-1)
+
+def jac_thompson(T,yf,mf,yu,mu,Tm,H):
+    """
+    Partial derivatives of eq_thompson with respect to its parameters.
+
+    Arguments:
+        T -> float or array. Temperature
+        yf, mf, yu, mu, Tm, H -> floats. See eq_thompson.
+
+    Returns array with one column per parameter (yf, mf, yu, mu, Tm, H).
+    """
+    T = np.asarray(T, dtype=float)
+    E = np.exp((H*((T-Tm)/Tm))/(8.3145*T))
+    # Derivative of the equation with respect to the exponential term
+    dE = ((yu+(mu*T)) - (yf+(mf*T)))/(1+E)**2
+    dyf = 1/(1+E)
+    dmf = T/(1+E)
+    dyu = E/(1+E)
+    dmu = T*E/(1+E)
+    dTm = dE*E*(-H/(8.3145*Tm**2))
+    dH = dE*E*((T-Tm)/Tm)/(8.3145*T)
+    return np.stack([dyf, dmf, dyu, dmu, dTm, dH], axis=-1)
+
+
 ####  ####   ###  #     # # #   #  ####
 #   # #   # #   # #     # # ##  # #
 #   # ####  ##### #  #  # # ##### #  ##
@@ -237,6 +366,161 @@ def draw_thompson(temp, pars):
 #   # #   #   #   #   #   #  ## #   # #   # #     #   #     #
 ####  #   #   #   #   #    ####  ###  #   # ##### #   #     #
 
+def guess_linear(xdata, ydata):
+    """
+    Estimates starting values for a linear fit from the two
+    outermost datapoints.
+
+    Arguments:
+        xdata -> list of floats. Independent variable, without np.nan
+        ydata -> list of floats. Dependent variable, without np.nan
+
+    Returns list of floats in order m, c
+    """
+    xdata = np.asarray(xdata, dtype=float)
+    ydata = np.asarray(ydata, dtype=float)
+    idx_Min = np.argmin(xdata)
+    idx_Max = np.argmax(xdata)
+    if xdata[idx_Max] > xdata[idx_Min]:
+        m = (ydata[idx_Max] - ydata[idx_Min])/(xdata[idx_Max] - xdata[idx_Min])
+    else:
+        m = 1
+    return [m, ydata[idx_Min] - m*xdata[idx_Min]]
+
+def guess_sigmoidal(doses, responses):
+    """
+    Estimates starting values for a sigmoidal fit from the data:
+    Top and bottom from the responses at the highest and lowest
+    concentration, inflection point at the first concentration where
+    the responses cross the half-way mark between the two.
+
+    Arguments:
+        doses -> list of floats. Concentrations in micromolar, without np.nan
+        responses -> list of floats. Matching responses, without np.nan
+
+    Returns list of floats in order ytop, ybot, h, i
+    """
+    doses = np.asarray(doses, dtype=float)
+    responses = np.asarray(responses, dtype=float)
+    idx_Sort = np.argsort(doses, kind="stable")
+    doses = doses[idx_Sort]
+    responses = responses[idx_Sort]
+    ytop = responses[-1]
+    ybot = responses[0]
+    half = (ytop + ybot)/2
+    if ytop >= ybot:
+        crossed = np.nonzero(responses >= half)[0]
+    else:
+        crossed = np.nonzero(responses <= half)[0]
+    if len(crossed) > 0 and doses[crossed[0]] > 0:
+        i = doses[crossed[0]]
+    else:
+        i = 1
+    return [ytop, ybot, 1, i]
+
+def is_plausible_sigmoidal(doses, responses, pars):
+    """
+    Tests whether the parameters of a sigmoidal fit describe the data
+    or an extrapolation far beyond it, e.g. a curve that only starts to
+    bend orders of magnitude above the highest concentration. The fit
+    can converge to such parameters, but they cannot be reported.
+    Limits are flt_MaxInflectionFactor and flt_MaxPlateauSpans.
+
+    Arguments:
+        doses -> list of floats. Concentrations in micromolar, without np.nan
+        responses -> list of floats. Matching responses, without np.nan
+        pars -> list of floats. ytop, ybot, h, i
+
+    Returns boolean.
+    """
+    doses = np.asarray(doses, dtype=float)
+    responses = np.asarray(responses, dtype=float)
+    doses = doses[doses > 0]
+    if len(doses) == 0 or len(responses) == 0:
+        return True
+    if (pars[3] < np.min(doses)/flt_MaxInflectionFactor
+        or pars[3] > np.max(doses)*flt_MaxInflectionFactor):
+        return False
+    span = np.max(responses) - np.min(responses)
+    for plateau in pars[:2]:
+        if (plateau < np.min(responses) - flt_MaxPlateauSpans*span
+            or plateau > np.max(responses) + flt_MaxPlateauSpans*span):
+            return False
+    return True
+
+def guess_logMM(time, signal):
+    """
+    Estimates starting values for a fit of the logarithmic
+    approximation of the Michaelis-Menten equation (eq_logMM).
+    y0 is the first signal. t0 follows from the time at which the
+    signal has covered half its total change, b from the total change.
+
+    Arguments:
+        time -> list of floats. Timepoints, without np.nan
+        signal -> list of floats. Measured signal, without np.nan
+
+    Returns list of floats in order y0, b, t0
+    """
+    time = np.asarray(time, dtype=float)
+    signal = np.asarray(signal, dtype=float)
+    idx_Sort = np.argsort(time, kind="stable")
+    time = time[idx_Sort]
+    signal = signal[idx_Sort]
+    y0 = signal[0]
+    span = signal[-1] - y0
+    duration = time[-1] - time[0]
+    # For y0 + b*ln(1+t/t0), half the change at th over a duration T means
+    # (1 + th/t0)**2 = 1 + T/t0, i.e. t0 = th**2/(T - 2*th).
+    crossed = np.nonzero((signal - y0)*np.sign(span) >= abs(span)/2)[0]
+    if len(crossed) > 0:
+        th = time[crossed[0]] - time[0]
+    else:
+        th = duration/2
+    if th > 0 and duration > 2*th:
+        t0 = th**2/(duration - 2*th)
+    elif duration > 0:
+        t0 = duration
+    else:
+        t0 = 1
+    b = span/np.log(1 + duration/t0) if duration > 0 and not span == 0 else 1
+    return [y0, b, t0]
+
+def count_evaluations(func, str_Fit, str_Counter = "Evaluations"):
+    """
+    Wraps a function so that every call gets counted in dic_Evaluations.
+    Used to measure how much work each fit function does.
+
+    Arguments:
+        func -> function to wrap (equation or jacobian)
+        str_Fit -> string. Name of the fit function to count for.
+        str_Counter -> string. "Evaluations" or "Jacobians"
+    """
+    dic_Fit = dic_Evaluations.setdefault(str_Fit, {"Fits":0,"Evaluations":0,"Jacobians":0})
+    def counted(*args):
+        dic_Fit[str_Counter] += 1
+        return func(*args)
+    return counted
+
+def count_fit(str_Fit, int_Fits = 1, int_Evaluations = 0):
+    """
+    Counts a fit (or several for batch fits) in dic_Evaluations.
+
+    Arguments:
+        str_Fit -> string. Name of the fit function.
+        int_Fits -> integer. Number of fits.
+        int_Evaluations -> integer. Evaluations not counted via
+                           count_evaluations.
+    """
+    dic_Fit = dic_Evaluations.setdefault(str_Fit, {"Fits":0,"Evaluations":0,"Jacobians":0})
+    dic_Fit["Fits"] += int_Fits
+    dic_Fit["Evaluations"] += int_Evaluations
+
+def reset_evaluations():
+    """
+    Clears dic_Evaluations.
+    """
+    dic_Evaluations.clear()
+
 def calculate_rsquare(data,fit):
     """
     Calculates R square value for given dataset and fit.
@@ -299,7 +583,11 @@ def calculate_repcorr(rep1, rep2):
     dfr_Temp = pd.DataFrame(data={"rep1":rep1_trimmed,"rep2":rep2_trimmed}).sort_values(by=["rep1"],ascending=[True])
 
     # Perform linear fit
-    pars, covar = curve_fit(eq_linear, dfr_Temp["rep1"], dfr_Temp["rep2"])
+    count_fit("calculate_repcorr")
+    pars, covar = curve_fit(count_evaluations(eq_linear, "calculate_repcorr"),
+                            dfr_Temp["rep1"], dfr_Temp["rep2"],
+                            p0=guess_linear(dfr_Temp["rep1"], dfr_Temp["rep2"]),
+                            jac=count_evaluations(jac_linear, "calculate_repcorr", "Jacobians"))
     # get values for linear fit
     linfit = draw_linear(dfr_Temp["rep1"], pars)
     # Calculate R square and Pearson's correlation coefficient
@@ -341,7 +629,7 @@ def calculate_confidence(n,pars,covar):
     
     return confidence
 
-def fit_sigmoidal_free(doses, responses, parsonly = False, skiptrim = False):
+def fit_sigmoidal_free(doses, responses, parsonly = False, skiptrim = False, guess = None):
     """
     Fits sigmoidal dose response curve to the provided
     dataset without constraints. Uses scipy.optimize.curve_fit
@@ -353,6 +641,9 @@ def fit_sigmoidal_free(doses, responses, parsonly = False, skiptrim = False):
         parsonly -> boolean. If true, does not return fit, success, Rsquare
         skiptrim -> boolean. If True, does not adjust doeses from molar to
                     micromolar.
+        guess -> list of floats. Starting values for the parameters, e.g. from
+                 a previous fit of the same sample. If None, they get estimated
+                 from the data (see guess_sigmoidal).
 
     Returns:
         fit -> list of floats. Fitted curve
@@ -379,9 +670,20 @@ def fit_sigmoidal_free(doses, responses, parsonly = False, skiptrim = False):
     doses_trim = df.moles_to_micromoles(doses_trim)
     # Perform curve_fit with scipy:
     try:
-        pars, covar = curve_fit(eq_sigmoidal,
+        if guess is None:
+            guess = guess_sigmoidal(doses_trim, resp_trim)
+        count_fit("fit_sigmoidal_free")
+        pars, covar = curve_fit(count_evaluations(eq_sigmoidal, "fit_sigmoidal_free"),
                                 doses_trim,
-                                resp_trim)
+                                resp_trim,
+                                p0=guess,
+                                jac=count_evaluations(jac_sigmoidal, "fit_sigmoidal_free", "Jacobians"))
+        # curve_fit does not raise if the parameters or their covariance end up
+        # infinite or undefined, but such a fit cannot be used.
+        if np.isfinite(pars).all() == False or np.isfinite(np.diagonal(covar)).all() == False:
+            raise RuntimeError("Fit parameters or covariance not finite")
+        if is_plausible_sigmoidal(doses_trim, resp_trim, pars) == False:
+            raise RuntimeError("Fit extrapolates far beyond the data")
         confidence = calculate_confidence(len(doses_trim),
                                           pars,
                                           covar)
@@ -455,7 +757,7 @@ def fit_sigmoidal_free_dataframe(doses, responses, parsonly = False, skiptrim =
 
     return dfr_Return
 
-def fit_sigmoidal_const(doses, responses, sem,parsonly = False, skiptrim = False):
+def fit_sigmoidal_const(doses, responses, sem,parsonly = False, skiptrim = False, guess = None):
     """
     Fits sigmoidal dose response curve to the provided
     dataset WITH constraints. Dataset HAS to be normalised
@@ -474,6 +776,9 @@ def fit_sigmoidal_const(doses, responses, sem,parsonly = False, skiptrim = False
         parsonly -> boolean. If true, does not return fit, success, Rsquare
         skiptrim -> boolean. If True, does not adjust doeses from molar to
                     micromolar.
+        guess -> list of floats. Starting values for the parameters, e.g. from
+                 a previous fit of the same sample. If None, they get estimated
+                 from the data (see guess_sigmoidal).
 
     Returns:
         fit -> list of floats. Fitted curve
@@ -513,13 +818,26 @@ def fit_sigmoidal_const(doses, responses, sem,parsonly = False, skiptrim = False
     # 20 > ybot > -20
     # Perform curve_fit with scipy:
     try:
-        pars, covar = curve_fit(eq_sigmoidal,
+        lst_Lower = [90,-10,-np.inf,-np.inf]
+        lst_Upper = [110,10,np.inf,np.inf]
+        if guess is None:
+            guess = guess_sigmoidal(doses_trim, resp_trim)
+        guess = np.clip(guess, lst_Lower, lst_Upper)
+        count_fit("fit_sigmoidal_const")
+        pars, covar = curve_fit(count_evaluations(eq_sigmoidal, "fit_sigmoidal_const"),
                                 doses_trim,
                                 resp_trim,
+                                p0=guess,
+                                jac=count_evaluations(jac_sigmoidal, "fit_sigmoidal_const", "Jacobians"),
                                 sigma=sem_trim,
                                 absolute_sigma=True,
-                                bounds=([90,-10,-np.inf,-np.inf],
-                                        [110,10,np.inf,np.inf]))
+                                bounds=(lst_Lower,lst_Upper))
+        # curve_fit does not raise if the parameters or their covariance end up
+        # infinite or undefined, but such a fit cannot be used.
+        if np.isfinite(pars).all() == False or np.isfinite(np.diagonal(covar)).all() == False:
+            raise RuntimeError("Fit parameters or covariance not finite")
+        if is_plausible_sigmoidal(doses_trim, resp_trim, pars) == False:
+            raise RuntimeError("Fit extrapolates far beyond the data")
         confidence = calculate_confidence(len(doses_trim),pars,covar)
         stderr = np.sqrt(np.diagonal(covar))
         if parsonly == False:
@@ -549,6 +867,318 @@ def fit_sigmoidal_const(doses, responses, sem,parsonly = False, skiptrim = False
     else:
         return pars, confidence, stderr
 
+def fit_sigmoidal_batch(lstlst_Doses, lstlst_Responses, lstlst_SEM = None,
+                        bounds = None, int_MaxIterations = 200):
+    """
+    Fits sigmoidal dose response curves to many datasets at once.
+    All curves are stacked into 2D numpy arrays (one row per curve,
+    padded with np.nan) and a Levenberg-Marquardt minimisation runs on
+    all rows simultaneously, with a damping factor for each curve.
+    np.nan in the responses are masked out, as the single fits would
+    trim them. If bounds are given, every step gets clipped to them.
+
+    Curves for which the batched minimisation does not converge are
+    handed to fit_sigmoidal_free/fit_sigmoidal_const, so the results
+    and failure behaviour are the same as fitting each sample on its own.
+
+    Arguments:
+        lstlst_Doses -> list of lists of floats. Concentrations in Molar.
+        lstlst_Responses -> list of lists of floats.
+        lstlst_SEM -> list of lists of floats or None. Standard errors of
+                      mean for each datapoint. If given, the fit is
+                      weighted and covariances are absolute (as in
+                      fit_sigmoidal_const).
+        bounds -> tuple of two lists (lower, upper) or None.
+        int_MaxIterations -> integer. Maximum number of iterations.
+
+    Returns list of tuples, one per curve, holding the same as
+    fit_sigmoidal_free: fit, pars, confidence, stderr, Rsquare, success
+    """
+    int_Curves = len(lstlst_Responses)
+    if int_Curves == 0:
+        return []
+    int_Points = max([len(lst) for lst in lstlst_Responses])
+    # Stack everything into arrays, padded with np.nan
+    arr_Dose = np.full((int_Curves,int_Points), np.nan)
+    arr_Resp = np.full((int_Curves,int_Points), np.nan)
+    arr_Sigma = np.ones((int_Curves,int_Points))
+    for c in range(int_Curves):
+        n = len(lstlst_Responses[c])
+        # Same unit conversion as df.moles_to_micromoles
+        arr_Dose[c,:n] = np.trunc(np.array(lstlst_Doses[c], dtype=float)*1000000*100000)/100000
+        arr_Resp[c,:n] = np.array(lstlst_Responses[c], dtype=float)
+        if lstlst_SEM is not None:
+            arr_Sigma[c,:n] = np.array(lstlst_SEM[c], dtype=float)
+    if lstlst_SEM is not None:
+        # See fit_sigmoidal_const: curve_fit would divide by 0.
+        arr_Sigma[arr_Sigma == 0] = 0.01
+    arr_Mask = ~np.isnan(arr_Resp) & ~np.isnan(arr_Dose)
+    arr_Weight = np.where(arr_Mask, 1/arr_Sigma**2, 0)
+    arr_Count = arr_Mask.sum(axis=1)
+    # Invalid input (e.g. SEM of np.nan) is left to the single fits.
+    arr_Valid = np.isfinite(arr_Weight).all(axis=1) & (arr_Count >= 4)
+    arr_Weight[~np.isfinite(arr_Weight)] = 0
+    arr_X = np.where(arr_Mask, arr_Dose, 1)
+    arr_Y = np.where(arr_Mask, arr_Resp, 0)
+
+    if bounds is None:
+        arr_Lower = np.full(4, -np.inf)
+        arr_Upper = np.full(4, np.inf)
+    else:
+        arr_Lower = np.array(bounds[0], dtype=float)
+        arr_Upper = np.array(bounds[1], dtype=float)
+
+    # Initial guesses from the data
+    arr_Pars = np.ones((int_Curves,4))
+    for c in range(int_Curves):
+        if arr_Valid[c] == True:
+            arr_Pars[c] = guess_sigmoidal(arr_X[c,arr_Mask[c]], arr_Y[c,arr_Mask[c]])
+    arr_Pars = np.clip(arr_Pars, arr_Lower, arr_Upper)
+
+    def residuals(arr_Rows, arr_P):
+        with np.errstate(all="ignore"):
+            arr_Fit = eq_sigmoidal(arr_X[arr_Rows], *[arr_P[:,k,None] for k in range(4)])
+        return np.where(arr_Mask[arr_Rows], arr_Fit - arr_Y[arr_Rows], 0)
+
+    def jacobian(arr_Rows, arr_P):
+        with np.errstate(all="ignore"):
+            arr_Jac = jac_sigmoidal(arr_X[arr_Rows], *[arr_P[:,k,None] for k in range(4)])
+        return np.where(arr_Mask[arr_Rows][:,:,None], arr_Jac, 0)
+
+    def cost(arr_Rows, arr_Res):
+        arr_Cost = np.sum(arr_Weight[arr_Rows]*arr_Res**2, axis=1)
+        return np.where(np.isfinite(arr_Cost), arr_Cost, np.inf)
+
+    arr_Rows = np.arange(int_Curves)
+    arr_Cost = np.full(int_Curves, np.inf)
+    arr_Cost[arr_Valid] = cost(arr_Rows[arr_Valid], residuals(arr_Rows[arr_Valid], arr_Pars[arr_Valid]))
+    arr_Lambda = np.full(int_Curves, 0.001)
+    arr_Converged = np.zeros(int_Curves, dtype=bool)
+    arr_Active = arr_Valid & np.isfinite(arr_Cost)
+    arr_Evaluations = arr_Active.astype(int)
+    for it in range(int_MaxIterations):
+        arr_Rows = np.nonzero(arr_Active)[0]
+        if len(arr_Rows) == 0:
+            break
+        arr_P = arr_Pars[arr_Rows]
+        arr_Res = residuals(arr_Rows, arr_P)
+        arr_Jac = jacobian(arr_Rows, arr_P)
+        arr_W = arr_Weight[arr_Rows]
+        arr_JTW = np.transpose(arr_Jac*arr_W[:,:,None], (0,2,1))
+        arr_A = arr_JTW @ arr_Jac
+        arr_G = (arr_JTW @ arr_Res[:,:,None])[:,:,0]
+        arr_G[~np.isfinite(arr_G)] = 0
+        # Parameters sitting on a bound that the gradient pushes against stay where they are
+        arr_Fixed = ((arr_P <= arr_Lower) & (arr_G > 0)) | ((arr_P >= arr_Upper) & (arr_G < 0))
+        arr_Free = (~arr_Fixed).astype(float)
+        arr_A = arr_A*arr_Free[:,:,None]*arr_Free[:,None,:] + (arr_Fixed[:,:,None]*np.eye(4))
+        arr_G = arr_G*arr_Free
+        arr_Diag = np.maximum(np.diagonal(arr_A, axis1=1, axis2=2), 1e-12)
+        arr_Damped = arr_A + (arr_Lambda[arr_Rows,None]*arr_Diag)[:,:,None]*np.eye(4)
+        arr_Damped[~np.isfinite(arr_Damped).all(axis=(1,2))] = np.eye(4)
+        try:
+            arr_Step = -np.linalg.solve(arr_Damped, arr_G[:,:,None])[:,:,0]
+        except np.linalg.LinAlgError:
+            arr_Step = -(np.linalg.pinv(arr_Damped) @ arr_G[:,:,None])[:,:,0]
+        arr_New = np.clip(arr_P + arr_Step, arr_Lower, arr_Upper)
+        arr_NewCost = cost(arr_Rows, residuals(arr_Rows, arr_New))
+        arr_Evaluations[arr_Rows] += 1
+        arr_Better = arr_NewCost < arr_Cost[arr_Rows]
+        # Converged once the cost or the parameters barely change on a successful step
+        arr_SmallCost = (arr_Cost[arr_Rows] - arr_NewCost) <= 1e-10*arr_Cost[arr_Rows]
+        arr_SmallStep = np.all(np.abs(arr_New - arr_P) <= 1e-10*(np.abs(arr_P) + 1e-10), axis=1)
+        arr_Done = (arr_Better & arr_SmallCost) | arr_SmallStep | (arr_Cost[arr_Rows] == 0)
+        arr_Pars[arr_Rows[arr_Better]] = arr_New[arr_Better]
+        arr_Cost[arr_Rows[arr_Better]] = arr_NewCost[arr_Better]
+        arr_Lambda[arr_Rows] = np.where(arr_Better, arr_Lambda[arr_Rows]/10, arr_Lambda[arr_Rows]*10)
+        arr_Converged[arr_Rows[arr_Done]] = True
+        arr_Active[arr_Rows[arr_Done]] = False
+        # Give up on curves where no step reduces the cost any more
+        arr_Active[arr_Rows[arr_Lambda[arr_Rows] > 1e10]] = False
+
+    # Covariance matrices from the Jacobian at the solution, as curve_fit does it.
+    arr_Rows = np.nonzero(arr_Converged)[0]
+    arr_Jac = jacobian(arr_Rows, arr_Pars[arr_Rows])
+    arr_JTW = np.transpose(arr_Jac*arr_Weight[arr_Rows][:,:,None], (0,2,1))
+    arr_Covar = np.full((int_Curves,4,4), np.inf)
+    if len(arr_Rows) > 0:
+        arr_Finite = np.isfinite(arr_JTW).all(axis=(1,2))
+        arr_Covar[arr_Rows[arr_Finite]] = np.linalg.pinv(arr_JTW[arr_Finite] @ arr_Jac[arr_Finite])
+    arr_DoF = arr_Count - 4
+    if lstlst_SEM is None:
+        # Relative weights -> scale with reduced chi square
+        with np.errstate(all="ignore"):
+            arr_Scale = np.where(arr_DoF > 0, arr_Cost/arr_DoF, np.inf)
+        arr_Covar = arr_Covar*arr_Scale[:,None,None]
+    # A non-positive inflection point makes (i/x)**h undefined for most slopes. Curves without
+    # finite parameters and covariance or with implausible parameters go to the single fits,
+    # which count them as failed.
+    arr_Converged = (arr_Converged & np.isfinite(arr_Pars).all(axis=1) & (arr_Pars[:,3] > 0)
+        & np.isfinite(np.diagonal(arr_Covar, axis1=1, axis2=2)).all(axis=1))
+    for c in np.nonzero(arr_Converged)[0]:
+        arr_Converged[c] = is_plausible_sigmoidal(arr_X[c,arr_Mask[c]], arr_Y[c,arr_Mask[c]], arr_Pars[c])
+    count_fit("fit_sigmoidal_batch", int(np.sum(arr_Converged)), int(np.sum(arr_Evaluations[arr_Converged])))
+
+    # Fits, R square values and confidence intervals for all curves at once
+    with np.errstate(all="ignore"):
+        arr_Fit = eq_sigmoidal(arr_Dose, *[arr_Pars[:,k,None] for k in range(4)])
+        arr_Data = np.where(np.isnan(arr_Resp), 0, arr_Resp)
+        arr_Mean = np.sum(arr_Data, axis=1)/np.maximum(arr_Count, 1)
+        arr_RSS = np.sum(np.where(arr_Mask, (arr_Data - arr_Fit)**2, 0), axis=1)
+        arr_TSS = np.sum(np.where(arr_Mask, (arr_Data - arr_Mean[:,None])**2, 0), axis=1)
+        arr_RSquare = np.round(1 - arr_RSS/arr_TSS, 4)
+        arr_Variance = np.diagonal(arr_Covar, axis1=1, axis2=2)
+        arr_StdErr = np.sqrt(arr_Variance)
+        arr_TValue = t.ppf(1.0-0.05/2., np.maximum(0, arr_DoF))
+        arr_Confidence = np.where(np.isinf(arr_Variance), np.nan, arr_StdErr*arr_TValue[:,None])
+
+    lst_Results = []
+    for c in range(int_Curves):
+        if arr_Converged[c] == False:
+            # Let scipy have a go at this one
+            if lstlst_SEM is None:
+                lst_Results.append(fit_sigmoidal_free(lstlst_Doses[c], lstlst_Responses[c]))
+            else:
+                lst_Results.append(fit_sigmoidal_const(lstlst_Doses[c], lstlst_Responses[c], lstlst_SEM[c]))
+            continue
+        n = len(lstlst_Responses[c])
+        lst_Results.append((arr_Fit[c,:n].tolist(), arr_Pars[c].copy(), arr_Confidence[c].tolist(),
+            arr_StdErr[c].copy(), float(arr_RSquare[c]), True))
+
+    return lst_Results
+
+def fit_sigmoidal_free_batch(lstlst_Doses, lstlst_Responses):
+    """
+    Wrapper function for fit_sigmoidal_batch. Free fit of
+    many datasets, results match fit_sigmoidal_free.
+
+    Arguments:
+        lstlst_Doses -> list of lists of floats. Concentrations in Molar.
+        lstlst_Responses -> list of lists of floats.
+    """
+    return fit_sigmoidal_batch(lstlst_Doses, lstlst_Responses)
+
+def fit_sigmoidal_const_batch(lstlst_Doses, lstlst_Responses, lstlst_SEM):
+    """
+    Wrapper function for fit_sigmoidal_batch. Constrained fit of
+    many normalised datasets, results match fit_sigmoidal_const.
+
+    Arguments:
+        lstlst_Doses -> list of lists of floats. Concentrations in Molar.
+        lstlst_Responses -> list of lists of floats.
+        lstlst_SEM -> list of lists of floats. Standard errors of mean.
+    """
+    return fit_sigmoidal_batch(lstlst_Doses, lstlst_Responses, lstlst_SEM,
+                               bounds=([90,-10,-np.inf,-np.inf],
+                                       [110,10,np.inf,np.inf]))
+
+def get_fit_key(str_Model, doses, responses, sem = None, bounds = None):
+    """
+    Turns everything that determines the outcome of a fit into a
+    hashable key for dic_FitCache. np.nan becomes None, since np.nan
+    is not equal to itself.
+
+    Arguments:
+        str_Model -> string. Name of the fit function
+        doses -> list of floats.
+        responses -> list of floats.
+        sem -> list of floats or None.
+        bounds -> tuple of lists or None.
+    """
+    def as_tuple(lst_Values):
+        if lst_Values is None:
+            return None
+        return tuple([None if pd.isna(value) else float(value) for value in lst_Values])
+    if not bounds is None:
+        bounds = (as_tuple(bounds[0]), as_tuple(bounds[1]))
+    return (str_Model, as_tuple(doses), as_tuple(responses), as_tuple(sem), bounds)
+
+def get_cached_fit(tpl_Key, fit):
+    """
+    Returns the result for tpl_Key from dic_FitCache or performs the fit
+    and stores its result. The cache only holds the int_FitCacheSize most
+    recently used results. Results get copied on the way in and out, as
+    they end up in dataframes whose lists get changed in place.
+
+    Arguments:
+        tpl_Key -> tuple. See get_fit_key.
+        fit -> function without arguments that performs the fit.
+    """
+    if tpl_Key in dic_FitCache:
+        dic_FitCache.move_to_end(tpl_Key)
+        dic_CacheStatistics["Hits"] += 1
+        return copy.deepcopy(dic_FitCache[tpl_Key])
+    dic_CacheStatistics["Misses"] += 1
+    tpl_Result = fit()
+    dic_FitCache[tpl_Key] = copy.deepcopy(tpl_Result)
+    if len(dic_FitCache) > int_FitCacheSize:
+        dic_FitCache.popitem(last=False)
+    return tpl_Result
+
+def clear_fit_cache():
+    """
+    Empties dic_FitCache and resets the hit/miss counters.
+    """
+    dic_FitCache.clear()
+    dic_CacheStatistics["Hits"] = 0
+    dic_CacheStatistics["Misses"] = 0
+
+def fit_sigmoidal_free_cached(doses, responses, guess = None):
+    """
+    Cached version of fit_sigmoidal_free: Returns the stored result if
+    the same doses and responses have been fitted before.
+
+    Arguments:
+        doses -> list of floats. Concentrations in Molar.
+        responses -> list of floats.
+        guess -> list of floats. Starting values for a new fit, e.g.
+                 the current parameters of the sample (warm start).
+
+    Returns the same as fit_sigmoidal_free.
+    """
+    return get_cached_fit(get_fit_key("fit_sigmoidal_free", doses, responses),
+                          lambda: fit_sigmoidal_free(doses, responses, guess = guess))
+
+def fit_sigmoidal_const_cached(doses, responses, sem, guess = None):
+    """
+    Cached version of fit_sigmoidal_const: Returns the stored result if
+    the same doses, responses and SEMs have been fitted before.
+
+    Arguments:
+        doses -> list of floats. Concentrations in Molar.
+        responses -> list of floats.
+        sem -> list of floats. Standard errors of mean for each datapoint
+        guess -> list of floats. Starting values for a new fit, e.g.
+                 the current parameters of the sample (warm start).
+
+    Returns the same as fit_sigmoidal_const.
+    """
+    return get_cached_fit(get_fit_key("fit_sigmoidal_const", doses, responses, sem,
+                                      ([90,-10,-np.inf,-np.inf],[110,10,np.inf,np.inf])),
+                          lambda: fit_sigmoidal_const(doses, responses, sem, guess = guess))
+
+def get_warm_start(pars, success = True):
+    """
+    Returns parameters of a previous fit as starting values for a new
+    one, or None if there is no usable previous fit. Fits that failed,
+    have parameters that are not finite or a slope steeper than
+    flt_MaxWarmStartSlope are not usable: a curve that steep is all but
+    a step, and fits started from it tend to stay one.
+
+    Arguments:
+        pars -> list of floats. Parameters of previous fit.
+        success -> boolean. Whether the previous fit was successful.
+    """
+    if not success == True:
+        return None
+    try:
+        if (len(pars) == 4 and np.all(np.isfinite(np.array(pars, dtype=float))) == True
+            and abs(pars[2]) <= flt_MaxWarmStartSlope):
+            return list(pars)
+    except (TypeError, ValueError):
+        pass
+    return None
+
 def draw_sigmoidal_fit_error(doses, pars, stderr):
     """
     This function draws the area that covers the 95%
@@ -627,10 +1257,12 @@ def fit_thompson(temp, fluo, guess, parsonly = False):
 
     # Perform curve_fit with scipy:
     try:
-        pars, covar = curve_fit(eq_thompson,
+        count_fit("fit_thompson")
+        pars, covar = curve_fit(count_evaluations(eq_thompson, "fit_thompson"),
                                 temp_trim,
                                 fluo_trim,
-                                p0=guess)#, bounds=constraints)
+                                p0=guess,
+                                jac=count_evaluations(jac_thompson, "fit_thompson", "Jacobians"))#, bounds=constraints)
         confidence = calculate_confidence(len(temp_trim),pars,covar)
         stderr = np.sqrt(np.diagonal(covar))
         success = True
@@ -678,15 +1310,14 @@ def thermal_shift(temp, fluo, constraints, guess, parameters_only):
     #for i in range(len(lst_Derivative)-1):
     #    lst_Derivative[i] = lst_Derivative[i]/lst_TempDifference[i]
 
-    for i in range(0,len(temp),int_Sampling):
-        if i > int_Sampling-1 and i < (len(temp)-int_Sampling):
-            #lst_x = [temp[i-int_Sampling],temp[i],temp[i+int_Sampling]]
-            #lst_y = [fluo[i-int_Sampling],fluo[i],fluo[i+int_Sampling]]
-            lst_Parameters, fnord = curve_fit(eq_parabola,
-                [temp[i-int_Sampling],temp[i],temp[i+int_Sampling]],
-                [fluo[i-int_Sampling],fluo[i],fluo[i+int_Sampling]])
-            lst_Derivative.append(2*lst_Parameters[0]*temp[i] + lst_Parameters[1])
-            lst_TempFitting.append(temp[i])
+    # The parabola through three points is known in closed form, so the slopes at all
+    # points get calculated in one go instead of fitting each parabola.
+    arr_Temp = np.asarray(temp, dtype=float)
+    arr_Fluo = np.asarray(fluo, dtype=float)
+    arr_Points = np.arange(int_Sampling, len(temp)-int_Sampling, int_Sampling)
+    lst_Derivative = parabola_slope(arr_Temp[arr_Points-int_Sampling], arr_Temp[arr_Points], arr_Temp[arr_Points+int_Sampling],
+                                    arr_Fluo[arr_Points-int_Sampling], arr_Fluo[arr_Points], arr_Fluo[arr_Points+int_Sampling])
+    lst_TempFitting = arr_Temp[arr_Points]
 
     #lst_Before = []
     #lst_After = []
@@ -750,7 +1381,10 @@ def fit_logMM_free(lst_Time, lst_Signal, parsonly = False):
     lst_Signal = lst_Signal_New
 
     try:
-        pars, covar = curve_fit(eq_logMM, lst_Time, lst_Signal)#, p0=guess)#, bounds=grenzen)
+        count_fit("fit_logMM_free")
+        pars, covar = curve_fit(count_evaluations(eq_logMM, "fit_logMM_free"), lst_Time, lst_Signal,
+                                p0=guess_logMM(lst_Time, lst_Signal),
+                                jac=count_evaluations(jac_logMM, "fit_logMM_free", "Jacobians"))#, bounds=grenzen)
         confidence = calculate_confidence(len(lst_Time),pars,covar)
         stderr = np.sqrt(np.diagonal(covar))
         if parsonly == False:
@@ -771,58 +1405,163 @@ def fit_logMM_free(lst_Time, lst_Signal, parsonly = False):
         return pars, confidence, stderr
 
 def draw_rate_deriv(lst_Time, lst_Pars):
-    lst_Deriv = []
-    for i in range(len(lst_Time)):
-        lst_Deriv.append(eq_logMM1stDerivative(lst_Time[i], *lst_Pars))
-    min_der = min(lst_Deriv)
-    max_der = max(lst_Deriv) - min_der
-    for i in range(len(lst_Deriv)):
-        lst_Deriv[i] = (lst_Deriv[i]-min_der)/max_der
-    return lst_Deriv
+    """
+    Draws the first derivative of the logarithmic approximation of MM
+    kinetic (eq_logMM1stDerivative), scaled to between 0 and 1.
+
+    Arguments:
+        lst_Time -> list of floats. Timepoints
+        lst_Pars -> list of floats. Values for eq_logMM's parameters.
+    """
+    arr_Deriv = eq_logMM1stDerivative(np.asarray(lst_Time, dtype=float), *lst_Pars)
+    min_der = np.min(arr_Deriv)
+    max_der = np.max(arr_Deriv) - min_der
+    return ((arr_Deriv - min_der)/max_der).tolist()
+
+def linear_regression(arr_X, arr_Y, arr_Mask = None):
+    """
+    Ordinary least squares fit of eq_linear to many datasets at once,
+    in closed form. One dataset per row.
+
+    Arguments:
+        arr_X -> numpy array (datasets x points). Independent variable
+        arr_Y -> numpy array (datasets x points). Dependent variable
+        arr_Mask -> numpy array of booleans, same shape. Points to use.
+                    If None, all points that are not np.nan are used.
+
+    Returns
+        arr_Pars -> numpy array (datasets x 2). Slope and intercept
+        arr_Covar -> numpy array (datasets x 2 x 2). Covariance of
+                     parameters, scaled with the variance of the
+                     residuals as scipy.optimize.curve_fit does.
+                     np.inf for datasets with two points or fewer.
+    """
+    arr_X = np.atleast_2d(np.asarray(arr_X, dtype=float))
+    arr_Y = np.atleast_2d(np.asarray(arr_Y, dtype=float))
+    if arr_Mask is None:
+        arr_Mask = np.isfinite(arr_X) & np.isfinite(arr_Y)
+    arr_X = np.where(arr_Mask, arr_X, 0)
+    arr_Y = np.where(arr_Mask, arr_Y, 0)
+    arr_n = arr_Mask.sum(axis=1)
+    with np.errstate(all="ignore"):
+        arr_MeanX = arr_X.sum(axis=1)/arr_n
+        arr_MeanY = arr_Y.sum(axis=1)/arr_n
+        arr_DX = np.where(arr_Mask, arr_X - arr_MeanX[:,None], 0)
+        arr_DY = np.where(arr_Mask, arr_Y - arr_MeanY[:,None], 0)
+        arr_SXX = np.sum(arr_DX*arr_DX, axis=1)
+        arr_m = np.sum(arr_DX*arr_DY, axis=1)/arr_SXX
+        arr_c = arr_MeanY - arr_m*arr_MeanX
+        arr_Residuals = np.where(arr_Mask, arr_Y - (arr_m[:,None]*arr_X + arr_c[:,None]), 0)
+        arr_Variance = np.where(arr_n > 2, np.sum(arr_Residuals**2, axis=1)/(arr_n - 2), np.inf)
+        arr_Covar = np.empty((len(arr_n),2,2))
+        arr_Covar[:,0,0] = arr_Variance/arr_SXX
+        arr_Covar[:,0,1] = -arr_MeanX*arr_Variance/arr_SXX
+        arr_Covar[:,1,0] = arr_Covar[:,0,1]
+        arr_Covar[:,1,1] = arr_Variance*(1/arr_n + arr_MeanX**2/arr_SXX)
+    return np.stack([arr_m, arr_c], axis=1), arr_Covar
 
 def linear_fit(lst_Time, lst_Signal, lst_NormFitPars, int_Start, int_Stop, str_auto):
+    """
+    Fits a line to the linear phase of a kinetic.
 
-    lst_Derivative = draw_rate_deriv(lst_Time, lst_NormFitPars)
-    lst_Signal_Trim = []
-    lst_Time_Trim = []
+    Arguments:
+        lst_Time -> list of floats. Timepoints
+        lst_Signal -> list of floats. Measured signal
+        lst_NormFitPars -> list of floats. Parameters of the fit of
+                           eq_logMM to the normalised signal.
+        int_Start, int_Stop -> integers. Datapoints to fit. Ignored for "auto".
+        str_auto -> string. "auto": the linear phase is where the scaled
+                    derivative of the log-MM fit is at least 0.7
+                    (see linear_fit_batch).
+
+    Returns fit, pars, derivative, start, stop, confidence, stderr and
+    timepoints of fit.
+    """
     if str_auto == "auto":
-        # Force change in case of bad input
-        int_Start = 0
-        for i in range(len(lst_Derivative)):
-            if lst_Derivative[i] >= 0.7:
-                lst_Time_Trim.append(lst_Time[i])
-                lst_Signal_Trim.append(lst_Signal[i])
-            else:
-                int_Stop = i
-                break
-    else:
-        for i in range(int_Start,int_Stop):
-            lst_Time_Trim.append(lst_Time[i])
-            lst_Signal_Trim.append(lst_Signal[i])
+        return linear_fit_batch([lst_Time], [lst_Signal], [lst_NormFitPars])[0]
+    lst_Derivative = draw_rate_deriv(lst_Time, lst_NormFitPars)
+    arr_Points = np.arange(len(lst_Time))
+    arr_Mask = (arr_Points >= int_Start) & (arr_Points < int_Stop)
+    arr_Pars, arr_Covar = linear_regression([lst_Time], [lst_Signal], arr_Mask[None,:])
+    return linear_fit_result(lst_Time, lst_Signal, lst_Derivative, int_Start, int_Stop,
+                             int(arr_Mask.sum()), arr_Pars[0], arr_Covar[0])
+
+def linear_fit_batch(lstlst_Time, lstlst_Signal, lstlst_NormFitPars):
+    """
+    Finds the linear phase of many kinetics at once and fits a line to
+    each with linear_regression. The linear phase runs from the first
+    point up to the first point where the derivative of the log-MM fit,
+    scaled to between 0 and 1, drops below 0.7.
+
+    Arguments:
+        lstlst_Time -> list of lists of floats. Timepoints
+        lstlst_Signal -> list of lists of floats. Measured signal
+        lstlst_NormFitPars -> list of lists of floats. Parameters of the
+                              fit of eq_logMM to the normalised signal.
+
+    Returns list of tuples, one per kinetic, with the same as linear_fit.
+    """
+    int_Sets = len(lstlst_Signal)
+    if int_Sets == 0:
+        return []
+    int_Points = max([len(lst) for lst in lstlst_Time])
+    arr_Time = np.full((int_Sets,int_Points), np.nan)
+    arr_Signal = np.full((int_Sets,int_Points), np.nan)
+    arr_Valid = np.zeros((int_Sets,int_Points), dtype=bool)
+    for i in range(int_Sets):
+        n = len(lstlst_Time[i])
+        arr_Time[i,:n] = lstlst_Time[i]
+        arr_Signal[i,:n] = lstlst_Signal[i]
+        arr_Valid[i,:n] = True
+    arr_Pars = np.array([np.asarray(pars, dtype=float)[:3] for pars in lstlst_NormFitPars])
+    with np.errstate(all="ignore"):
+        arr_Deriv = eq_logMM1stDerivative(arr_Time, *[arr_Pars[:,k,None] for k in range(3)])
+        arr_Min = np.min(np.where(arr_Valid, arr_Deriv, np.inf), axis=1)
+        arr_Max = np.max(np.where(arr_Valid, arr_Deriv, -np.inf), axis=1) - arr_Min
+        arr_Deriv = (arr_Deriv - arr_Min[:,None])/arr_Max[:,None]
+    # First point that is not in the linear phase. Padding is never in it.
+    arr_Linear = np.concatenate([(arr_Deriv >= 0.7) & arr_Valid, np.zeros((int_Sets,1), dtype=bool)], axis=1)
+    arr_Stop = np.argmin(arr_Linear, axis=1)
+    arr_Mask = np.arange(int_Points)[None,:] < arr_Stop[:,None]
+    arr_FitPars, arr_Covar = linear_regression(arr_Time, arr_Signal, arr_Mask)
+    lst_Results = []
+    for i in range(int_Sets):
+        n = len(lstlst_Time[i])
+        lst_Results.append(linear_fit_result(lstlst_Time[i], lstlst_Signal[i], arr_Deriv[i,:n].tolist(),
+                           0, int(arr_Stop[i]), int(arr_Stop[i]), arr_FitPars[i], arr_Covar[i]))
+    return lst_Results
+
+def linear_fit_result(lst_Time, lst_Signal, lst_Derivative, int_Start, int_Stop, int_Fitted, pars, covar):
+    """
+    Puts together what linear_fit returns. The fitted line only gets
+    drawn where it is below the maximum signal.
+
+    Arguments:
+        lst_Time -> list of floats. Timepoints
+        lst_Signal -> list of floats. Measured signal
+        lst_Derivative -> list of floats. Scaled derivative of log-MM fit
+        int_Start, int_Stop -> integers. Datapoints of linear phase
+        int_Fitted -> integer. Number of datapoints the line was fitted to.
+        pars, covar -> numpy arrays. See linear_regression.
+    """
     # Need at least two datapoints to fit a line:
-    if len(lst_Signal_Trim) > 2:
-        pars, covar = curve_fit(eq_linear, lst_Time_Trim, lst_Signal_Trim)
+    if int_Fitted > 2:
+        count_fit("linear_fit")
         lst_Confidence = calculate_confidence(len(lst_Time),pars,covar)
         lst_STDERR = np.sqrt(np.diagonal(covar))
-        lst_Time = [float(x) for x in lst_Time]
+        arr_Time = np.asarray(lst_Time, dtype=float)
         pars = [float(x) for x in pars]
-        lst_LinFit = []
-        for i in range(len(lst_Time)):
-            lst_LinFit.append(pars[0]*lst_Time[i] + pars[1])
-        lst_LinFitTime = []
-        lst_LinFit_Trimmed = []
-        max_signal = max(lst_Signal)
-        for i in range(len(lst_Time)):
-            if lst_LinFit[i] < max_signal:
-                lst_LinFitTime.append(lst_Time[i])
-                lst_LinFit_Trimmed.append(lst_LinFit[i])
-        return lst_LinFit_Trimmed, pars, lst_Derivative, int_Start, int_Stop, lst_Confidence, lst_STDERR, lst_LinFitTime
+        arr_LinFit = pars[0]*arr_Time + pars[1]
+        arr_Drawn = arr_LinFit < max(lst_Signal)
+        return (arr_LinFit[arr_Drawn].tolist(), pars, lst_Derivative, int_Start, int_Stop, lst_Confidence, lst_STDERR,
+                arr_Time[arr_Drawn].tolist())
     else:
         return df.set_to_nan(len(lst_Time)), df.set_to_nan(2), lst_Derivative, int_Start, int_Stop, df.set_to_nan(2), df.set_to_nan(2), df.set_to_nan(len(lst_Time))
 
 def derivative(xdata, ydata, SavGolIn, SavGolOut, minmaxboth):
     """
-    Determines derivative to a given dataset.
+    Determines derivative to a given dataset. See derivative_matrix,
+    which does the same for many datasets at once.
 
     Arguments:
         xdata -> list of floats. Data on x axis
@@ -831,50 +1570,153 @@ def derivative(xdata, ydata, SavGolIn, SavGolOut, minmaxboth):
                     filter to ydata. Max is 2.
         SavGolOut -> integer. How many times to apply SavGol filter
                      once derivative is calculated.
+        minmaxboth -> string. Inflections are at the "max" or "min" of
+                      the derivative, or at whichever is larger ("both").
     """
+    arr_Derivative, arr_Inflections, arr_Slopes = derivative_matrix(xdata, [ydata], SavGolIn, SavGolOut, minmaxboth)
+    return arr_Derivative[0].tolist(), arr_Inflections[0], arr_Slopes[0]
 
-    lst_Derivative = []
-    lst_XFitting = []
-
-    xdata = np.array(xdata)
-    lst_XFitting = np.array(xdata+[xdata[len(xdata)-1]])
-    ydata = np.array(ydata+[ydata[len(ydata)-1]])
-    if SavGolIn > 0:
-        ydata = savgol_filter(ydata, 31, 3)
-        if SavGolIn > 1:
-            ydata = savgol_filter(ydata, 31, 3)
-
-    derivative = ydata[1:] - ydata[:-1]
-    lst_XDifference = lst_XFitting[1:] - lst_XFitting[:-1]
-    for i in range(len(derivative)-1):
-        derivative[i] = derivative[i]/lst_XDifference[i]
+def derivative_matrix(xdata, ydata, SavGolIn, SavGolOut, minmaxboth, interpolate = False):
+    """
+    Determines the derivatives of many datasets with the same x values
+    at once, e.g. the fluorescence of all wells of a DSF plate.
+    The last axis of ydata holds the y values of each dataset.
+
+    The data get smoothed with a Savitzky-Golay filter (window of 31
+    points, 3rd order), differentiated point by point and smoothed again
+    (windows of 11 and 21 points). Inflections are where the derivative
+    reaches its extreme, not counting the first and last 10 points
+    (20 for "both").
+
+    Arguments:
+        xdata -> list or numpy array of floats. Data on x axis, same for
+                 all datasets or same shape as ydata.
+        ydata -> list of lists or numpy array of floats (datasets x points,
+                 or any number of dimensions with points last)
+        SavGolIn -> integer. How many times to apply Savitsky-Golay
+                    filter to ydata. Max is 2.
+        SavGolOut -> integer. How many times to apply SavGol filter
+                     once derivative is calculated.
+        minmaxboth -> string. Inflections are at the "max" or "min" of
+                      the derivative, or at whichever is larger ("both").
+        interpolate -> boolean. If True, the inflection is placed at the
+                       vertex of the parabola through the extreme point
+                       and its neighbours instead of on the nearest
+                       point, the slope is the value at the vertex.
+
+    Returns
+        arr_Derivative -> numpy array, same shape as ydata.
+        arr_Inflections -> numpy array of lists, one list of x values for
+                           each dataset.
+        arr_Slopes -> numpy array of lists, one list of slopes at the
+                      inflections for each dataset.
+    """
+    arr_Y = np.asarray(ydata, dtype=float)
+    arr_X = np.broadcast_to(np.asarray(xdata, dtype=float), arr_Y.shape)
+    # Repeat the last point so that there is a derivative for each point
+    arr_Y = np.concatenate([arr_Y, arr_Y[...,-1:]], axis=-1)
+    for i in range(min(SavGolIn,2)):
+        arr_Y = savgol_filter(arr_Y, 31, 3, axis=-1)
+
+    arr_Derivative = np.diff(arr_Y, axis=-1)
+    # The derivative of the repeated point is left as it is
+    arr_Derivative[...,:-1] = arr_Derivative[...,:-1] / np.diff(arr_X, axis=-1)
     if SavGolOut > 0:
-        derivative = savgol_filter(derivative,11,3)
+        arr_Derivative = savgol_filter(arr_Derivative, 11, 3, axis=-1)
         if SavGolOut > 1:
-            derivative = savgol_filter(derivative,21,3)
+            arr_Derivative = savgol_filter(arr_Derivative, 21, 3, axis=-1)
 
     if minmaxboth == "max":
-        flt_Extreme = np.nanmax(derivative[10:-10])
-    if minmaxboth == "min":
-        flt_Extreme = np.nanmin(derivative[10:-10])
+        arr_Extreme = np.nanmax(arr_Derivative[...,10:-10], axis=-1)
+    elif minmaxboth == "min":
+        arr_Extreme = np.nanmin(arr_Derivative[...,10:-10], axis=-1)
     elif minmaxboth == "both":
         # Set further back for both. Both is used for nanoDSF.
-        max = np.nanmax(derivative[20:-20])
-        min = np.nanmin(derivative[20:-20])
-        if abs(max) > abs(min):
-            flt_Extreme = max
-        else:
-            flt_Extreme = min
-    lst_Inflections = []
-    lst_Slopes = []
-    for i in range(len(derivative)):
-        if derivative[i] == flt_Extreme:
-            lst_Inflections.append(xdata[i]) # remember, we only calculate the derivative from the second to the second to last point.
-            lst_Slopes.append(derivative[i])
-
-    return derivative.tolist(), lst_Inflections, lst_Slopes
-
-
-
+        arr_Max = np.nanmax(arr_Derivative[...,20:-20], axis=-1)
+        arr_Min = np.nanmin(arr_Derivative[...,20:-20], axis=-1)
+        arr_Extreme = np.where(np.abs(arr_Max) > np.abs(arr_Min), arr_Max, arr_Min)
+
+    arr_Inflections = np.empty(arr_Y.shape[:-1], dtype=object)
+    arr_Slopes = np.empty(arr_Y.shape[:-1], dtype=object)
+    for idx in np.ndindex(arr_Inflections.shape):
+        arr_Inflections[idx] = []
+        arr_Slopes[idx] = []
+    int_Points = arr_Derivative.shape[-1]
+    for tpl_Point in zip(*np.nonzero(arr_Derivative == arr_Extreme[...,np.newaxis])):
+        idx = tpl_Point[:-1]
+        i = tpl_Point[-1]
+        flt_Inflection = arr_X[idx][i]
+        flt_Slope = arr_Derivative[idx][i]
+        # The derivative of the last point is not divided by a step in x
+        if interpolate == True and i > 0 and i < int_Points - 2:
+            flt_Vertex, flt_Top = parabola_vertex(arr_X[idx][i-1], arr_X[idx][i], arr_X[idx][i+1],
+                arr_Derivative[idx][i-1], arr_Derivative[idx][i], arr_Derivative[idx][i+1])
+            if np.isnan(flt_Vertex) == False:
+                flt_Inflection, flt_Slope = flt_Vertex, flt_Top
+        arr_Inflections[idx].append(flt_Inflection)
+        arr_Slopes[idx].append(flt_Slope)
+
+    return arr_Derivative, arr_Inflections, arr_Slopes
+
+def derivative_batch(lstlst_XData, lstlst_YData, SavGolIn, SavGolOut, minmaxboth, interpolate = False):
+    """
+    Runs derivative_matrix over a list of datasets. Datasets with the same
+    shape get stacked into one array, so a whole plate usually takes one
+    call.
 
+    Arguments:
+        lstlst_XData -> list of lists of floats. x values of each dataset
+        lstlst_YData -> list of lists of floats. y values of each dataset.
+                        A dataset can have several channels that share the
+                        x values (list of lists, channels x points).
+        Other arguments see derivative_matrix.
+
+    Returns three lists with one entry per dataset, same as derivative:
+    derivative (list), inflections (list) and slopes (list). For datasets
+    with channels, each entry is a list or array with one item per channel.
+    """
+    int_Sets = len(lstlst_YData)
+    lst_Derivatives = [None] * int_Sets
+    lst_Inflections = [None] * int_Sets
+    lst_Slopes = [None] * int_Sets
+    dic_Lengths = {}
+    for i in range(int_Sets):
+        dic_Lengths.setdefault(np.shape(lstlst_YData[i]), []).append(i)
+    for tpl_Shape, lst_Sets in dic_Lengths.items():
+        arr_X = np.asarray([lstlst_XData[i] for i in lst_Sets], dtype=float)
+        # x values are the same for all channels of a dataset
+        arr_X = arr_X.reshape((len(lst_Sets),) + (1,)*(len(tpl_Shape)-1) + (tpl_Shape[-1],))
+        arr_Derivative, arr_Inflections, arr_Slopes = derivative_matrix(arr_X,
+            [lstlst_YData[i] for i in lst_Sets], SavGolIn, SavGolOut, minmaxboth, interpolate)
+        for j in range(len(lst_Sets)):
+            lst_Derivatives[lst_Sets[j]] = arr_Derivative[j].tolist()
+            lst_Inflections[lst_Sets[j]] = arr_Inflections[j]
+            lst_Slopes[lst_Sets[j]] = arr_Slopes[j]
+    return lst_Derivatives, lst_Inflections, lst_Slopes
+
+def parabola_slope(x0, x1, x2, y0, y1, y2):
+    """
+    Slope at x1 of the parabola through three points. Works on numpy
+    arrays of points, too.
+    """
+    return (y0*(x1-x2)/((x0-x1)*(x0-x2)) + y1*(2*x1-x0-x2)/((x1-x0)*(x1-x2))
+            + y2*(x1-x0)/((x2-x0)*(x2-x1)))
 
+def parabola_vertex(x0, x1, x2, y0, y1, y2):
+    """
+    Vertex of the parabola through three points.
+    Returns x and y of vertex, np.nan for both if the points lie on a
+    line or the vertex is not between x0 and x2.
+    """
+    flt_Denominator = (x0-x1)*(x0-x2)*(x1-x2)
+    if flt_Denominator == 0:
+        return np.nan, np.nan
+    a = (x2*(y1-y0) + x1*(y0-y2) + x0*(y2-y1)) / flt_Denominator
+    b = (x2*x2*(y0-y1) + x1*x1*(y2-y0) + x0*x0*(y1-y2)) / flt_Denominator
+    c = (x1*x2*(x1-x2)*y0 + x2*x0*(x2-x0)*y1 + x0*x1*(x0-x1)*y2) / flt_Denominator
+    if a == 0:
+        return np.nan, np.nan
+    flt_Vertex = -b/(2*a)
+    if flt_Vertex < min(x0,x2) or flt_Vertex > max(x0,x2):
+        return np.nan, np.nan
+    return flt_Vertex, c - b*b/(4*a)
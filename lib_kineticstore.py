@@ -0,0 +1,266 @@
+"""
+Memory-mapped storage for the raw data of kinetic assays (rate and
+dose response time course).
+
+Every well of these assays has a full time series. Kept as Python lists
+in the RawDataFrame and again in the ProcessedDataFrame, a plate read
+over thousands of cycles takes up hundreds of megabytes. KineticStore
+writes each plate's raw data as one matrix of float64 values
+(wells x timepoints) into a file on disk and hands out read-only
+numpy memmaps of it. The operating system only keeps the pages that
+are actually being looked at (e.g. plotted) in memory.
+
+The file sits next to the project file (same name, extension
+".kinetic") or in the temporary directory if the project has not been
+saved yet. It is a scratch file: the project file still holds all raw
+data, and the kinetic file gets written again on every analysis.
+
+Classes:
+    KineticStore
+    KineticReplicates
+
+Functions:
+    get_store_path
+    store_plate
+    store_rate_plate
+    store_DRTC_plate
+
+"""
+
+import os
+import atexit
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+
+str_Extension = ".kinetic"
+
+def get_store_path(str_ProjectPath):
+    """
+    Returns the path of the kinetic store belonging to a project file
+    or None if the project has not been saved yet.
+
+    Arguments:
+        str_ProjectPath -> string. Path of .bbq file, can be empty or None.
+    """
+    if str_ProjectPath == None or str_ProjectPath == "":
+        return None
+    if str_ProjectPath.endswith(".bbq") == True:
+        str_ProjectPath = str_ProjectPath[:-4]
+    return str_ProjectPath + str_Extension
+
+class KineticStore:
+    """
+    File of float64 matrices, one per plate, that get read back as
+    read-only memmaps.
+    """
+
+    def __init__(self, str_Path = None):
+        """
+        Initialises class attributes and creates an empty file.
+        An existing file gets replaced. Memmaps of the old file stay
+        valid where the operating system allows it; where it does not
+        (the file is still mapped on Windows), a temporary file is used
+        instead.
+
+        Arguments:
+            str_Path -> string. Path of file. Temporary file if None.
+        """
+        self.lock = threading.Lock()
+        self.dic_Blocks = {}
+        self.int_Size = 0
+        self.bol_Temporary = True
+        if not str_Path == None:
+            try:
+                if os.path.exists(str_Path) == True:
+                    os.remove(str_Path)
+                with open(str_Path, "wb"):
+                    pass
+                self.str_Path = str_Path
+                self.bol_Temporary = False
+            except OSError:
+                str_Path = None
+        if str_Path == None:
+            int_Handle, self.str_Path = tempfile.mkstemp(prefix="bbq_", suffix=str_Extension)
+            os.close(int_Handle)
+            atexit.register(self.close)
+
+    def add(self, str_Key, arr_Matrix):
+        """
+        Appends a matrix to the file and returns a read-only memmap of it.
+
+        Arguments:
+            str_Key -> string. Name of matrix, e.g. plate name and column.
+            arr_Matrix -> numpy array or anything np.asarray can turn into
+                          an array of floats.
+        """
+        arr_Matrix = np.ascontiguousarray(arr_Matrix, dtype=np.float64)
+        with self.lock:
+            with open(self.str_Path, "ab") as fil:
+                fil.write(arr_Matrix.tobytes())
+            self.dic_Blocks[str_Key] = (self.int_Size, arr_Matrix.shape)
+            self.int_Size += arr_Matrix.nbytes
+        return self.get(str_Key)
+
+    def get(self, str_Key):
+        """
+        Returns a read-only memmap of a matrix written with add.
+
+        Arguments:
+            str_Key -> string. Name of matrix.
+        """
+        int_Offset, tpl_Shape = self.dic_Blocks[str_Key]
+        # Memmaps cannot be empty
+        if int(np.prod(tpl_Shape)) == 0:
+            return np.empty(tpl_Shape, dtype=np.float64)
+        return np.memmap(self.str_Path, dtype=np.float64, mode="r",
+                         offset=int_Offset, shape=tpl_Shape)
+
+    def __contains__(self, str_Key):
+        return str_Key in self.dic_Blocks.keys()
+
+    @property
+    def nbytes(self):
+        """
+        Size of file in bytes.
+        """
+        return self.int_Size
+
+    def close(self):
+        """
+        Deletes the file if it is temporary. Failing to delete it (e.g.
+        still mapped on Windows) is not an error.
+        """
+        if self.bol_Temporary == True:
+            try:
+                os.remove(self.str_Path)
+            except OSError:
+                pass
+
+class KineticReplicates:
+    """
+    Raw data of one dose response time course sample: the replicate
+    values of each concentration in each cycle. The values are looked up
+    in the plate's raw data matrix (usually a memmap from a KineticStore)
+    when they are needed instead of being copied into lists.
+    """
+
+    def __init__(self, arr_RawData, lst_Locations, lst_Concentrations, lst_Time):
+        """
+        Initialises class attributes.
+
+        Arguments:
+            arr_RawData -> numpy array. Raw data of plate (wells x cycles)
+            lst_Locations -> list of lists. Wells of each concentration.
+            lst_Concentrations -> list. Concentrations
+            lst_Time -> list. Time of each cycle
+        """
+        self.arr_RawData = arr_RawData
+        self.lst_Locations = lst_Locations
+        self.lst_Concentrations = lst_Concentrations
+        self.lst_Time = lst_Time
+
+    @property
+    def shape(self):
+        return (len(self.lst_Concentrations), len(self.lst_Time))
+
+    def values(self, conc, cycle):
+        """
+        Returns the replicate values of a concentration in a cycle.
+
+        Arguments:
+            conc -> integer. Position of concentration
+            cycle -> integer. Position of cycle
+        """
+        return self.arr_RawData[self.lst_Locations[conc],cycle].tolist()
+
+    def to_frame(self):
+        """
+        Returns the values as dataframe of lists, concentrations as index
+        and times as columns. This is how the raw data of each sample was
+        held before.
+        """
+        dfr_RawData = pd.DataFrame(index=self.lst_Concentrations, columns=self.lst_Time)
+        for conc in range(len(self.lst_Concentrations)):
+            arr_Replicates = np.asarray(self.arr_RawData[self.lst_Locations[conc],:])
+            for cycle in range(len(self.lst_Time)):
+                dfr_RawData.iloc[conc,cycle] = arr_Replicates[:,cycle].tolist()
+        return dfr_RawData
+
+    def __repr__(self):
+        return repr(self.to_frame())
+
+    def __str__(self):
+        return str(self.to_frame())
+
+def store_plate(kineticstore, dic_Plate, str_AssayCategory):
+    """
+    Moves the raw data of a processed plate into the store. Other
+    assay categories are left alone.
+
+    Arguments:
+        kineticstore -> KineticStore
+        dic_Plate -> dictionary. Fields of the plate's row in the
+                     complete container (see lib_datafunctions.process_plate).
+        str_AssayCategory -> string.
+    """
+    if str_AssayCategory.find("rate") != -1:
+        store_rate_plate(kineticstore, dic_Plate)
+    elif str_AssayCategory == "dose_response_time_course":
+        store_DRTC_plate(kineticstore, dic_Plate)
+
+def store_rate_plate(kineticstore, dic_Plate):
+    """
+    Writes the "Time" and "Signal" lists of each well into the store and
+    replaces them with memmaps, in the RawDataFrame and in the
+    ProcessedDataFrame (both hold the same lists).
+
+    Arguments:
+        kineticstore -> KineticStore
+        dic_Plate -> dictionary. See store_plate.
+    """
+    dfr_RawData = dic_Plate["RawDataFrame"]
+    dfr_Processed = dic_Plate["ProcessedDataFrame"]
+    if len(dfr_RawData) == 0:
+        return
+    for str_Column in ["Time","Signal"]:
+        lst_Cells = dfr_RawData[str_Column].tolist()
+        if not all([isinstance(cell, (list, tuple, np.ndarray)) for cell in lst_Cells]):
+            return
+        # Wells can have fewer readings than others, pad with np.nan
+        arr_Lengths = np.array([len(cell) for cell in lst_Cells], dtype=int)
+        arr_Matrix = np.full((len(lst_Cells), max(1, arr_Lengths.max())), np.nan)
+        for i in range(len(lst_Cells)):
+            arr_Matrix[i,:arr_Lengths[i]] = lst_Cells[i]
+        arr_Stored = kineticstore.add(str(dic_Plate["DestinationPlateName"]) + "/" + str_Column, arr_Matrix)
+        arr_Views = np.empty(len(lst_Cells), dtype=object)
+        for i in range(len(lst_Cells)):
+            arr_Views[i] = arr_Stored[i,:arr_Lengths[i]]
+        dfr_RawData[str_Column] = arr_Views
+        # Sample k of the processed data was taken from row k of the raw data
+        for k in dfr_Processed.index:
+            if k < len(arr_Views) and isinstance(dfr_Processed.at[k,str_Column], (list, np.ndarray)):
+                dfr_Processed.at[k,str_Column] = arr_Views[k]
+
+def store_DRTC_plate(kineticstore, dic_Plate):
+    """
+    Writes the RawDataFrame (wells x cycles) into the store and replaces
+    it with a dataframe on top of the memmap. The "RawData" of each
+    sample (see KineticReplicates) then reads from the memmap, too.
+    Raw data that is not numeric stays as it is.
+
+    Arguments:
+        kineticstore -> KineticStore
+        dic_Plate -> dictionary. See store_plate.
+    """
+    dfr_RawData = dic_Plate["RawDataFrame"]
+    if not all([dtype.kind in "biuf" for dtype in dfr_RawData.dtypes]):
+        return
+    arr_Stored = kineticstore.add(str(dic_Plate["DestinationPlateName"]) + "/RawData",
+                                  dfr_RawData.to_numpy(dtype=np.float64))
+    dic_Plate["RawDataFrame"] = pd.DataFrame(arr_Stored, index=dfr_RawData.index,
+                                             columns=dfr_RawData.columns, copy=False)
+    for replicates in dic_Plate["ProcessedDataFrame"]["RawData"]:
+        if isinstance(replicates, KineticReplicates):
+            replicates.arr_RawData = arr_Stored
@@ -157,7 +157,7 @@ def well_to_index(well: str, pf: int):
                 int_Well = cols * pcols + int(well[2:])
             else:
                 cols = 26 + (ord(well[1:2]) - 65)
-                int_Well =  cols * pcols + int(well[3:])
+                int_Well =  cols * pcols + int(well[2:])
         else:
             cols = ord(well[0:1]) - 96 + 25
             int_Well =  cols * pcols + int(well[2:])
@@ -208,9 +208,9 @@ def sortable_well(well: str, pf: int):
             well = well[0:1] + "00" + well[1:]
         elif len(well) == 3:
             if ord(well[1:2]) > 57: # Unicode 57 is Character "9"
-                well = well[0:2] + "0" + well[1:]
+                well = well[0:2] + "0" + well[2:]
             else:
-                well = well[0:1] + "0" + well[2:]
+                well = well[0:1] + "0" + well[1:]
     return well
 
 def sortable_well_96(well: str):
@@ -0,0 +1,180 @@
+"""
+Array-backed storage for the processed data of a plate.
+
+The ProcessedDataFrame of each plate holds Python lists in its cells
+(e.g. "Raw", "NormSEM", "NormFitFreePars"), which makes every access
+slow and bulk operations impossible to vectorise. ProcessedStore keeps
+the same information as dense numpy arrays:
+
+    sample columns      -> one value per sample (samples)
+    point columns       -> one value per concentration
+                           (samples x concentrations, padded with np.nan)
+    replicate columns   -> one value per well
+                           (samples x concentrations x replicates)
+    parameter columns   -> fit parameters, confidence intervals, errors
+                           (samples x parameters)
+
+The ProcessedDataFrame stays the data of record, the tabs, plots and
+project files work with it. The store is a copy made to read whole
+columns at once, e.g. to build the rows of the database export (see
+lib_datafunctions.create_Database_frame_EPDR).
+
+Classes:
+    ProcessedStore
+
+"""
+
+import numpy as np
+import pandas as pd
+
+# Columns holding one value per fit parameter
+lst_ParameterSuffixes = ["Pars","CI","Errors"]
+
+def is_sequence(value):
+    """
+    Returns True if value is a list, tuple or numpy array.
+    """
+    return isinstance(value, (list, tuple, np.ndarray))
+
+class ProcessedStore:
+    """
+    Dense numpy arrays holding the processed data of one plate,
+    see module docstring.
+    """
+
+    def __init__(self):
+        """
+        Initialises class attributes. Use from_dataframe to fill the store.
+        """
+        self.lst_Columns = []
+        self.dic_Kind = {}
+        self.dic_Arrays = {}
+        # Number of concentrations per sample for point and parameter columns,
+        # number of replicates per concentration for replicate columns
+        self.dic_Lengths = {}
+
+    @classmethod
+    def from_dataframe(cls, dfr_Processed):
+        """
+        Creates a store from a ProcessedDataFrame.
+        Columns holding dataframes are kept as objects.
+
+        Arguments:
+            dfr_Processed -> pandas dataframe. Processed data of one plate.
+        """
+        store = cls()
+        store.lst_Columns = dfr_Processed.columns.tolist()
+        int_Samples = dfr_Processed.shape[0]
+        for str_Column in store.lst_Columns:
+            lst_Cells = dfr_Processed[str_Column].tolist()
+            lst_Sequences = [cell for cell in lst_Cells if is_sequence(cell)]
+            # Anything that is neither a list nor np.nan (strings, booleans, dataframes...)
+            lst_Other = [cell for cell in lst_Cells if not is_sequence(cell)
+                         and not (pd.api.types.is_scalar(cell) and pd.isna(cell))]
+            if len(lst_Sequences) == 0 or len(lst_Other) > 0 or store.pack(str_Column, lst_Cells) == False:
+                store.dic_Kind[str_Column] = "sample"
+                arr_Column = np.empty(int_Samples, dtype=object)
+                arr_Column[:] = lst_Cells
+                store.dic_Arrays[str_Column] = arr_Column
+        return store
+
+    def pack(self, str_Column, lst_Cells):
+        """
+        Packs a column of lists (or lists of lists) into a dense array.
+        Returns False if the values are not numeric.
+
+        Arguments:
+            str_Column -> string. Column name
+            lst_Cells -> list of cells of the column
+        """
+        try:
+            self.pack_column(str_Column, lst_Cells)
+            return True
+        except (TypeError, ValueError):
+            self.dic_Arrays.pop(str_Column, None)
+            self.dic_Lengths.pop(str_Column, None)
+            return False
+
+    def pack_column(self, str_Column, lst_Cells):
+        """
+        See pack. Cells that are not lists (np.nan) get a length of -1.
+        """
+        int_Samples = len(lst_Cells)
+        lst_Sequences = [cell for cell in lst_Cells if is_sequence(cell)]
+        if any([is_sequence(value) for cell in lst_Sequences for value in cell]):
+            self.dic_Kind[str_Column] = "replicate"
+            arr_Lengths = np.full((int_Samples, max(1, max([len(cell) for cell in lst_Sequences]))), -1, dtype=int)
+            for smpl in range(int_Samples):
+                if is_sequence(lst_Cells[smpl]):
+                    for conc in range(len(lst_Cells[smpl])):
+                        arr_Lengths[smpl,conc] = len(lst_Cells[smpl][conc])
+            int_Replicates = max(1, arr_Lengths.max())
+            if str_Column == "Locations":
+                arr_Column = np.full(arr_Lengths.shape + (int_Replicates,), -1, dtype=int)
+            else:
+                arr_Column = np.full(arr_Lengths.shape + (int_Replicates,), np.nan)
+            for smpl in range(int_Samples):
+                for conc in range(arr_Lengths.shape[1]):
+                    if arr_Lengths[smpl,conc] > 0:
+                        arr_Column[smpl,conc,:arr_Lengths[smpl,conc]] = lst_Cells[smpl][conc]
+        else:
+            if any([str_Column.endswith(str_Suffix) for str_Suffix in lst_ParameterSuffixes]) == True:
+                self.dic_Kind[str_Column] = "parameter"
+            else:
+                self.dic_Kind[str_Column] = "point"
+            arr_Lengths = np.array([len(cell) if is_sequence(cell) else -1 for cell in lst_Cells], dtype=int)
+            arr_Column = np.full((int_Samples, max(1, arr_Lengths.max())), np.nan)
+            for smpl in range(int_Samples):
+                if arr_Lengths[smpl] > 0:
+                    arr_Column[smpl,:arr_Lengths[smpl]] = np.array(lst_Cells[smpl], dtype=float)
+        self.dic_Arrays[str_Column] = arr_Column
+        self.dic_Lengths[str_Column] = arr_Lengths
+
+    @property
+    def nbytes(self):
+        """
+        Memory used by the numeric arrays in bytes.
+        """
+        return sum([arr.nbytes for arr in self.dic_Arrays.values() if not arr.dtype == object]
+                   + [arr.nbytes for arr in self.dic_Lengths.values()])
+
+    def get(self, str_Column):
+        """
+        Returns the array of a column (see module docstring for shapes).
+
+        Arguments:
+            str_Column -> string. Column name as in the ProcessedDataFrame.
+        """
+        return self.dic_Arrays[str_Column]
+
+    def select_fit(self, str_Field):
+        """
+        Returns, for every sample, the value of the fit that gets shown
+        ("Show": 0 raw fit, 1 free fit of normalised data, 2 constrained fit).
+
+        Arguments:
+            str_Field -> string. "Pars", "CI", "Errors" or "R2"
+
+        Returns numpy array (samples x parameters for Pars, CI and Errors,
+        samples for R2).
+        """
+        arr_Show = pd.to_numeric(pd.Series(self.dic_Arrays["Show"]), errors="coerce").to_numpy()
+        lst_Fits = [self.get_column("RawFit" + str_Field),
+                    self.get_column("NormFitFree" + str_Field),
+                    self.get_column("NormFitConst" + str_Field)]
+        arr_Selected = np.full(lst_Fits[0].shape, np.nan)
+        for int_Show in range(3):
+            arr_Selected[arr_Show == int_Show] = lst_Fits[int_Show][arr_Show == int_Show]
+        return arr_Selected
+
+    def get_column(self, str_Column):
+        """
+        Returns a column as float array. Sample columns get converted,
+        non-numeric values become np.nan.
+
+        Arguments:
+            str_Column -> string. Column name.
+        """
+        if self.dic_Kind[str_Column] == "sample":
+            return pd.to_numeric(pd.Series(self.dic_Arrays[str_Column]), errors="coerce").to_numpy(dtype=float)
+        return self.dic_Arrays[str_Column]
@@ -0,0 +1,97 @@
+"""
+Contains classes to report the progress of an analysis without wxPython.
+They mimic the parts of lib_progressdialog.ProgressDialog that the data
+processing functions in lib_datafunctions talk to, so the same functions
+can be run from the command line (see batch.py) or in worker processes.
+
+Classes:
+	CallbackLog
+	CallbackProgress
+
+Functions:
+	print_progress
+
+"""
+
+class CallbackLog:
+	"""
+	Stand-in for the wx.ListBox lbx_Log of ProgressDialog.
+	Keeps the log lines in a list and hands every new or
+	changed line to a callback function.
+	"""
+
+	def __init__(self, callback = None):
+		"""
+		Initialises class attributes.
+
+		Arguments:
+			callback -> function taking two arguments: the line of text
+						(string) and whether it replaces the previous
+						line (boolean, used for progress gauges).
+						Can be None if lines should only be collected.
+		"""
+		self.lst_Lines = []
+		self.callback = callback
+
+	@property
+	def Count(self):
+		"""
+		Number of lines in the log, same as wx.ListBox.Count
+		"""
+		return len(self.lst_Lines)
+
+	def InsertItems(self, lst_Items, int_Position):
+		"""
+		Inserts lines into the log, same signature as
+		wx.ListBox.InsertItems.
+
+		Arguments:
+			lst_Items -> list of strings
+			int_Position -> integer. Position to insert lines at.
+		"""
+		self.lst_Lines[int_Position:int_Position] = lst_Items
+		if not self.callback == None:
+			for str_Line in lst_Items:
+				self.callback(str_Line, False)
+
+	def SetString(self, int_Position, str_Line):
+		"""
+		Replaces a line in the log, same signature as
+		wx.ListBox.SetString.
+
+		Arguments:
+			int_Position -> integer. Index of line to replace.
+			str_Line -> string. New text.
+		"""
+		self.lst_Lines[int_Position] = str_Line
+		if not self.callback == None:
+			self.callback(str_Line, int_Position == len(self.lst_Lines) - 1)
+
+class CallbackProgress:
+	"""
+	Stand-in for ProgressDialog. Only provides the log, which is
+	what the processing functions write to.
+	"""
+
+	def __init__(self, callback = None):
+		"""
+		Initialises class attributes.
+
+		Arguments:
+			callback -> function, see CallbackLog.
+		"""
+		self.lbx_Log = CallbackLog(callback)
+
+def print_progress(str_Line, bol_Replace):
+	"""
+	Default callback for the command line: Prints each line,
+	progress gauge updates overwrite the current line.
+
+	Arguments:
+		str_Line -> string. Line of text
+		bol_Replace -> boolean. Whether the line replaces the previous one
+	"""
+	if bol_Replace == True:
+		print("\r" + str_Line, end="", flush=True)
+	else:
+		print("\n" + str_Line, end="", flush=True)
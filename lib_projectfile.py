@@ -0,0 +1,876 @@
+"""
+Functions to write and read BBQ project files (.bbq) without any GUI
+involvement. Used by the main window (main.py) and by the command line
+batch analysis (batch.py).
+
+A .bbq file is a zip archive. Two versions of the format exist:
+
+Version 1 (CSV based, still read and written for comparison):
+    paths.csv, details.csv, boolean.csv, meta.csv
+    and one folder per plate/capillary set holding samples.csv,
+    rawdata.csv, processed.csv, layout.csv and references.csv.
+    List-valued cells are written as their string representation
+    and have to be parsed with import_string_to_list on opening.
+
+Version 2 (binary, written by default):
+    project.json holding paths, details, boolean variables and the
+    per plate meta data, and one folder per plate/capillary set holding
+    samples, rawdata, processed, layout and references as pairs of
+    .json (index, columns and how each column is encoded) and
+    .npz (typed numpy arrays) members.
+    Columns of numbers are stored as one array, columns of lists of
+    numbers as a flat array of values plus an array with the length of
+    each list (-1 where the cell is not a list, e.g. np.nan). Columns of
+    lists of lists additionally store the length of each inner list.
+    Strings and lists of strings are stored the same way.
+    Anything else (strings, mixed types, dataframes) is kept in the
+    .json member.
+    Replicates of kinetic raw data (lib_kineticstore.KineticReplicates)
+    only point into the plate's raw data, which is saved in rawdata
+    anyway. Only the wells of each concentration get stored, read_plate
+    points the replicates at the raw data again.
+
+Plates of dose response time courses have an additional member
+drtcresults.npz in both versions, holding the arrays of the plate's
+lib_drtcresults.DRTCResults (see DRTCResults.to_arrays).
+
+Classes:
+    ProjectArchive
+    LazyPlateFrame
+    LazyIndexer
+
+Functions:
+    write_archive
+    write_archive_v1
+    write_archive_v2
+    write_csv_member
+    write_drtc_results
+    read_archive
+    read_project_v1
+    read_project_v2
+    read_plate
+    read_csv_member
+    encode_dataframe
+    encode_column
+    decode_dataframe
+    decode_column
+    to_json
+    from_json
+    update_details
+    update_references
+
+"""
+
+import os
+import zipfile as zf
+import io
+import json
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+from lib_datafunctions import import_string_to_list
+from lib_drtcresults import DRTCResults, lst_CurveColumns, lst_ParameterColumns, lst_ValueColumns
+from lib_kineticstore import KineticReplicates
+
+# Version written by write_archive
+int_CurrentVersion = 2
+
+# Number of unchanged plates kept in memory when a project is opened lazily
+int_PlateCacheSize = 8
+
+# Dataframe methods that can change a LazyPlateFrame in place
+lst_InPlaceMethods = ["insert","pop","update","drop","fillna","replace","set_index",
+                      "reset_index","rename","sort_values","sort_index","where","mask",
+                      # lib_drtcresults.DRTCResults
+                      "set_values","set_excluded","set_sample"]
+
+# Member name inside archive/plate folder, column in dfr_AssayData
+lst_PlateMembers = [("samples","Samples"),
+                    ("rawdata","RawDataFrame"),
+                    ("processed","ProcessedDataFrame"),
+                    ("layout","Layout"),
+                    ("references","References")]
+
+def write_archive(str_SaveFilePath: str, dfr_AssayData: pd.DataFrame,
+                  dfr_Details: pd.DataFrame, lst_Boolean: list,
+                  dfr_Paths: pd.DataFrame, int_Version: int = int_CurrentVersion):
+    """
+    Writes the project into a .bbq archive.
+
+    Arguments:
+        str_SaveFilePath -> string. path of saved file
+        dfr_AssayData -> pandas dataframe holding all assay data
+        dfr_Details -> pandas dataframe. Meta data of experiment
+        lst_Boolean -> list. Boolean variables defining the
+                       state/behaviour of the project (e.g. has a
+                       certain tab been populated, has the file
+                       been saved before...)
+        dfr_Paths -> pandas dataframe. Paths of all files provided
+                     by the user.
+        int_Version -> integer. File format version to write.
+
+    Returns True on succesful save.
+    """
+    # Plates of a lazily opened project might still have to be read from
+    # the file we are about to overwrite. Write to a new file first and
+    # replace the old one once everything is written. The name of the new
+    # file is unique to this save in case the same file gets saved twice
+    # at the same time.
+    str_PartFilePath = (str_SaveFilePath + "." + str(os.getpid()) + "."
+                        + str(threading.get_ident()) + ".part")
+    try:
+        if int_Version == 1:
+            bol_Saved = write_archive_v1(str_PartFilePath, dfr_AssayData,
+                                         dfr_Details, lst_Boolean, dfr_Paths)
+        else:
+            bol_Saved = write_archive_v2(str_PartFilePath, dfr_AssayData,
+                                         dfr_Details, lst_Boolean, dfr_Paths)
+    except:
+        # Do not leave incomplete files behind
+        if os.path.isfile(str_PartFilePath) == True:
+            os.remove(str_PartFilePath)
+        raise
+    if bol_Saved == False:
+        return False
+    try:
+        os.replace(str_PartFilePath, str_SaveFilePath)
+    except:
+        os.remove(str_PartFilePath)
+        return False
+    # Changed plates are now in the file and need not be kept in memory
+    for str_Column in [str_Column for str_Member, str_Column in lst_PlateMembers]:
+        for lazyframe in dfr_AssayData[str_Column]:
+            if isinstance(lazyframe, LazyPlateFrame) and os.path.abspath(lazyframe.archive.str_FilePath) == os.path.abspath(str_SaveFilePath):
+                lazyframe.archive.saved()
+    return True
+
+def write_archive_v1(str_SaveFilePath: str, dfr_AssayData: pd.DataFrame,
+                     dfr_Details: pd.DataFrame, lst_Boolean: list,
+                     dfr_Paths: pd.DataFrame):
+    """
+    Writes the dataframes and lists as csv files into a zip archive
+    (version 1 of the format). Arguments see write_archive.
+
+    Returns True on succesful save.
+    """
+    try:
+        zip_BBQ = zf.ZipFile(str_SaveFilePath, "w")
+    except:
+        return False
+
+    with zip_BBQ:
+        # Paths
+        write_csv_member(zip_BBQ, "paths.csv", dfr_Paths)
+        # Assay details
+        write_csv_member(zip_BBQ, "details.csv", dfr_Details)
+        # Boolean status variables
+        dfr_Boolean = pd.DataFrame(lst_Boolean,columns=["BooleanVariables"])
+        write_csv_member(zip_BBQ, "boolean.csv", dfr_Boolean)
+        # Make dataframe with fields of dataframe that do not hold other dataframes
+        if dfr_Details.loc["AssayType","Value"] == "nanoDSF":
+            str_WellsOrCapillaries = "Capillaries"
+        else:
+            str_WellsOrCapillaries = "Wells"
+        dfr_Meta = dfr_AssayData[["DestinationPlateName",
+                                  str_WellsOrCapillaries,
+                                  "DataFileName"]]
+        write_csv_member(zip_BBQ, "meta.csv", dfr_Meta)
+        # Save all the fields that hold dataframes in separate folders
+        # (one folder per plate/set of capillaries). Inside the archive,
+        # folders are always separated with a forward slash.
+        for i in range(len(dfr_AssayData)):
+            str_Subdirectory = dfr_AssayData.loc[i,"DestinationPlateName"] + "/"
+            for str_Member, str_Column in lst_PlateMembers:
+                write_csv_member(zip_BBQ, str_Subdirectory + str_Member + ".csv",
+                                 dfr_AssayData.loc[i,str_Column])
+            if "DRTCResults" in dfr_AssayData.columns:
+                write_drtc_results(zip_BBQ, str_Subdirectory, dfr_AssayData.loc[i,"DRTCResults"])
+    return True
+
+def write_archive_v2(str_SaveFilePath: str, dfr_AssayData: pd.DataFrame,
+                     dfr_Details: pd.DataFrame, lst_Boolean: list,
+                     dfr_Paths: pd.DataFrame):
+    """
+    Writes the project into a zip archive with the meta data as json
+    and the plate dataframes as typed numpy arrays (version 2 of the
+    format). Arguments see write_archive.
+
+    Returns True on succesful save.
+    """
+    try:
+        # Strings are stored as fixed width arrays, compression
+        # takes care of the padding.
+        zip_BBQ = zf.ZipFile(str_SaveFilePath, "w", compression=zf.ZIP_DEFLATED, compresslevel=1)
+    except:
+        return False
+
+    with zip_BBQ:
+        if dfr_Details.loc["AssayType","Value"] == "nanoDSF":
+            str_WellsOrCapillaries = "Capillaries"
+        else:
+            str_WellsOrCapillaries = "Wells"
+        dic_Project = {"Version":2,
+                       "Details":to_json(dfr_Details),
+                       "Boolean":to_json(list(lst_Boolean)),
+                       "Paths":to_json(dfr_Paths),
+                       "Meta":to_json(dfr_AssayData[["DestinationPlateName",
+                                                     str_WellsOrCapillaries,
+                                                     "DataFileName"]])}
+        zip_BBQ.writestr("project.json", json.dumps(dic_Project))
+        # One folder per plate/set of capillaries. Inside the archive,
+        # folders are always separated with a forward slash.
+        for i in range(len(dfr_AssayData)):
+            str_Subdirectory = dfr_AssayData.loc[i,"DestinationPlateName"] + "/"
+            for str_Member, str_Column in lst_PlateMembers:
+                dic_Schema, dic_Arrays = encode_dataframe(dfr_AssayData.loc[i,str_Column])
+                zip_BBQ.writestr(str_Subdirectory + str_Member + ".json", json.dumps(dic_Schema))
+                with zip_BBQ.open(str_Subdirectory + str_Member + ".npz", "w") as file:
+                    np.savez(file, **dic_Arrays)
+            if "DRTCResults" in dfr_AssayData.columns:
+                write_drtc_results(zip_BBQ, str_Subdirectory, dfr_AssayData.loc[i,"DRTCResults"])
+    return True
+
+def write_csv_member(zip_BBQ: zf.ZipFile, str_Member: str, dfr_Output: pd.DataFrame):
+    """
+    Writes a dataframe as csv file straight into an archive.
+
+    Arguments:
+        zip_BBQ -> zipfile.ZipFile opened for writing.
+        str_Member -> string. Name of file inside archive.
+        dfr_Output -> pandas dataframe.
+    """
+    with zip_BBQ.open(str_Member, "w") as member:
+        with io.TextIOWrapper(member, encoding="utf-8", newline="") as file:
+            dfr_Output.to_csv(file)
+
+def write_drtc_results(zip_BBQ: zf.ZipFile, str_Subdirectory: str, results: DRTCResults):
+    """
+    Writes the results of a dose response time course plate as
+    npz file straight into an archive (either version).
+
+    Arguments:
+        zip_BBQ -> zipfile.ZipFile opened for writing.
+        str_Subdirectory -> string. Folder of the plate inside archive.
+        results -> lib_drtcresults.DRTCResults (or LazyPlateFrame
+                   standing in for it).
+    """
+    with zip_BBQ.open(str_Subdirectory + "drtcresults.npz", "w") as file:
+        np.savez(file, **results.to_arrays())
+
+def read_archive(str_FilePath: str, bol_Lazy: bool = False):
+    """
+    Reads a .bbq archive of either version.
+
+    Arguments:
+        str_FilePath -> string. Full path of project file.
+        bol_Lazy -> boolean. If True, only the project's meta data is read
+                    now and each plate gets loaded from the file the first
+                    time it is used (see LazyPlateFrame).
+
+    Returns
+        dfr_Details -> pandas dataframe. Meta data of experiment
+        lst_Boolean -> list of boolean variables
+        dfr_Loaded -> pandas dataframe holding all assay data
+        lst_Paths -> list of paths of all files provided by the user.
+    """
+    with zf.ZipFile(str_FilePath, "r") as zip_BBQ:
+        if "project.json" in zip_BBQ.namelist():
+            dfr_Details, lst_Boolean, dfr_Meta, lst_Paths = read_project_v2(zip_BBQ)
+        else:
+            dfr_Details, lst_Boolean, dfr_Meta, lst_Paths = read_project_v1(zip_BBQ)
+        # Create new dataframe to hold raw and analysed data with meta data from dfr_Meta
+        str_WellsOrCapillaries = dfr_Meta.columns[1]
+        lst_DataframeHeaders = ["DestinationPlateName","Samples",
+                                str_WellsOrCapillaries,"DataFileName","RawDataFrame",
+                                "ProcessedDataFrame", "Layout","References"]
+        if dfr_Details.loc["Shorthand","Value"] == "DRTC":
+            lst_DataframeHeaders.append("DRTCResults")
+        dfr_Loaded = pd.DataFrame(index=range(len(dfr_Meta)),columns=lst_DataframeHeaders)
+        if bol_Lazy == True:
+            archive = ProjectArchive(str_FilePath)
+        # Go through each plate in the dataframe
+        for i in range(len(dfr_Meta)):
+            # Load first fields into loaded dataframe
+            for str_Column in dfr_Meta.columns:
+                dfr_Loaded.at[i,str_Column] = dfr_Meta.iloc[i][str_Column]
+            str_Plate = dfr_Meta.iloc[i]["DestinationPlateName"]
+            if bol_Lazy == True:
+                for str_Member, str_Column in lst_PlateMembers:
+                    dfr_Loaded.at[i,str_Column] = LazyPlateFrame(archive, str_Plate, str_Column)
+                if "DRTCResults" in lst_DataframeHeaders:
+                    dfr_Loaded.at[i,"DRTCResults"] = LazyPlateFrame(archive, str_Plate, "DRTCResults")
+            else:
+                dic_Plate = read_plate(zip_BBQ, str_Plate)
+                for str_Column in dic_Plate.keys():
+                    dfr_Loaded.at[i,str_Column] = dic_Plate[str_Column]
+    return dfr_Details, lst_Boolean, dfr_Loaded, lst_Paths
+
+def read_project_v1(zip_BBQ: zf.ZipFile):
+    """
+    Reads the details, boolean variables, plate meta data and paths
+    of a version 1 archive.
+
+    Arguments:
+        zip_BBQ -> open zipfile.ZipFile.
+
+    Returns dfr_Details, lst_Boolean, dfr_Meta, lst_Paths
+    """
+    # Read details.csv
+    dfr_Details = read_csv_member(zip_BBQ, "details.csv")
+    # Ensure backwards compatibility by making sure that all things are string
+    for i in range(len(dfr_Details)):
+        if type(dfr_Details.iloc[i,0]) != str:
+            if pd.isna(dfr_Details.iloc[i,0]) == True:
+                dfr_Details.iloc[i,0] = "NA"
+    # Read boolean.csv
+    dfr_Boolean = read_csv_member(zip_BBQ, "boolean.csv")
+    # Read in meta.csv. Find better name for file
+    dfr_Meta = read_csv_member(zip_BBQ, "meta.csv")
+    # Read paths.csv -> Contains references to file locations
+    dfr_Paths = read_csv_member(zip_BBQ, "paths.csv")
+    return update_details(dfr_Details), dfr_Boolean.BooleanVariables.tolist(), dfr_Meta, dfr_Paths.Path.tolist()
+
+def read_project_v2(zip_BBQ: zf.ZipFile):
+    """
+    Reads the details, boolean variables, plate meta data and paths
+    of a version 2 archive.
+
+    Arguments:
+        zip_BBQ -> open zipfile.ZipFile.
+
+    Returns dfr_Details, lst_Boolean, dfr_Meta, lst_Paths
+    """
+    dic_Project = json.loads(zip_BBQ.read("project.json"))
+    return (from_json(dic_Project["Details"]), from_json(dic_Project["Boolean"]),
+            from_json(dic_Project["Meta"]), from_json(dic_Project["Paths"]).Path.tolist())
+
+def read_plate(zip_BBQ: zf.ZipFile, str_Plate: str):
+    """
+    Reads the dataframes of one plate/capillary set from an archive
+    of either version.
+
+    Arguments:
+        zip_BBQ -> open zipfile.ZipFile.
+        str_Plate -> string. DestinationPlateName of the plate.
+
+    Returns dictionary of dataframes (and DRTCResults for dose response
+    time courses), keys are the column names in the assay data
+    (e.g. "ProcessedDataFrame").
+    """
+    dic_Plate = {}
+    str_Subdirectory = str_Plate + "/"
+    bol_Version2 = "project.json" in zip_BBQ.namelist()
+    # Columns of KineticReplicates, saved as their wells (see encode_column)
+    lst_Kinetic = []
+    for str_Member, str_Column in lst_PlateMembers:
+        if bol_Version2 == True:
+            dic_Schema = json.loads(zip_BBQ.read(str_Subdirectory + str_Member + ".json"))
+            with np.load(io.BytesIO(zip_BBQ.read(str_Subdirectory + str_Member + ".npz"))) as npz_Arrays:
+                dic_Plate[str_Column] = decode_dataframe(dic_Schema, npz_Arrays)
+            if str_Column == "ProcessedDataFrame":
+                lst_Kinetic = [from_json(dic_Column["Name"]) for dic_Column in dic_Schema["Columns"]
+                               if dic_Column.get("Kinetic", False) == True]
+        else:
+            dfr_Member = read_csv_member(zip_BBQ, str_Subdirectory + str_Member + ".csv")
+            if str_Column == "References":
+                dfr_Member = update_references(dfr_Member)
+            else:
+                for j in dfr_Member.columns:
+                    if type(dfr_Member.loc[0,j]) == str:
+                        dfr_Member[j] = dfr_Member[j].apply(import_string_to_list)
+            dic_Plate[str_Column] = dfr_Member
+    if len(lst_Kinetic) > 0:
+        # All samples share the plate's raw data (wells x cycles), as after the analysis
+        arr_RawData = dic_Plate["RawDataFrame"].to_numpy(dtype=np.float64)
+        dfr_Processed = dic_Plate["ProcessedDataFrame"]
+        for str_Column in lst_Kinetic:
+            arr_Replicates = np.empty(len(dfr_Processed), dtype=object)
+            for smpl, lst_Locations in enumerate(dfr_Processed[str_Column]):
+                if isinstance(lst_Locations, list):
+                    arr_Replicates[smpl] = KineticReplicates(arr_RawData, lst_Locations,
+                        dfr_Processed["Concentrations"].iloc[smpl], dfr_Processed["Time"].iloc[smpl])
+                else:
+                    arr_Replicates[smpl] = np.nan
+            dfr_Processed[str_Column] = arr_Replicates
+    if str_Subdirectory + "drtcresults.npz" in zip_BBQ.namelist():
+        with np.load(io.BytesIO(zip_BBQ.read(str_Subdirectory + "drtcresults.npz"))) as npz_Arrays:
+            dic_Plate["DRTCResults"] = DRTCResults.from_arrays(npz_Arrays)
+    elif ("NormMean" in dic_Plate["ProcessedDataFrame"].columns
+          and all([isinstance(cell, pd.DataFrame) for cell in dic_Plate["ProcessedDataFrame"]["NormMean"]])):
+        # Dose response time course saved while each sample held a dataframe per column
+        dic_Plate["DRTCResults"] = DRTCResults.from_processed(dic_Plate["ProcessedDataFrame"])
+        dic_Plate["ProcessedDataFrame"] = dic_Plate["ProcessedDataFrame"].drop(columns=[column
+            for column in lst_CurveColumns + lst_ParameterColumns + lst_ValueColumns
+            if column in dic_Plate["ProcessedDataFrame"].columns])
+    return dic_Plate
+
+def read_csv_member(zip_BBQ: zf.ZipFile, str_Member: str):
+    """
+    Reads a csv file inside a version 1 archive.
+
+    Arguments:
+        zip_BBQ -> open zipfile.ZipFile.
+        str_Member -> string. Name of file inside archive.
+    """
+    with zip_BBQ.open(str_Member) as file:
+        return pd.read_csv(file, sep=",", header=0, index_col=0, engine="python")
+
+class ProjectArchive:
+    """
+    Loads the plates of a .bbq file on demand. The most recently used
+    plates are kept in memory, the least recently used ones get dropped
+    once more than int_CacheSize plates are loaded and are read from the
+    file again when needed. Plates that have been changed are kept until
+    the project has been saved.
+    """
+
+    def __init__(self, str_FilePath: str, int_CacheSize: int = int_PlateCacheSize):
+        """
+        Initialises class attributes.
+
+        Arguments:
+            str_FilePath -> string. Full path of project file.
+            int_CacheSize -> integer. Number of unchanged plates to keep.
+        """
+        self.str_FilePath = str_FilePath
+        self.int_CacheSize = int_CacheSize
+        self.dic_Plates = OrderedDict()
+        self.set_Changed = set()
+        # Plates can be requested from the GUI and from analysis threads
+        self.lock = threading.RLock()
+
+    def get(self, str_Plate: str, str_Column: str):
+        """
+        Returns a dataframe of a plate, loading the plate if required.
+
+        Arguments:
+            str_Plate -> string. DestinationPlateName of the plate.
+            str_Column -> string. Column in the assay data, e.g. "Layout"
+        """
+        with self.lock:
+            if str_Plate in self.dic_Plates.keys():
+                self.dic_Plates.move_to_end(str_Plate)
+            else:
+                # The archive is only open while reading so the
+                # file can be overwritten when saving.
+                with zf.ZipFile(self.str_FilePath, "r") as zip_BBQ:
+                    self.dic_Plates[str_Plate] = read_plate(zip_BBQ, str_Plate)
+                self.drop_unused()
+            return self.dic_Plates[str_Plate][str_Column]
+
+    def drop_unused(self):
+        """
+        Drops the least recently used unchanged plates.
+        """
+        with self.lock:
+            lst_Unchanged = [str_Plate for str_Plate in self.dic_Plates.keys()
+                             if not str_Plate in self.set_Changed]
+            for str_Plate in lst_Unchanged[:max(0,len(lst_Unchanged)-self.int_CacheSize)]:
+                self.dic_Plates.pop(str_Plate)
+
+    def set_changed(self, str_Plate: str):
+        """
+        Keeps a plate in memory until the project gets saved.
+
+        Arguments:
+            str_Plate -> string. DestinationPlateName of the plate.
+        """
+        with self.lock:
+            self.set_Changed.add(str_Plate)
+
+    def saved(self):
+        """
+        Gets called after the project has been written to str_FilePath.
+        All plates are now the same as in the file.
+        """
+        with self.lock:
+            self.set_Changed = set()
+            self.drop_unused()
+
+class LazyPlateFrame:
+    """
+    Stands in for a dataframe of a plate (e.g. "ProcessedDataFrame") or its
+    DRTCResults in the assay data of a lazily opened project. Attributes and
+    item access are handed on to the dataframe, which ProjectArchive loads
+    the first time it is needed. Writing through .loc, .at, .iloc, .iat,
+    item assignment or the methods in lst_InPlaceMethods marks the plate as
+    changed, as does retrieving a single cell that holds a dataframe or
+    series, which could be changed in place.
+    """
+
+    def __init__(self, archive: ProjectArchive, str_Plate: str, str_Column: str):
+        """
+        Initialises class attributes.
+
+        Arguments:
+            archive -> ProjectArchive the plate is loaded from.
+            str_Plate -> string. DestinationPlateName of the plate.
+            str_Column -> string. Column in the assay data, e.g. "Layout"
+        """
+        self.archive = archive
+        self.str_Plate = str_Plate
+        self.str_Column = str_Column
+
+    @property
+    def frame(self):
+        """
+        The actual dataframe.
+        """
+        return self.archive.get(self.str_Plate, self.str_Column)
+
+    def __getattr__(self, str_Attribute):
+        # Only called for attributes not set in __init__
+        if str_Attribute in ["loc","at","iloc","iat"]:
+            return LazyIndexer(self, str_Attribute)
+        if str_Attribute in lst_InPlaceMethods:
+            self.archive.set_changed(self.str_Plate)
+        return getattr(self.frame, str_Attribute)
+
+    def __getitem__(self, key):
+        return self.frame[key]
+
+    def __setitem__(self, key, value):
+        self.archive.set_changed(self.str_Plate)
+        self.frame[key] = value
+
+    def __len__(self):
+        return len(self.frame)
+
+    def __iter__(self):
+        return iter(self.frame)
+
+    def __contains__(self, key):
+        return key in self.frame
+
+    def __repr__(self):
+        return repr(self.frame)
+
+class LazyIndexer:
+    """
+    Hands indexing of a LazyPlateFrame on to the dataframe's indexer
+    (.loc, .at, .iloc or .iat), see LazyPlateFrame.
+    """
+
+    def __init__(self, lazyframe: LazyPlateFrame, str_Indexer: str):
+        self.lazyframe = lazyframe
+        self.str_Indexer = str_Indexer
+
+    def __getitem__(self, key):
+        value = getattr(self.lazyframe.frame, self.str_Indexer)[key]
+        if isinstance(value, (pd.DataFrame, pd.Series)) and (self.str_Indexer in ["at","iat"]
+                or (type(key) == tuple and len(key) == 2 and all([pd.api.types.is_scalar(k) for k in key]))):
+            self.lazyframe.archive.set_changed(self.lazyframe.str_Plate)
+        return value
+
+    def __setitem__(self, key, value):
+        self.lazyframe.archive.set_changed(self.lazyframe.str_Plate)
+        getattr(self.lazyframe.frame, self.str_Indexer)[key] = value
+def encode_dataframe(dfr_Input: pd.DataFrame):
+    """
+    Splits a dataframe into a json-compatible schema and a dictionary
+    of typed numpy arrays (see module docstring).
+
+    Arguments:
+        dfr_Input -> pandas dataframe.
+
+    Returns
+        dic_Schema -> dictionary. Index, columns and encoding of each column
+        dic_Arrays -> dictionary of numpy arrays, keys are array names in npz
+    """
+    dic_Schema = {"Index":to_json(dfr_Input.index.tolist()),
+                  "IndexName":to_json(dfr_Input.index.name),
+                  "Columns":[]}
+    dic_Arrays = {}
+    for col, str_Column in enumerate(dfr_Input.columns):
+        dic_Column = encode_column(dfr_Input[str_Column], "c" + str(col), dic_Arrays)
+        dic_Column["Name"] = to_json(str_Column)
+        dic_Column["Dtype"] = str(dfr_Input[str_Column].dtype)
+        dic_Schema["Columns"].append(dic_Column)
+    return dic_Schema, dic_Arrays
+
+def encode_column(sr_Column: pd.Series, str_Key: str, dic_Arrays: dict):
+    """
+    Encodes one column. Arrays get added to dic_Arrays under names
+    starting with str_Key.
+
+    Arguments:
+        sr_Column -> pandas series.
+        str_Key -> string. Name of column's arrays in npz member.
+        dic_Arrays -> dictionary of numpy arrays.
+
+    Returns dictionary with encoding of column for the schema.
+    """
+    # Column of numbers (or booleans)
+    if sr_Column.dtype.kind in "biuf":
+        dic_Arrays[str_Key] = sr_Column.to_numpy()
+        return {"Encoding":"array","Key":str_Key}
+    lst_Cells = sr_Column.tolist()
+    lst_Types = set([type(cell) for cell in lst_Cells])
+    # Replicates of kinetic raw data: keep the wells of each concentration,
+    # the values are in the plate's raw data (see read_plate)
+    if KineticReplicates in lst_Types and lst_Types <= set([KineticReplicates, float, np.float64]):
+        dic_Column = encode_column(pd.Series([cell.lst_Locations if isinstance(cell, KineticReplicates) else cell
+                                              for cell in lst_Cells], dtype=object), str_Key, dic_Arrays)
+        dic_Column["Kinetic"] = True
+        return dic_Column
+    if len(lst_Cells) > 0 and (lst_Types <= set([float, np.float64, int, np.int64])
+                               or lst_Types <= set([bool, np.bool_])):
+        dic_Arrays[str_Key] = np.array(lst_Cells)
+        return {"Encoding":"array","Key":str_Key}
+    # Column of strings, np.nan where a cell is empty
+    if str in lst_Types and lst_Types <= set([str, float, np.float64]):
+        arr_Empty = np.array([not type(cell) == str for cell in lst_Cells])
+        if all([np.isnan(cell) for cell in sr_Column[arr_Empty]]) == True:
+            dic_Arrays[str_Key] = np.array([cell if type(cell) == str else "" for cell in lst_Cells])
+            dic_Arrays[str_Key + "_empty"] = arr_Empty
+            return {"Encoding":"string","Key":str_Key}
+    # Column of lists, np.nan where a cell holds no list
+    lst_Lengths = []
+    lst_Values = []
+    lst_Inner = []
+    bol_Nested = None
+    for cell in lst_Cells:
+        # Samples can hold series of wells, concentrations etc.
+        if isinstance(cell, pd.Series):
+            cell = cell.tolist()
+        if isinstance(cell, (list, tuple, np.ndarray)):
+            lst_Lengths.append(len(cell))
+            for value in cell:
+                if isinstance(value, (list, tuple, np.ndarray)):
+                    if bol_Nested == False:
+                        return {"Encoding":"json","Values":to_json(lst_Cells)}
+                    bol_Nested = True
+                    lst_Inner.append(len(value))
+                    lst_Values.extend(value)
+                else:
+                    if bol_Nested == True:
+                        return {"Encoding":"json","Values":to_json(lst_Cells)}
+                    bol_Nested = False
+                    lst_Values.append(value)
+        elif type(cell) in [float, np.float64] and np.isnan(cell) == True:
+            lst_Lengths.append(-1)
+        else:
+            return {"Encoding":"json","Values":to_json(lst_Cells)}
+    arr_Values = np.array(lst_Values)
+    if len(lst_Values) == 0:
+        arr_Values = np.array([], dtype=float)
+    elif not arr_Values.dtype.kind in "biufU" or (arr_Values.dtype.kind == "U"
+            and not set([type(value) for value in lst_Values]) == set([str])):
+        # Mixed types
+        return {"Encoding":"json","Values":to_json(lst_Cells)}
+    dic_Arrays[str_Key] = arr_Values
+    dic_Arrays[str_Key + "_lengths"] = np.array(lst_Lengths, dtype=np.int32)
+    if bol_Nested == True:
+        dic_Arrays[str_Key + "_inner"] = np.array(lst_Inner, dtype=np.int32)
+        return {"Encoding":"nested","Key":str_Key}
+    return {"Encoding":"ragged","Key":str_Key}
+
+def decode_dataframe(dic_Schema: dict, npz_Arrays):
+    """
+    Reassembles a dataframe written by encode_dataframe.
+
+    Arguments:
+        dic_Schema -> dictionary. Schema from json member.
+        npz_Arrays -> dictionary-like of numpy arrays (e.g. loaded npz member)
+
+    Returns pandas dataframe.
+    """
+    lst_Index = from_json(dic_Schema["Index"])
+    dic_Columns = {}
+    for dic_Column in dic_Schema["Columns"]:
+        dic_Columns[from_json(dic_Column["Name"])] = decode_column(dic_Column, npz_Arrays, len(lst_Index))
+    dfr_Output = pd.DataFrame(dic_Columns, index=lst_Index,
+                              columns=[from_json(dic_Column["Name"]) for dic_Column in dic_Schema["Columns"]])
+    dfr_Output.index.name = dic_Schema["IndexName"]
+    return dfr_Output
+
+def decode_column(dic_Column: dict, npz_Arrays, int_Length: int):
+    """
+    Decodes one column written by encode_column.
+
+    Arguments:
+        dic_Column -> dictionary. Encoding of column from schema.
+        npz_Arrays -> dictionary-like of numpy arrays
+        int_Length -> integer. Number of rows.
+
+    Returns numpy array.
+    """
+    if dic_Column["Encoding"] == "array":
+        arr_Column = npz_Arrays[dic_Column["Key"]]
+        if dic_Column["Dtype"] == "object":
+            arr_Column = arr_Column.astype(object)
+        return arr_Column
+    arr_Column = np.empty(int_Length, dtype=object)
+    if dic_Column["Encoding"] == "json":
+        arr_Column[:] = from_json(dic_Column["Values"])
+        return arr_Column
+    elif dic_Column["Encoding"] == "string":
+        arr_Column[:] = npz_Arrays[dic_Column["Key"]].tolist()
+        arr_Column[npz_Arrays[dic_Column["Key"] + "_empty"]] = np.nan
+        return arr_Column
+    lst_Values = npz_Arrays[dic_Column["Key"]].tolist()
+    lst_Lengths = npz_Arrays[dic_Column["Key"] + "_lengths"].tolist()
+    if dic_Column["Encoding"] == "nested":
+        # Assemble inner lists first
+        lst_Inner = []
+        int_Start = 0
+        for int_Inner in npz_Arrays[dic_Column["Key"] + "_inner"].tolist():
+            lst_Inner.append(lst_Values[int_Start:int_Start+int_Inner])
+            int_Start += int_Inner
+        lst_Values = lst_Inner
+    int_Start = 0
+    for i in range(int_Length):
+        if lst_Lengths[i] < 0:
+            arr_Column[i] = np.nan
+        else:
+            arr_Column[i] = lst_Values[int_Start:int_Start+lst_Lengths[i]]
+            int_Start += lst_Lengths[i]
+    return arr_Column
+
+def to_json(value):
+    """
+    Turns a value (dataframe, list, numpy type...) into something
+    json can write. Dataframes and series become dictionaries with the
+    key "DataFrame" or "Series", tuples become lists.
+
+    Arguments:
+        value -> any value found in the project's dataframes.
+    """
+    if isinstance(value, pd.DataFrame):
+        return {"DataFrame":{"Index":to_json(value.index.tolist()),
+                             "Columns":to_json(value.columns.tolist()),
+                             "Data":to_json(value.values.tolist())}}
+    elif isinstance(value, pd.Series):
+        return {"Series":{"Index":to_json(value.index.tolist()),
+                          "Name":to_json(value.name),
+                          "Data":to_json(value.tolist())}}
+    elif isinstance(value, (list, tuple, np.ndarray)):
+        return [to_json(item) for item in value]
+    elif isinstance(value, dict):
+        return {str(key):to_json(item) for key, item in value.items()}
+    elif isinstance(value, (np.bool_)):
+        return bool(value)
+    elif isinstance(value, np.integer):
+        return int(value)
+    elif isinstance(value, np.floating):
+        return float(value)
+    elif isinstance(value, (str, int, float, bool)) or value == None:
+        return value
+    else:
+        # pandas Timestamps and the like
+        return str(value)
+
+def from_json(value):
+    """
+    Reverses to_json: Turns dictionaries with the key "DataFrame"
+    or "Series" back into dataframes and series.
+
+    Arguments:
+        value -> value read from json.
+    """
+    if isinstance(value, dict):
+        if "DataFrame" in value.keys():
+            return pd.DataFrame(from_json(value["DataFrame"]["Data"]),
+                                index=from_json(value["DataFrame"]["Index"]),
+                                columns=from_json(value["DataFrame"]["Columns"]))
+        elif "Series" in value.keys():
+            return pd.Series(from_json(value["Series"]["Data"]),
+                             index=from_json(value["Series"]["Index"]),
+                             name=from_json(value["Series"]["Name"]),
+                             dtype=object)
+        return {key:from_json(item) for key, item in value.items()}
+    elif isinstance(value, list):
+        return [from_json(item) for item in value]
+    return value
+
+def update_details(dfr_Details: pd.DataFrame):
+    """
+    Ensure backwards compatibility for details. Previously, was
+    just a list, from version 1.0.8 onwards a full dataframe.
+
+    Arguments:
+        dfr_Details -> pandas dataframe. Details as read from file.
+    """
+    if dfr_Details.index[0] == 0: # we are dealing with the old list style!
+        dfr_Details.set_index(pd.Index(["AssayType","AssayCategory","PurificationID",
+                                        "ProteinConcentration","PeptideID",
+                                        "PeptideConcentration","Solvent",
+                                        "SolventConcentration","Buffer","ELN",
+                                        "AssayVolume","DataFileExtension",
+                                        "SampleSource","Device","Date"]),
+                                        inplace=True)
+        dfr_Details = dfr_Details.rename(columns={"AssayDetails":"Value"})
+        if dfr_Details.iloc[1,0] == "single_dose":
+            dfr_Details.loc["Shorthand","Value"] = "EPSD"
+        elif dfr_Details.iloc[1,0] == "dose_response":
+            dfr_Details.loc["Shorthand","Value"] = "EPDR"
+        elif dfr_Details.iloc[1,0] == "dose_response_time_course":
+            dfr_Details.loc["Shorthand","Value"] = "DRTC"
+        elif dfr_Details.iloc[1,0] == "thermal_shift":
+            if dfr_Details.iloc[0,0] == "nanoDSF":
+                dfr_Details.loc["Shorthand","Value"] = "NDSF"
+            else:
+                dfr_Details.loc["Shorthand","Value"] = "DSF"
+        elif dfr_Details.iloc[1,0] == "rate":
+            dfr_Details.loc["Shorthand","Value"] = "RATE"
+    return dfr_Details
+
+def update_references(dfr_References: pd.DataFrame):
+    """
+    Read in references (i.e. samples that are used to normalise
+    data against, e.g. solvent/buffer only for background/signal
+    baseline or known inhibitors that give 100% effect). Assumes
+    ONE each of solvent reference, buffer reference, control compound.
+    Backwards compatiblity: was previously a list, so indices and
+    column names need updating.
+
+    Arguments:
+        dfr_References -> pandas dataframe. References as read from file.
+    """
+    if dfr_References.columns[0] == "0":
+        dfr_References = dfr_References.rename(columns={"0":0})
+    if dfr_References.columns[0] == "References":
+        dfr_References_Convert = pd.DataFrame(columns=[0],
+                                              index=["SolventMean",
+                                                     "SolventMedian",
+                                                     "SolventSEM",
+                                                     "SolventSTDEV",
+                                                     "SolventMAD",
+                                                     "BufferMean",
+                                                     "BufferMedian",
+                                                     "BufferSEM",
+                                                     "BufferSTDEV",
+                                                     "BufferMAD",
+                                                     "ControlMean",
+                                                     "ControlMedian",
+                                                     "ControlSEM",
+                                                     "ControlSTDEV",
+                                                     "ControlMAD",
+                                                     "ZPrimeMean",
+                                                     "ZPrimeMeadian"])
+        # Solvent reference
+        dfr_References_Convert.at["SolventMean",0] = dfr_References.iloc[0,0]
+        dfr_References_Convert.at["SolventMedian",0] = np.nan
+        dfr_References_Convert.at["SolventSEM",0] = dfr_References.iloc[1,0]
+        dfr_References_Convert.at["SolventSTDEV",0] = np.nan
+        dfr_References_Convert.at["SolventMAD",0] = np.nan
+        # Buffer reference
+        dfr_References_Convert.at["BufferMean",0] = dfr_References.iloc[4,0]
+        dfr_References_Convert.at["BufferMedian",0] = np.nan
+        dfr_References_Convert.at["BufferSEM",0] = dfr_References.iloc[5,0]
+        dfr_References_Convert.at["BufferSTDEV",0] = np.nan
+        dfr_References_Convert.at["BufferMAD",0] = np.nan
+        # Control compound
+        dfr_References_Convert.at["ControlMean",0] = dfr_References.iloc[2,0]
+        dfr_References_Convert.at["ControlMedian",0] = np.nan
+        dfr_References_Convert.at["ControlSEM",0] = dfr_References.iloc[3,0]
+        dfr_References_Convert.at["ControlSTDEV",0] = np.nan
+        dfr_References_Convert.at["ControlMAD",0] = np.nan
+        # Quality metrics
+        dfr_References_Convert.at["ZPrimeMean",0] = dfr_References.iloc[6,0]
+        dfr_References_Convert.at["ZPrimeMedian",0] = dfr_References.iloc[7,0]
+        # Overwrite
+        dfr_References = dfr_References_Convert
+    return dfr_References
@@ -2,70 +2,138 @@
 Library of functions to read out results from devices, e.g. plate readers
 
 Functions:
+    parse_bmg_list_file
     get_bmg_list_readout
     get_bmg_list_namesonly
     get_bmg_plate_readout
     get_lightcycler_readout
     get_mxp_readout
+    get_bmg_cycles
     get_bmg_timecourse_readout
     get_bmg_DRTC_readout
     get_FLIPR_DRTC_readout
+    parse_prometheus_workbook
     get_prometheus_readout
     get_prometheus_capillaries
     get_operetta_readout
+    read_head
+    is_excel
+    head_lines
+    workbook_sheets
+    workbook_strings
+    sniff_bmg_plate
+    sniff_bmg_kinetic
+    sniff_bmg_list
+    sniff_flipr
+    sniff_lightcycler
+    sniff_mxp
+    sniff_prometheus
+    sniff_operetta_columbus
+    sniff_operetta_harmony
+    read_bmg_plate
+    read_bmg_list
+    read_bmg_timecourse
+    read_bmg_DRTC
+    read_FLIPR_DRTC
+    read_lightcycler
+    read_mxp
+    read_prometheus
+    read_operetta_columbus
+    read_operetta_harmony
+    get_reader_name
+    sniff_datafile
+    read_datafile
+    list_datafiles
 
 """
+import os
+import re
+import zipfile
 import pandas as pd
 import numpy as np
+import openpyxl
 import lib_platefunctions as pf
 
-def get_bmg_list_readout(datafile: str, wells: int):
+# Parsed BMG list files. Key is (path, size, time of last modification)
+# so that a file gets parsed again once it changes.
+dic_ListFileCache = {}
+
+def parse_bmg_list_file(datafile: str):
     """
-    Parses list format BMG Pherastar output and writes it into
-    a dataframe.
-    
+    Parses list format BMG Pherastar output once and caches the result.
+    The file selection tab and the processing of each plate all get the
+    same parsed file.
+
     Arguments:
         datafile -> string. Path of datafile.
-        wells -> integer. Plate format in number of wells.
-                 Permitted: 96, 384, 1536
-    
+
     Returns:
-        Pandas dataframe. Index is well, columns are plates in file
+        Dictionary with the parsed file ("Readings", pandas dataframe with
+        columns "Plate", "Reading" and "Well") and the readouts for each
+        plate format that has been asked for ("Plates", dictionary, see
+        get_bmg_list_readout), or None if the file cannot be parsed.
+        The dataframes are shared, do not change them in place.
     """
+    try:
+        tpl_Key = (os.path.abspath(datafile), os.path.getsize(datafile),
+                   os.path.getmtime(datafile))
+    except OSError:
+        return None
+    if tpl_Key in dic_ListFileCache.keys():
+        return dic_ListFileCache[tpl_Key]
     # Read file. Cells in PheraStar output are tab stop separated (Symbol: \t)
     try:
-        dfr_Direct = pd.read_csv(datafile, sep="\t", header=None,
-                                 index_col=False, engine="python",
-                                 names=["Plate", "Reading"])
+        try:
+            dfr_Direct = pd.read_csv(datafile, sep="\t", header=None,
+                                     index_col=False, engine="c",
+                                     names=["Plate", "Reading"])
+        except pd.errors.ParserError:
+            # The python engine is more forgiving with malformed lines
+            dfr_Direct = pd.read_csv(datafile, sep="\t", header=None,
+                                     index_col=False, engine="python",
+                                     names=["Plate", "Reading"])
     except:
         return None
     # Remove empty lines
     dfr_Direct = dfr_Direct.dropna()
     # Separate first column into plate and well. Write well into new column
-    lst_Plates = dfr_Direct.Plate.apply(pf.pherastar_plate)
-    lst_Wells = dfr_Direct.Plate.apply(pf.pherastar_well)
-    dfr_Direct.Plate = lst_Plates
-    dfr_Direct["Well"] = lst_Wells
-    if wells == 96:
-        dfr_Direct.Well = dfr_Direct.Well.apply(pf.sortable_well_96)
-        dfr_Direct.Well = dfr_Direct.Well.apply(pf.well_to_index_96)
-    elif wells == 384:
-        dfr_Direct.Well = dfr_Direct.Well.apply(pf.sortable_well_384)
-        dfr_Direct.Well = dfr_Direct.Well.apply(pf.well_to_index_384)
-    elif wells == 1536:
-        dfr_Direct.Well = dfr_Direct.Well.apply(pf.sortable_well_1536)
-        dfr_Direct.Well = dfr_Direct.Well.apply(pf.well_to_index_1536)
-    # repurpose lstPlates to only contain the unique plate names
-    lst_Plates = np.unique(np.array(lst_Plates))
-    # repurpose lstWells to hold list of all wells possible on the current plate type
-    lst_Wells = pf.write_well_list(wells)
-    # Create new dataframe to hold the plate data
-    dfr_Plates = pd.DataFrame(lst_Wells, columns=["Well"])
-    # Get reading for each plate and write it in dfPlateArray as new column
-    for p in range(len(lst_Plates)):
-        dfr_Plates[lst_Plates[p]] = dfr_Direct[dfr_Direct.Plate == lst_Plates[p]].reset_index().Reading
-    # Return
-    return dfr_Plates
+    dfr_Direct["Well"] = dfr_Direct.Plate.apply(pf.pherastar_well)
+    dfr_Direct["Plate"] = dfr_Direct.Plate.apply(pf.pherastar_plate)
+    # Forget earlier versions of the same file
+    for tpl_Cached in [tpl_Cached for tpl_Cached in dic_ListFileCache.keys()
+                       if tpl_Cached[0] == tpl_Key[0]]:
+        dic_ListFileCache.pop(tpl_Cached)
+    dic_ListFileCache[tpl_Key] = {"Readings":dfr_Direct, "Plates":{}}
+    return dic_ListFileCache[tpl_Key]
+
+def get_bmg_list_readout(datafile: str, wells: int):
+    """
+    Parses list format BMG Pherastar output and writes it into
+    a dataframe. The file only gets parsed and split into plates
+    once, see parse_bmg_list_file.
+    
+    Arguments:
+        datafile -> string. Path of datafile.
+        wells -> integer. Plate format in number of wells.
+                 Permitted: 96, 384, 1536
+    
+    Returns:
+        Pandas dataframe. Index is well, columns are plates in file.
+        Shared between calls, do not change it in place.
+    """
+    dic_Parsed = parse_bmg_list_file(datafile)
+    if dic_Parsed is None:
+        return None
+    if not wells in dic_Parsed["Plates"].keys():
+        # List of all wells possible on the current plate type
+        lst_Wells = pf.write_well_list(wells)
+        # Readings of each plate in the order they are in the file,
+        # split into plates in one go.
+        dic_Plates = {"Well":lst_Wells}
+        for str_Plate, dfr_Plate in dic_Parsed["Readings"].groupby("Plate", sort=True):
+            dic_Plates[str_Plate] = dfr_Plate.Reading.reset_index(drop=True).reindex(range(len(lst_Wells)))
+        dic_Parsed["Plates"][wells] = pd.DataFrame(dic_Plates)
+    return dic_Parsed["Plates"][wells]
 
 def get_bmg_list_namesonly(datafile: str):
     """
@@ -74,17 +142,10 @@ def get_bmg_list_namesonly(datafile: str):
     Arguments:
         datafile -> string. Path of datafile
     """
-    # Read file. Cells in PheraStar output are tab stop separated (Symbol: \t)
-    try:
-        dfr_Direct = pd.read_csv(datafile, sep="\t", header=None, index_col=False,
-                                 engine="python", names=["Plate", "Reading"])
-    except:
+    dic_Parsed = parse_bmg_list_file(datafile)
+    if dic_Parsed is None:
         return None
-    # Remove empty lines
-    dfr_Direct = dfr_Direct.dropna()
-    # Separate first column into plate and well. Write well into new column
-    arr_Plates = dfr_Direct.Plate.apply(pf.pherastar_plate)
-    arr_Plates = np.unique(np.array(arr_Plates))
+    arr_Plates = np.unique(np.array(dic_Parsed["Readings"].Plate))
     # numpy arrays are immutable, so we need an actual list
     # into which we write the entries that pass the criteria
     lst_Plates = []
@@ -102,8 +163,8 @@ def get_bmg_plate_readout(datapath: str, datafile: str, wells: int, assaytype: s
     masquerading as xls files. Depending on the machine/software version/protocol,
     they sometimes seem purely tab delimited, sometimes there is leading
     whitespace, sometimes they"ve ben resaved by the user as actual excel files.
-    If they are actual excel files, the read_csv throw an error and we will have to try
-    read_excel.
+    Actual excel files are recognised by the start of the file (see is_excel)
+    and read with read_excel.
 
     Arguments:
         datapath -> string. Path to directory of datafile
@@ -114,23 +175,25 @@ def get_bmg_plate_readout(datapath: str, datafile: str, wells: int, assaytype: s
                      data file. Permitted: "HTRF", "AlphaScreen", "TAMRA FP".
     """
     lst_Columns = []
-    # In case there is no slash at the end of the data path, add one!
-    if datapath[len(datapath)-1] != chr(92):
-        datapath = datapath + chr(92)
+    # Join path and file name with the separator of whichever OS we are on
+    str_DataFile = os.path.join(datapath, datafile)
     # Make 49 columns (48 columns max on plate, plus 1 column for well letters)
     for i in range(49):
         lst_Columns.append(i)
     # Read file. Cells in PheraStar output are tab stop separated (Symbol: \t)
+    head = read_head(str_DataFile)
+    if head is None:
+        return None
     try:
-        dfr_Direct = pd.read_csv(datapath + datafile, sep="\t", header=None,
-                                 index_col=False, engine="python", names=lst_Columns)
-    except:
-        try:
-            dfr_Direct = pd.read_excel(datapath + datafile, header=None,
+        if is_excel(head) == True:
+            dfr_Direct = pd.read_excel(str_DataFile, header=None,
                                        index_col=False, engine="openpyxl",
                                        names=lst_Columns)
-        except:
-            return None
+        else:
+            dfr_Direct = pd.read_csv(str_DataFile, sep="\t", header=None,
+                                     index_col=False, engine="python", names=lst_Columns)
+    except:
+        return None
 
     if dfr_Direct.iloc[0,0].find("Testname") == -1:
         return None
@@ -193,21 +256,24 @@ def get_lightcycler_readout(datafile: str, wells: int):
                                         "Cycle","Time","Temp","Fluo"])
     except Exception:
         return None
-    # Define required lists
-    lst_Wells = dfr_Direct.Well.unique()
-    lst_Sortable = []
-    for i in range(len(lst_Wells)):
-        lst_Sortable.append(pf.sortable_well(lst_Wells[i],wells))
-    lst_SampleNames = dfr_Direct.Name.unique()
+    # Group rows by well in one go, wells in the order they appear in the file
+    arr_Codes, arr_Wells = pd.factorize(dfr_Direct.Well)
+    arr_Order = np.argsort(arr_Codes[arr_Codes >= 0], kind="stable")
+    arr_Ends = np.cumsum(np.bincount(arr_Codes[arr_Codes >= 0], minlength=len(arr_Wells)))
+    dfr_Direct = dfr_Direct[arr_Codes >= 0].iloc[arr_Order]
+    lst_Names = dfr_Direct.Name.tolist()
+    lst_Temp = dfr_Direct.Temp.tolist()
+    lst_Fluo = dfr_Direct.Fluo.tolist()
     # Build new dataframe based on number of wells in data file
-    dfr_Readout = pd.DataFrame(index=range(len(lst_Wells)),
+    dfr_Readout = pd.DataFrame(index=range(len(arr_Wells)),
                                columns=["Well","Name","Temp","Fluo"])
     # Populate with Well as string, SampleName as string, Temp as list, Fluo as list.
-    for i in range(len(lst_Wells)):
-        dfr_Readout.loc[i,"Well"] = lst_Sortable[i]
-        dfr_Readout.loc[i,"Name"] = lst_SampleNames[i]
-        dfr_Readout.loc[i,"Temp"] = dfr_Direct[(dfr_Direct["Well"]==lst_Wells[i])]["Temp"].tolist()
-        dfr_Readout.loc[i,"Fluo"] = dfr_Direct[(dfr_Direct["Well"]==lst_Wells[i])]["Fluo"].tolist()
+    for i in range(len(arr_Wells)):
+        int_Start = arr_Ends[i-1] if i > 0 else 0
+        dfr_Readout.at[i,"Well"] = pf.sortable_well(arr_Wells[i],wells)
+        dfr_Readout.at[i,"Name"] = lst_Names[int_Start]
+        dfr_Readout.at[i,"Temp"] = lst_Temp[int_Start:arr_Ends[i]]
+        dfr_Readout.at[i,"Fluo"] = lst_Fluo[int_Start:arr_Ends[i]]
     # Return
     return dfr_Readout
 
@@ -263,17 +329,73 @@ def get_mxp_readout(datafile: str, start: int):
     dfr_Direct = pd.concat([dfr_Direct_Top.T, dfr_Direct_Bot.T]).reset_index(drop=True)
     # Assumption is one reading per degree
     lst_Temp = list(range(start, start + dfr_Direct.shape[1]))
-    # Create new dataframe
-    dfr_Readout = pd.DataFrame(index=range(len(lst_Wells)),
-                               columns=["Well","Name","Temp","Fluo"])
-    for well in range(dfr_Readout.shape[0]):
-        dfr_Readout.loc[well,"Well"] = lst_Wells[well]
-        dfr_Readout.loc[well,"Name"] = lst_Wells[well]
-        dfr_Readout.loc[well,"Temp"] = lst_Temp
-        dfr_Readout.loc[well,"Fluo"] = dfr_Direct.loc[well].tolist()
+    # Create new dataframe, one row of dfr_Direct per well
+    dfr_Readout = pd.DataFrame({"Well":lst_Wells,
+                                "Name":lst_Wells,
+                                "Temp":[lst_Temp for well in lst_Wells],
+                                "Fluo":dfr_Direct.to_numpy().tolist()},
+                               index=range(len(lst_Wells)), dtype=object)
     # Return the new dataframe
     return dfr_Readout
 
+def get_bmg_cycles(datafile: str, wells: int, bol_RequireTime: bool = False):
+    """
+    Reads BMG kinetic output with one plate-shaped table per cycle.
+    All "Cycle:" lines are found in one go and each table is copied
+    as one block into a wells x cycles array.
+
+    Arguments:
+        datafile -> string. Path of datafile
+        wells -> integer. Plate format in number of wells.
+        bol_RequireTime -> boolean. Only use cycles where the line after
+                           "Cycle:" holds the time.
+
+    Returns
+        arr_Times -> numpy array. Time of each cycle in seconds, np.nan
+                     where it could not be read.
+        arr_Signal -> numpy array, wells x cycles. np.nan where a cell
+                      holds no number (e.g. "-" for wells not read)
+        or None if the file could not be read.
+    """
+    int_Columns = pf.plate_columns(wells)
+    int_Rows = pf.plate_rows(wells)
+    lst_ReadoutColumns = range(int_Columns+1)
+    head = read_head(datafile)
+    if head is None:
+        return None
+    # Any number of spaces is separator. The C engine can handle this,
+    # the python engine is more forgiving with malformed lines.
+    try:
+        if is_excel(head) == True:
+            dfr_Direct = pd.read_excel(datafile, header=None, index_col=False,
+                                       engine="openpyxl", names=lst_ReadoutColumns)
+        else:
+            try:
+                dfr_Direct = pd.read_csv(datafile, sep="\s+", header=None, index_col=False,
+                                         engine="c", names=lst_ReadoutColumns)
+            except pd.errors.ParserError:
+                dfr_Direct = pd.read_csv(datafile, sep="\s+", header=None, index_col=False,
+                                         engine="python", names=lst_ReadoutColumns)
+    except:
+        return None
+    # Go through first column to find cycles and associated time
+    sr_First = dfr_Direct[0].astype(str)
+    arr_CycleLines = np.flatnonzero(sr_First.str.contains("Cycle:", regex=False).to_numpy())
+    arr_CycleLines = arr_CycleLines[arr_CycleLines+1 < len(dfr_Direct)]
+    if bol_RequireTime == True:
+        arr_CycleLines = arr_CycleLines[sr_First.iloc[arr_CycleLines+1].str.contains("Time", regex=False).to_numpy()]
+    # -> String in file is "Time [s]: 1234"
+    # -> number of seconds ends up in third column (index 2)
+    arr_Times = pd.to_numeric(dfr_Direct[2].iloc[arr_CycleLines+1], errors="coerce").to_numpy(dtype=float)
+    # Everything that is not a number becomes np.nan
+    arr_Numbers = dfr_Direct[list(range(1,int_Columns+1))].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    arr_Signal = np.full((wells, len(arr_CycleLines)), np.nan)
+    for cycle, line in enumerate(arr_CycleLines):
+        # Table starts three lines after "Cycle:", wells are in rows of the plate
+        arr_Block = arr_Numbers[line+3:line+3+int_Rows]
+        arr_Signal[:arr_Block.size,cycle] = arr_Block.ravel()
+    return arr_Times, arr_Signal
+
 def get_bmg_timecourse_readout(datafile: str):
     """
     Get readout for timecourse on BMG plate reader.
@@ -286,49 +408,22 @@ def get_bmg_timecourse_readout(datafile: str):
     "Time"(list of times),"Signal"(list of readings)
     """
     int_PlateFormat = 384
-    int_Columns = pf.plate_columns(int_PlateFormat)
-    int_Rows = pf.plate_rows(int_PlateFormat)
-    lst_ReadoutColumns = range(int_Columns+1)
-
-    try:
-        dfr_Direct = pd.read_csv(datafile, sep="\s+", header=None, index_col=False,
-                                 engine="python", names=lst_ReadoutColumns)
-    except:
-        try:
-             dfr_Direct = pd.read_excel(datafile, header=None, index_col=False,
-                                        engine="openpyxl", names=lst_ReadoutColumns)
-        except:
-            return None
-
-    int_Cycles = 0
+    tpl_Cycles = get_bmg_cycles(datafile, int_PlateFormat)
+    if tpl_Cycles is None:
+        return None
+    arr_Times, arr_Signal = tpl_Cycles
+    # Cycles without readable time are skipped
+    arr_Signal[:,np.isnan(arr_Times)] = np.nan
+    arr_Read = ~np.isnan(arr_Signal)
     # Time of cycle is given in file
     dfr_Timecourse = pd.DataFrame(index=range(int_PlateFormat),
                                   columns=["Well","Time","Signal"])
-    # Initialise timecourse
     for i in range(len(dfr_Timecourse)):
-        dfr_Timecourse.loc[i,"Well"] = pf.index_to_well(i+1,int_PlateFormat)
-        dfr_Timecourse.loc[i,"Time"] = []
-        dfr_Timecourse.loc[i,"Signal"] = []
-
-    # Go through first column to find number of cycles and associated time
-    for line in range(len(dfr_Direct)):
-        if dfr_Direct.iloc[line,0].find("Cycle:") != -1:
-            int_Cycles += 1
-            # Any number of spaces is separator
-            # -> String in csv is "Time [s]: 1234"
-            # -> number of seconds ends up in third column (index 2)
-            for row in range(int_Rows):
-                for col in range(int_Columns):
-                    # find corresponding index
-                    int_Index = row*int_Columns + col
-                    try:
-                        value = float(dfr_Direct.iloc[line+3+row,1+col])
-                        dfr_Timecourse.loc[int_Index,"Signal"].append(value)
-                        dfr_Timecourse.loc[int_Index,"Time"].append(float(dfr_Direct.iloc[line+1,2]))
-                    except ValueError:
-                        pass
+        dfr_Timecourse.at[i,"Well"] = pf.index_to_well(i+1,int_PlateFormat)
+        dfr_Timecourse.at[i,"Time"] = arr_Times[arr_Read[i]].tolist()
+        dfr_Timecourse.at[i,"Signal"] = arr_Signal[i,arr_Read[i]].tolist()
     # cleanup to remove any empty wells
-    dfr_Timecourse = dfr_Timecourse[dfr_Timecourse["Signal"].map(lambda d: len(d)) > 0]
+    dfr_Timecourse = dfr_Timecourse[arr_Read.any(axis=1)]
     dfr_Timecourse.reset_index(drop=True, inplace=True)
     return dfr_Timecourse
 
@@ -345,42 +440,17 @@ def get_bmg_DRTC_readout(datafile: str):
     as columns.
     '''
     int_PlateFormat = 384
-    int_Columns = pf.plate_columns(int_PlateFormat)
-    int_Rows = pf.plate_rows(int_PlateFormat)
-    lst_ReadoutColumns = range(int_Columns+1)
-    # Read file. Cells in PheraStar output are tab stop separated (Symbol: \t)
-    try:
-        dfr_Direct = pd.read_csv(datafile, sep="\s+", header=None,
-                                 index_col=False, engine="python",
-                                 names=lst_ReadoutColumns)
-    except:
-        try:
-             dfr_Direct = pd.read_excel(datafile, header=None, index_col=False,
-                                        engine="openpyxl", names=lst_ReadoutColumns)
-        except:
-            return None
     # Get location of "Cycle" and ensure there is a corresponding time stamp
-    lst_CycleTimes = []
-    lst_CyclesLines = []
-    for line in range(len(dfr_Direct)):
-        if (dfr_Direct.iloc[line,0].find("Cycle:") != -1 and
-            dfr_Direct.iloc[line+1,0].find("Time") != -1):
-            lst_CycleTimes.append(float(dfr_Direct.iloc[line+1,2]))
-            lst_CyclesLines.append(line)
+    tpl_Cycles = get_bmg_cycles(datafile, int_PlateFormat, bol_RequireTime = True)
     # Check if any cycles have actually been found. If not, return None and
     # next checks in the process will flag that raw data file was not the
     # right type
-    if len(lst_CycleTimes) == 0:
+    if tpl_Cycles is None or len(tpl_Cycles[0]) == 0:
         return None
+    arr_Times, arr_Signal = tpl_Cycles
     # Time of cycle is given in file
-    dfr_Timecourse = pd.DataFrame(index=range(int_PlateFormat),
-                                  columns=lst_CycleTimes)
-    # Initialise timecourse
-    for row in range(int_Rows):
-        for col in range(int_Columns):
-            for cycle in range(dfr_Timecourse.shape[1]):
-                dfr_Timecourse.iloc[pf.col_row_to_index(row,col,int_PlateFormat),cycle] = float(dfr_Direct.iloc[lst_CyclesLines[cycle]+3+row,1+col])
-    return dfr_Timecourse
+    return pd.DataFrame(arr_Signal, index=range(int_PlateFormat),
+                        columns=arr_Times.tolist())
 
 def get_FLIPR_DRTC_readout(datafile: str):
     '''
@@ -408,83 +478,129 @@ def get_FLIPR_DRTC_readout(datafile: str):
 
     return dfr_Timecourse
         
-def get_prometheus_readout(datafile: str):
+# Parsed Prometheus workbooks. Key is (path, size, time of last modification)
+dic_PrometheusCache = {}
+
+# Sheets in Prometheus output and the columns they go into in get_prometheus_readout.
+# The derivatives are only in processed output.
+lst_PrometheusSheets = [("Ratio","Ratio"),
+                        ("330nm","330nm"),
+                        ("350nm","350nm"),
+                        ("Scattering","Scattering")]
+lst_PrometheusDerivSheets = [("Ratio (1st deriv.)","RatioDeriv"),
+                             ("330nm (1st deriv.)","330nmDeriv"),
+                             ("350nm (1st deriv.)","350nmDeriv"),
+                             ("Scattering (1st deriv.)","ScatteringDeriv")]
+
+def parse_prometheus_workbook(datafile: str):
     """
-    Parses processed or unprocessed Nanotemper Prometheus output.
+    Opens processed or unprocessed Nanotemper Prometheus output once
+    (openpyxl, read only) and reads every sheet get_prometheus_readout
+    and get_prometheus_capillaries need. Results are cached, the file
+    only gets parsed again if it has changed.
 
     Arguments:
         datafile -> string. Path of datafile.
 
-    Returns dataframe with capillaries as indices and readouts as columns
-    (actual measurements are lists in the dataframe's cells)
+    Returns dictionary or None if the file is not Prometheus output:
+        "Capillaries" -> pandas dataframe with columns "CapIndex" and
+                         "CapillaryName", one row per capillary.
+        "Time", "Temp" -> numpy arrays, capillaries x data points.
+        "Ratio", "330nm", "350nm", "Scattering" and, if all derivatives
+        are in the file, "RatioDeriv", "330nmDeriv", "350nmDeriv",
+        "ScatteringDeriv" -> numpy arrays, capillaries x data points.
+    Missing data points are np.nan.
     """
-    # Each readout gets parsed into its own dataframe.
-    # If it fails the first time, return None because it's
-    # not the correct file type.
     try:
-        dfr_Ratio = pd.read_excel(datafile, sheet_name="Ratio", header=None,
-                                  engine="openpyxl")
-    except Exception:
+        tpl_Key = (os.path.abspath(datafile), os.path.getsize(datafile),
+                   os.path.getmtime(datafile))
+    except OSError:
         return None
-    dfr_330nm = pd.read_excel(datafile, sheet_name="330nm", header=None,
-                              engine="openpyxl")
-    dfr_350nm = pd.read_excel(datafile, sheet_name="350nm", header=None,
-                              engine="openpyxl")
-    dfr_Scattering = pd.read_excel(datafile, sheet_name="Scattering", header=None,
-                                   engine="openpyxl")
-    # Check whether we have a derivative already determined
+    if tpl_Key in dic_PrometheusCache.keys():
+        return dic_PrometheusCache[tpl_Key]
     try:
-        dfr_RatioDeriv = pd.read_excel(datafile, sheet_name="Ratio (1st deriv.)",
-                                       header=None, engine="openpyxl")
-        dfr_330nmDeriv = pd.read_excel(datafile, sheet_name="330nm (1st deriv.)",
-                                       header=None, engine="openpyxl")
-        dfr_350nmDeriv = pd.read_excel(datafile, sheet_name="350nm (1st deriv.)",
-                                       header=None, engine="openpyxl")
-        dfr_ScatteringDeriv = pd.read_excel(datafile, sheet_name="Scattering (1st deriv.)",
-                                            header=None, engine="openpyxl")
-        bol_Derivative = True
+        wbk_Prometheus = openpyxl.load_workbook(datafile, read_only=True, data_only=True)
     except Exception:
-        bol_Derivative = False
-    
-    int_Capillaries = 0
-    for col in range(len(dfr_Ratio.columns)):
-        if dfr_Ratio.iloc[1,col].find("Time") != -1:
-            int_Capillaries += 1
+        return None
+    lst_Sheets = lst_PrometheusSheets
+    # Check whether we have a derivative already determined
+    if all([str_Sheet in wbk_Prometheus.sheetnames for str_Sheet, str_Column in lst_PrometheusDerivSheets]) == True:
+        lst_Sheets = lst_Sheets + lst_PrometheusDerivSheets
+    if not all([str_Sheet in wbk_Prometheus.sheetnames for str_Sheet, str_Column in lst_Sheets]) == True:
+        wbk_Prometheus.close()
+        return None
+    dic_Sheets = {}
+    for str_Sheet, str_Column in lst_Sheets:
+        lst_Rows = [list(row) for row in wbk_Prometheus[str_Sheet].iter_rows(values_only=True)]
+        # Remove empty rows at the end and make all rows the same length
+        while len(lst_Rows) > 0 and all([value is None for value in lst_Rows[-1]]) == True:
+            lst_Rows.pop()
+        int_Columns = max([len(row) for row in lst_Rows] + [0])
+        dic_Sheets[str_Column] = pd.DataFrame([row + [None]*(int_Columns-len(row)) for row in lst_Rows])
+    wbk_Prometheus.close()
+    dfr_Ratio = dic_Sheets["Ratio"]
+    if len(dfr_Ratio) < 2:
+        return None
+    # Each capillary has three columns in each sheet: Time, temperature and readout.
+    # The first row holds the name of the capillary, e.g. "Capillary #1 (3-0)"
+    lst_Columns = [col for col in range(len(dfr_Ratio.columns))
+                   if type(dfr_Ratio.iloc[1,col]) == str and dfr_Ratio.iloc[1,col].find("Time") != -1]
+    dfr_Capillaries = pd.DataFrame(index=range(len(lst_Columns)),
+                                   columns=["CapIndex","CapillaryName"])
+    for idx_Sample in range(len(lst_Columns)):
+        str_Header = dfr_Ratio.iloc[0,lst_Columns[idx_Sample]]
+        int_Pound = str_Header.find("#")
+        if str_Header[int_Pound+2:int_Pound+3] == " ":
+            # Recurring reminder: human friendly index vs machine index!
+            idx_Capillary = int(str_Header[int_Pound+1:int_Pound+2])-1
+        else:
+            idx_Capillary = int(str_Header[int_Pound+1:int_Pound+3])-1
+        dfr_Capillaries.loc[idx_Sample,"CapIndex"] = idx_Capillary
+        idx_Open = str_Header.find("(")
+        idx_Close = str_Header.find(")")
+        if idx_Open != -1:
+            dfr_Capillaries.loc[idx_Sample,"CapillaryName"] = str_Header[idx_Open+1:idx_Close]
+        else:
+            dfr_Capillaries.loc[idx_Sample,"CapillaryName"] = str_Header
+    dic_Parsed = {"Capillaries":dfr_Capillaries}
+    # Data starts in third row. Transpose to get capillaries x data points
+    for str_Column, dfr_Sheet, int_Offset in ([("Time",dfr_Ratio,0),("Temp",dfr_Ratio,1)]
+            + [(str_Column,dic_Sheets[str_Column],2) for str_Sheet, str_Column in lst_Sheets]):
+        lst_Data = [col+int_Offset for col in lst_Columns]
+        dic_Parsed[str_Column] = dfr_Sheet.iloc[2:,lst_Data].apply(pd.to_numeric,
+            errors="coerce").to_numpy(dtype=float).T
+    # Forget earlier versions of the same file
+    for tpl_Cached in [tpl_Cached for tpl_Cached in dic_PrometheusCache.keys()
+                       if tpl_Cached[0] == tpl_Key[0]]:
+        dic_PrometheusCache.pop(tpl_Cached)
+    dic_PrometheusCache[tpl_Key] = dic_Parsed
+    return dic_Parsed
 
-    dfr_Prometheus = pd.DataFrame(index=range(int_Capillaries),
+def get_prometheus_readout(datafile: str):
+    """
+    Parses processed or unprocessed Nanotemper Prometheus output.
+
+    Arguments:
+        datafile -> string. Path of datafile.
+
+    Returns dataframe with capillaries as indices and readouts as columns
+    (actual measurements are lists in the dataframe's cells)
+    """
+    # If it fails, return None because it's not the correct file type.
+    dic_Parsed = parse_prometheus_workbook(datafile)
+    if dic_Parsed is None:
+        return None
+    dfr_Prometheus = pd.DataFrame(index=range(len(dic_Parsed["Capillaries"])),
                                   columns=["CapIndex","CapillaryName","Time","Temp",
                                            "Ratio","330nm","350nm","Scattering",
                                            "RatioDeriv","330nmDeriv","350nmDeriv",
                                            "ScatteringDeriv"])
-    idx_Sample = -1
-    for col in range(len(dfr_Ratio.columns)):
-        if dfr_Ratio.iloc[1,col].find("Time") != -1:
-            idx_Sample += 1
-            int_Pound = dfr_Ratio.iloc[0,col].find("#")
-            if dfr_Ratio.iloc[0,col][int_Pound+2:int_Pound+3] == " ":
-                # Recurring reminder: human friendly index vs machine index!
-                idx_Capillary = int(dfr_Ratio.iloc[0,col][int_Pound+1:int_Pound+2])-1
-            else:
-                idx_Capillary = int(dfr_Ratio.iloc[0,col][int_Pound+1:int_Pound+3])-1
-            dfr_Prometheus.loc[idx_Sample,"CapIndex"] = idx_Capillary
-            idx_Open = dfr_Ratio.iloc[0,col].find("(")
-            idx_Close = dfr_Ratio.iloc[0,col].find(")")
-            if idx_Open != -1:
-                dfr_Prometheus.loc[idx_Sample,"CapillaryName"] = dfr_Ratio.iloc[0,col][idx_Open+1:idx_Close]
-            else:
-                dfr_Prometheus.loc[idx_Sample,"CapillaryName"] = dfr_Ratio.iloc[0,col]
-            dfr_Prometheus.loc[idx_Sample,"Time"] = dfr_Ratio[col].tolist()[2:]
-            dfr_Prometheus.loc[idx_Sample,"Temp"] = dfr_Ratio[col+1].tolist()[2:]
-            dfr_Prometheus.loc[idx_Sample,"Ratio"] = dfr_Ratio[col+2].tolist()[2:]
-            dfr_Prometheus.loc[idx_Sample,"330nm"] = dfr_330nm[col+2].tolist()[2:]
-            dfr_Prometheus.loc[idx_Sample,"350nm"] = dfr_350nm[col+2].tolist()[2:]
-            dfr_Prometheus.loc[idx_Sample,"Scattering"] = dfr_Scattering[col+2].tolist()[2:]
-            if bol_Derivative == True:
-                dfr_Prometheus.loc[idx_Sample,"RatioDeriv"] = dfr_RatioDeriv[col+2].tolist()[2:]
-                dfr_Prometheus.loc[idx_Sample,"330nmDeriv"] = dfr_330nmDeriv[col+2].tolist()[2:]
-                dfr_Prometheus.loc[idx_Sample,"350nmDeriv"] = dfr_350nmDeriv[col+2].tolist()[2:]
-                dfr_Prometheus.loc[idx_Sample,"ScatteringDeriv"] = dfr_ScatteringDeriv[col+2].tolist()[2:]
-
+    dfr_Prometheus["CapIndex"] = dic_Parsed["Capillaries"]["CapIndex"]
+    dfr_Prometheus["CapillaryName"] = dic_Parsed["Capillaries"]["CapillaryName"]
+    for str_Column in dfr_Prometheus.columns[2:]:
+        if str_Column in dic_Parsed.keys():
+            for idx_Sample in range(len(dfr_Prometheus)):
+                dfr_Prometheus.at[idx_Sample,str_Column] = dic_Parsed[str_Column][idx_Sample].tolist()
     return dfr_Prometheus
 
 def get_prometheus_capillaries(datafile: int):
@@ -500,39 +616,15 @@ def get_prometheus_capillaries(datafile: int):
     columns: "CapIndex","CapillaryName","PurificationID","ProteinConc",
     "SampleID","SampleConc","Buffer","CapillaryType"
     """
-    try:
-        dfr_Ratio = pd.read_excel(datafile, sheet_name="Ratio", header=None,
-                                  engine="openpyxl")
-    except:
+    dic_Parsed = parse_prometheus_workbook(datafile)
+    if dic_Parsed is None:
         return None
-
-    int_Capillaries = 0
-    for col in range(len(dfr_Ratio.columns)):
-        if dfr_Ratio.iloc[1,col].find("Time") != -1:
-            int_Capillaries += 1
-    
-    dfr_Capillaries = pd.DataFrame(index=range(int_Capillaries),
+    dfr_Capillaries = pd.DataFrame(index=range(len(dic_Parsed["Capillaries"])),
                                    columns=["CapIndex","CapillaryName","PurificationID",
                                             "ProteinConc","SampleID","SampleConc",
                                             "Buffer","CapillaryType"])
-    idx_Sample = -1
-    for col in range(len(dfr_Ratio.columns)):
-        if dfr_Ratio.iloc[1,col].find("Time") != -1:
-            idx_Sample += 1
-            int_Pound = dfr_Ratio.iloc[0,col].find("#")
-            if dfr_Ratio.iloc[0,col][int_Pound+2:int_Pound+3] == " ":
-                # Recurring reminder: human friendly index vs machine index!
-                idx_Capillary = int(dfr_Ratio.iloc[0,col][int_Pound+1:int_Pound+2])-1
-            else:
-                idx_Capillary = int(dfr_Ratio.iloc[0,col][int_Pound+1:int_Pound+3])-1
-            dfr_Capillaries.loc[idx_Sample,"CapIndex"] = idx_Capillary
-            idx_Open = dfr_Ratio.iloc[0,col].find("(")
-            idx_Close = dfr_Ratio.iloc[0,col].find(")")
-            if idx_Open != -1:
-                dfr_Capillaries.loc[idx_Sample,"CapillaryName"] = dfr_Ratio.iloc[0,col][idx_Open+1:idx_Close]
-            else:
-                dfr_Capillaries.loc[idx_Sample,"CapillaryName"] = dfr_Ratio.iloc[0,col]
-    
+    dfr_Capillaries["CapIndex"] = dic_Parsed["Capillaries"]["CapIndex"]
+    dfr_Capillaries["CapillaryName"] = dic_Parsed["Capillaries"]["CapillaryName"]
     return dfr_Capillaries
 
 def get_operetta_readout(datafile: str, processor: str):
@@ -578,11 +670,353 @@ def get_operetta_readout(datafile: str, processor: str):
                                 columns=["Row","Column","Readout","Normalised"])
 
     int_PlateColumns = pf.plate_columns(int_PlateFormat)
-    for line in range(0,dfr_Direct.shape[0]):
-        # Transform from "human indexed" well to index base 0 well numbering
-        int_Well = dfr_Direct.loc[line,"Column"] + (dfr_Direct.loc[line,"Row"]-1) * int_PlateColumns - 1
-        dfr_Output.loc[int_Well,"Readout"] = dfr_Direct.loc[line,"Nuclei"]
-        dfr_Output.loc[int_Well,"Row"] = dfr_Direct.loc[line,"Row"]
-        dfr_Output.loc[int_Well,"Column"] = dfr_Direct.loc[line,"Column"]
+    # Transform from "human indexed" well to index base 0 well numbering.
+    # If a well is in the file more than once, the last line counts.
+    dfr_Direct = dfr_Direct.assign(Well = dfr_Direct["Column"] + (dfr_Direct["Row"]-1) * int_PlateColumns - 1)
+    dfr_Direct = dfr_Direct.drop_duplicates(subset="Well", keep="last")
+    arr_Wells = dfr_Direct["Well"].to_numpy()
+    for str_Column, str_Direct in [("Readout","Nuclei"),("Row","Row"),("Column","Column")]:
+        arr_Column = dfr_Output[str_Column].to_numpy(copy=True)
+        arr_Column[arr_Wells] = list(dfr_Direct[str_Direct].to_numpy())
+        dfr_Output[str_Column] = arr_Column
     return dfr_Output
 
+# Reader registry. Each reader declares a sniff function that only looks at the
+# start of a file (or, for xlsx files, at the workbook and the start of the shared
+# strings), so the right parser can be chosen and directories can be filtered
+# without trying to parse every file.
+
+# Number of bytes at the start of a file the sniff functions get to see
+int_SniffBytes = 4096
+
+def read_head(datafile: str, int_Bytes: int = int_SniffBytes):
+    """
+    Returns the first bytes of a file or None if it cannot be read.
+
+    Arguments:
+        datafile -> string. Path of datafile
+        int_Bytes -> integer. Number of bytes to read.
+    """
+    try:
+        with open(datafile, "rb") as fil:
+            return fil.read(int_Bytes)
+    except OSError:
+        return None
+
+def is_excel(head: bytes):
+    """
+    Returns True if the bytes are the start of an Excel workbook
+    (xlsx, which is a zip archive, or old style binary xls).
+
+    Arguments:
+        head -> bytes. Start of file, see read_head
+    """
+    return head[:4] == b"PK\x03\x04" or head[:8] == b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+def head_lines(head: bytes):
+    """
+    Decodes the start of a text file and returns its lines.
+    The last line may be cut off.
+
+    Arguments:
+        head -> bytes. Start of file, see read_head
+    """
+    if head[:3] == b"\xef\xbb\xbf":
+        head = head[3:]
+    return head.decode("latin-1").replace("\r\n","\n").replace("\r","\n").split("\n")
+
+def workbook_sheets(datafile: str):
+    """
+    Returns the names of the sheets in an xlsx file without loading it,
+    empty list if the file is not an xlsx file.
+
+    Arguments:
+        datafile -> string. Path of datafile
+    """
+    try:
+        with zipfile.ZipFile(datafile) as zip_Book:
+            str_Workbook = zip_Book.read("xl/workbook.xml").decode("utf-8")
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return []
+    return re.findall(r"<(?:\w+:)?sheet\s[^>]*name=\"([^\"]*)\"", str_Workbook)
+
+def workbook_strings(datafile: str):
+    """
+    Returns the start of the shared strings of an xlsx file as string.
+    Workbooks written with inline strings (e.g. by openpyxl) have none,
+    then it is the start of the first sheet. Empty string if neither exist.
+
+    Arguments:
+        datafile -> string. Path of datafile
+    """
+    try:
+        with zipfile.ZipFile(datafile) as zip_Book:
+            lst_Members = zip_Book.namelist()
+            for str_Member in ["xl/sharedStrings.xml","xl/worksheets/sheet1.xml"]:
+                if str_Member in lst_Members:
+                    with zip_Book.open(str_Member) as fil:
+                        return fil.read(int_SniffBytes).decode("utf-8", errors="ignore")
+    except (OSError, zipfile.BadZipFile):
+        pass
+    return ""
+
+def sniff_bmg_plate(datafile: str, head: bytes):
+    """
+    BMG Pherastar output with plate-shaped tables. Files that have been
+    resaved as binary xls workbooks are left to the parser.
+    """
+    if head[:4] == b"PK\x03\x04":
+        return workbook_strings(datafile).find(">Testname") != -1
+    elif is_excel(head) == True:
+        return True
+    return head_lines(head)[0].find("Testname") != -1
+
+def sniff_bmg_kinetic(datafile: str, head: bytes):
+    """
+    BMG Pherastar output with one plate-shaped table per cycle.
+    """
+    if sniff_bmg_plate(datafile, head) == False:
+        return False
+    for str_Line in head_lines(head)[:20]:
+        if str_Line.startswith("No. of Cycles:"):
+            try:
+                return int(str_Line[14:].split("\t")[0]) > 1
+            except ValueError:
+                return True
+    return True
+
+def sniff_bmg_list(datafile: str, head: bytes):
+    """
+    List format BMG Pherastar output: "Plate name: Well<tab>Reading"
+    """
+    if is_excel(head) == True:
+        return False
+    lst_Lines = [str_Line for str_Line in head_lines(head) if not str_Line.strip() == ""]
+    if len(lst_Lines) == 0:
+        return False
+    return not re.match(r"^[^\t]+: *[A-Za-z]{1,2}\d{1,2}\t", lst_Lines[0]) == None
+
+def sniff_flipr(datafile: str, head: bytes):
+    """
+    FLIPR Tetra output: first line has "Well" followed by timepoints.
+    """
+    if is_excel(head) == True:
+        return False
+    return "Well" in head_lines(head)[0].split("\t")
+
+def sniff_lightcycler(datafile: str, head: bytes):
+    """
+    Roche LightCycler raw data export.
+    """
+    if is_excel(head) == True:
+        return False
+    lst_Lines = head_lines(head)
+    return lst_Lines[0].startswith("Raw Data") or (len(lst_Lines) > 1
+        and lst_Lines[1].split("\t")[0] == "SamplePos")
+
+def sniff_mxp(datafile: str, head: bytes):
+    """
+    Agilent MX3005p export. Binary xls files are left to the parser.
+    """
+    if head[:4] == b"PK\x03\x04":
+        return workbook_strings(datafile).find(">Amplification Plots<") != -1
+    return is_excel(head)
+
+def sniff_prometheus(datafile: str, head: bytes):
+    """
+    Nanotemper Prometheus export (xlsx)
+    """
+    if not head[:4] == b"PK\x03\x04":
+        return False
+    lst_Sheets = workbook_sheets(datafile)
+    return all([str_Sheet in lst_Sheets for str_Sheet, str_Column in lst_PrometheusSheets])
+
+def sniff_operetta_columbus(datafile: str, head: bytes):
+    """
+    Columbus results of PerkinElmer Operetta Phoenix
+    """
+    if is_excel(head) == True:
+        return False
+    lst_Header = head_lines(head)[0].split("\t")
+    return all([str_Column in lst_Header for str_Column in
+                ["Row","Column","Nuclei Selected - Number of Objects"]])
+
+def sniff_operetta_harmony(datafile: str, head: bytes):
+    """
+    Harmony results of PerkinElmer Operetta Phoenix. The header ends
+    with a line "[Data]", which might not be in the first few KB.
+    """
+    if is_excel(head) == True:
+        return False
+    lst_Lines = head_lines(head)
+    return lst_Lines[0].startswith("[") or "[Data]" in [str_Line.split("\t")[0] for str_Line in lst_Lines]
+
+def read_bmg_plate(datapath: str, datafile: str, wells: int, assaytype: str):
+    """
+    Reader for the registry, see get_bmg_plate_readout
+    """
+    return get_bmg_plate_readout(datapath, datafile, wells, assaytype)
+
+def read_bmg_list(datapath: str, datafile: str, wells: int, assaytype: str):
+    """
+    Reader for the registry, see get_bmg_list_readout. All plates are in
+    one file (datapath), datafile is the name of the plate.
+    """
+    dfr_List = get_bmg_list_readout(datapath, wells)
+    if dfr_List is None:
+        return None
+    return dfr_List[["Well",datafile]]
+
+def read_bmg_timecourse(datapath: str, datafile: str, wells: int, assaytype: str):
+    """
+    Reader for the registry, see get_bmg_timecourse_readout
+    """
+    return get_bmg_timecourse_readout(os.path.join(datapath, datafile))
+
+def read_bmg_DRTC(datapath: str, datafile: str, wells: int, assaytype: str):
+    """
+    Reader for the registry, see get_bmg_DRTC_readout
+    """
+    return get_bmg_DRTC_readout(os.path.join(datapath, datafile))
+
+def read_FLIPR_DRTC(datapath: str, datafile: str, wells: int, assaytype: str):
+    """
+    Reader for the registry, see get_FLIPR_DRTC_readout
+    """
+    return get_FLIPR_DRTC_readout(os.path.join(datapath, datafile))
+
+def read_lightcycler(datapath: str, datafile: str, wells: int, assaytype: str):
+    """
+    Reader for the registry, see get_lightcycler_readout. Plate format
+    follows from the assay type.
+    """
+    if assaytype.find("96") != -1:
+        return get_lightcycler_readout(os.path.join(datapath, datafile), 96)
+    return get_lightcycler_readout(os.path.join(datapath, datafile), 384)
+
+def read_mxp(datapath: str, datafile: str, wells: int, assaytype: str):
+    """
+    Reader for the registry, see get_mxp_readout. Our runs start at 24C.
+    """
+    return get_mxp_readout(os.path.join(datapath, datafile), 24)
+
+def read_prometheus(datapath: str, datafile: str, wells: int, assaytype: str):
+    """
+    Reader for the registry, see get_prometheus_readout
+    """
+    return get_prometheus_readout(os.path.join(datapath, datafile))
+
+def read_operetta_columbus(datapath: str, datafile: str, wells: int, assaytype: str):
+    """
+    Reader for the registry, see get_operetta_readout
+    """
+    return get_operetta_readout(os.path.join(datapath, datafile), "Columbus")
+
+def read_operetta_harmony(datapath: str, datafile: str, wells: int, assaytype: str):
+    """
+    Reader for the registry, see get_operetta_readout
+    """
+    return get_operetta_readout(os.path.join(datapath, datafile), "Harmony")
+
+# "Sniff" -> function(datafile, head) returning True if the file looks right
+# "Read" -> function(datapath, datafile, wells, assaytype) returning the raw data
+# "ListFile" -> True if all plates are in one file (datapath) and datafile is a plate name
+dic_Readers = {"bmg_plate":{"Sniff":sniff_bmg_plate, "Read":read_bmg_plate, "ListFile":False},
+               "bmg_list":{"Sniff":sniff_bmg_list, "Read":read_bmg_list, "ListFile":True},
+               "bmg_timecourse":{"Sniff":sniff_bmg_kinetic, "Read":read_bmg_timecourse, "ListFile":False},
+               "bmg_DRTC":{"Sniff":sniff_bmg_kinetic, "Read":read_bmg_DRTC, "ListFile":False},
+               "flipr_DRTC":{"Sniff":sniff_flipr, "Read":read_FLIPR_DRTC, "ListFile":False},
+               "lightcycler":{"Sniff":sniff_lightcycler, "Read":read_lightcycler, "ListFile":False},
+               "mxp":{"Sniff":sniff_mxp, "Read":read_mxp, "ListFile":False},
+               "prometheus":{"Sniff":sniff_prometheus, "Read":read_prometheus, "ListFile":False},
+               "operetta_columbus":{"Sniff":sniff_operetta_columbus, "Read":read_operetta_columbus, "ListFile":False},
+               "operetta_harmony":{"Sniff":sniff_operetta_harmony, "Read":read_operetta_harmony, "ListFile":False}}
+
+def get_reader_name(assaycategory: str, assaytype: str, device: str):
+    """
+    Returns the name of the reader in dic_Readers for an assay,
+    None if there is none. Operetta readers go by the image processing
+    software, not the assay, and are not chosen here.
+
+    Arguments:
+        assaycategory -> string. Assay category, e.g. "dose_response"
+        assaytype -> string. Assay type, e.g. "HTRF", "DSF_LC_384"
+        device -> string. Device, e.g. "pherastar", "flipr"
+    """
+    if assaycategory == "dose_response_time_course":
+        if device == "flipr":
+            return "flipr_DRTC"
+        elif device == "pherastar":
+            return "bmg_DRTC"
+    elif assaycategory.find("dose_response") != -1:
+        return "bmg_plate"
+    elif assaycategory.find("single_dose") != -1:
+        return "bmg_list"
+    elif assaycategory == "thermal_shift":
+        if assaytype == "DSF_MX_96":
+            return "mxp"
+        elif assaytype.find("DSF_LC") != -1:
+            return "lightcycler"
+        elif assaytype == "nanoDSF":
+            return "prometheus"
+    elif assaycategory == "rate":
+        return "bmg_timecourse"
+    return None
+
+def sniff_datafile(datafile: str, lst_Readers: list = None):
+    """
+    Returns the names of the readers in dic_Readers that accept a file.
+
+    Arguments:
+        datafile -> string. Path of datafile
+        lst_Readers -> list of reader names to try. All readers if None.
+    """
+    if lst_Readers is None:
+        lst_Readers = list(dic_Readers.keys())
+    head = read_head(datafile)
+    if head is None:
+        return []
+    return [str_Reader for str_Reader in lst_Readers
+            if dic_Readers[str_Reader]["Sniff"](datafile, head) == True]
+
+def read_datafile(reader: str, datapath: str, datafile: str, wells: int, assaytype: str):
+    """
+    Reads a raw data file with a reader from dic_Readers. Files that
+    do not pass the reader's sniff function are not parsed.
+
+    Arguments:
+        reader -> string. Name of reader in dic_Readers
+        datapath -> string. Directory of datafile, or the data file itself
+                    for list files.
+        datafile -> string. Name of datafile, or the plate for list files.
+        wells -> integer. Plate format in number of wells.
+        assaytype -> string. Assay type
+
+    Returns pandas dataframe or None if the file is not the right type.
+    """
+    if not reader in dic_Readers.keys():
+        return None
+    if dic_Readers[reader]["ListFile"] == True:
+        str_File = datapath
+    else:
+        str_File = os.path.join(datapath, datafile)
+    if len(sniff_datafile(str_File, [reader])) == 0:
+        return None
+    return dic_Readers[reader]["Read"](datapath, datafile, wells, assaytype)
+
+def list_datafiles(datapath: str, extension: str, reader: str = None):
+    """
+    Returns the names of the files in a directory that have the extension
+    and, if a reader is given, pass its sniff function. Order as os.listdir.
+
+    Arguments:
+        datapath -> string. Directory
+        extension -> string. File extension, e.g. ".xls"
+        reader -> string. Name of reader in dic_Readers or None
+    """
+    lst_Files = [fil for fil in os.listdir(datapath) if fil.find(extension) != -1]
+    if reader is None or not reader in dic_Readers.keys() or dic_Readers[reader]["ListFile"] == True:
+        return lst_Files
+    return [fil for fil in lst_Files if os.path.isfile(os.path.join(datapath, fil))
+            and len(sniff_datafile(os.path.join(datapath, fil), [reader])) > 0]
+
@@ -28,7 +28,9 @@ import lib_colourscheme as cs
 import lib_transferdragndrop as tdnd
 import lib_messageboxes as msg
 import lib_datafunctions as df
-from lib_resultreadouts import get_bmg_list_namesonly
+import lib_export as exp
+from lib_resultreadouts import get_reader_name
+import lib_filescanner as fs
 import lib_customplots as cp
 from  lib_progressdialog import GenericProgress
 import lib_custombuttons as btn
@@ -745,6 +747,8 @@ class FileSelection(wx.Panel):
                            style = wx.TAB_TRAVERSAL, name = wx.EmptyString)
 
         self.Tabname = tabname
+        # Background thread filling lbc_Data, see GatherDataFiles
+        self.thd_Scanner = None
 
         self.SetBackgroundColour(cs.BgUltraLight)
         clr_Panels = cs.BgLight
@@ -976,15 +980,8 @@ class FileSelection(wx.Panel):
                 # write empty string tinto third column
                 self.lbc_Transfer.SetItem(i,2,"")
         if self.Tabname.str_AssayCategory != "single_dose":
-            # Write .xls files from same directory into tab_Files.lbc_Data list
-            self.lbc_Data.DeleteAllItems()
-            # Write transfer path (full path with with file name) into variable; chr(92) is "\"
-            self.Tabname.str_DataPath = self.Tabname.str_TransferPath[0:self.Tabname.str_TransferPath.rfind(chr(92))+1]
-            lst_DataFiles = os.listdir(self.Tabname.str_DataPath)
-            # Select correct file extension:
-            for i in range(len(lst_DataFiles)):
-                if lst_DataFiles[i].find(self.Tabname.str_DatafileExtension) != -1: #and lst_DataFiles[i].find(".xlsx") == -1: # I am going to have to trust the 
-                    self.lbc_Data.InsertItem(i,str(lst_DataFiles[i]))
+            # Write data files from same directory into tab_Files.lbc_Data list; chr(92) is "\"
+            self.GatherDataFiles(self.Tabname.str_TransferPath[0:self.Tabname.str_TransferPath.rfind(chr(92))+1])
             self.fpk_Data.SetPath(self.Tabname.str_DataPath)
         self.Tabname.bol_TransferLoaded = True
     
@@ -1009,10 +1006,16 @@ class FileSelection(wx.Panel):
     def GatherDataFiles(self, str_DataPath):
         """
         Get list of data files and populate list control with them.
+        The directory (or, for single dose, the list file) gets scanned
+        in a background thread and the list control fills up as files
+        are found, see lib_filescanner.
 
         Arguments:
             str_DataPath -> string
         """
+        # Stop scanning the previous path
+        if not self.thd_Scanner is None:
+            self.thd_Scanner.cancel()
         # Clear list
         self.lbc_Data.DeleteAllItems()
         # Write transfer path (full path with with file name) into variable
@@ -1020,17 +1023,51 @@ class FileSelection(wx.Panel):
         # Populate list depending on assaz category. Only for single dose do we have
         # multiple plates per data file.
         if self.Tabname.str_AssayCategory != "single_dose":
-            lst_DataFiles = os.listdir(self.Tabname.str_DataPath)
-            for i in range(len(lst_DataFiles)):
-                if lst_DataFiles[i].find(self.Tabname.str_DatafileExtension) != -1:
-                    self.lbc_Data.InsertItem(i,str(lst_DataFiles[i]))
+            # Only list files the assay's reader accepts (see lib_resultreadouts.dic_Readers)
+            if hasattr(self.Tabname, "Device") == True:
+                str_Device = self.Tabname.Device
+            else:
+                str_Device = None
+            str_Reader = get_reader_name(self.Tabname.str_AssayCategory,
+                                         self.Tabname.str_AssayType, str_Device)
         else:
-            lst_Plates = get_bmg_list_namesonly(self.Tabname.str_DataPath)
-            if len(lst_Plates) == 0:
+            str_Reader = "bmg_list"
+        self.thd_Scanner = fs.DirectoryScanner(self.Tabname.str_DataPath,
+                                               self.Tabname.str_DatafileExtension,
+                                               str_Reader, self.OnDataFilesFound)
+        self.thd_Scanner.start()
+
+    def OnDataFilesFound(self, thd_Scanner, lst_Items, bol_Finished):
+        """
+        Gets called from the scanner thread started in GatherDataFiles.
+        Hands the items to the main thread.
+
+        Arguments:
+            thd_Scanner -> lib_filescanner.DirectoryScanner that found the items
+            lst_Items -> list of data files or plates
+            bol_Finished -> boolean. Whether the scan is finished.
+        """
+        wx.CallAfter(self.InsertDataFiles, thd_Scanner, list(lst_Items), bol_Finished)
+
+    def InsertDataFiles(self, thd_Scanner, lst_Items, bol_Finished):
+        """
+        Adds data files or plates found by the scanner thread to the
+        list control. Items from a scan that has since been replaced
+        are dropped.
+
+        Arguments:
+            thd_Scanner -> lib_filescanner.DirectoryScanner that found the items
+            lst_Items -> list of data files or plates
+            bol_Finished -> boolean. Whether the scan is finished.
+        """
+        if not thd_Scanner is self.thd_Scanner:
+            return
+        for str_Item in lst_Items:
+            self.lbc_Data.InsertItem(self.lbc_Data.GetItemCount(),str(str_Item))
+        if bol_Finished == True:
+            self.thd_Scanner = None
+            if self.Tabname.str_AssayCategory == "single_dose" and self.lbc_Data.GetItemCount() == 0:
                 msg.FileNotData()
-            else:
-                for i in range(len(lst_Plates)):
-                    self.lbc_Data.InsertItem(i,str(lst_Plates[i]))
 
     def OnUpdateTransfer(self,event):
         """
@@ -1633,9 +1670,14 @@ class ELNPlots(wx.Panel):
                                  "DRTC":cp.PlotGridDRTC}
             self.dic_Figures[self.lst_FigureNames[i]] = self.dic_PlotType[self.shorthand](
                     self.pnl_ELNPlots_Scroll, total_height_px, total_height_inch, dpi)
+            # Dose response time courses keep their results next to the processed dataframe
+            dic_Results = {}
+            if "DRTCResults" in completecontainer.columns:
+                dic_Results["results"] = completecontainer.loc[count,"DRTCResults"]
             self.dic_Figures[self.lst_FigureNames[i]].Draw(self.Tabname.int_Samples,completecontainer.loc[count,"ProcessedDataFrame"],
                 completecontainer.loc[count,"DestinationPlateName"],int_GridHeight,int_GridWidth,hspace_ratio,bottom_ratio,
-                top_ratio,total_height_px,int_SuperTitleSize,supertitle_ratio,int_TitleSize,int_LabelSize,self.dlg_PlotsProgress)
+                top_ratio,total_height_px,int_SuperTitleSize,supertitle_ratio,int_TitleSize,int_LabelSize,self.dlg_PlotsProgress,
+                **dic_Results)
             # Add panel to Plots sizer
             self.szr_ELNPlots_Scroll.Add(self.dic_Figures[self.lst_FigureNames[i]], 0, wx.ALL|wx.ALIGN_CENTER_HORIZONTAL, 5)
             # Create and add l
@@ -1766,36 +1808,11 @@ class ExportToDatabase(wx.Panel):
         """
         Thread for populating the export tab.
         """
-        self.Tabname.dfr_Database = pd.DataFrame(columns=self.Tabname.lst_Headers)
-        # Create Database dataframe in sections for each plate and append
-        for i in range(len(self.Tabname.dfr_AssayData)):
-            if self.Tabname.str_AssayCategory.find("dose_response") != -1:
-                bol_DoseResponse = True
-                if self.Tabname.str_AssayCategory.find("activity") != -1:
-                    dfr_Partial = df.create_Database_frame_EPDR_ActAssay(self.Tabname.dfr_Details,self.Tabname.lst_Headers,self.Tabname.dfr_AssayData.iloc[i,5],
-                        self.Tabname.dfr_AssayData.loc[i,"References"],bol_DoseResponse)    
-                else:
-                    dfr_Partial = df.create_Database_frame_EPDR(self.Tabname.dfr_Details,self.Tabname.lst_Headers,self.Tabname.dfr_AssayData.iloc[i,5],
-                        self.Tabname.dfr_AssayData.loc[i,"References"])
-            elif self.Tabname.str_AssayCategory == "single_dose":
-                bol_DoseResponse = False
-                if self.Tabname.str_AssayCategory.find("activity") != -1:
-                    dfr_Partial = df.create_Database_frame_EPSD_ActAssay(self.Tabname.dfr_Details,self.Tabname.lst_Headers,self.Tabname.dfr_AssayData.iloc[i,5],
-                        self.Tabname.dfr_AssayData.loc[i,"References"],bol_DoseResponse)    
-                else:
-                    dfr_Partial = df.create_Database_frame_EPSD(self.Tabname.dfr_Details,self.Tabname.lst_Headers,self.Tabname.dfr_AssayData.iloc[i,5],
-                        self.Tabname.dfr_AssayData.loc[i,"References"])
-            elif self.Tabname.str_AssayCategory == "rate":
-                dfr_Partial = df.create_Database_frame_rate(self.Tabname.dfr_Details,self.Tabname.lst_Headers,self.Tabname.dfr_AssayData.iloc[i,5])
-            elif self.Tabname.str_AssayCategory == "thermal_shift":
-                if self.Tabname.str_AssayType == "nanoDSF":
-                    dfr_Partial = df.create_Database_frame_NanoDSF(self.Tabname.dfr_Details,self.Tabname.lst_Headers,self.Tabname.dfr_AssayData.iloc[i,5],
-                        self.Tabname.dfr_Layout.loc[i])
-                else:
-                    dfr_Partial = df.create_Database_frame_DSF(self.Tabname.dfr_Details,self.Tabname.lst_Headers,self.Tabname.dfr_AssayData.iloc[i,5],
-                        self.Tabname.dfr_Layout.loc[i])
-            frames = [self.Tabname.dfr_Database, dfr_Partial]
-            self.Tabname.dfr_Database = pd.concat(frames, ignore_index=False)
+        # Create Database dataframe in sections for each plate and put them together in one go
+        lst_Partials = [pd.DataFrame(columns=self.Tabname.lst_Headers)]
+        lst_Partials.extend(exp.database_partials(self.Tabname.dfr_AssayData,self.Tabname.dfr_Details,self.Tabname.lst_Headers,
+            self.Tabname.dfr_Layout,self.Tabname.str_AssayCategory,self.Tabname.str_AssayType))
+        self.Tabname.dfr_Database = pd.concat(lst_Partials, ignore_index=False)
 
         # Create grid:
         self.int_Samples = len(self.Tabname.dfr_Database)
@@ -1849,16 +1866,21 @@ class ExportToDatabase(wx.Panel):
 
     def ExportToCSV(self, event):
         """
-        Event handler. Exports data in dfr_Database to csv.
+        Event handler. Exports the database table to csv or xlsx.
+        The rows get written plate by plate straight from the assay
+        data, see lib_export.
         """
-        fdlg = wx.FileDialog(self, "Save results as", wildcard="Comma separated files (*.csv)|*.csv", style=wx.FD_SAVE|wx.FD_OVERWRITE_PROMPT)
+        fdlg = wx.FileDialog(self, "Save results as", wildcard="Comma separated files (*.csv)|*.csv|Excel files (*.xlsx)|*.xlsx",
+                             style=wx.FD_SAVE|wx.FD_OVERWRITE_PROMPT)
         if fdlg.ShowModal() == wx.ID_OK:
             str_SavePath = fdlg.GetPath()
-            # Check if str_SavePath ends in .csv. If so, remove
-            if str_SavePath[-1:-4] == ".csv":
-                str_SavePath = str_SavePath[:len(str_SavePath)]
+            # Add file extension of selected file type if it is missing
+            str_Extension = [".csv",".xlsx"][fdlg.GetFilterIndex()]
+            if str_SavePath.lower().endswith(str_Extension) == False:
+                str_SavePath = str_SavePath + str_Extension
             try:
-                self.Tabname.dfr_Database.to_csv(str_SavePath)
+                exp.write_database(str_SavePath,self.Tabname.dfr_AssayData,self.Tabname.dfr_Details,self.Tabname.lst_Headers,
+                    self.Tabname.dfr_Layout,self.Tabname.str_AssayCategory,self.Tabname.str_AssayType)
             except PermissionError:
                 msg.SavePermissionDenied()
 
@@ -2306,8 +2328,14 @@ def ProcessData(ProjectTab, dlg_Progress):
 
     # Build dataframe that holds everything
     dlg_Progress.lbx_Log.InsertItems(["Start creating complete container dataframe"], dlg_Progress.lbx_Log.Count)
+    # Number of worker processes, see main frame
+    if hasattr(ProjectTab.parent, "int_Workers") == True:
+        int_Workers = ProjectTab.parent.int_Workers
+    else:
+        int_Workers = df.int_DefaultWorkers
     ProjectTab.dfr_AssayData = df.get_CompleteContainer(ProjectTab.dfr_PlateAssignment,ProjectTab.str_DataPath,ProjectTab.dfr_TransferFile,ProjectTab.dfr_Exceptions,
-        ProjectTab.dfr_Layout,ProjectTab.dfr_Details,dlg_Progress)
+        ProjectTab.dfr_Layout,ProjectTab.dfr_Details,dlg_Progress,int_Workers,
+        str_ProjectPath=ProjectTab.str_SaveFilePath)
 
     # Catch any errors in processing -> df.get_CompleteContainer() returns None on any errors:
     if ProjectTab.dfr_AssayData is None:
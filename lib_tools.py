@@ -14,6 +14,7 @@ Functions:
 """
 
 import lib_platefunctions as pf
+import lib_datafunctions as df
 from lib_custombuttons import CustomBitmapButton
 from lib_tabs import CustomFilePicker
 import lib_messageboxes as msg
@@ -895,20 +896,12 @@ class panel_TransferFileProcessor (wx.Panel):
         Also writes entire contents into dataframe self.dfr_TransferFile
         for later use.
         """
-        # Open transfer file and find header row
-        dfr_Temp = pd.read_csv(str_TransferFile, sep=",", usecols=[0], header=None,
-                               index_col=False, engine="python")
-        int_HeaderRow = dfr_Temp.index[dfr_Temp[0] == "[DETAILS]"].tolist()
+        # Open transfer file, same parsed file as for the analysis
+        dic_Transfer = df.parse_transfer_file(str_TransferFile)
         # Check whether the keyword has been found:
-        if not int_HeaderRow:
+        if dic_Transfer is None:
             return None
-        # Adjust header row for offset:
-        int_HeaderRow = int_HeaderRow[0] + 1
-        # Now open transfer file properly:
-        dfr_TransferFile = pd.read_csv(str_TransferFile, sep=",", header=int_HeaderRow,
-                                       index_col=False, engine="python")
-        # Clean up headers
-        dfr_TransferFile.columns = dfr_TransferFile.columns.str.replace(" ", "")
+        dfr_TransferFile = dic_Transfer["Details"]
         # Keep only relevant columns -> This will drop the first two columns
         # that hold the appendix data (Instrument name, serial number, etc)
         # Sort by DestinationConcentration -> Ensures that all points will
@@ -1,6 +1,15 @@
 """
 Main module for BBQ.
 
+Settings are kept in the user's home directory:
+    bbq_pinned.csv -> Shorthands of the assays pinned on the home screen,
+                      in one row.
+    bbq_settings.csv -> One setting per row, name and value:
+                        Workers,4 -> Number of worker processes that process
+                                     plates in parallel. Default is 1, i.e.
+                                     one plate after another. Worth it for
+                                     projects with many plates.
+
 Classes:
     frm_Main
     BBQ
@@ -60,7 +69,6 @@ import pandas as pd
 import zipfile as zf
 from pathlib import Path
 import os
-import shutil
 import threading
 import datetime
 import csv
@@ -77,7 +85,7 @@ import subprocess
 # Import my custom libraries
 import lib_messageboxes as msg
 import lib_colourscheme as cs
-from lib_datafunctions import import_string_to_list
+import lib_projectfile as prj
 import lib_progressdialog as prog
 from lib_custombuttons import CustomBitmapButton
 # Import panels for notebook
@@ -113,10 +121,6 @@ class frm_Main (wx.Frame):
                            pos = wx.DefaultPosition, size = wx.Size(1380,768),
                            style = wx.TAB_TRAVERSAL|wx.RESIZE_BORDER)
 
-        # Delete BBQ's temp directory if for any reason BBQ was previously
-        # exited incorrectly and it still exists.
-        self.DeleteBBQTempDirectory()
-
         # Set default colours
         self.clr_Dark = cs.BgUltraDark
         self.clr_Medium = cs.BgMediumDark
@@ -357,6 +361,14 @@ class frm_Main (wx.Frame):
                     self.dfr_Assays.loc[assay,"Pinned"] = True
                 else:
                     self.dfr_Assays.loc[assay,"Pinned"] = False
+        # Number of worker processes for processing plates (see lib_tabs.ProcessData). Only set
+        # if the settings file has a "Workers" row (see module docstring), otherwise
+        # lib_datafunctions.int_DefaultWorkers is used.
+        self.str_Settings = os.path.join(Path.home(),"bbq_settings.csv")
+        if os.path.isfile(self.str_Settings) == True:
+            for lst_Row in csv.reader(open(self.str_Settings,"r")):
+                if len(lst_Row) > 1 and lst_Row[0] == "Workers" and lst_Row[1].strip().isdigit() == True:
+                    self.int_Workers = max(1,int(lst_Row[1]))
 
         # "Home" Tab ####################################################################
         self.sbk_WorkArea.AddPage(page = Home.HomeScreen(self.sbk_WorkArea, self),
@@ -475,7 +487,6 @@ class frm_Main (wx.Frame):
             bol_AllowCancel = True
         if bol_AllowCancel == True:
             # Clean up, then exit
-            self.DeleteBBQTempDirectory()
             self.icn_Taskbar.RemoveIcon()
             wx.Exit()
 
@@ -714,18 +725,6 @@ class frm_Main (wx.Frame):
                                              daemon=True)
         self.thd_Analysis.start()
 
-    def DeleteBBQTempDirectory(self):
-        """
-        Checks whether the temporary directory exists.
-        If so, it gets deleted so that we're not running
-        into problems with it existing and being unable to
-        be overwritten later.
-        """
-        # Check whether temporary directory exists. if so, delete it.
-        str_TempDir = os.path.join(Path.home(),"bbqtempdir")
-        if os.path.isdir(str_TempDir) == True:
-            shutil.rmtree(str_TempDir)
-
      ###  ####  ##### #   #    ###  #   # ####     ####  ###  #   # #####
     #   # #   # #     ##  #   #   # ##  # #   #   #     #   # #   # #
     #   # ####  ###   #####   ##### ##### #   #    ###  ##### #   # ###
@@ -740,176 +739,30 @@ class frm_Main (wx.Frame):
             str_FilePath -> string. Full path of project file.
             str_FileName -> string. File name only of project file.
         """
-        # Extracts bbq archive into temporary directory and reads each file to
-        # import into dataframe.
+        # Reads the bbq archive (see lib_projectfile for the file format).
+        # Only the project's meta data is read here, each plate gets loaded
+        # from the file the first time it is used.
         # Based on the assay specified in the bbq archive, a new appropriate project is opened and the
         # loaded dataframe is handed to the PopulateFromFile() function of the analyis panel.
         self.Freeze()
-        # Check whether temporary directory exists. if so, delete and make fresh
-        str_TempDir = os.path.join(Path.home(),"bbqtempdir")
-        if os.path.isdir(str_TempDir) == True:
-            shutil.rmtree(str_TempDir)
-        else:
-            # Extract saved file to temporary directory
-            with zf.ZipFile(str_FilePath, "r") as zip:
-                zip.extractall(str_TempDir)
-            # Read details.csv
-            dfr_Details = pd.read_csv(str_TempDir + r"\details.csv", sep = ",",
-                                      header=0, index_col=0, engine="python")
-            # Ensure backwards compatibility by making sure that all things are string
-            for i in range(len(dfr_Details)):
-                if type(dfr_Details.iloc[i,0]) != str:
-                    if pd.isna(dfr_Details.iloc[i,0]) == True:
-                        dfr_Details.iloc[i,0] = "NA"
-            if dfr_Details.iloc[0,0] == "nanoDSF":
-                str_WellsOrCapillaries = "Capillaries"
-            else:
-                str_WellsOrCapillaries = "Wells"
-            # Read boolean.csv
-            dfr_Boolean = pd.read_csv(str_TempDir + r"\boolean.csv", sep=",",
-                                      header=0, index_col=0, engine="python")
-            # Read in meta.csv. Find better name for file
-            dfr_Meta = pd.read_csv(str_TempDir + r"\meta.csv", sep=",",
-                                   header=0, index_col=0, engine="python")
-            # Read paths.csv -> Contains references to file locations
-            dfr_Paths = pd.read_csv(str_TempDir + r"\paths.csv", sep=",",
-                                    header=0, index_col=0, engine="python")
-            # Create new dataframe to hold raw and analysed data with meta data from dfr_Meta
-            lst_DataframeHeaders = ["DestinationPlateName","Samples",
-                                    str_WellsOrCapillaries,"DataFileName","RawDataFrame",
-                                    "ProcessedDataFrame", "Layout","References"]
-            dfr_Loaded = pd.DataFrame(index=range(len(dfr_Meta)),columns=lst_DataframeHeaders)
-            # Go through each plate in the dataframe
-            for i in range(len(dfr_Meta)):
-                # Load first fields into loaded dataframe
-                dfr_Loaded.at[i,"DestinationPlateName"] = dfr_Meta.loc[i,"DestinationPlateName"]
-                dfr_Loaded.at[i,str_WellsOrCapillaries] = dfr_Meta.loc[i,str_WellsOrCapillaries]
-                dfr_Loaded.at[i,"DataFileName"] = dfr_Meta.loc[i,"DataFileName"]
-                str_Subdirectory = str_TempDir + chr(92) + dfr_Meta.iloc[i,0] # Unicode 92 is back slash
-                # read samples
-                dfr_Samples = pd.read_csv(str_Subdirectory + r"\samples.csv", sep=",",
-                                          header=0, index_col=0, engine="python")
-                for j in dfr_Samples.columns:
-                    if type(dfr_Samples.loc[0,j]) == str:
-                        dfr_Samples[j] = dfr_Samples[j].apply(import_string_to_list)
-                dfr_Loaded.at[i,"Samples"] = dfr_Samples
-                # read in rawdata.csv. Do per plate
-                dfr_RawData = pd.read_csv(str_Subdirectory + r"\rawdata.csv", sep=",",
-                                          header=0, index_col=0, engine="python")
-                for j in dfr_RawData.columns:
-                    if type(dfr_RawData.loc[0,j]) == str:
-                        dfr_RawData[j] = dfr_RawData[j].apply(import_string_to_list)
-                dfr_Loaded.at[i,"RawDataFrame"] = dfr_RawData
-                # Read in processed data file/frame
-                dfr_Processed = pd.read_csv(str_Subdirectory + r"\processed.csv", sep=",",
-                                            header=0, index_col=0, engine="python")
-                for k in dfr_Processed.columns:
-                    if type(dfr_Processed.loc[0,k]) == str:
-                        dfr_Processed[k] = dfr_Processed[k].apply(import_string_to_list)
-                dfr_Loaded.at[i,"ProcessedDataFrame"] = dfr_Processed
-                # Read in references (i.e. samples that are used to normalise
-                # data against, e.g. solvent/buffer only for background/signal
-                # baseline or known inhibitors that give 100% effect). Assumes
-                # ONE each of solvent reference, buffer reference, control compound.
-                dfr_References = pd.read_csv(str_Subdirectory + r"\references.csv", sep=",",
-                                             header=0, index_col=0, engine="python")
-                # Backwards compatiblity: was previously a list, so indices and
-                # column names need updating:
-                if dfr_References.columns[0] == "0":
-                    dfr_References = dfr_References.rename(columns={"0":0})
-                if dfr_References.columns[0] == "References":
-                    dfr_References_Convert = pd.DataFrame(columns=[0],
-                                                          index=["SolventMean",
-                                                                 "SolventMedian",
-                                                                 "SolventSEM",
-                                                                 "SolventSTDEV",
-                                                                 "SolventMAD",
-                                                                 "BufferMean",
-                                                                 "BufferMedian",
-                                                                 "BufferSEM",
-                                                                 "BufferSTDEV",
-                                                                 "BufferMAD",
-                                                                 "ControlMean",
-                                                                 "ControlMedian",
-                                                                 "ControlSEM",
-                                                                 "ControlSTDEV",
-                                                                 "ControlMAD",
-                                                                 "ZPrimeMean",
-                                                                 "ZPrimeMeadian"])
-                    # Solvent reference
-                    dfr_References_Convert.at["SolventMean",0] = dfr_References.iloc[0,0]
-                    dfr_References_Convert.at["SolventMedian",0] = np.nan
-                    dfr_References_Convert.at["SolventSEM",0] = dfr_References.iloc[1,0]
-                    dfr_References_Convert.at["SolventSTDEV",0] = np.nan
-                    dfr_References_Convert.at["SolventMAD",0] = np.nan
-                    # Buffer reference
-                    dfr_References_Convert.at["BufferMean",0] = dfr_References.iloc[4,0]
-                    dfr_References_Convert.at["BufferMedian",0] = np.nan
-                    dfr_References_Convert.at["BufferSEM",0] = dfr_References.iloc[5,0]
-                    dfr_References_Convert.at["BufferSTDEV",0] = np.nan
-                    dfr_References_Convert.at["BufferMAD",0] = np.nan
-                    # Control compound
-                    dfr_References_Convert.at["ControlMean",0] = dfr_References.iloc[2,0]
-                    dfr_References_Convert.at["ControlMedian",0] = np.nan
-                    dfr_References_Convert.at["ControlSEM",0] = dfr_References.iloc[3,0]
-                    dfr_References_Convert.at["ControlSTDEV",0] = np.nan
-                    dfr_References_Convert.at["ControlMAD",0] = np.nan
-                    # Quality metrics
-                    dfr_References_Convert.at["ZPrimeMean",0] = dfr_References.iloc[6,0]
-                    dfr_References_Convert.at["ZPrimeMedian",0] = dfr_References.iloc[7,0]
-                    # Overwrite
-                    dfr_References = dfr_References_Convert
-                dfr_Loaded.at[i,"References"] = dfr_References
-                # Read in layout
-                dfr_Layout = pd.read_csv(str_Subdirectory + r"\layout.csv", sep=",", 
-                                         header=0, index_col=0, engine="python")
-                for k in dfr_Layout.columns:
-                    if type(dfr_Layout.loc[0,k]) == str:
-                        dfr_Layout[k] = dfr_Layout[k].apply(import_string_to_list)
-                dfr_Loaded.at[i,"Layout"] = dfr_Layout
-            # Remove all the temporary files
-            shutil.rmtree(str_TempDir)
-            # Ensure backwards compatibility for details. Previously, was
-            # just a list, from version 1.0.8 onwards a full dataframe
-            if dfr_Details.index[0] == 0: # we are dealing with the old list style!
-                dfr_Details.set_index(pd.Index(["AssayType","AssayCategory","PurificationID",
-                                                "ProteinConcentration","PeptideID",
-                                                "PeptideConcentration","Solvent",
-                                                "SolventConcentration","Buffer","ELN",
-                                                "AssayVolume","DataFileExtension",
-                                                "SampleSource","Device","Date"]),
-                                                inplace=True)
-                dfr_Details = dfr_Details.rename(columns={"AssayDetails":"Value"})
-                if dfr_Details.iloc[1,0] == "single_dose":
-                    dfr_Details.loc["Shorthand","Value"] = "EPSD"
-                elif dfr_Details.iloc[1,0] == "dose_response":
-                    dfr_Details.loc["Shorthand","Value"] = "EPDR"
-                elif dfr_Details.iloc[1,0] == "dose_response_time_course":
-                    dfr_Details.loc["Shorthand","Value"] = "DRTC"
-                elif dfr_Details.iloc[1,0] == "thermal_shift":
-                    if dfr_Details.iloc[0,0] == "nanoDSF":
-                        dfr_Details.loc["Shorthand","Value"] = "NDSF"
-                    else:
-                        dfr_Details.loc["Shorthand","Value"] = "DSF"
-                elif dfr_Details.iloc[1,0] == "rate":
-                    dfr_Details.loc["Shorthand","Value"] = "RATE"
-            # start new project based on dfr_Details.loc["Shorthand","Value"] (was =lst_Details[0])
-            self.StartNewProject(None, dfr_Details.loc["Shorthand","Value"])
-            # Hand over loaded data to populate tab
-            self.ProjectTab.PopulateFromFile(dfr_Details,
-                                             dfr_Boolean.BooleanVariables.tolist(),
-                                             dfr_Loaded,
-                                             dfr_Paths.Path.tolist())
-            # Display file name on header
-            self.ProjectTab.ButtonBar.lbl_Filename.SetLabel(str_FilePath)
-            # Update py files:
-            int_Slash = str(str_FilePath).rfind(chr(92))+1
-            str_FileName = str_FilePath[int_Slash:]
-            self.tab_Home.UpdateRecent(str_FilePath,
-                                       str_FileName,
-                                       dfr_Details.loc["AssayCategory","Value"],
-                                       dfr_Details.loc["Shorthand","Value"])
-            self.Thaw()
+        dfr_Details, lst_Boolean, dfr_Loaded, lst_Paths = prj.read_archive(str_FilePath, bol_Lazy = True)
+        # start new project based on dfr_Details.loc["Shorthand","Value"] (was =lst_Details[0])
+        self.StartNewProject(None, dfr_Details.loc["Shorthand","Value"])
+        # Hand over loaded data to populate tab
+        self.ProjectTab.PopulateFromFile(dfr_Details,
+                                         lst_Boolean,
+                                         dfr_Loaded,
+                                         lst_Paths)
+        # Display file name on header
+        self.ProjectTab.ButtonBar.lbl_Filename.SetLabel(str_FilePath)
+        # Update py files:
+        int_Slash = str(str_FilePath).rfind(chr(92))+1
+        str_FileName = str_FilePath[int_Slash:]
+        self.tab_Home.UpdateRecent(str_FilePath,
+                                   str_FileName,
+                                   dfr_Details.loc["AssayCategory","Value"],
+                                   dfr_Details.loc["Shorthand","Value"])
+        self.Thaw()
 
     def SaveFileAs(self, event):
         """
@@ -996,8 +849,8 @@ class frm_Main (wx.Frame):
     def WriteToArchive(self, str_SaveFilePath, dfr_AssayData,
                        dfr_Details, lst_Boolean, dfr_Paths):
         """
-        Writes the dataframes and lists into csv files and
-        packages them into a zip archive.
+        Writes the dataframes and lists into a zip archive
+        (see lib_projectfile for the file format).
         
         Arguments:
             str_SaveFilePath -> string. path of saved file
@@ -1013,73 +866,10 @@ class frm_Main (wx.Frame):
         Returns True on succesful save.
         """
         # Separated from main  saving function to simplify code for human readability.
-        
-        try:
-            zip_BBQ = zf.ZipFile(str_SaveFilePath, "w")
-        except:
-            return False
-
-        str_TempDir = os.path.join(Path.home(),"bbqtempdir")
-        # Check whether temporary directory exists. if so, delete and make fresh
-        if os.path.isdir(str_TempDir) == True:
-            shutil.rmtree(str_TempDir)
-            os.mkdir(str_TempDir)
-        else:
-            os.mkdir(str_TempDir)
-        # Paths
-        dfr_Paths.to_csv(str_TempDir + r"\paths.csv")
-        # .write(name_of_file_to_write, arcname=name_to_give_file_in_archive, other arguments)
-        # file names contain path. for arcname, use relative paths inside archive.
-        zip_BBQ.write(str_TempDir + r"\paths.csv", arcname="paths.csv")
-        # Assay details
-        dfr_Details.to_csv(str_TempDir + r"\details.csv")
-        zip_BBQ.write(str_TempDir + r"\details.csv", arcname="details.csv")
-        # Boolean status variables
-        dfr_Boolean = pd.DataFrame(lst_Boolean,columns=["BooleanVariables"])
-        dfr_Boolean.to_csv(str_TempDir + r"\boolean.csv")
-        zip_BBQ.write(str_TempDir + r"\boolean.csv", arcname="boolean.csv")
-        # Make dataframe with fields of dataframe that do not hold other dataframes
-        if dfr_Details.loc["AssayType","Value"] == "nanoDSF":
-            str_WellsOrCapillaries = "Capillaries"
-        else:
-            str_WellsOrCapillaries = "Wells"
-        dfr_Meta = dfr_AssayData[["DestinationPlateName",
-                                          str_WellsOrCapillaries,
-                                          "DataFileName"]]
-        dfr_Meta.to_csv(str_TempDir + r"\meta.csv")
-        zip_BBQ.write(str_TempDir + r"\meta.csv", arcname="meta.csv")
-        # Save all the fields that hold dataframes in separate folders
-        # (one folder per plate/set of capillaries)
-        for i in range(len(dfr_AssayData)):
-            str_Subdirectory = os.path.join(str_TempDir,
-                                            dfr_AssayData.loc[i,"DestinationPlateName"])
-            os.mkdir(str_Subdirectory)
-            str_Subdirectory_relative = dfr_AssayData.loc[i,"DestinationPlateName"] + chr(92)
-            # Samples
-            dfr_AssayData.loc[i,"Samples"].to_csv(str_Subdirectory + r"\samples.csv")
-            zip_BBQ.write(str_Subdirectory + r"\samples.csv",
-                          arcname=str_Subdirectory_relative+"samples.csv")
-            # Raw data
-            dfr_AssayData.loc[i,"RawDataFrame"].to_csv(str_Subdirectory + r"\rawdata.csv")
-            zip_BBQ.write(str_Subdirectory + r"\rawdata.csv",
-                          arcname=str_Subdirectory_relative+"rawdata.csv")
-            # Processed data
-            dfr_AssayData.loc[i,"ProcessedDataFrame"].to_csv(str_Subdirectory + r"\processed.csv")
-            zip_BBQ.write(str_Subdirectory + r"\processed.csv",
-                          arcname=str_Subdirectory_relative+"processed.csv")
-            # Plate layouts
-            dfr_Layout = dfr_AssayData.loc[i,"Layout"]
-            dfr_Layout.to_csv(str_Subdirectory + r"\layout.csv")
-            zip_BBQ.write(str_Subdirectory + r"\layout.csv",
-                          arcname=str_Subdirectory_relative+"layout.csv")
-            # List of reference wells
-            dfr_AssayData.loc[i,"References"].to_csv(str_Subdirectory + r"\references.csv")
-            zip_BBQ.write(str_Subdirectory + r"\references.csv",
-                          arcname=str_Subdirectory_relative+"references.csv")
-        zip_BBQ.close()
-        # Remove all the temporary files
-        shutil.rmtree(str_TempDir)
-        return True
+        # The actual writing happens in lib_projectfile so that it can also be used
+        # without the GUI (e.g. batch.py).
+        return prj.write_archive(str_SaveFilePath, dfr_AssayData, dfr_Details,
+                                 lst_Boolean, dfr_Paths)
 
     def FindAssays(self):
         """
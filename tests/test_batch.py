@@ -0,0 +1,31 @@
+import os
+
+import pandas as pd
+
+import batch
+
+str_Examples = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples")
+str_EPDR = os.path.join(str_Examples, "EPDR")
+
+
+def test_run_analysis_EPDR():
+    dfr_AssayData, dfr_Details, dfr_Paths = batch.run_analysis("EPDR", str_EPDR,
+        os.path.join(str_EPDR, "TransferFileIC50s.csv"), callback=None)
+    assert dfr_AssayData.shape[0] == 2
+    assert list(dfr_AssayData.DataFileName) == ["RawData_Plate.xls","RawData_Plate2.xls"]
+    assert all(len(dfr_Processed) == 11 for dfr_Processed in dfr_AssayData.ProcessedDataFrame)
+    assert dfr_Details.loc["Shorthand","Value"] == "EPDR"
+
+
+def test_main_EPDR(tmp_path):
+    str_Project = str(tmp_path / "epdr.bbq")
+    str_Results = str(tmp_path / "epdr.csv")
+    int_Exit = batch.main(["EPDR", "--transfer", os.path.join(str_EPDR, "TransferFileIC50s.csv"),
+                           "--data", str_EPDR, "--output", str_Project, "--results", str_Results,
+                           "--quiet"])
+    assert int_Exit == 0
+    assert os.path.isfile(str_Project)
+    dfr_Results = pd.read_csv(str_Results, index_col=0)
+    assert len(dfr_Results) == 22
+    assert set(dfr_Results.DestinationPlateName) == {"Destination Plate[1]","Destination Plate[2]"}
+    assert dfr_Results["NormFitFree IC50 (uM)"].notna().any()
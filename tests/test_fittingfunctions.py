@@ -0,0 +1,94 @@
+import numpy as np
+
+import lib_fittingfunctions as ff
+
+
+def numerical_jacobian(x, pars, eps=1e-7):
+    lst_Columns = []
+    for k in range(len(pars)):
+        lst_Step = list(pars)
+        lst_Step[k] += eps
+        lst_Columns.append((ff.eq_sigmoidal(x, *lst_Step) - ff.eq_sigmoidal(x, *pars))/eps)
+    return np.stack(lst_Columns, axis=-1)
+
+
+def test_jac_sigmoidal_matches_finite_differences():
+    x = np.logspace(-3, 2, 16)
+    pars = [100.0, 5.0, 1.3, 0.7]
+    np.testing.assert_allclose(ff.jac_sigmoidal(x, *pars), numerical_jacobian(x, pars),
+                               rtol=1e-4, atol=1e-4)
+
+
+def test_jac_sigmoidal_extreme_slopes():
+    # (i/x)**h overflows for these doses
+    x = np.array([1e-5, 1e-4, 1e-3, 1e-2, 1.0, 5.0, 10.0, 100.0])
+    for h in [150.0, -150.0, 1e4]:
+        arr_Jac = ff.jac_sigmoidal(x, 100.0, 5.0, h, 5.0)
+        assert arr_Jac.shape == (len(x), 4)
+        assert np.isfinite(arr_Jac).all()
+        np.testing.assert_allclose(arr_Jac[:,0] + arr_Jac[:,1], 1.0)
+    # Far from the IC50 the curve is flat
+    arr_Jac = ff.jac_sigmoidal(x[:4], 100.0, 5.0, 150.0, 5.0)
+    np.testing.assert_allclose(arr_Jac[:,0], 0.0, atol=1e-12)
+    np.testing.assert_allclose(arr_Jac[:,1], 1.0)
+    np.testing.assert_allclose(arr_Jac[:,2:], 0.0, atol=1e-12)
+
+
+def test_jac_sigmoidal_stacked():
+    x = np.logspace(-3, 2, 8)
+    arr_Pars = np.array([[100.0, 5.0, 1.0, 0.5], [90.0, -2.0, 150.0, 5.0]])
+    arr_Jac = ff.jac_sigmoidal(x, *[arr_Pars[:,k,None] for k in range(4)])
+    assert arr_Jac.shape == (2, len(x), 4)
+    np.testing.assert_allclose(arr_Jac[0], ff.jac_sigmoidal(x, *arr_Pars[0]))
+    np.testing.assert_allclose(arr_Jac[1], ff.jac_sigmoidal(x, *arr_Pars[1]))
+
+
+def test_fit_sigmoidal_free_needs_finite_covariance():
+    # As many points as parameters: curve_fit cannot estimate the covariance
+    doses = [1e-8, 1e-7, 1e-6, 1e-5]
+    responses = [98.0, 80.0, 30.0, 3.0]
+    for guess in [None, [100.0, 0.0, 1.0, 0.3]]:
+        fit, pars, confidence, stderr, rsquare, success = ff.fit_sigmoidal_free(doses, responses, guess=guess)
+        assert success == False
+        assert np.isnan(pars).all()
+    assert ff.fit_sigmoidal_free_batch([doses], [responses])[0][-1] == False
+
+
+def test_fit_sigmoidal_free_success():
+    doses = np.logspace(-9, -4, 8)
+    responses = ff.eq_sigmoidal(doses*1e6, 100.0, 0.0, 1.0, 0.5)
+    fit, pars, confidence, stderr, rsquare, success = ff.fit_sigmoidal_free(list(doses), list(responses))
+    assert success == True
+    np.testing.assert_allclose(pars, [100.0, 0.0, 1.0, 0.5], atol=1e-2)
+    assert np.isfinite(stderr).all()
+
+
+def test_fit_sigmoidal_free_rejects_extrapolation():
+    # Plate 2, sample 13 of examples/EPDR. Converges to a curve that only
+    # bends far above the highest concentration.
+    doses = [2.24e-05, 1.12e-05, 7.45e-06, 3.73e-06, 2.24e-06, 1.12e-06, 7.45e-07,
+             3.73e-07, 1.75e-07, 1.16e-07, 5.82e-08, 3.49e-08, 1.75e-08, 1.16e-08]
+    responses = [675.2, 924.85, 1287.56, 1742.78, 2581.31, 2900.32, 2485.65,
+                 2238.72, 1993.91, 2354.87, 3980.27, 3718.38, 3647.56, 2311.31]
+    fit, pars, confidence, stderr, rsquare, success = ff.fit_sigmoidal_free(doses, responses)
+    assert success == False
+    assert np.isnan(pars).all()
+    assert ff.fit_sigmoidal_free_batch([doses], [responses])[0][-1] == False
+
+
+def test_is_plausible_sigmoidal():
+    doses = np.logspace(-3, 1, 8)
+    responses = np.linspace(0.0, 100.0, 8)
+    assert ff.is_plausible_sigmoidal(doses, responses, [100.0, 0.0, 1.0, 0.5]) == True
+    assert ff.is_plausible_sigmoidal(doses, responses, [100.0, 0.0, 1.0, 5e4]) == False
+    assert ff.is_plausible_sigmoidal(doses, responses, [100.0, 0.0, 1.0, 1e-7]) == False
+    assert ff.is_plausible_sigmoidal(doses, responses, [-4e5, 0.0, 1.0, 0.5]) == False
+
+
+def test_get_warm_start():
+    assert ff.get_warm_start([100.0, 0.0, 1.5, 0.5]) == [100.0, 0.0, 1.5, 0.5]
+    assert ff.get_warm_start([100.0, 0.0, 1.5, 0.5], False) is None
+    assert ff.get_warm_start([100.0, np.nan, 1.5, 0.5]) is None
+    assert ff.get_warm_start([100.0, 0.0, 150.0, 0.5]) is None
+    assert ff.get_warm_start([100.0, 0.0, 1.5]) is None
+    assert ff.get_warm_start(np.nan) is None
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+import lib_projectfile as prj
+from lib_drtcresults import DRTCResults
+from lib_kineticstore import KineticReplicates
+
+
+def make_DRTC_project():
+    lst_Time = [0.0, 30.0, 60.0]
+    arr_RawData = np.arange(8*len(lst_Time), dtype=np.float64).reshape(8, len(lst_Time))
+    dfr_RawData = pd.DataFrame(arr_RawData, columns=lst_Time)
+    lst_Locations = [[[0,1],[2,3]], [[4,5],[6,7]]]
+    lst_Concentrations = [[1e-6,1e-5], [1e-6,1e-5]]
+    dfr_Processed = pd.DataFrame({"SampleID":["A","B"],
+                                  "Locations":lst_Locations,
+                                  "Concentrations":lst_Concentrations,
+                                  "Time":[lst_Time, lst_Time]})
+    dfr_Processed["RawData"] = [KineticReplicates(arr_RawData, lst_Locations[smpl], lst_Concentrations[smpl], lst_Time)
+                                for smpl in range(2)]
+    dfr_Empty = pd.DataFrame({"Value":[1.0]})
+    dfr_AssayData = pd.DataFrame({"DestinationPlateName":["Plate1"], "Samples":[dfr_Empty], "Wells":[384],
+                                  "DataFileName":["plate1.txt"], "RawDataFrame":[dfr_RawData],
+                                  "ProcessedDataFrame":[dfr_Processed], "Layout":[dfr_Empty],
+                                  "References":[dfr_Empty], "DRTCResults":[DRTCResults(lst_Time, 2, 2)]})
+    dfr_Details = pd.DataFrame({"Value":["DRTC","HTRF"]}, index=["Shorthand","AssayType"])
+    dfr_Paths = pd.DataFrame({"Path":["transfer.csv"]})
+    return dfr_AssayData, dfr_Details, dfr_Paths
+
+
+def test_kinetic_replicates_round_trip(tmp_path):
+    dfr_AssayData, dfr_Details, dfr_Paths = make_DRTC_project()
+    str_Project = str(tmp_path / "drtc.bbq")
+    assert prj.write_archive(str_Project, dfr_AssayData, dfr_Details, [True], dfr_Paths) == True
+    dfr_Details, lst_Boolean, dfr_Loaded, lst_Paths = prj.read_archive(str_Project)
+    dfr_Processed = dfr_Loaded.loc[0,"ProcessedDataFrame"]
+    arr_RawData = dfr_Loaded.loc[0,"RawDataFrame"].to_numpy()
+    for smpl in range(2):
+        replicates = dfr_Processed.loc[smpl,"RawData"]
+        assert isinstance(replicates, KineticReplicates)
+        assert replicates.lst_Locations == dfr_AssayData.loc[0,"ProcessedDataFrame"].loc[smpl,"Locations"]
+        assert replicates.values(1, 2) == arr_RawData[replicates.lst_Locations[1],2].tolist()
+        assert replicates.to_frame().equals(dfr_AssayData.loc[0,"ProcessedDataFrame"].loc[smpl,"RawData"].to_frame())
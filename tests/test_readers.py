@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+
+import lib_resultreadouts as ro
+
+str_Examples = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples")
+str_LightCycler = os.path.join(str_Examples, "DSF_LC")
+str_LightCyclerFile = "LC_RawData_Tm_shift.txt"
+str_MXP = os.path.join(str_Examples, "DSF_agilent")
+str_MXPFile = "2017 07 07 bromo compound A CG bis.xlsx"
+
+# Expected values, taken from the readers before they were rewritten. Whole numbers in
+# the MX3005p workbook are read as integers.
+dic_Expected = {
+    "lightcycler":{"Shape":(384,4), "Points":207, "TempType":float, "FluoType":float,
+                   "FirstWells":["A01","A02","A03","A04","A05"], "LastWells":["P22","P23","P24"],
+                   "FirstNames":["Sample 1","Sample 2","Sample 3"],
+                   "TempSum":4724279.04, "FluoSum":786459.04,
+                   "Temp5":[24.17,24.5,24.91], "TempLast":[94.33,94.7],
+                   "Fluo5":[9.14,9.17,9.17], "FluoLast":[6.95,6.89]},
+    "mxp":{"Shape":(96,4), "Points":71, "TempType":int, "FluoType":(int,float),
+           "FirstWells":["A01","A02","A03","A04","A05"], "LastWells":["H10","H11","H12"],
+           "FirstNames":["A01","A02","A03"],
+           "TempSum":402144.0, "FluoSum":37925625.39362,
+           "Temp5":[24,25,26], "TempLast":[93,94],
+           "Fluo5":[2796.72222,2778.7963,2758.26543], "FluoLast":[4606.49479,4551.67188]}
+    }
+
+
+def check_readout(dfr_Readout, dic_Values):
+    assert dfr_Readout.shape == dic_Values["Shape"]
+    assert list(dfr_Readout.columns) == ["Well","Name","Temp","Fluo"]
+    assert all(str(dtype) == "object" for dtype in dfr_Readout.dtypes)
+    assert list(dfr_Readout.Well[:5]) == dic_Values["FirstWells"]
+    assert list(dfr_Readout.Well[-3:]) == dic_Values["LastWells"]
+    assert list(dfr_Readout.Name[:3]) == dic_Values["FirstNames"]
+    for str_Column in ["Temp","Fluo"]:
+        assert all(type(lst_Values) == list for lst_Values in dfr_Readout[str_Column])
+        assert set(len(lst_Values) for lst_Values in dfr_Readout[str_Column]) == {dic_Values["Points"]}
+        assert all(isinstance(value, dic_Values[str_Column + "Type"])
+                   for lst_Values in dfr_Readout[str_Column] for value in lst_Values)
+        np.testing.assert_allclose(sum(sum(lst_Values) for lst_Values in dfr_Readout[str_Column]),
+                                   dic_Values[str_Column + "Sum"])
+        assert dfr_Readout[str_Column].iloc[5][:3] == dic_Values[str_Column + "5"]
+        assert dfr_Readout[str_Column].iloc[-1][-2:] == dic_Values[str_Column + "Last"]
+
+
+def test_lightcycler_readout():
+    dfr_Readout = ro.get_lightcycler_readout(os.path.join(str_LightCycler, str_LightCyclerFile), 384)
+    check_readout(dfr_Readout, dic_Expected["lightcycler"])
+    assert dfr_Readout.Name.iloc[-1] == "Sample 384"
+
+
+def test_mxp_readout():
+    dfr_Readout = ro.get_mxp_readout(os.path.join(str_MXP, str_MXPFile), 24)
+    check_readout(dfr_Readout, dic_Expected["mxp"])
+    assert (dfr_Readout.Name == dfr_Readout.Well).all()
+
+
+def test_read_datafile():
+    assert ro.get_reader_name("thermal_shift", "DSF_LC_384", "lightcycler") == "lightcycler"
+    assert ro.get_reader_name("thermal_shift", "DSF_MX_96", "agilent") == "mxp"
+    check_readout(ro.read_datafile("lightcycler", str_LightCycler, str_LightCyclerFile, 384, "DSF_LC_384"),
+                  dic_Expected["lightcycler"])
+    check_readout(ro.read_datafile("mxp", str_MXP, str_MXPFile, 96, "DSF_MX_96"),
+                  dic_Expected["mxp"])
+    # Files of the wrong type do not get parsed
+    assert ro.read_datafile("lightcycler", str_MXP, str_MXPFile, 384, "DSF_LC_384") is None
+    assert ro.read_datafile("mxp", str_LightCycler, str_LightCyclerFile, 96, "DSF_MX_96") is None
+    assert ro.read_datafile("lightcycler", str_MXP, "fnord", 384, "DSF_LC_384") is None